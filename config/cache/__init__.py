@@ -0,0 +1,18 @@
+from .breaker import CircuitBreaker
+from .client import CodecClient, TwoTierClient
+from .codec import CacheCodec, CompactSerializer
+from .local import FallbackCache, LocalCache
+from .resilient import ResilientClient
+from .stampede import get_or_compute
+
+__all__ = [
+    'CacheCodec',
+    'CircuitBreaker',
+    'CodecClient',
+    'CompactSerializer',
+    'FallbackCache',
+    'LocalCache',
+    'ResilientClient',
+    'TwoTierClient',
+    'get_or_compute',
+]
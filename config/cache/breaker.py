@@ -0,0 +1,165 @@
+import logging
+import socket
+import threading
+import time
+
+from redis.exceptions import TimeoutError as RedisTimeoutError
+
+logger = logging.getLogger('config.cache')
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+
+DEFAULT_BREAKER_OPTIONS = {
+    # Oxirgi WINDOW sekunddagi chaqiruvlarning FAILURE_RATE qismi xato bo'lsa (kamida MIN_CALLS ta) ochiladi
+    'WINDOW': 10,
+    'MIN_CALLS': 10,
+    'FAILURE_RATE': 0.5,
+    # Socket timeout bitta chaqiruvni SOCKET_TIMEOUT ga to'sadi - MIN_CALLS ni kutmasdan darhol ochiladi
+    'TRIP_ON_TIMEOUT': True,
+    # Ochiq holatda Redis'ga umuman murojaat qilinmaydi; shundan keyin PING bilan tekshiriladi
+    'OPEN_SECONDS': 5,
+    'PROBE_TIMEOUT': 0.05,
+}
+
+
+class FailureWindow:
+    """
+    Sekundlik bucketlar halqasi: har bir sekund uchun (jami, xato). Chaqiruvlar soniga
+    bog'liq bo'lmagan xotira bilan oxirgi `seconds` sekunddagi xato ulushini beradi.
+    """
+
+    def __init__(self, seconds):
+        self.seconds = seconds
+        self._buckets = [[0, 0, 0] for _ in range(seconds)]  # [sekund, jami, xato]
+
+    def record(self, success, now=None):
+        second = int(now if now is not None else time.monotonic())
+        bucket = self._buckets[second % self.seconds]
+        if bucket[0] != second:
+            bucket[:] = [second, 0, 0]
+        bucket[1] += 1
+        if not success:
+            bucket[2] += 1
+
+    def totals(self, now=None):
+        oldest = int(now if now is not None else time.monotonic()) - self.seconds
+        calls = failures = 0
+        for second, total, failed in self._buckets:
+            if second > oldest:
+                calls += total
+                failures += failed
+        return calls, failures
+
+    def reset(self):
+        for bucket in self._buckets:
+            bucket[:] = [0, 0, 0]
+
+
+class CircuitBreaker:
+    """
+    closed -> (xato ulushi oshsa) open -> (OPEN_SECONDS o'tgach) half_open -> probe muvaffaqiyatli
+    bo'lsa closed, aks holda yana open. Probe'ni bitta chaqiruvchi bajaradi, qolganlar kutmaydi.
+    `probe` - qisqa timeout bilan Redis'ni tekshiradigan funksiya (xato bo'lsa exception).
+    """
+
+    def __init__(self, probe, options=None, on_close=None):
+        self.options = {**DEFAULT_BREAKER_OPTIONS, **(options or {})}
+        self.probe = probe
+        self.on_close = on_close
+        self.state = CLOSED
+        self.window = FailureWindow(self.options['WINDOW'])
+        self.opened_at = None
+        self.trips = 0
+        self.short_circuited = 0
+        self.failures = 0
+        self.last_error = None
+        self._probing = False
+        self._lock = threading.Lock()
+
+    def allow(self):
+        """
+        Redis'ga murojaat qilish mumkinmi. Ochiq holatda mikrosekundlarda False qaytaradi.
+        """
+        if self.state == CLOSED:
+            return True
+
+        with self._lock:
+            if self.state == CLOSED:
+                return True
+            if self._probing or time.monotonic() - self.opened_at < self.options['OPEN_SECONDS']:
+                self.short_circuited += 1
+                return False
+            self._probing = True
+            self._transition(HALF_OPEN)
+
+        try:
+            self.probe()
+        except Exception as exc:
+            with self._lock:
+                self._probing = False
+                self.last_error = str(exc) or repr(exc)
+                self._open()
+            self.short_circuited += 1
+            return False
+
+        with self._lock:
+            self._probing = False
+            self.window.reset()
+            self._transition(CLOSED)
+        if self.on_close is not None:
+            self.on_close()
+        return True
+
+    def record_success(self):
+        if self.state == CLOSED:
+            self.window.record(True)
+
+    def record_failure(self, exc):
+        with self._lock:
+            self.failures += 1
+            self.last_error = str(exc) or repr(exc)
+            if self.state != CLOSED:
+                return
+            self.window.record(False)
+            if self.options['TRIP_ON_TIMEOUT'] and _is_timeout(exc):
+                self._open()
+                return
+            calls, failures = self.window.totals()
+            if calls >= self.options['MIN_CALLS'] and failures / calls >= self.options['FAILURE_RATE']:
+                self._open()
+
+    def _open(self):
+        if self.state != OPEN:
+            self.trips += 1
+        self.opened_at = time.monotonic()
+        self._transition(OPEN)
+
+    def _transition(self, state):
+        if state != self.state:
+            log = logger.warning if state == OPEN else logger.info
+            log('Redis circuit breaker %s -> %s (%s)', self.state, state, self.last_error)
+            self.state = state
+
+    def stats(self):
+        calls, failures = self.window.totals()
+        return {
+            'state': self.state,
+            'trips': self.trips,
+            'short_circuited': self.short_circuited,
+            'failures': self.failures,
+            'window_calls': calls,
+            'window_failures': failures,
+            'open_for': round(time.monotonic() - self.opened_at, 3) if self.state != CLOSED else 0,
+            'last_error': self.last_error,
+        }
+
+
+def _is_timeout(exc):
+    # django-redis ConnectionInterrupted asl xatoni __cause__ da saqlaydi
+    while exc is not None:
+        if isinstance(exc, (RedisTimeoutError, socket.timeout)):
+            return True
+        exc = exc.__cause__
+    return False
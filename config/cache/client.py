@@ -0,0 +1,273 @@
+import json
+import logging
+import os
+import threading
+import uuid
+
+from django.core.cache.backends.base import DEFAULT_TIMEOUT
+from django_redis.client import DefaultClient
+from django_redis.util import CacheKey
+from redis.client import Pipeline
+
+from .codec import CacheCodec
+from .local import MISSING, LocalCache
+
+logger = logging.getLogger('config.cache')
+
+DEFAULT_LOCAL_OPTIONS = {
+    'MAX_ENTRIES': 1024,
+    # kalit prefiksi -> lokal TTL (sekund). Ro'yxatda yo'q kalitlar har doim Redis'dan o'qiladi
+    'PREFIXES': {},
+    'CHANNEL': None,
+    'RECONNECT_DELAY': 1,
+}
+
+
+class InvalidationListener(threading.Thread):
+    """
+    Redis pub/sub kanalini tinglab, boshqa workerlar o'zgartirgan kalitlarni lokal keshdan o'chiradi.
+    Ulanish uzilsa (xabarlar yo'qolgan bo'lishi mumkin) lokal kesh tozalanadi va ulanish
+    qayta tiklanmaguncha lokal qatlam ishlatilmaydi.
+    """
+
+    def __init__(self, client):
+        super().__init__(name='cache-invalidation', daemon=True)
+        self.client = client
+        self.connected = threading.Event()
+        self.stopped = threading.Event()
+
+    def run(self):
+        while not self.stopped.is_set():
+            try:
+                self.listen()
+            except Exception:
+                logger.warning('Cache invalidation channel lost, local tier disabled until reconnect',
+                               exc_info=True)
+            self.connected.clear()
+            self.client.local.clear()
+            self.stopped.wait(self.client.local_options['RECONNECT_DELAY'])
+
+    def listen(self):
+        pubsub = self.client.get_client(write=True).pubsub()
+        try:
+            pubsub.subscribe(self.client.channel)
+            while not self.stopped.is_set():
+                message = pubsub.get_message(timeout=1.0)
+                if message is None:
+                    continue
+                if message['type'] == 'subscribe':
+                    # Obunagacha bo'lgan o'zgarishlarni bilmaymiz - toza holatdan boshlaymiz
+                    self.client.local.clear()
+                    self.connected.set()
+                elif message['type'] == 'message':
+                    self.client.apply_invalidation(message['data'])
+        finally:
+            pubsub.close()
+
+
+class CodecClient(DefaultClient):
+    """
+    DefaultClient, lekin qiymatlar OPTIONS['CODEC'] bo'yicha kalit prefiksiga qarab kodlanadi
+    (config.cache.codec.CacheCodec). COMPRESSOR/SERIALIZER sozlamalari ishlatilmaydi.
+    """
+
+    def __init__(self, server, params, backend):
+        super().__init__(server, params, backend)
+        self.codec = CacheCodec(self._options.get('CODEC'))
+
+    def plain_key(self, key):
+        # make_key() natijasi (CacheKey) bo'lsa prefiks va versiyasiz kalit
+        return self.reverse_key(key) if isinstance(key, CacheKey) else key
+
+    def encode(self, value, key=None):
+        if type(value) is Encoded:
+            return value.data
+        return self.codec.encode(value, None if key is None else self.plain_key(key))
+
+    def decode(self, value):
+        return self.codec.decode(value)
+
+    def set(self, key, value, timeout=DEFAULT_TIMEOUT, version=None, client=None, nx=False, xx=False):
+        # DefaultClient.set() encode()'ga kalitni bermaydi - qiymat shu yerda kodlanadi
+        return super().set(key, Encoded(self.encode(value, key)), timeout,
+                           version=version, client=client, nx=nx, xx=xx)
+
+
+class Encoded:
+    __slots__ = ('data',)
+
+    def __init__(self, data):
+        self.data = data
+
+
+class TwoTierClient(CodecClient):
+    """
+    django-redis DefaultClient + jarayon ichidagi LRU qatlam. Faqat OPTIONS['LOCAL_CACHE']['PREFIXES']
+    da e'lon qilingan prefiksli kalitlar lokal saqlanadi, har biri o'z TTL'i bilan.
+    Yozish/o'chirishlar Redis'ga tushgandan keyin kalitlar pub/sub orqali barcha workerlarga
+    e'lon qilinadi.
+    """
+
+    def __init__(self, server, params, backend):
+        super().__init__(server, params, backend)
+        self.local_options = {**DEFAULT_LOCAL_OPTIONS, **self._options.get('LOCAL_CACHE', {})}
+        self.local = LocalCache(self.local_options['MAX_ENTRIES'])
+        # Uzunroq prefiks birinchi: 'user:' va 'user:snapshot:' bo'lsa aniqrog'i tanlanadi
+        self.local_prefixes = sorted(self.local_options['PREFIXES'].items(), key=lambda item: -len(item[0]))
+        self.channel = self.local_options['CHANNEL'] or f'{backend.key_prefix or "cache"}:invalidate'
+        self.origin = uuid.uuid4().hex
+        self._listener = None
+        self._listener_pid = None
+        self._listener_lock = threading.Lock()
+
+    # --- lokal qatlam ---
+
+    def local_timeout(self, key):
+        if not self.local_prefixes:
+            return None
+        key = self.plain_key(key)
+        for prefix, timeout in self.local_prefixes:
+            if key.startswith(prefix):
+                return timeout
+        return None
+
+    def local_ready(self):
+        """
+        Listener ishlayotgan va obuna tasdiqlangan bo'lsa True. Fork'dan keyin (gunicorn --preload)
+        thread bolaga o'tmaydi - pid o'zgarsa listener qayta ishga tushiriladi.
+        """
+        if self._listener_pid != os.getpid() or not self._listener.is_alive():
+            with self._listener_lock:
+                if self._listener_pid != os.getpid() or not self._listener.is_alive():
+                    self.local.clear()
+                    self._listener = InvalidationListener(self)
+                    self._listener.start()
+                    self._listener_pid = os.getpid()
+        return self._listener.connected.is_set()
+
+    def apply_invalidation(self, payload):
+        message = json.loads(payload)
+        if message['origin'] == self.origin:
+            return
+        if message['keys'] is None:
+            self.local.clear()
+        else:
+            self.local.delete_many(message['keys'])
+
+    def invalidation_message(self, keys):
+        """
+        (kanal, payload) - Redis'ga boshqa yo'l bilan yozadiganlar (AsyncCache) ham shuni e'lon qiladi.
+        `keys` None bo'lsa barcha lokal keshlar tozalanadi.
+        """
+        return self.channel, json.dumps({'origin': self.origin, 'keys': keys})
+
+    def invalidate(self, keys, client=None):
+        """
+        Lokal nusxani o'chiradi va boshqa workerlarga xabar beradi. Redis'ga yozilgandan
+        keyin chaqiriladi - aks holda boshqa worker eski qiymatni qayta o'qib olishi mumkin.
+        """
+        if keys is not None:
+            keys = [str(key) for key in keys if self.local_timeout(key) is not None]
+            if not keys:
+                return
+            self.local.delete_many(keys)
+        else:
+            self.local.clear()
+
+        channel, payload = self.invalidation_message(keys)
+        try:
+            (client or self.get_client(write=True)).publish(channel, payload)
+        except Exception:
+            # Yozish o'tdi, lekin boshqa workerlar lokal TTL tugaguncha eski qiymatni ko'rishi mumkin
+            logger.warning('Failed to publish cache invalidation for %s', keys, exc_info=True)
+
+    # --- o'qish ---
+
+    def get(self, key, default=None, version=None, client=None):
+        timeout = self.local_timeout(key)
+        if timeout is None or not self.local_ready():
+            return super().get(key, default=default, version=version, client=client)
+
+        key = self.make_key(key, version=version)
+        value = self.local.get(key)
+        if value is not MISSING:
+            return value
+
+        generation = self.local.generation
+        value = super().get(key, default=MISSING, version=version, client=client)
+        if value is MISSING:
+            return default
+        self.local.set(key, value, timeout, generation)
+        return value
+
+    def get_many(self, keys, version=None, client=None):
+        keys = list(keys)
+        if not self.local_prefixes or not self.local_ready():
+            return super().get_many(keys, version=version, client=client)
+
+        found = {}
+        remote = []
+        for key in keys:
+            cache_key = self.make_key(key, version=version)
+            value = self.local.get(cache_key) if self.local_timeout(key) is not None else MISSING
+            if value is MISSING:
+                remote.append(key)
+            else:
+                found[key] = value
+
+        if remote:
+            generation = self.local.generation
+            fetched = super().get_many(remote, version=version, client=client)
+            for key, value in fetched.items():
+                timeout = self.local_timeout(key)
+                if timeout is not None:
+                    self.local.set(self.make_key(key, version=version), value, timeout, generation)
+            found.update(fetched)
+
+        # super().get_many() kabi so'ralgan tartibda
+        return {key: found[key] for key in keys if key in found}
+
+    # --- yozish ---
+
+    def set(self, key, value, timeout=DEFAULT_TIMEOUT, version=None, client=None, nx=False, xx=False):
+        result = super().set(key, value, timeout, version=version, client=client, nx=nx, xx=xx)
+        # set_many() pipeline orqali chaqiradi - e'lon pipeline bajarilgandan keyin
+        if result and not isinstance(client, Pipeline):
+            self.invalidate([self.make_key(key, version=version)])
+        return result
+
+    def set_many(self, data, timeout=DEFAULT_TIMEOUT, version=None, client=None):
+        super().set_many(data, timeout, version=version, client=client)
+        self.invalidate([self.make_key(key, version=version) for key in data])
+
+    def delete(self, key, version=None, prefix=None, client=None):
+        result = super().delete(key, version=version, prefix=prefix, client=client)
+        self.invalidate([self.make_key(key, version=version, prefix=prefix)])
+        return result
+
+    def delete_many(self, keys, version=None, client=None):
+        keys = list(keys)
+        result = super().delete_many(keys, version=version, client=client)
+        self.invalidate([self.make_key(key, version=version) for key in keys])
+        return result
+
+    def delete_pattern(self, *args, **kwargs):
+        result = super().delete_pattern(*args, **kwargs)
+        self.invalidate(None)
+        return result
+
+    def clear(self, client=None):
+        super().clear(client=client)
+        self.invalidate(None)
+
+    def _incr(self, key, delta=1, version=None, client=None, ignore_key_check=False):
+        value = super()._incr(key, delta, version=version, client=client, ignore_key_check=ignore_key_check)
+        self.invalidate([self.make_key(key, version=version)])
+        return value
+
+    def stats(self):
+        return {
+            **self.local.stats(),
+            'prefixes': dict(self.local_prefixes),
+            'listener_connected': bool(self._listener and self._listener.connected.is_set()),
+        }
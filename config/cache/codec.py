@@ -0,0 +1,320 @@
+import pickle
+import struct
+import zlib
+
+from django_redis.exceptions import CompressorError
+
+DEFAULT_CODEC_OPTIONS = {
+    # Shundan qisqa qiymatlar siqilmaydi: kichik qiymatlarda zlib faqat CPU sarflaydi va hajmni oshiradi
+    'COMPRESS_MIN_LENGTH': 1024,
+    'COMPRESS_LEVEL': 6,
+    'DEFAULT': {'SERIALIZER': 'compact', 'COMPRESSOR': 'zlib'},
+    # kalit prefiksi -> {'SERIALIZER': ..., 'COMPRESSOR': ...}; eng uzun mos prefiks tanlanadi
+    'PREFIXES': {},
+}
+
+# Compact formatda 1 bayt bilan yoziladigan satrlar (dict kalitlari va tez-tez uchraydigan qiymatlar).
+# Faqat oxiriga qo'shish mumkin: indeks Redis'dagi qiymatlar ichida saqlanadi
+KNOWN_STRINGS = (
+    'email',
+    'code',
+    'ip_address',
+    'user_id',
+    '_auth_user_id',
+    '_auth_user_backend',
+    '_auth_user_hash',
+    'django.contrib.auth.backends.ModelBackend',
+)
+_KNOWN_INDEX = {value: index for index, value in enumerate(KNOWN_STRINGS)}
+
+_INT32 = struct.Struct('>i')
+_INT64 = struct.Struct('>q')
+_FLOAT = struct.Struct('>d')
+_UINT16 = struct.Struct('>H')
+_UINT32 = struct.Struct('>I')
+
+
+class Unsupported(Exception):
+    pass
+
+
+class CompactSerializer:
+    """
+    msgpack'ga o'xshash ixcham binar format: None, bool, int (64 bit), float, str, bytes, list,
+    tuple va dict. Turlar aniq tekshiriladi (`type(x) is ...`) - subklasslar (OrderedDict, SafeString)
+    va boshqa turlar uchun Unsupported, codec ularni pickle bilan yozadi. Shu sababli o'qilgan
+    qiymat yozilgani bilan bir xil turda bo'ladi.
+
+    OTP dict'i pickle+zlib'da ~100 bayt, bu formatda ~45 bayt; True - 1 bayt.
+    """
+
+    def __init__(self, options=None):
+        pass
+
+    def dumps(self, value):
+        out = bytearray()
+        _pack(value, out)
+        return bytes(out)
+
+    def loads(self, data):
+        value, offset = _unpack(data, 0)
+        if offset != len(data):
+            raise ValueError('Trailing data in compact cache value')
+        return value
+
+
+def _pack(value, out):
+    kind = type(value)
+    if kind is str:
+        index = _KNOWN_INDEX.get(value)
+        if index is not None:
+            out.append(0xE0 | index)
+            return
+        data = value.encode()
+        size = len(data)
+        if size < 32:
+            out.append(0xA0 | size)
+        elif size < 0x10000:
+            out.append(0xDA)
+            out += _UINT16.pack(size)
+        else:
+            out.append(0xDB)
+            out += _UINT32.pack(size)
+        out += data
+    elif kind is int:
+        if 0 <= value < 0x80:
+            out.append(value)
+        elif -0x80000000 <= value < 0x80000000:
+            out.append(0xD2)
+            out += _INT32.pack(value)
+        elif -0x8000000000000000 <= value < 0x8000000000000000:
+            out.append(0xD3)
+            out += _INT64.pack(value)
+        else:
+            raise Unsupported(kind)
+    elif value is None:
+        out.append(0xC0)
+    elif value is True:
+        out.append(0xC3)
+    elif value is False:
+        out.append(0xC2)
+    elif kind is dict:
+        _header(out, len(value), 0x80, 0xDE)
+        for key, item in value.items():
+            _pack(key, out)
+            _pack(item, out)
+    elif kind is list:
+        _header(out, len(value), 0x90, 0xDC)
+        for item in value:
+            _pack(item, out)
+    elif kind is tuple:
+        out.append(0xD4)
+        out += _UINT32.pack(len(value))
+        for item in value:
+            _pack(item, out)
+    elif kind is float:
+        out.append(0xCB)
+        out += _FLOAT.pack(value)
+    elif kind is bytes:
+        out.append(0xC6)
+        out += _UINT32.pack(len(value))
+        out += value
+    else:
+        raise Unsupported(kind)
+
+
+def _header(out, size, fixed, extended):
+    if size < 16:
+        out.append(fixed | size)
+    else:
+        out.append(extended)
+        out += _UINT32.pack(size)
+
+
+def _unpack(data, offset):
+    tag = data[offset]
+    offset += 1
+    if tag < 0x80:
+        return tag, offset
+    if tag >= 0xE0:
+        return KNOWN_STRINGS[tag & 0x1F], offset
+    if 0xA0 <= tag < 0xC0:
+        end = offset + (tag & 0x1F)
+        return str(data[offset:end], 'utf-8'), end
+    if 0x80 <= tag < 0xA0:
+        return _unpack_container(data, offset, tag & 0x0F, tag < 0x90)
+    if tag == 0xC0:
+        return None, offset
+    if tag == 0xC3:
+        return True, offset
+    if tag == 0xC2:
+        return False, offset
+    if tag == 0xD2:
+        return _INT32.unpack_from(data, offset)[0], offset + 4
+    if tag == 0xD3:
+        return _INT64.unpack_from(data, offset)[0], offset + 8
+    if tag == 0xCB:
+        return _FLOAT.unpack_from(data, offset)[0], offset + 8
+    if tag in (0xDA, 0xDB):
+        size_format = _UINT16 if tag == 0xDA else _UINT32
+        size = size_format.unpack_from(data, offset)[0]
+        offset += size_format.size
+        return str(data[offset:offset + size], 'utf-8'), offset + size
+    if tag == 0xC6:
+        size = _UINT32.unpack_from(data, offset)[0]
+        offset += 4
+        return bytes(data[offset:offset + size]), offset + size
+    if tag in (0xDE, 0xDC, 0xD4):
+        size = _UINT32.unpack_from(data, offset)[0]
+        value, offset = _unpack_container(data, offset + 4, size, tag == 0xDE)
+        return (tuple(value) if tag == 0xD4 else value), offset
+    raise ValueError(f'Unknown compact cache tag 0x{tag:02x}')
+
+
+def _unpack_container(data, offset, size, mapping):
+    items = []
+    append = items.append
+    for _ in range(size * 2 if mapping else size):
+        # Eng ko'p uchraydigan skalyar turlar funksiya chaqiruvisiz
+        tag = data[offset]
+        if tag >= 0xE0:
+            append(KNOWN_STRINGS[tag & 0x1F])
+            offset += 1
+        elif 0xA0 <= tag < 0xC0:
+            end = offset + 1 + (tag & 0x1F)
+            append(str(data[offset + 1:end], 'utf-8'))
+            offset = end
+        elif tag < 0x80:
+            append(tag)
+            offset += 1
+        else:
+            item, offset = _unpack(data, offset)
+            append(item)
+    if mapping:
+        return dict(zip(items[::2], items[1::2])), offset
+    return items, offset
+
+
+class PickleSerializer:
+    def __init__(self, options=None):
+        self.protocol = pickle.HIGHEST_PROTOCOL
+
+    def dumps(self, value):
+        return pickle.dumps(value, self.protocol)
+
+    def loads(self, data):
+        return pickle.loads(data)
+
+
+class ZlibCompressor:
+    def __init__(self, options=None):
+        self.level = (options or {}).get('COMPRESS_LEVEL', DEFAULT_CODEC_OPTIONS['COMPRESS_LEVEL'])
+
+    def compress(self, data):
+        return zlib.compress(data, self.level)
+
+    def decompress(self, data):
+        try:
+            return zlib.decompress(data)
+        except zlib.error as exc:
+            raise CompressorError from exc
+
+
+# Yangi format qo'shish: nom -> (id, klass). id'lar qiymat sarlavhasiga yoziladi - o'zgartirilmaydi.
+# Serializer id 1..7, compressor id 0..3 (0 - siqilmagan)
+SERIALIZERS = {
+    'pickle': (1, PickleSerializer),
+    'compact': (2, CompactSerializer),
+}
+COMPRESSORS = {
+    None: (0, None),
+    'zlib': (1, ZlibCompressor),
+}
+
+
+class CacheCodec:
+    """
+    Qiymatni kalit prefiksi bo'yicha tanlangan serializer va compressor bilan kodlaydi.
+    Birinchi bayt - sarlavha (serializer_id << 2 | compressor_id), shuning uchun o'qishda kalit
+    kerak emas va sozlamalar o'zgarsa ham eski qiymatlar o'qiladi. Sarlavha 0x04..0x1F oralig'ida:
+    oldingi django-redis formati (pickle 0x80.., zlib 0x78..) va INCR uchun xom saqlanadigan
+    butun sonlar bilan to'qnashmaydi.
+    """
+
+    def __init__(self, options=None):
+        self.options = {**DEFAULT_CODEC_OPTIONS, **(options or {})}
+        self.min_length = self.options['COMPRESS_MIN_LENGTH']
+        self._serializers = {}
+        self._compressors = {}
+        self._decoders = {}
+        for name, (serializer_id, serializer_class) in SERIALIZERS.items():
+            self._serializers[name] = (serializer_id, serializer_class(self.options))
+        for name, (compressor_id, compressor_class) in COMPRESSORS.items():
+            compressor = compressor_class(self.options) if compressor_class else None
+            self._compressors[name] = (compressor_id, compressor)
+        for serializer_id, serializer in self._serializers.values():
+            for compressor_id, compressor in self._compressors.values():
+                self._decoders[serializer_id << 2 | compressor_id] = (serializer, compressor)
+
+        self.default_rule = self._rule(self.options['DEFAULT'])
+        # Uzunroq prefiks birinchi
+        self.rules = sorted(
+            ((prefix, self._rule(rule)) for prefix, rule in self.options['PREFIXES'].items()),
+            key=lambda item: -len(item[0]),
+        )
+        self._legacy = (PickleSerializer(), ZlibCompressor())
+
+    def _rule(self, rule):
+        serializer = rule.get('SERIALIZER', 'compact')
+        compressor = rule.get('COMPRESSOR')
+        if serializer not in self._serializers or compressor not in self._compressors:
+            raise ValueError(f'Unknown cache codec {serializer!r}/{compressor!r}')
+        return self._serializers[serializer], self._compressors[compressor]
+
+    def rule_for(self, key):
+        if key is not None:
+            for prefix, rule in self.rules:
+                if key.startswith(prefix):
+                    return rule
+        return self.default_rule
+
+    def encode(self, value, key=None):
+        # django-redis kabi: butun sonlar xom saqlanadi, aks holda INCR ishlamaydi
+        if type(value) is int:
+            return value
+
+        (serializer_id, serializer), (compressor_id, compressor) = self.rule_for(key)
+        try:
+            data = serializer.dumps(value)
+        except (Unsupported, RecursionError):
+            serializer_id, serializer = self._serializers['pickle']
+            data = serializer.dumps(value)
+
+        if compressor is not None and len(data) >= self.min_length:
+            compressed = compressor.compress(data)
+            # Siqilmaydigan ma'lumot (rasm, shifrlangan token) uchun siqilmagan variant qoladi
+            if len(compressed) < len(data):
+                return bytes((serializer_id << 2 | compressor_id,)) + compressed
+        return bytes((serializer_id << 2,)) + data
+
+    def decode(self, data):
+        decoder = self._decoders.get(data[0]) if data else None
+        if decoder is None:
+            try:
+                return int(data)
+            except (ValueError, TypeError):
+                return self._decode_legacy(data)
+        serializer, compressor = decoder
+        payload = data[1:]
+        if compressor is not None:
+            payload = compressor.decompress(payload)
+        return serializer.loads(payload)
+
+    def _decode_legacy(self, data):
+        # django-redis PickleSerializer + ZlibCompressor bilan yozilgan (15 baytdan qisqasi siqilmagan)
+        serializer, compressor = self._legacy
+        try:
+            data = compressor.decompress(data)
+        except CompressorError:
+            pass
+        return serializer.loads(data)
@@ -0,0 +1,133 @@
+import pickle
+import threading
+import time
+from collections import OrderedDict
+
+# O'zgarmas turlar nusxalanmasdan saqlanadi; qolganlari pickle qilinadi - chaqiruvchi
+# olgan dict/list'ni o'zgartirsa ham keshdagi qiymat buzilmaydi (Redis'dagi kabi)
+IMMUTABLE_TYPES = (str, bytes, int, float, bool, type(None))
+
+MISSING = object()
+
+
+class LocalCache:
+    """
+    Jarayon ichidagi LRU + TTL kesh. `MAX_ENTRIES` dan oshsa eng kam ishlatilgan kalit chiqariladi.
+
+    `generation` har bir invalidatsiyada oshadi: Redis'dan o'qish boshlanganidan keyin
+    invalidatsiya kelgan bo'lsa, eski qiymat lokal keshga yozilmaydi.
+    """
+
+    def __init__(self, max_entries=1024):
+        self.max_entries = max_entries
+        self.generation = 0
+        self.hits = 0
+        self.misses = 0
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._data)
+
+    def get(self, key, default=MISSING):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None or entry[0] <= time.monotonic():
+                if entry is not None:
+                    del self._data[key]
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+        expires_at, frozen, value = entry
+        return pickle.loads(value) if frozen else value
+
+    def set(self, key, value, timeout, generation=None):
+        frozen = not isinstance(value, IMMUTABLE_TYPES)
+        stored = pickle.dumps(value, pickle.HIGHEST_PROTOCOL) if frozen else value
+        with self._lock:
+            if generation is not None and generation != self.generation:
+                return False
+            self._data[key] = (time.monotonic() + timeout, frozen, stored)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+        return True
+
+    def delete_many(self, keys):
+        with self._lock:
+            self.generation += 1
+            for key in keys:
+                self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self.generation += 1
+            self._data.clear()
+
+    def stats(self):
+        return {
+            'entries': len(self._data),
+            'max_entries': self.max_entries,
+            'hits': self.hits,
+            'misses': self.misses,
+        }
+
+
+class FallbackCache(LocalCache):
+    """
+    Redis ishlamay turganda (circuit breaker ochiq) ishlatiladigan jarayon ichidagi kesh.
+    Sessiyalar, OTP va throttle kalitlari shu workerda ishlashda davom etadi; Redis qaytganda tozalanadi.
+    """
+
+    def _deadline(self, timeout):
+        return float('inf') if timeout is None else time.monotonic() + timeout
+
+    def set(self, key, value, timeout, generation=None):
+        if timeout is not None and timeout <= 0:
+            self.delete_many([key])
+            return True
+        return super().set(key, value, float('inf') if timeout is None else timeout, generation)
+
+    def add(self, key, value, timeout):
+        with self._lock:
+            if self._alive(key):
+                return False
+        return self.set(key, value, timeout)
+
+    def has_key(self, key):
+        with self._lock:
+            return self._alive(key)
+
+    def delete(self, key):
+        with self._lock:
+            existed = self._alive(key)
+            self._data.pop(key, None)
+        return existed
+
+    def incr(self, key, delta, ignore_key_check=False):
+        with self._lock:
+            if self._alive(key):
+                expires_at, frozen, value = self._data[key]
+            elif ignore_key_check:
+                expires_at, frozen, value = float('inf'), False, 0
+            else:
+                raise ValueError(f"Key '{key}' not found")
+            value += delta
+            self._data[key] = (expires_at, frozen, value)
+        return value
+
+    def touch(self, key, timeout):
+        with self._lock:
+            if not self._alive(key):
+                return False
+            _, frozen, value = self._data[key]
+            self._data[key] = (self._deadline(timeout), frozen, value)
+        return True
+
+    def _alive(self, key):
+        entry = self._data.get(key)
+        if entry is not None and entry[0] <= time.monotonic():
+            del self._data[key]
+            entry = None
+        return entry is not None
@@ -0,0 +1,187 @@
+import socket
+import threading
+
+import redis
+from django.core.cache.backends.base import DEFAULT_TIMEOUT
+from django_redis.exceptions import ConnectionInterrupted
+from redis.exceptions import ConnectionError as RedisConnectionError
+from redis.exceptions import TimeoutError as RedisTimeoutError
+
+from .breaker import CircuitBreaker
+from .client import TwoTierClient
+from .local import MISSING, FallbackCache
+
+# Redis ishlamayotganini bildiradigan xatolar. ResponseError (noto'g'ri buyruq) bu yerga kirmaydi
+OUTAGE_ERRORS = (RedisConnectionError, RedisTimeoutError, socket.timeout, OSError)
+
+DEFAULT_FALLBACK_OPTIONS = {
+    'MAX_ENTRIES': 10000,
+}
+
+
+def is_outage(exc):
+    if isinstance(exc, ConnectionInterrupted):
+        exc = exc.__cause__
+    return isinstance(exc, OUTAGE_ERRORS)
+
+
+class ResilientClient(TwoTierClient):
+    """
+    TwoTierClient + circuit breaker. Redis xato bera boshlasa breaker ochiladi va OPEN_SECONDS davomida
+    barcha amallar Redis'ga bormasdan (socket timeoutni kutmasdan) jarayon ichidagi
+    FallbackCache'da bajariladi. Breaker qisqa timeoutli PING bilan Redis qaytganini aniqlaydi.
+    Fallback qo'llab-quvvatlamaydigan amallar (lock, set buyruqlari, ...) darhol ConnectionInterrupted beradi.
+    """
+
+    def __init__(self, server, params, backend):
+        super().__init__(server, params, backend)
+        self.fallback = FallbackCache(
+            {**DEFAULT_FALLBACK_OPTIONS, **self._options.get('FALLBACK', {})}['MAX_ENTRIES'],
+        )
+        self.breaker = CircuitBreaker(self._probe, self._options.get('CIRCUIT_BREAKER'), on_close=self._recovered)
+        self._probe_client = None
+        self._depth = threading.local()
+
+    def _probe(self):
+        if self._probe_client is None:
+            timeout = self.breaker.options['PROBE_TIMEOUT']
+            self._probe_client = redis.Redis.from_url(
+                self._server[0], socket_timeout=timeout, socket_connect_timeout=timeout,
+            )
+        self._probe_client.ping()
+
+    def _recovered(self):
+        # Outage paytida yozilganlar faqat shu workerda edi; lokal qatlam invalidatsiyalarni o'tkazib yuborgan
+        self.fallback.clear()
+        self.local.clear()
+
+    def guarded(self, operation, fallback, *args, **kwargs):
+        """
+        Tashqi chaqiruvni breaker orqali bajaradi. Ichki chaqiruvlar (set -> delete, add -> set)
+        breakerdan qayta o'tmaydi va alohida hisoblanmaydi.
+        """
+        depth = getattr(self._depth, 'value', 0)
+        if depth:
+            return operation(*args, **kwargs)
+
+        if not self.breaker.allow():
+            return self._fallback(fallback, *args, **kwargs)
+
+        self._depth.value = 1
+        try:
+            result = operation(*args, **kwargs)
+        except Exception as exc:
+            if not is_outage(exc):
+                raise
+            self.breaker.record_failure(exc)
+            return self._fallback(fallback, *args, **kwargs)
+        finally:
+            self._depth.value = 0
+        self.breaker.record_success()
+        return result
+
+    def _fallback(self, fallback, *args, **kwargs):
+        if fallback is None:
+            raise ConnectionInterrupted(connection=None) from RedisConnectionError('Redis circuit breaker is open')
+        return fallback(*args, **kwargs)
+
+    def _timeout(self, timeout):
+        return self._backend.default_timeout if timeout is DEFAULT_TIMEOUT else timeout
+
+    # --- fallback amallar (Redis amallari bilan bir xil signatura) ---
+
+    def _fallback_get(self, key, default=None, version=None, client=None):
+        value = self.fallback.get(self.make_key(key, version=version))
+        return default if value is MISSING else value
+
+    def _fallback_get_many(self, keys, version=None, client=None):
+        found = {}
+        for key in keys:
+            value = self.fallback.get(self.make_key(key, version=version))
+            if value is not MISSING:
+                found[key] = value
+        return found
+
+    def _fallback_set(self, key, value, timeout=DEFAULT_TIMEOUT, version=None, client=None, nx=False, xx=False):
+        key = self.make_key(key, version=version)
+        if nx:
+            return self.fallback.add(key, value, self._timeout(timeout))
+        if xx and not self.fallback.has_key(key):
+            return False
+        return self.fallback.set(key, value, self._timeout(timeout))
+
+    def _fallback_set_many(self, data, timeout=DEFAULT_TIMEOUT, version=None, client=None):
+        for key, value in data.items():
+            self.fallback.set(self.make_key(key, version=version), value, self._timeout(timeout))
+
+    def _fallback_delete(self, key, version=None, prefix=None, client=None):
+        return int(self.fallback.delete(self.make_key(key, version=version, prefix=prefix)))
+
+    def _fallback_delete_many(self, keys, version=None, client=None):
+        return sum(self.fallback.delete(self.make_key(key, version=version)) for key in keys)
+
+    def _fallback_incr(self, key, delta=1, version=None, client=None, ignore_key_check=False):
+        return self.fallback.incr(self.make_key(key, version=version), delta, ignore_key_check)
+
+    def _fallback_has_key(self, key, version=None, client=None):
+        return self.fallback.has_key(self.make_key(key, version=version))
+
+    def _fallback_touch(self, key, timeout=DEFAULT_TIMEOUT, version=None, client=None):
+        return self.fallback.touch(self.make_key(key, version=version), self._timeout(timeout))
+
+    def _fallback_clear(self, client=None):
+        self.fallback.clear()
+
+    # --- Redis amallari ---
+
+    def get(self, *args, **kwargs):
+        return self.guarded(super().get, self._fallback_get, *args, **kwargs)
+
+    def get_many(self, *args, **kwargs):
+        return self.guarded(super().get_many, self._fallback_get_many, *args, **kwargs)
+
+    def set(self, *args, **kwargs):
+        return self.guarded(super().set, self._fallback_set, *args, **kwargs)
+
+    def set_many(self, *args, **kwargs):
+        return self.guarded(super().set_many, self._fallback_set_many, *args, **kwargs)
+
+    def delete(self, *args, **kwargs):
+        return self.guarded(super().delete, self._fallback_delete, *args, **kwargs)
+
+    def delete_many(self, *args, **kwargs):
+        return self.guarded(super().delete_many, self._fallback_delete_many, *args, **kwargs)
+
+    def _incr(self, *args, **kwargs):
+        return self.guarded(super()._incr, self._fallback_incr, *args, **kwargs)
+
+    def has_key(self, *args, **kwargs):
+        return self.guarded(super().has_key, self._fallback_has_key, *args, **kwargs)
+
+    def touch(self, *args, **kwargs):
+        return self.guarded(super().touch, self._fallback_touch, *args, **kwargs)
+
+    def clear(self, *args, **kwargs):
+        return self.guarded(super().clear, self._fallback_clear, *args, **kwargs)
+
+    def delete_pattern(self, *args, **kwargs):
+        return self.guarded(super().delete_pattern, None, *args, **kwargs)
+
+    def ttl(self, *args, **kwargs):
+        return self.guarded(super().ttl, None, *args, **kwargs)
+
+    def expire(self, *args, **kwargs):
+        return self.guarded(super().expire, None, *args, **kwargs)
+
+    def lock(self, *args, **kwargs):
+        # Lock obyekti keyin Redis'ga murojaat qiladi - ochiq holatda faqat darhol rad etamiz
+        if not self.breaker.allow():
+            return self._fallback(None)
+        return super().lock(*args, **kwargs)
+
+    def stats(self):
+        return {
+            **super().stats(),
+            'breaker': self.breaker.stats(),
+            'fallback_entries': len(self.fallback),
+        }
@@ -0,0 +1,138 @@
+import logging
+import math
+import random
+import time
+import uuid
+
+from django.conf import settings
+from django.core.cache import cache as default_cache
+from django.core.cache.backends.base import DEFAULT_TIMEOUT
+from django_redis.cache import RedisCache
+
+from .resilient import is_outage
+
+logger = logging.getLogger('config.cache')
+
+DEFAULT_STAMPEDE_OPTIONS = {
+    # Qayta hisoblovchi worker ushlab turadigan lock (sekund); worker o'lib qolsa shuncha vaqtda bo'shaydi
+    'LOCK_TIMEOUT': 10,
+    # Kesh bo'sh va boshqa worker hisoblayotgan bo'lsa shuncha kutiladi, keyin o'zi hisoblaydi
+    'WAIT': 2.0,
+    'POLL_INTERVAL': 0.05,
+    # Muddati o'tgan qiymat Redis'da yana shuncha saqlanadi - hisoblash paytida eskisi beriladi
+    'STALE_TTL': 60,
+    # Probabilistic early expiration koeffitsienti: katta bo'lsa oldinroq yangilanadi, 0 - o'chirilgan
+    'BETA': 1.0,
+}
+
+
+# Compare-and-delete bitta buyruqda: GET va DEL orasida lock muddati o'tib, uni boshqa worker olsa
+# o'shaning lockini o'chirib yubormaymiz
+RELEASE_SCRIPT = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+    return redis.call('del', KEYS[1])
+end
+return 0
+"""
+
+
+def get_config():
+    return {**DEFAULT_STAMPEDE_OPTIONS, **getattr(settings, 'CACHE_STAMPEDE', {})}
+
+
+def get_or_compute(key, compute, timeout=DEFAULT_TIMEOUT, cache=None, version=None, **options):
+    """
+    cache.get_or_set() o'rniga: kesh muddati tugaganda `compute()` ni bitta worker chaqiradi.
+
+    - Qiymat bor va yangi: darhol qaytariladi. Muddat tugashiga yaqin har bir so'rov
+      `delta * beta * -log(rand)` ehtimollik bilan (XFetch) oldinroq yangilashga urinadi -
+      mashhur kalit odatda muddati tugamasdan bitta so'rov tomonidan yangilanadi.
+    - Muddati o'tgan (yoki erta yangilash tanlangan): lockni olgan worker hisoblaydi,
+      qolganlar kutmasdan eski qiymatni oladi.
+    - Qiymat yo'q: lockni olgan worker hisoblaydi, qolganlar WAIT sekundgacha natijani kutadi.
+
+    Kalitga faqat shu funksiya orqali yozish kerak: qiymat (value, delta, expires_at) ko'rinishida saqlanadi.
+    `options` - LOCK_TIMEOUT, WAIT, STALE_TTL, BETA ni shu chaqiruv uchun almashtiradi.
+    """
+    cache = cache or default_cache
+    config = {**get_config(), **{name.upper(): value for name, value in options.items()}}
+    if timeout is DEFAULT_TIMEOUT:
+        timeout = cache.default_timeout
+
+    entry = cache.get(key, version=version)
+    if entry is not None:
+        value, delta, expires_at = entry
+        if time.time() - delta * config['BETA'] * math.log(1.0 - random.random()) < expires_at:
+            return value
+        lock = _acquire(cache, key, version, config)
+        if lock is None:
+            return value
+        return _compute_and_store(cache, key, compute, timeout, version, config, lock, expires_at)
+
+    deadline = time.monotonic() + config['WAIT']
+    while True:
+        lock = _acquire(cache, key, version, config)
+        if lock is not None:
+            return _compute_and_store(cache, key, compute, timeout, version, config, lock)
+        if time.monotonic() >= deadline:
+            logger.warning('Timed out waiting for %s to be computed by another worker', key)
+            return compute()
+        time.sleep(config['POLL_INTERVAL'])
+        entry = cache.get(key, version=version)
+        if entry is not None:
+            return entry[0]
+
+
+def _lock_key(key):
+    return f'{key}:lock'
+
+
+def _acquire(cache, key, version, config):
+    # SET NX PX - Redis'da atomar; lockni faqat egasi o'chiradi. Token butun son - kodeksdan o'tmasdan
+    # xom saqlanadi va RELEASE_SCRIPT uni to'g'ridan-to'g'ri solishtira oladi
+    token = uuid.uuid4().int
+    expires = time.monotonic() + config['LOCK_TIMEOUT']
+    if cache.add(_lock_key(key), token, config['LOCK_TIMEOUT'], version=version):
+        return token, expires
+    return None
+
+
+def _release(cache, key, version, lock):
+    token, expires = lock
+    if isinstance(cache, RedisCache):
+        client = cache.client
+        redis_key = client.make_key(_lock_key(key), version=version)
+
+        def release(redis):
+            return redis.eval(RELEASE_SCRIPT, 1, redis_key, token)
+
+        try:
+            if hasattr(client, 'guarded'):
+                return client.guarded(release, None, client.get_client(write=True))
+            return release(client.get_client(write=True))
+        except Exception as exc:
+            # Breaker ochiq: lock jarayon ichidagi fallback keshda olingan bo'lishi mumkin - pastdagi yo'l
+            if not is_outage(exc):
+                raise
+    # Atomar buyruq yo'q: lock muddati ichidagina o'chiramiz - undan keyin uni boshqa worker olgan bo'lishi mumkin
+    if time.monotonic() < expires and cache.get(_lock_key(key), version=version) == token:
+        cache.delete(_lock_key(key), version=version)
+
+
+def _compute_and_store(cache, key, compute, timeout, version, config, lock, seen=None):
+    try:
+        # Lockni olguncha boshqa worker yangilab ulgurgan bo'lishi mumkin - qayta hisoblamaymiz
+        entry = cache.get(key, version=version)
+        if entry is not None and entry[2] != seen:
+            return entry[0]
+
+        started = time.monotonic()
+        value = compute()
+        delta = time.monotonic() - started
+        if timeout is None:
+            cache.set(key, (value, delta, math.inf), None, version=version)
+        else:
+            cache.set(key, (value, delta, time.time() + timeout), timeout + config['STALE_TTL'], version=version)
+        return value
+    finally:
+        _release(cache, key, version, lock)
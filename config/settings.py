@@ -44,7 +44,6 @@ INSTALLED_APPS = [
     'django.contrib.messages',
     'django.contrib.staticfiles',
 
-    'drf_yasg',
     'rest_framework',
     'rest_framework_simplejwt',
     'djoser',
@@ -64,7 +63,11 @@ MIDDLEWARE = [
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 
-    'whitenoise.middleware.WhiteNoiseMiddleware',
+    'config.middleware.AsyncWhiteNoiseMiddleware',
+
+    'custom_user.capture.TrafficCaptureMiddleware',
+    'custom_user.querylog.QueryLogMiddleware',
+    'custom_user.profiling.ProfilingMiddleware',
 ]
 
 ROOT_URLCONF = 'config.urls'
@@ -155,20 +158,90 @@ LOGGING = {
     },
 }
 
+QUERY_LOG = {
+    'ENABLED': os.environ.get('QUERY_LOG_ENABLED', 'False') == 'True',
+    'SLOW_THRESHOLD_MS': float(os.environ.get('QUERY_LOG_SLOW_MS', 100)),
+    'EXPLAIN': True,
+    'STATS_DIR': os.path.join(BASE_DIR, 'var', 'querylog'),
+    'FLUSH_INTERVAL': 30,
+}
+
+PROFILING = {
+    'ENABLED': os.environ.get('PROFILING_ENABLED', 'False') == 'True',
+    'SAMPLE_RATE': float(os.environ.get('PROFILING_SAMPLE_RATE', 0)),
+    'HEADER': 'X-Profile-Token',
+    'MODE': os.environ.get('PROFILING_MODE', 'cprofile'),  # 'cprofile' yoki 'sample'
+    'OUTPUT_DIR': os.path.join(BASE_DIR, 'var', 'profiles'),
+    'MAX_DISK_MB': 200,
+    'CPU_BUDGET_SECONDS': 10,
+    'CPU_BUDGET_WINDOW': 60,
+    'TOKEN_MAX_AGE': 3600,
+}
+
+MEMORY_PROFILING = {
+    'ENABLED': os.environ.get('MEMORY_PROFILING_ENABLED', 'False') == 'True',
+    'SNAPSHOT_INTERVAL': int(os.environ.get('MEMORY_SNAPSHOT_INTERVAL', 300)),
+    'TRACEBACK_FRAMES': 1,
+    'TOP': 20,
+    'MODULES': ['custom_user', 'restaurants', 'rest_framework', 'django', 'user_agents'],
+    'STATS_DIR': os.path.join(BASE_DIR, 'var', 'memory'),
+}
+
+TRAFFIC_CAPTURE = {
+    'ENABLED': os.environ.get('TRAFFIC_CAPTURE_ENABLED', 'False') == 'True',
+    'SAMPLE_RATE': float(os.environ.get('TRAFFIC_CAPTURE_SAMPLE_RATE', 1)),
+    'OUTPUT_DIR': os.path.join(BASE_DIR, 'var', 'traffic'),
+    'MAX_FILE_MB': 50,
+    'BACKUP_COUNT': 10,
+    'MAX_BODY_BYTES': 64 * 1024,
+}
+
 
 CACHES = {
     'default': {
         'BACKEND': 'django_redis.cache.RedisCache',
         'LOCATION': 'redis://127.0.0.1:6379/1',
         'OPTIONS': {
-            'CLIENT_CLASS': 'django_redis.client.DefaultClient',
-            'SOCKET_CONNECT_TIMEOUT': 5,
-            'SOCKET_TIMEOUT': 5,
+            'CLIENT_CLASS': 'config.cache.ResilientClient',
+            # Redis ishlamasa fallback bor - so'rov sekundlab kutmasin (timeout breakerni darhol ochadi)
+            'SOCKET_CONNECT_TIMEOUT': 0.5,
+            'SOCKET_TIMEOUT': 0.5,
             'CONNECTION_POOL_KWARGS': {
                 'max_connections': 50,
                 'retry_on_timeout': True,
             },
-            'COMPRESSOR': 'django_redis.compressors.zlib.ZlibCompressor',
+            # Qiymat formati kalit prefiksiga qarab: kichik OTP dict'lari va flaglar ixcham binar formatda,
+            # COMPRESS_MIN_LENGTH dan uzunlari zlib bilan. Oldingi pickle+zlib qiymatlar ham o'qiladi
+            'CODEC': {
+                'COMPRESS_MIN_LENGTH': 1024,
+                'DEFAULT': {'SERIALIZER': 'compact', 'COMPRESSOR': 'zlib'},
+                'PREFIXES': {
+                    'activation_code_': {'SERIALIZER': 'compact', 'COMPRESSOR': None},
+                    'reset_password_code_': {'SERIALIZER': 'compact', 'COMPRESSOR': None},
+                    'password_reset_token_': {'SERIALIZER': 'compact', 'COMPRESSOR': None},
+                    'last_code_sent_': {'SERIALIZER': 'compact', 'COMPRESSOR': None},
+                    'last_reset_sent_': {'SERIALIZER': 'compact', 'COMPRESSOR': None},
+                },
+            },
+            # Jarayon ichidagi LRU qatlam: faqat shu prefikslar, qiymat - lokal TTL (sekund).
+            # Kam o'zgaradigan ma'lumotlar uchun; o'zgarishlar pub/sub orqali barcha workerlarga yetadi.
+            'LOCAL_CACHE': {
+                'MAX_ENTRIES': 2048,
+                'PREFIXES': {},
+            },
+            # Redis xato bera boshlasa har bir so'rov timeout kutmasligi uchun: breaker ochiladi va
+            # amallar shu workerning xotirasidagi fallback keshda bajariladi (debug/cache/ da holati)
+            'CIRCUIT_BREAKER': {
+                'WINDOW': 10,
+                'MIN_CALLS': 10,
+                'FAILURE_RATE': 0.5,
+                'TRIP_ON_TIMEOUT': True,
+                'OPEN_SECONDS': 5,
+                'PROBE_TIMEOUT': 0.05,
+            },
+            'FALLBACK': {
+                'MAX_ENTRIES': 10000,
+            },
         },
         'KEY_PREFIX': 'cookservice',
         'TIMEOUT': 300,
@@ -202,7 +275,7 @@ EMAIL_USE_TLS = True
 
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'custom_user.authentication.RevocableJWTAuthentication',
     ),
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticated',
@@ -239,6 +312,13 @@ SIMPLE_JWT = {
     'ALGORITHM': 'HS256',
     'AUTH_HEADER_TYPES': ('Bearer',),
     'TOKEN_OBTAIN_SERIALIZER': 'custom_user.serializers.CustomTokenObtainPairSerializer',
+    'TOKEN_REFRESH_SERIALIZER': 'custom_user.serializers.CustomTokenRefreshSerializer',
+    'TOKEN_VERIFY_SERIALIZER': 'custom_user.serializers.CustomTokenVerifySerializer',
+}
+
+# O'chirilgan qurilmalarning tokenlari (custom_user/revocation.py): Redis set + har bir worker xotirasidagi Bloom filter
+TOKEN_REVOCATION = {
+    'SYNC_INTERVAL': 1.0,
 }
 
 SPECTACULAR_SETTINGS = {
@@ -254,5 +334,16 @@ SPECTACULAR_SETTINGS = {
     ],
 }
 
+# /api/schema/ oldindan qurilgan sxemani beradi: `manage.py build_schema` deploy vaqtida
+SCHEMA_CACHE = {
+    'DIR': os.path.join(BASE_DIR, 'var', 'schema'),
+    'VERSION': os.environ.get('SCHEMA_VERSION', ''),
+}
+
+# Push gateway (custom_user/push.py); lokal sinov uchun: `manage.py push_gateway`
+PUSH = {
+    'GATEWAY_URL': os.environ.get('PUSH_GATEWAY_URL', ''),
+}
+
 
 
@@ -2,4 +2,4 @@ from django.contrib import admin
 from custom_user.models import *
 
 
-admin.site.register([CustomUser, Card, Address, Device])
\ No newline at end of file
+admin.site.register([CustomUser, Card, Address, Device, Campaign, PushDelivery, Job])
\ No newline at end of file
@@ -4,3 +4,13 @@ from django.apps import AppConfig
 class CustomUserConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'custom_user'
+
+    def ready(self):
+        from django.db.backends.signals import connection_created
+        from custom_user import memory, querylog
+
+        if querylog.get_config()['ENABLED']:
+            connection_created.connect(querylog.install_query_logger, dispatch_uid='custom_user.querylog')
+
+        if memory.get_config()['ENABLED']:
+            memory.start()
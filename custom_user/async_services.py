@@ -0,0 +1,177 @@
+import asyncio
+import weakref
+
+from asgiref.sync import sync_to_async
+from django.contrib.auth.hashers import make_password, verify_password
+from django.core.cache import DEFAULT_CACHE_ALIAS, caches
+from django.core.cache.backends.base import DEFAULT_TIMEOUT
+from django.core.mail import send_mail
+from django_redis.cache import RedisCache
+from django_redis.util import CacheKey
+
+from config.cache.resilient import OUTAGE_ERRORS
+
+# redis.asyncio importi sekin - async viewlar birinchi marta ishlaganda yuklanadi
+
+
+class AsyncCache:
+    """
+    django-redis bilan bir xil kalit va formatda (prefix, versiya, codec) ishlaydigan
+    async client. Sync viewlar yozgan kodni async viewlar o'qiy oladi va aksincha.
+    Backend Redis bo'lmasa (locmem, dummy) Django'ning aget/aset API'siga tushadi.
+    """
+
+    def __init__(self, alias=DEFAULT_CACHE_ALIAS):
+        self.alias = alias
+        self._clients = weakref.WeakKeyDictionary()
+
+    @property
+    def backend(self):
+        return caches[self.alias]
+
+    def _client(self, backend):
+        loop = asyncio.get_running_loop()
+        client = self._clients.get(loop)
+        if client is None:
+            import redis.asyncio as aioredis
+
+            server = backend._server
+            location = server[0] if isinstance(server, (list, tuple)) else server.split(',')[0]
+            options = backend._params.get('OPTIONS', {})
+            pool_kwargs = options.get('CONNECTION_POOL_KWARGS', {})
+            client = aioredis.Redis.from_url(
+                location,
+                socket_timeout=options.get('SOCKET_TIMEOUT'),
+                socket_connect_timeout=options.get('SOCKET_CONNECT_TIMEOUT'),
+                max_connections=pool_kwargs.get('max_connections'),
+            )
+            self._clients[loop] = client
+        return client
+
+    async def get(self, key, default=None):
+        backend = self.backend
+        if not isinstance(backend, RedisCache):
+            return await backend.aget(key, default)
+
+        async def operation():
+            value = await self._client(backend).get(backend.make_key(key))
+            return default if value is None else backend.client.decode(value)
+
+        return await self._guarded(backend, operation, 'get', key, default)
+
+    async def set(self, key, value, timeout=DEFAULT_TIMEOUT):
+        backend = self.backend
+        if not isinstance(backend, RedisCache):
+            return await backend.aset(key, value, timeout)
+
+        async def operation():
+            client = self._client(backend)
+            made_key = backend.make_key(key)
+            seconds = backend.default_timeout if timeout is DEFAULT_TIMEOUT else timeout
+            if seconds is not None and seconds <= 0:
+                await client.delete(made_key)
+            else:
+                px = int(seconds * 1000) if seconds is not None else None
+                await client.set(made_key, self._encode(backend, key, value), px=px)
+            await self._invalidate(backend, client, [made_key])
+
+        await self._guarded(backend, operation, 'set', key, value, timeout)
+
+    async def add(self, key, value, timeout=DEFAULT_TIMEOUT):
+        """
+        Kalit yo'q bo'lsagina yozadi (SET NX). Yozilgan bo'lsa True.
+        """
+        backend = self.backend
+        if not isinstance(backend, RedisCache):
+            return await backend.aadd(key, value, timeout)
+
+        async def operation():
+            client = self._client(backend)
+            made_key = backend.make_key(key)
+            seconds = backend.default_timeout if timeout is DEFAULT_TIMEOUT else timeout
+            px = int(seconds * 1000) if seconds is not None else None
+            added = bool(await client.set(made_key, self._encode(backend, key, value), px=px, nx=True))
+            if added:
+                await self._invalidate(backend, client, [made_key])
+            return added
+
+        # _fallback_set(key, value, timeout, version, client, nx)
+        return bool(await self._guarded(backend, operation, 'set', key, value, timeout, None, None, True))
+
+    async def delete(self, *keys):
+        backend = self.backend
+        if not isinstance(backend, RedisCache):
+            await backend.adelete_many(keys)
+            return
+        if not keys:
+            return
+
+        async def operation():
+            client = self._client(backend)
+            made_keys = [backend.make_key(key) for key in keys]
+            await client.delete(*made_keys)
+            await self._invalidate(backend, client, made_keys)
+
+        await self._guarded(backend, operation, 'delete_many', keys)
+
+    def _encode(self, backend, key, value):
+        # CodecClient format kalit prefiksiga qarab tanlanadi
+        if hasattr(backend.client, 'codec'):
+            return backend.client.encode(value, key)
+        return backend.client.encode(value)
+
+    async def _guarded(self, backend, operation, fallback, *args):
+        """
+        ResilientClient bo'lsa sync kod bilan bir xil breaker va fallback keshdan foydalanadi:
+        breaker ochiq bo'lsa yoki Redis ulanishi uzilsa amal jarayon ichidagi keshda bajariladi.
+        """
+        cache_client = backend.client
+        breaker = getattr(cache_client, 'breaker', None)
+        if breaker is None:
+            return await operation()
+        # half-open holatda allow() qisqa (PROBE_TIMEOUT) sync PING qiladi
+        if not breaker.allow():
+            return getattr(cache_client, f'_fallback_{fallback}')(*args)
+        try:
+            result = await operation()
+        except OUTAGE_ERRORS as exc:
+            breaker.record_failure(exc)
+            return getattr(cache_client, f'_fallback_{fallback}')(*args)
+        breaker.record_success()
+        return result
+
+    async def _invalidate(self, backend, client, keys):
+        # TwoTierClient: workerlarning lokal qatlamidagi nusxalar ham eskirmasin
+        cache_client = backend.client
+        if not hasattr(cache_client, 'invalidation_message'):
+            return
+        keys = [key for key in keys if cache_client.local_timeout(CacheKey(key)) is not None]
+        if keys:
+            cache_client.local.delete_many(keys)
+            await client.publish(*cache_client.invalidation_message(keys))
+
+
+acache = AsyncCache()
+
+
+async def acheck_password(user, raw_password):
+    """
+    Django'ning User.acheck_password() PBKDF2'ni event loop ichida hisoblaydi -
+    bu yerda hash thread poolda, loop boshqa so'rovlarga bo'sh qoladi.
+    """
+    is_correct, must_update = await sync_to_async(verify_password, thread_sensitive=False)(
+        raw_password, user.password,
+    )
+    if is_correct and must_update:
+        user.password = await amake_password(raw_password)
+        await user.asave(update_fields=['password'])
+    return is_correct
+
+
+async def amake_password(raw_password):
+    return await sync_to_async(make_password, thread_sensitive=False)(raw_password)
+
+
+async def asend_mail(**kwargs):
+    # SMTP client sync - alohida threadda, thread-sensitive navbatni band qilmasdan
+    return await sync_to_async(send_mail, thread_sensitive=False)(**kwargs)
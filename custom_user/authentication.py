@@ -0,0 +1,23 @@
+from drf_spectacular.contrib.rest_framework_simplejwt import SimpleJWTScheme
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken
+
+from custom_user.revocation import get_revocation_list
+
+
+class RevocableJWTAuthentication(JWTAuthentication):
+    """
+    JWTAuthentication + bekor qilingan tokenlar ro'yxati (custom_user.revocation):
+    o'chirilgan qurilmaning tokenlari muddati tugashini kutmasdan rad etiladi.
+    """
+
+    def get_validated_token(self, raw_token):
+        token = super().get_validated_token(raw_token)
+        if get_revocation_list().is_revoked(token):
+            raise InvalidToken({'detail': 'Token has been revoked', 'code': 'token_revoked'})
+        return token
+
+
+class RevocableJWTScheme(SimpleJWTScheme):
+    # drf-spectacular: sxemada oddiy JWT (Bearer) sifatida
+    target_class = RevocableJWTAuthentication
@@ -0,0 +1,101 @@
+import asyncio
+import time
+
+from asgiref.sync import async_to_sync, sync_to_async
+from django.core.cache import cache
+from django.test import AsyncClient
+
+from .auth_flow import PASSWORD, _activation_code
+from .base import StepTimer, summarize
+
+SYNC_URLS = {
+    'register': '/api/user/register/',
+    'send_activation': '/api/user/activation/send/',
+    'verify': '/api/user/verify/',
+    'login': '/api/user/login/',
+    'forgot_password': '/api/user/password/forgot/',
+}
+ASYNC_URLS = {step: url.replace('/api/user/', '/api/user/async/', 1) for step, url in SYNC_URLS.items()}
+
+STEPS = ['register', 'send_activation', 'verify', 'login', 'forgot_password']
+
+
+def _payloads(step, mode, count, users):
+    """
+    Har bir qadam uchun payloadlar. verify kodi cache'dan o'qiladi - shuning uchun
+    lazy (callable) va o'lchovdan oldin hisoblanadi.
+    """
+    new_email = f'async-bench-{mode}-{{}}@cookservice.local'.format
+    seeded_email = f'bench-user-{{}}@cookservice.local'.format
+
+    for index in range(count):
+        if step == 'register':
+            yield {'email': new_email(index), 'password': PASSWORD, 'full_name': 'Bench User'}
+        elif step == 'send_activation':
+            yield {'email': new_email(index)}
+        elif step == 'verify':
+            yield lambda index=index: {
+                'email': new_email(index),
+                'code': _activation_code(new_email(index)),
+                'request_type': 'register',
+                'device_hardware': f'async-bench-{mode}-device-{index}',
+            }
+        elif step == 'login':
+            yield {
+                'email': seeded_email(index % users),
+                'password': PASSWORD,
+                'device_hardware': f'async-bench-{mode}-login-{index}',
+            }
+        else:
+            yield {'email': seeded_email(index % users)}
+
+
+async def _resolve(payloads):
+    return [await sync_to_async(payload)() if callable(payload) else payload for payload in payloads]
+
+
+async def _fire(url, payloads, concurrency):
+    semaphore = asyncio.Semaphore(concurrency)
+    durations = []
+
+    async def one(data):
+        async with semaphore:
+            start = time.perf_counter()
+            response = await AsyncClient().post(url, data, content_type='application/json')
+            durations.append(time.perf_counter() - start)
+            return response.status_code < 400
+
+    started = time.perf_counter()
+    outcomes = await asyncio.gather(*(one(data) for data in payloads))
+    return durations, outcomes.count(False), time.perf_counter() - started
+
+
+def run(mode, requests, concurrency, users):
+    """
+    Har bir endpointga `concurrency` ta parallel so'rov bilan `requests` ta so'rov yuboradi.
+    mode='sync' - mavjud APIView'lar (ASGI ostida sync_to_async orqali), mode='async' - native async.
+    rps devor soati bo'yicha: parallel so'rovlar bir-birini kutadimi yoki yo'qmi shunda ko'rinadi.
+    """
+    urls = ASYNC_URLS if mode == 'async' else SYNC_URLS
+    results = []
+
+    @async_to_sync
+    async def run_steps(timer):
+        for step in STEPS:
+            payloads = await _resolve(_payloads(step, mode, requests, users))
+            timer.counter.take()
+            durations, errors, wall = await _fire(urls[step], payloads, concurrency)
+            queries = timer.counter.take()
+
+            result = summarize(step, durations, [queries / len(payloads)], errors)
+            result.update(mode=mode, concurrency=concurrency, rps=round(len(durations) / wall, 2))
+            results.append(result)
+
+    # Oldingi rejimning rate-limit kalitlari (last_reset_sent_*) natijaga ta'sir qilmasin
+    cache.clear()
+
+    # Thread-sensitive ORM chaqiruvlari shu threadda bajariladi - counter shu yerda o'rnatiladi
+    with StepTimer() as timer:
+        run_steps(timer)
+
+    return results
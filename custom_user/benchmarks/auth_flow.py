@@ -0,0 +1,120 @@
+from asgiref.sync import async_to_sync, sync_to_async
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.cache import cache
+from django.test import AsyncClient, Client
+
+from .base import StepTimer
+
+User = get_user_model()
+
+PASSWORD = 'bench-password-123'
+
+
+def seed_users(count):
+    """
+    Login va undan keyingi qadamlar uchun aktiv userlar. Parol hashi bir marta hisoblanadi.
+    """
+    password_hash = make_password(PASSWORD)
+    User.objects.bulk_create(
+        [User(email=f'bench-user-{index}@cookservice.local', password=password_hash, is_active=True)
+         for index in range(count)],
+        batch_size=1000,
+    )
+
+
+def _card_number(mode, iteration):
+    prefix = '8600' if mode == 'wsgi' else '9860'
+    return f'{prefix}{iteration:012d}'
+
+
+def _flow_requests(mode, iteration, users):
+    """
+    Bitta iteratsiya uchun (qadam, method, url, payload, token kerakmi) ketma-ketligi.
+    """
+    new_email = f'bench-{mode}-{iteration}@cookservice.local'
+    seeded_email = f'bench-user-{iteration % users}@cookservice.local'
+    hardware = f'bench-{mode}-device-{iteration}'
+
+    yield 'register', 'post', '/api/user/register/', {
+        'email': new_email, 'password': PASSWORD, 'full_name': 'Bench User',
+    }, False
+    yield 'send_activation', 'post', '/api/user/activation/send/', {'email': new_email}, False
+    yield 'verify', 'post', '/api/user/verify/', lambda: {
+        'email': new_email,
+        'code': _activation_code(new_email),
+        'request_type': 'register',
+        'device_hardware': hardware,
+    }, False
+    yield 'login', 'post', '/api/user/login/', {
+        'email': seeded_email, 'password': PASSWORD, 'device_hardware': hardware,
+    }, False
+    yield 'device_list', 'get', '/api/user/devices/', None, True
+    yield 'card_create', 'post', '/api/user/api/cards/create/', {
+        'name': 'Bench card', 'card_number': _card_number(mode, iteration), 'card_expiry_date': '12/30',
+    }, True
+    yield 'card_list', 'get', '/api/user/api/cards/', None, True
+    yield 'address_create', 'post', '/api/user/addresses/create', {
+        'name': 'Uy', 'address': 'Amir Temur ko\'chasi 1', 'lat': '41.311081', 'long': '69.240562',
+    }, True
+    yield 'address_list', 'get', '/api/user/addresses/', None, True
+
+
+def _activation_code(email):
+    user = User.objects.by_email(email).only('id').get()
+    cached = cache.get(f'activation_code_{user.id}') or {}
+    return cached.get('code', '000000')
+
+
+def _access_token(response):
+    data = response.json()
+    return (data.get('login_response') or {}).get('access')
+
+
+def run_wsgi(iterations, users):
+    client = Client()
+
+    with StepTimer() as timer:
+        for iteration in range(iterations):
+            token = None
+            for step, method, url, payload, auth in _flow_requests('wsgi', iteration, users):
+                headers = {'Authorization': f'Bearer {token}'} if auth else {}
+                data = payload() if callable(payload) else payload
+                with timer.step(step) as outcome:
+                    response = getattr(client, method)(url, data, content_type='application/json', headers=headers)
+                    outcome.ok = response.status_code < 400
+                if step == 'login':
+                    token = _access_token(response)
+
+    return [dict(item, mode='wsgi') for item in timer.results()]
+
+
+def run_asgi(iterations, users):
+    @async_to_sync
+    async def run(timer):
+        client = AsyncClient()
+
+        for iteration in range(iterations):
+            token = None
+            for step, method, url, payload, auth in _flow_requests('asgi', iteration, users):
+                headers = {'Authorization': f'Bearer {token}'} if auth else {}
+                data = await _resolve_payload(payload)
+                with timer.step(step) as outcome:
+                    response = await getattr(client, method)(
+                        url, data, content_type='application/json', headers=headers,
+                    )
+                    outcome.ok = response.status_code < 400
+                if step == 'login':
+                    token = _access_token(response)
+
+    # Timer shu threadda ochiladi: thread-sensitive sync viewlar aynan shu threadning connectionida ishlaydi
+    with StepTimer() as timer:
+        run(timer)
+
+    return [dict(item, mode='asgi') for item in timer.results()]
+
+
+async def _resolve_payload(payload):
+    if not callable(payload):
+        return payload
+    return await sync_to_async(payload)()
@@ -0,0 +1,220 @@
+import json
+import math
+import platform
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from types import SimpleNamespace
+from unittest import mock
+
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.test.utils import override_settings, setup_databases, teardown_databases
+
+LOCAL_CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'benchmarks',
+    }
+}
+
+FAST_PASSWORD_HASHERS = ['django.contrib.auth.hashers.MD5PasswordHasher']
+
+
+def percentile(sorted_values, pct):
+    if not sorted_values:
+        return 0.0
+    index = max(math.ceil(pct / 100 * len(sorted_values)) - 1, 0)
+    return sorted_values[index]
+
+
+def summarize(name, durations, queries, errors=0):
+    """
+    Bitta qadam uchun natija: requests/sec, p50/p95/p99 (ms) va so'rov boshiga SQL soni.
+    """
+    values = sorted(durations)
+    total = sum(values)
+    return {
+        'step': name,
+        'requests': len(values),
+        'errors': errors,
+        'rps': round(len(values) / total, 2) if total else 0.0,
+        'p50_ms': round(percentile(values, 50) * 1000, 3),
+        'p95_ms': round(percentile(values, 95) * 1000, 3),
+        'p99_ms': round(percentile(values, 99) * 1000, 3),
+        'queries_per_request': round(sum(queries) / len(queries), 2) if queries else 0.0,
+    }
+
+
+class QueryCounter:
+    """
+    Barcha connectionlarga execute_wrapper sifatida o'rnatiladi. ASGI rejimida
+    har bir so'rov alohida threadda (o'z connectioni bilan) bajariladi.
+    """
+
+    def __init__(self):
+        self.count = 0
+        self._lock = threading.Lock()
+
+    def __call__(self, execute, sql, params, many, context):
+        with self._lock:
+            self.count += 1
+        return execute(sql, params, many, context)
+
+    def install(self, sender=None, connection=None, **kwargs):
+        for conn in [connection] if connection is not None else connections.all():
+            if self not in conn.execute_wrappers:
+                conn.execute_wrappers.append(self)
+
+    def uninstall(self):
+        connection_created.disconnect(self.install)
+        for conn in connections.all():
+            if self in conn.execute_wrappers:
+                conn.execute_wrappers.remove(self)
+
+    def take(self):
+        with self._lock:
+            count, self.count = self.count, 0
+        return count
+
+
+class StepTimer:
+    def __init__(self):
+        self.durations = {}
+        self.queries = {}
+        self.errors = {}
+        self.counter = QueryCounter()
+
+    def __enter__(self):
+        self.counter.install()
+        connection_created.connect(self.counter.install)
+        return self
+
+    def __exit__(self, *exc_info):
+        self.counter.uninstall()
+
+    @contextmanager
+    def step(self, name):
+        self.counter.take()
+        start = time.perf_counter()
+        outcome = SimpleNamespace(ok=True)
+        yield outcome
+        self.durations.setdefault(name, []).append(time.perf_counter() - start)
+        self.queries.setdefault(name, []).append(self.counter.take())
+        if not outcome.ok:
+            self.errors[name] = self.errors.get(name, 0) + 1
+
+    def results(self):
+        return [
+            summarize(name, self.durations[name], self.queries[name], self.errors.get(name, 0))
+            for name in self.durations
+        ]
+
+
+class FakeGeocoderResult:
+    city = 'Tashkent'
+    ok = True
+    error = None
+
+
+def fake_geocoder(latency):
+    def ip(address):
+        if latency:
+            time.sleep(latency)
+        return FakeGeocoderResult()
+    return ip
+
+
+@contextmanager
+def local_standins(fast_hasher=False, geo_latency=0):
+    """
+    Redis -> locmem cache, SMTP -> locmem email, geolocation -> statik javob.
+    Natijalar tashqi servislarning tezligiga bog'liq bo'lmasligi uchun. `geo_latency`
+    (sekund) geolocation HTTP chaqiruvining kechikishini taqlid qiladi - u endi fon enricher'ida.
+    """
+    overrides = {
+        'CACHES': LOCAL_CACHES,
+        'EMAIL_BACKEND': 'django.core.mail.backends.locmem.EmailBackend',
+        'DEFAULT_FROM_EMAIL': 'bench@cookservice.local',
+    }
+    if fast_hasher:
+        overrides['PASSWORD_HASHERS'] = FAST_PASSWORD_HASHERS
+
+    with override_settings(**overrides), \
+            mock.patch('geocoder.ip', fake_geocoder(geo_latency)):
+        yield
+
+
+@contextmanager
+def benchmark_database(verbosity=0):
+    """
+    Vaqtinchalik test bazasi: benchmark haqiqiy db.sqlite3'ga tegmaydi.
+    """
+    old_config = setup_databases(verbosity=verbosity, interactive=False)
+    try:
+        yield
+    finally:
+        teardown_databases(old_config, verbosity=verbosity)
+
+
+def save_results(path, suite, results, meta=None):
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    payload = {
+        'suite': suite,
+        'created_at': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'python': platform.python_version(),
+        'machine': platform.machine(),
+        'meta': meta or {},
+        'results': results,
+    }
+    path.write_text(json.dumps(payload, indent=2))
+    return payload
+
+
+def load_results(path):
+    return json.loads(Path(path).read_text())
+
+
+def compare_results(results, baseline, tolerance=0.2, metrics=('p95_ms', 'queries_per_request')):
+    """
+    Baseline bilan solishtiradi. `tolerance` (0.2 = 20%) dan ko'proq yomonlashgan
+    metrikalar regressiya sifatida qaytariladi. rps kamayishi ham regressiya.
+    """
+    baseline_by_key = {_result_key(item): item for item in baseline['results']}
+    regressions = []
+
+    for item in results:
+        old = baseline_by_key.get(_result_key(item))
+        if old is None:
+            continue
+        for metric in metrics:
+            if metric == 'queries_per_request':
+                # SQL soni deterministik - har qanday o'sish regressiya
+                if item[metric] > old[metric]:
+                    regressions.append((item, metric, old[metric], item[metric]))
+            elif old[metric] and item[metric] > old[metric] * (1 + tolerance):
+                regressions.append((item, metric, old[metric], item[metric]))
+        if 'rps' in item and old.get('rps') and item['rps'] < old['rps'] * (1 - tolerance):
+            regressions.append((item, 'rps', old['rps'], item['rps']))
+
+    return regressions
+
+
+def _result_key(item):
+    return item.get('mode', ''), item['step']
+
+
+def format_table(results):
+    lines = [
+        f"{'mode':<6} {'step':<22} {'n':>5} {'err':>4} {'rps':>9} "
+        f"{'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'q/req':>6}"
+    ]
+    for item in results:
+        lines.append(
+            f"{item.get('mode', ''):<6} {item['step']:<22} {item['requests']:>5} {item['errors']:>4} "
+            f"{item['rps']:>9.1f} {item['p50_ms']:>9.2f} {item['p95_ms']:>9.2f} {item['p99_ms']:>9.2f} "
+            f"{item['queries_per_request']:>6.1f}"
+        )
+    return '\n'.join(lines)
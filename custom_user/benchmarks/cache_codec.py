@@ -0,0 +1,142 @@
+import hashlib
+import random
+import time
+import uuid
+
+from django.conf import settings
+from django_redis.compressors.zlib import ZlibCompressor
+from django_redis.exceptions import CompressorError
+from django_redis.serializers.pickle import PickleSerializer
+
+from config.cache.codec import CacheCodec
+
+# Viewlar yozadigan kalitlar va ularning yozishlardagi taxminiy ulushi: har bir kod yuborishda
+# kod + "yaqinda yuborilgan" flagi, parol tiklashda token, qolgani - admin sessiyalari
+KEY_MIX = (
+    ('activation_code_', 25),
+    ('last_code_sent_', 20),
+    ('reset_password_code_', 10),
+    ('last_reset_sent_', 10),
+    ('password_reset_token_', 5),
+    ('django.contrib.sessions.cache', 30),
+)
+
+
+def _ip(rng):
+    return '.'.join(str(rng.randint(1, 254)) for _ in range(4))
+
+
+def sample(prefix, rng):
+    """
+    (kalit, qiymat) - viewlardagi cache.set() bilan bir xil shaklda.
+    """
+    user_id = rng.randint(1, 200000)
+    email = f'user{user_id}@example.com'
+    ip_address = _ip(rng)
+    if prefix in ('activation_code_', 'reset_password_code_'):
+        code = ''.join(rng.choices('0123456789', k=6))
+        return f'{prefix}{user_id}', {'email': email, 'code': code, 'ip_address': ip_address, 'user_id': user_id}
+    if prefix in ('last_code_sent_', 'last_reset_sent_'):
+        return f'{prefix}{user_id}_{ip_address}', True
+    if prefix == 'password_reset_token_':
+        token = uuid.UUID(int=rng.getrandbits(128))
+        return f'{prefix}{token}', {'user_id': user_id, 'email': email, 'ip_address': ip_address}
+    session_key = ''.join(rng.choices('abcdefghijklmnopqrstuvwxyz0123456789', k=32))
+    return f'{prefix}{session_key}', {
+        '_auth_user_id': str(user_id),
+        '_auth_user_backend': 'django.contrib.auth.backends.ModelBackend',
+        '_auth_user_hash': hashlib.sha256(session_key.encode()).hexdigest(),
+    }
+
+
+class LegacyCodec:
+    """
+    Oldingi sozlama: django-redis PickleSerializer + ZlibCompressor (DefaultClient.encode/decode).
+    """
+
+    def __init__(self):
+        self.serializer = PickleSerializer(options={})
+        self.compressor = ZlibCompressor(options={})
+
+    def encode(self, value, key=None):
+        if isinstance(value, bool) or not isinstance(value, int):
+            return self.compressor.compress(self.serializer.dumps(value))
+        return value
+
+    def decode(self, data):
+        try:
+            return int(data)
+        except (ValueError, TypeError):
+            try:
+                data = self.compressor.decompress(data)
+            except CompressorError:
+                pass
+            return self.serializer.loads(data)
+
+
+def codec_options(alias='default'):
+    return settings.CACHES[alias].get('OPTIONS', {}).get('CODEC')
+
+
+def _best_time(func, items, iterations, repeat):
+    # Eng yaxshi urinish: mikrosekundlik o'lchovlarda GC va boshqa jarayonlar shovqinini kamaytiradi
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(iterations):
+            for item in items:
+                func(*item)
+        best = min(best, time.perf_counter() - start)
+    return best * 1e6 / (iterations * len(items))
+
+
+def _measure(codec, items, iterations, repeat):
+    encoded = [codec.encode(value, key) for key, value in items]
+    for (key, value), data in zip(items, encoded):
+        decoded = codec.decode(data)
+        assert decoded == value and type(decoded) is type(value), f'{key}: value changed after round trip'
+
+    return (
+        sum(len(data) for data in encoded) / len(encoded),
+        _best_time(lambda key, value: codec.encode(value, key), items, iterations, repeat),
+        _best_time(codec.decode, [(data,) for data in encoded], iterations, repeat),
+    )
+
+
+def run(samples=200, iterations=20, repeat=5, options=None, seed=0):
+    """
+    Har bir kalit turi uchun oldingi (pickle+zlib) va yangi codec: o'rtacha saqlanadigan bayt,
+    encode/decode vaqti. `total` qatori KEY_MIX ulushlari bo'yicha o'rtacha.
+    """
+    rng = random.Random(seed)
+    codecs = (('legacy', LegacyCodec()), ('codec', CacheCodec(options)))
+    total_weight = sum(weight for _, weight in KEY_MIX)
+    results = []
+    for mode, codec in codecs:
+        total = {'bytes': 0.0, 'encode_us': 0.0, 'decode_us': 0.0}
+        for prefix, weight in KEY_MIX:
+            items = [sample(prefix, rng) for _ in range(samples)]
+            size, encode_us, decode_us = _measure(codec, items, iterations, repeat)
+            results.append({
+                'mode': mode,
+                'step': prefix,
+                'share': round(weight / total_weight, 3),
+                'bytes': round(size, 1),
+                'encode_us': round(encode_us, 3),
+                'decode_us': round(decode_us, 3),
+            })
+            for metric, value in (('bytes', size), ('encode_us', encode_us), ('decode_us', decode_us)):
+                total[metric] += value * weight / total_weight
+        results.append({'mode': mode, 'step': 'total', 'share': 1.0,
+                        **{metric: round(value, 3) for metric, value in total.items()}})
+    return results
+
+
+def format_table(results):
+    lines = [f"{'mode':<7} {'step':<30} {'share':>6} {'bytes':>8} {'encode us':>10} {'decode us':>10}"]
+    for item in results:
+        lines.append(
+            f"{item['mode']:<7} {item['step']:<30} {item['share']:>6.2f} {item['bytes']:>8.1f} "
+            f"{item['encode_us']:>10.2f} {item['decode_us']:>10.2f}"
+        )
+    return '\n'.join(lines)
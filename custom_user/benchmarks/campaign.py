@@ -0,0 +1,107 @@
+import time
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+
+from custom_user.campaigns import CampaignDispatcher, LocalSink, opted_in_users
+from custom_user.models import Campaign
+
+from .base import QueryCounter
+
+User = get_user_model()
+
+OPT_IN_RATIO = 0.3
+
+
+def seed(users):
+    # dataset.py bilan bir xil ulush: har 10 userdan 3 tasi reklamaga rozi
+    User.objects.bulk_create(
+        [User(email=f'bench-campaign-{index}@cookservice.local', is_active=index % 20 != 0,
+              promotional_notification=index % 10 < OPT_IN_RATIO * 10)
+         for index in range(users)],
+        batch_size=5000,
+    )
+    return opted_in_users().count()
+
+
+def query_plan():
+    sql, params = opted_in_users().query.sql_with_params()
+    with connection.cursor() as cursor:
+        if connection.vendor == 'sqlite':
+            cursor.execute(f'EXPLAIN QUERY PLAN {sql}', params)
+            return ' '.join(str(row[-1]) for row in cursor.fetchall())
+        cursor.execute(f'EXPLAIN {sql}', params)
+        return ' '.join(str(row[0]) for row in cursor.fetchall())
+
+
+def _campaign(name):
+    return Campaign.objects.create(
+        name=name, subject='{{ campaign.name }}: chegirmalar', body='Assalomu alaykum! {{ campaign.name }} boshlandi.',
+    )
+
+
+def _dispatch(campaign, sink, options):
+    counter = QueryCounter()
+    with connection.execute_wrapper(counter):
+        start = time.perf_counter()
+        campaign = CampaignDispatcher(campaign, sink, **options).run()
+        elapsed = time.perf_counter() - start
+    return campaign, elapsed, counter.take()
+
+
+def _result(step, recipients, sink, elapsed, queries, runs=1):
+    delivered = len(sink.delivered)
+    unique = len(set(sink.delivered))
+    return {
+        'mode': 'local',
+        'step': step,
+        'recipients': recipients,
+        'delivered': unique,
+        'duplicates': delivered - unique,
+        'runs': runs,
+        'seconds': round(elapsed, 3),
+        'msgs_per_sec': round(delivered / elapsed, 1) if elapsed else 0.0,
+        'queries_per_1k': round(queries * 1000 / max(recipients, 1), 2),
+    }
+
+
+def run(users=100_000, batch_size=500, workers=4, latency=0.005):
+    """
+    1) Butun kampaniya LocalSink'ga (har bir batch `latency` sekund).
+    2) Gateway yarmida ishdan chiqadi -> kampaniya paused, so'ng davom ettiriladi:
+       hamma yetib borishi va hech kim ikki marta olmasligi kerak.
+    """
+    recipients = seed(users)
+    options = {'batch_size': batch_size, 'workers': workers, 'rate': 0, 'retries': 0}
+    results = []
+
+    sink = LocalSink(latency)
+    campaign, elapsed, queries = _dispatch(_campaign('Bench full'), sink, options)
+    assert campaign.status == 'done', campaign.last_error
+    results.append(_result('full', recipients, sink, elapsed, queries))
+
+    sink = LocalSink(latency, fail_after=recipients // 2)
+    campaign, first_elapsed, first_queries = _dispatch(_campaign('Bench resume'), sink, options)
+    assert campaign.status == 'paused', campaign.status
+    sink.fail_after = None
+    campaign, elapsed, queries = _dispatch(campaign, sink, options)
+    assert campaign.status == 'done', campaign.last_error
+    results.append(_result('outage+resume', recipients, sink, first_elapsed + elapsed, first_queries + queries, 2))
+
+    for item in results:
+        assert item['delivered'] == recipients, f"{item['step']}: {item['delivered']} of {recipients} delivered"
+        assert not item['duplicates'], f"{item['step']}: {item['duplicates']} duplicate messages"
+    return results
+
+
+def format_table(results):
+    lines = [
+        f"{'step':<14} {'recipients':>10} {'delivered':>10} {'dupes':>6} {'runs':>5} {'seconds':>8} "
+        f"{'msgs/s':>10} {'q/1k':>7}"
+    ]
+    for item in results:
+        lines.append(
+            f"{item['step']:<14} {item['recipients']:>10} {item['delivered']:>10} {item['duplicates']:>6} "
+            f"{item['runs']:>5} {item['seconds']:>8.2f} {item['msgs_per_sec']:>10.1f} {item['queries_per_1k']:>7.2f}"
+        )
+    return '\n'.join(lines)
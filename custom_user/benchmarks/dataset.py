@@ -0,0 +1,271 @@
+import random
+import time
+from contextlib import contextmanager
+from datetime import time as dtime, timedelta
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.db import connection, transaction
+from django.db.models import Max
+from django.utils import timezone
+
+from custom_user.models import Address, Card, Device
+from restaurants.models import RestaurantBranches, Restaurants
+
+User = get_user_model()
+
+DEFAULT_PASSWORD = 'password123'
+
+# Toshkent tumanlari markazlari (lat, long, og'irlik)
+TASHKENT_CLUSTERS = [
+    (41.3111, 69.2797, 0.22),  # Markaz / Amir Temur
+    (41.2756, 69.2034, 0.18),  # Chilonzor
+    (41.3640, 69.2870, 0.15),  # Yunusobod
+    (41.3380, 69.3350, 0.12),  # Mirzo Ulug'bek
+    (41.2850, 69.2550, 0.10),  # Yakkasaroy
+    (41.3520, 69.2150, 0.09),  # Olmazor
+    (41.2270, 69.2200, 0.08),  # Sergeli
+    (41.2950, 69.3400, 0.06),  # Yashnobod
+]
+CLUSTER_SIGMA = 0.012
+
+CITIES = ['Tashkent'] * 85 + ['Samarkand'] * 5 + ['Bukhara'] * 3 + ['Namangan'] * 4 + ['Andijan'] * 3
+DEVICE_MODELS = ['iPhone', 'SM-A525F', 'SM-S911B', 'Redmi Note 12', 'Pixel 7', 'iPad', 'K', 'M2101K6G', None]
+STREETS = ['Amir Temur', 'Mustaqillik', 'Bunyodkor', 'Shota Rustaveli', 'Navoiy', 'Bobur', 'Labzak', 'Chilonzor']
+
+# Userga nechta yozuv to'g'ri keladi: (qiymatlar, og'irliklar)
+DEVICES_PER_USER = ([0, 1, 2, 3, 4, 6], [0.08, 0.46, 0.26, 0.12, 0.05, 0.03])
+CARDS_PER_USER = ([0, 1, 2, 3], [0.35, 0.40, 0.18, 0.07])
+ADDRESSES_PER_USER = ([0, 1, 2, 3, 4], [0.25, 0.40, 0.22, 0.09, 0.04])
+
+
+@contextmanager
+def raw_timestamps(*fields):
+    """
+    auto_now/auto_now_add ni vaqtincha o'chiradi - tarixiy created_at/last_online yozish uchun.
+    """
+    saved = [(field, field.auto_now, field.auto_now_add) for field in fields]
+    for field in fields:
+        field.auto_now = field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field, auto_now, auto_now_add in saved:
+            field.auto_now, field.auto_now_add = auto_now, auto_now_add
+
+
+@contextmanager
+def fast_sqlite():
+    """
+    Faqat SQLite uchun: generatsiya vaqtida fsync'ni o'chiradi. Postgres'ga ta'sir qilmaydi.
+    """
+    if connection.vendor != 'sqlite':
+        yield
+        return
+    with connection.cursor() as cursor:
+        cursor.execute('PRAGMA synchronous')
+        synchronous = cursor.fetchone()[0]
+        cursor.execute('PRAGMA synchronous = OFF')
+    try:
+        yield
+    finally:
+        with connection.cursor() as cursor:
+            cursor.execute(f'PRAGMA synchronous = {int(synchronous)}')
+
+
+def tashkent_point(rng):
+    lat, long, _ = rng.choices(TASHKENT_CLUSTERS, weights=[item[2] for item in TASHKENT_CLUSTERS])[0]
+    return rng.gauss(lat, CLUSTER_SIGMA), rng.gauss(long, CLUSTER_SIGMA)
+
+
+def _past(rng, now, days, scale):
+    # Eksponensial taqsimot: ko'p yozuvlar yaqin kunlarda, "dum" uzoq o'tmishda
+    return now - timedelta(days=min(rng.expovariate(1 / scale), days), seconds=rng.randrange(86400))
+
+
+def _next_id(model):
+    return (model.objects.aggregate(value=Max('id'))['value'] or 0) + 1
+
+
+class DatasetGenerator:
+    def __init__(self, seed=None, batch_size=5000, password=DEFAULT_PASSWORD, stdout=None):
+        self.rng = random.Random(seed)
+        self.batch_size = batch_size
+        self.now = timezone.now()
+        self.stdout = stdout
+        # Parol hashi bir marta - PBKDF2 har bir user uchun hisoblansa soatlab ketadi
+        self.password_hash = make_password(password)
+
+    def log(self, message):
+        if self.stdout:
+            self.stdout.write(message)
+
+    def generate_users(self, count, inactive_ratio=0.05):
+        start_id = _next_id(User)
+        card_counter = _next_id(Card)
+        created = {'users': 0, 'devices': 0, 'cards': 0, 'addresses': 0}
+        started = time.perf_counter()
+
+        with fast_sqlite(), raw_timestamps(
+            Device._meta.get_field('created_at'), Device._meta.get_field('last_online'),
+            Card._meta.get_field('created_at'), Address._meta.get_field('created_at'),
+        ):
+            for offset in range(0, count, self.batch_size):
+                size = min(self.batch_size, count - offset)
+                with transaction.atomic():
+                    users = User.objects.bulk_create(
+                        [self._user(start_id + offset + index, inactive_ratio) for index in range(size)],
+                        batch_size=self.batch_size,
+                    )
+                    devices, cards, addresses = [], [], []
+                    for user in users:
+                        devices.extend(self._devices(user))
+                        user_cards = self._cards(user, card_counter)
+                        card_counter += len(user_cards)
+                        cards.extend(user_cards)
+                        addresses.extend(self._addresses(user))
+
+                    Device.objects.bulk_create(devices, batch_size=self.batch_size)
+                    Card.objects.bulk_create(cards, batch_size=self.batch_size)
+                    Address.objects.bulk_create(addresses, batch_size=self.batch_size)
+
+                created['users'] += len(users)
+                created['devices'] += len(devices)
+                created['cards'] += len(cards)
+                created['addresses'] += len(addresses)
+                elapsed = time.perf_counter() - started
+                self.log(
+                    f"users {created['users']}/{count} devices={created['devices']} cards={created['cards']} "
+                    f"addresses={created['addresses']} ({created['users'] / elapsed:.0f} users/s)"
+                )
+
+        return created
+
+    def _user(self, number, inactive_ratio):
+        is_active = self.rng.random() >= inactive_ratio
+        # Aktivlashtirilmagan userlar odatda yaqinda ro'yxatdan o'tganlar
+        joined = _past(self.rng, self.now, 2, 0.5) if not is_active else _past(self.rng, self.now, 900, 240)
+        return User(
+            email=f'user{number}@example.uz',
+            password=self.password_hash,
+            full_name=f'User {number}',
+            phone_number=f'+99890{self.rng.randrange(10 ** 7):07d}',
+            date_joined=joined,
+            is_active=is_active,
+            notification=self.rng.random() < 0.6,
+            promotional_notification=self.rng.random() < 0.3,
+        )
+
+    def _devices(self, user):
+        if not user.is_active:
+            return []
+        count = self.rng.choices(*DEVICES_PER_USER)[0]
+        devices = []
+        for _ in range(count):
+            created_at = user.date_joined + (self.now - user.date_joined) * self.rng.random()
+            last_online = created_at + (self.now - created_at) * self.rng.betavariate(5, 1)
+            devices.append(Device(
+                user=user,
+                device_ip=f'{self.rng.choice([84, 178, 185, 213])}.{self.rng.randrange(256)}.'
+                          f'{self.rng.randrange(256)}.{self.rng.randrange(1, 255)}',
+                device_hardware=f'{self.rng.getrandbits(64):016x}',
+                device_name=self.rng.choice(DEVICE_MODELS),
+                location_city=self.rng.choice(CITIES),
+                created_at=created_at,
+                last_online=last_online,
+            ))
+        return devices
+
+    def _cards(self, user, counter):
+        if not user.is_active:
+            return []
+        count = self.rng.choices(*CARDS_PER_USER)[0]
+        return [
+            Card(
+                user=user,
+                name=self.rng.choice(['Mening kartam', 'Ish kartasi', None]),
+                card_number=f'{self.rng.choice(["8600", "9860"])}{counter + index:012d}',
+                card_name=self.rng.choice(['UzCard', 'Humo']),
+                card_expiry_date=f'{self.rng.randint(1, 12):02d}/{self.rng.randint(26, 31)}',
+                phone_number=user.phone_number,
+                default=index == 0,
+                created_at=user.date_joined + (self.now - user.date_joined) * self.rng.random(),
+            )
+            for index in range(count)
+        ]
+
+    def _addresses(self, user):
+        if not user.is_active:
+            return []
+        count = self.rng.choices(*ADDRESSES_PER_USER)[0]
+        addresses = []
+        for index in range(count):
+            lat, long = tashkent_point(self.rng)
+            addresses.append(Address(
+                user=user,
+                lat=Decimal(f'{lat:.6f}'),
+                long=Decimal(f'{long:.6f}'),
+                name=['Uy', 'Ish', 'Ota-onam', 'Boshqa', None][min(index, 4)],
+                address=f"{self.rng.choice(STREETS)} ko'chasi {self.rng.randint(1, 200)}",
+                apartment=str(self.rng.randint(1, 120)) if self.rng.random() < 0.7 else None,
+                entrance=str(self.rng.randint(1, 8)) if self.rng.random() < 0.5 else None,
+                floor=str(self.rng.randint(1, 16)) if self.rng.random() < 0.6 else None,
+                instructions="Qo'ng'iroq qiling" if self.rng.random() < 0.15 else None,
+                default=index == 0,
+                created_at=user.date_joined + (self.now - user.date_joined) * self.rng.random(),
+            ))
+        return addresses
+
+    def generate_restaurants(self, count, branches_mean=6):
+        start_id = _next_id(Restaurants)
+        created = {'restaurants': 0, 'branches': 0}
+
+        with fast_sqlite():
+            for offset in range(0, count, self.batch_size):
+                size = min(self.batch_size, count - offset)
+                with transaction.atomic():
+                    restaurants = Restaurants.objects.bulk_create([
+                        Restaurants(
+                            name=f'Restaurant {start_id + offset + index}',
+                            phone=f'+99871{self.rng.randrange(10 ** 7):07d}',
+                            email=f'restaurant{start_id + offset + index}@example.uz',
+                            password=self.password_hash,
+                            description='Milliy va yevropa taomlari',
+                        )
+                        for index in range(size)
+                    ], batch_size=self.batch_size)
+
+                    branches = []
+                    for restaurant in restaurants:
+                        # Ko'p restoranlar 1-3 filialli, bir nechta tarmoqlar o'nlab filialli
+                        branch_count = max(1, min(int(self.rng.paretovariate(1.5) * branches_mean / 3), 60))
+                        branches.extend(self._branch(restaurant, index) for index in range(branch_count))
+                    RestaurantBranches.objects.bulk_create(branches, batch_size=self.batch_size)
+
+                created['restaurants'] += len(restaurants)
+                created['branches'] += len(branches)
+                self.log(f"restaurants {created['restaurants']}/{count} branches={created['branches']}")
+
+        return created
+
+    def _branch(self, restaurant, index):
+        lat, long = tashkent_point(self.rng)
+        opens = self.rng.choices([7, 8, 9, 10, 11], weights=[0.1, 0.25, 0.3, 0.25, 0.1])[0]
+        closes = self.rng.choices([21, 22, 23], weights=[0.3, 0.4, 0.3])[0]
+        state_open = self.rng.random() < 0.8
+        return RestaurantBranches(
+            restaurant=restaurant,
+            name=f'{restaurant.name} #{index + 1}',
+            latitude=lat,
+            longitude=long,
+            address=f"{self.rng.choice(STREETS)} ko'chasi {self.rng.randint(1, 200)}",
+            email=f'branch{index + 1}.{restaurant.email}',
+            password=self.password_hash,
+            phone=f'+99871{self.rng.randrange(10 ** 7):07d}',
+            start_time=dtime(opens, self.rng.choice([0, 30])),
+            close_time=dtime(closes, self.rng.choice([0, 30, 59])),
+            state='open' if state_open else 'close',
+            status='work' if self.rng.random() < 0.95 else 'close',
+            delivery_time=int(self.rng.triangular(20, 90, 35)),
+        )
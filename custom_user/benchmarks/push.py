@@ -0,0 +1,99 @@
+import time
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+
+from custom_user.models import Device, PushDelivery
+from custom_user.push import DEAD_TOKEN_PREFIX, LocalGateway, PushDispatcher, PushGateway
+
+from .base import QueryCounter
+
+User = get_user_model()
+
+DEVICES_PER_USER = 2
+
+
+def seed(devices, dead_ratio):
+    users = User.objects.bulk_create(
+        [User(email=f'bench-push-{index}@cookservice.local', is_active=True)
+         for index in range(max(devices // DEVICES_PER_USER, 1))],
+        batch_size=5000,
+    )
+    every = round(1 / dead_ratio) if dead_ratio else 0
+    Device.objects.bulk_create(
+        [Device(user=users[index % len(users)], device_hardware=f'bench-{index}',
+                push_token=f'{DEAD_TOKEN_PREFIX if every and index % every == 0 else "tok-"}{index}')
+         for index in range(devices)],
+        batch_size=5000,
+    )
+    return User.objects.filter(email__startswith='bench-push-').values('pk')
+
+
+def _step(name, dispatcher, gateway, users, notifications):
+    counter = QueryCounter()
+    with connection.execute_wrapper(counter):
+        start = time.perf_counter()
+        for number in range(notifications):
+            dispatcher.notify(users, 'Buyurtma', f'Buyurtma holati #{number}', {'order': number})
+        queued = time.perf_counter() - start
+
+        messages_before = gateway.messages
+        start = time.perf_counter()
+        summary = dispatcher.flush()
+        elapsed = time.perf_counter() - start
+    messages = gateway.messages - messages_before
+    return {
+        'mode': 'local',
+        'step': name,
+        'notifications': notifications,
+        'messages': messages,
+        'sent': summary['sent'],
+        'invalid': summary['invalid'],
+        'failed': summary['failed'],
+        'notify_ms': round(queued * 1000, 1),
+        'seconds': round(elapsed, 3),
+        'msgs_per_sec': round(messages / elapsed, 1) if elapsed else 0.0,
+        'queries': counter.take(),
+    }
+
+
+def run(devices=20_000, notifications=3, batch_size=500, workers=4, latency=0.0, dead_ratio=0.05):
+    """
+    1) Har bir qurilmaga `notifications` ta bildirishnoma -> oynada bittaga birlashadi,
+       o'lik tokenlar o'chiriladi.
+    2) Yana bitta bildirishnoma: o'lik tokenlarga endi yuborilmaydi.
+    """
+    users = seed(devices, dead_ratio)
+    gateway = LocalGateway(latency=latency).start()
+    # Oyna katta: flush() ni benchmark o'zi chaqiradi
+    dispatcher = PushDispatcher(PushGateway(gateway.url, pool_size=workers), window=3600,
+                                batch_size=batch_size, workers=workers, retries=0)
+    try:
+        results = [
+            _step('coalesce+prune', dispatcher, gateway, users, notifications),
+            _step('after prune', dispatcher, gateway, users, 1),
+        ]
+    finally:
+        dispatcher.stop()
+        gateway.stop()
+
+    dead = results[0]['invalid']
+    assert results[0]['messages'] == devices, f"{results[0]['messages']} messages for {devices} devices"
+    assert results[1]['messages'] == devices - dead and not results[1]['invalid'], results[1]
+    assert not Device.objects.filter(push_token__startswith=DEAD_TOKEN_PREFIX).exists()
+    assert PushDelivery.objects.filter(coalesced=notifications).count() == devices
+    return results
+
+
+def format_table(results):
+    lines = [
+        f"{'step':<16} {'notif':>6} {'messages':>9} {'sent':>7} {'invalid':>8} {'failed':>7} "
+        f"{'notify ms':>10} {'seconds':>8} {'msgs/s':>10} {'queries':>8}"
+    ]
+    for item in results:
+        lines.append(
+            f"{item['step']:<16} {item['notifications']:>6} {item['messages']:>9} {item['sent']:>7} "
+            f"{item['invalid']:>8} {item['failed']:>7} {item['notify_ms']:>10.1f} {item['seconds']:>8.3f} "
+            f"{item['msgs_per_sec']:>10.1f} {item['queries']:>8}"
+        )
+    return '\n'.join(lines)
@@ -0,0 +1,129 @@
+import time
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+
+from custom_user.models import Address, Card
+from custom_user.serializers import (
+    AddressSerializer,
+    CardSerializer,
+    NotificationSettingsSerializer,
+    address_rows,
+    card_rows,
+    notification_settings_rows,
+)
+
+from .base import QueryCounter
+
+User = get_user_model()
+
+
+def seed(rows):
+    user = User.objects.create(email='bench-serializers@cookservice.local', is_active=True)
+    Card.objects.bulk_create(
+        [Card(user=user, name=f'Card {index}', card_number=f'8600{index:012d}', card_name='BENCH USER',
+              card_expiry_date='12/30', phone_number='+998901234567')
+         for index in range(rows)],
+        batch_size=1000,
+    )
+    Address.objects.bulk_create(
+        [Address(user=user, lat='41.311081', long='69.240562', name=f'Address {index}',
+                 address='Toshkent, Amir Temur ko\'chasi', floor=str(index % 9))
+         for index in range(rows)],
+        batch_size=1000,
+    )
+    return user
+
+
+def _cases(user):
+    """
+    (nom, DRF varianti, kompilyatsiya qilingan variant). Har ikkalasi bir xil natija qaytarishi kerak.
+    """
+    cards = Card.objects.filter(user=user)
+    addresses = Address.objects.filter(user=user)
+    return [
+        ('card_list',
+         lambda: CardSerializer(cards.all(), many=True).data,
+         lambda: card_rows.many(card_rows.values(cards.all()))),
+        ('address_list',
+         lambda: AddressSerializer(addresses.all(), many=True).data,
+         lambda: address_rows.many(address_rows.values(addresses.all()))),
+        ('notification_settings',
+         lambda: NotificationSettingsSerializer(user).data,
+         lambda: notification_settings_rows.one(user)),
+    ]
+
+
+def _serialize_only_cases(user):
+    """
+    So'rovsiz: qatorlar oldindan olingan, faqat obyekt -> dict bosqichi o'lchanadi.
+    """
+    cards = list(Card.objects.filter(user=user))
+    card_values = list(card_rows.values(Card.objects.filter(user=user)))
+    addresses = list(Address.objects.filter(user=user))
+    address_values = list(address_rows.values(Address.objects.filter(user=user)))
+    return [
+        ('card_list:serialize',
+         lambda: CardSerializer(cards, many=True).data,
+         lambda: card_rows.many(card_values)),
+        ('address_list:serialize',
+         lambda: AddressSerializer(addresses, many=True).data,
+         lambda: address_rows.many(address_values)),
+    ]
+
+
+def _measure(func, iterations):
+    counter = QueryCounter()
+    with connection.execute_wrapper(counter):
+        start = time.perf_counter()
+        for _ in range(iterations):
+            func()
+        elapsed = time.perf_counter() - start
+    return elapsed / iterations, counter.take() / iterations
+
+
+def _normalize(data):
+    # ReturnList/ReturnDict va OrderedDict o'rniga oddiy dict/list
+    if isinstance(data, list):
+        return [dict(item) for item in data]
+    return dict(data)
+
+
+def run(rows=100, iterations=200):
+    """
+    Har bir holat uchun DRF serializer va CompiledSerializer vaqtini o'lchaydi.
+    Natijalar mos kelmasa AssertionError - tezlik noto'g'ri javob hisobiga bo'lmasligi kerak.
+    """
+    user = seed(rows)
+    results = []
+    for step, drf, compiled in _cases(user) + _serialize_only_cases(user):
+        expected, actual = _normalize(drf()), _normalize(compiled())
+        assert expected == actual, f'{step}: compiled output differs from the serializer'
+
+        per_row = rows if isinstance(expected, list) else 1
+        drf_seconds, drf_queries = _measure(drf, iterations)
+        compiled_seconds, compiled_queries = _measure(compiled, iterations)
+        for mode, seconds, queries in (('drf', drf_seconds, drf_queries),
+                                       ('fast', compiled_seconds, compiled_queries)):
+            results.append({
+                'mode': mode,
+                'step': step,
+                'requests': iterations,
+                'rows': per_row,
+                'call_us': round(seconds * 1e6, 2),
+                'row_us': round(seconds * 1e6 / per_row, 3),
+                'queries_per_request': queries,
+                'speedup': round(drf_seconds / compiled_seconds, 2),
+            })
+    return results
+
+
+def format_table(results):
+    lines = [f"{'mode':<6} {'step':<24} {'rows':>5} {'call us':>10} {'row us':>9} {'q/req':>6} {'speedup':>8}"]
+    for item in results:
+        speedup = f"{item['speedup']:.2f}x" if item['mode'] == 'fast' else ''
+        lines.append(
+            f"{item['mode']:<6} {item['step']:<24} {item['rows']:>5} {item['call_us']:>10.1f} "
+            f"{item['row_us']:>9.2f} {item['queries_per_request']:>6.1f} {speedup:>8}"
+        )
+    return '\n'.join(lines)
@@ -0,0 +1,142 @@
+import threading
+import time
+
+from django.core.cache import cache
+from django.db import connection
+from django.db.backends.signals import connection_created
+
+from config.cache import get_or_compute
+from restaurants.models import RestaurantBranches, Restaurants
+
+from .base import QueryCounter, percentile
+
+LISTING_KEY = 'bench:restaurant_branches'
+
+
+def seed(rows):
+    restaurants = Restaurants.objects.bulk_create(
+        [Restaurants(name=f'Restaurant {index}', phone='+998901234567', password='-', description='Bench')
+         for index in range(max(rows // 20, 1))],
+    )
+    RestaurantBranches.objects.bulk_create(
+        [RestaurantBranches(restaurant=restaurants[index % len(restaurants)], name=f'Branch {index}',
+                            latitude=41.31, longitude=69.24, address='Toshkent', email=f'b{index}@cookservice.local',
+                            password='-', state='open', status='work', delivery_time=30)
+         for index in range(rows)],
+        batch_size=1000,
+    )
+
+
+class Listing:
+    """
+    Restoran filiallari ro'yxati - kesh muddati tugaganda qayta hisoblanadigan "qimmat" so'rov.
+    Har bir chaqiruv vaqti yoziladi: DB so'rovlari muddat tugash oynalari bo'yicha sanaladi.
+    """
+
+    def __init__(self):
+        self.calls = []
+        self._lock = threading.Lock()
+
+    def __call__(self):
+        rows = list(
+            RestaurantBranches.objects.select_related('restaurant')
+            .values('id', 'name', 'restaurant__name', 'state', 'delivery_time')
+        )
+        with self._lock:
+            self.calls.append(time.monotonic())
+        return rows
+
+
+def naive_get(key, compute, ttl):
+    # Oldingi usul: muddat tugaganda har bir so'rov o'zi hisoblaydi
+    value = cache.get(key)
+    if value is None:
+        value = compute()
+        cache.set(key, value, ttl)
+    return value
+
+
+def guarded_get(key, compute, ttl):
+    return get_or_compute(key, compute, ttl)
+
+
+MODES = {
+    'naive': naive_get,
+    'guarded': guarded_get,
+}
+
+
+def _run_mode(mode, threads, duration, ttl):
+    fetch = MODES[mode]
+    listing = Listing()
+    durations = [[] for _ in range(threads)]
+    counter = QueryCounter()
+    counter.install()
+    connection_created.connect(counter.install)
+    barrier = threading.Barrier(threads + 1)
+    cache.delete(LISTING_KEY)
+
+    def worker(samples):
+        barrier.wait()
+        deadline = time.monotonic() + duration
+        try:
+            while time.monotonic() < deadline:
+                start = time.perf_counter()
+                fetch(LISTING_KEY, listing, ttl)
+                samples.append(time.perf_counter() - start)
+        finally:
+            connection.close()
+
+    pool = [threading.Thread(target=worker, args=(samples,)) for samples in durations]
+    for thread in pool:
+        thread.start()
+    barrier.wait()
+    started = time.monotonic()
+    for thread in pool:
+        thread.join()
+    elapsed = time.monotonic() - started
+    counter.uninstall()
+
+    # TTL uzunlikdagi oynalar: stampede bo'lsa muddat tugagan oynada so'rovlar soni threadlar soniga yetadi
+    windows = [0] * (int(duration / ttl) + 1)
+    for moment in listing.calls:
+        windows[min(int((moment - started) / ttl), len(windows) - 1)] += 1
+    values = sorted(value for samples in durations for value in samples)
+    return {
+        'mode': mode,
+        'step': 'listing',
+        'threads': threads,
+        'requests': len(values),
+        'rps': round(len(values) / elapsed, 1),
+        'p50_ms': round(percentile(values, 50) * 1000, 3),
+        'p95_ms': round(percentile(values, 95) * 1000, 3),
+        'p99_ms': round(percentile(values, 99) * 1000, 3),
+        'db_hits': counter.take(),
+        'max_hits_per_window': max(windows),
+        'hits_per_window': windows,
+    }
+
+
+def run(threads=16, duration=5.0, ttl=0.5, rows=2000):
+    """
+    `threads` ta thread `duration` sekund davomida bitta kesh kalitini o'qiydi, kalit har `ttl`
+    sekundda eskiradi. Har bir rejim uchun DB so'rovlari soni va ularning TTL oynalari bo'yicha taqsimoti.
+    """
+    seed(rows)
+    return [_run_mode(mode, threads, duration, ttl) for mode in MODES]
+
+
+def format_table(results):
+    lines = [
+        f"{'mode':<8} {'thr':>4} {'requests':>9} {'rps':>9} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} "
+        f"{'db hits':>8} {'max/win':>8}"
+    ]
+    for item in results:
+        lines.append(
+            f"{item['mode']:<8} {item['threads']:>4} {item['requests']:>9} {item['rps']:>9.1f} "
+            f"{item['p50_ms']:>8.3f} {item['p95_ms']:>8.3f} {item['p99_ms']:>8.3f} "
+            f"{item['db_hits']:>8} {item['max_hits_per_window']:>8}"
+        )
+    for item in results:
+        lines.append(f"{item['mode']:<8} hits per window: {' '.join(map(str, item['hits_per_window']))}")
+    return '\n'.join(lines)
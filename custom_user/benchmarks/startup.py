@@ -0,0 +1,109 @@
+import json
+import statistics
+import subprocess
+import sys
+import time
+
+from django.conf import settings
+
+# Bolalar jarayonida bajariladi: django.setup() + URLconf importi + birinchi so'rov.
+# Vaqtlar ota jarayon yuborgan spawn momentidan hisoblanadi - interpreter starti ham kiradi.
+FIRST_RESPONSE_SCRIPT = '''
+import json, sys, time
+spawned = float(sys.argv[1])
+import django
+django.setup()
+setup_done = time.time()
+from django.test import Client
+from django.urls import get_resolver
+get_resolver().url_patterns
+urls_done = time.time()
+response = Client().get(sys.argv[2])
+done = time.time()
+print(json.dumps({
+    'setup_ms': (setup_done - spawned) * 1000,
+    'urlconf_ms': (urls_done - setup_done) * 1000,
+    'first_response_ms': (done - spawned) * 1000,
+    'status': response.status_code,
+}))
+'''
+
+IMPORT_SCRIPT = 'import django; django.setup(); from django.urls import get_resolver; get_resolver().url_patterns'
+
+
+def parse_importtime(stderr):
+    """
+    `-X importtime` chiqishidan [(modul, self_us, cumulative_us, chuqurlik)] ro'yxati.
+    Chuqurlik modul nomi oldidagi bo'shliqlardan (har daraja 2 ta) aniqlanadi.
+    """
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith('import time:'):
+            continue
+        parts = line[len('import time:'):].split('|')
+        if len(parts) != 3 or not parts[0].strip().isdigit():
+            continue  # sarlavha qatori
+        name = parts[2].rstrip()
+        depth = (len(name) - len(name.lstrip())) // 2
+        rows.append((name.strip(), int(parts[0]), int(parts[1]), depth))
+    return rows
+
+
+def import_profile(python=sys.executable):
+    result = subprocess.run(
+        [python, '-X', 'importtime', '-c', IMPORT_SCRIPT],
+        cwd=settings.BASE_DIR, capture_output=True, text=True, check=True,
+    )
+    return parse_importtime(result.stderr)
+
+
+def summarize_imports(rows, top=15):
+    top_level = [row for row in rows if row[3] == 0]
+    by_cumulative = sorted(rows, key=lambda row: row[2], reverse=True)
+    return {
+        'modules': len(rows),
+        'total_ms': round(sum(row[2] for row in top_level) / 1000, 2),
+        'top_cumulative': [(name, round(cumulative / 1000, 2)) for name, _, cumulative, _ in by_cumulative[:top]],
+        'top_self': [
+            (name, round(self_us / 1000, 2))
+            for name, self_us, _, _ in sorted(rows, key=lambda row: row[1], reverse=True)[:top]
+        ],
+    }
+
+
+def first_response(path, python=sys.executable):
+    result = subprocess.run(
+        [python, '-c', FIRST_RESPONSE_SCRIPT, repr(time.time()), path],
+        cwd=settings.BASE_DIR, capture_output=True, text=True, check=True,
+    )
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def run(repeat=5, path='/api/user/login/', top=15):
+    """
+    `repeat` ta yangi jarayonda o'lchaydi, median va minimumni qaytaradi. Birinchi marta
+    .pyc fayllar yozilishi natijani buzmasligi uchun bitta isituvchi ishga tushirish tashlab yuboriladi.
+    """
+    first_response(path)
+    samples = [first_response(path) for _ in range(repeat)]
+    import_rows = [import_profile() for _ in range(repeat)]
+    imports = summarize_imports(import_rows[-1], top)
+
+    results = []
+    for metric in ('setup_ms', 'urlconf_ms', 'first_response_ms'):
+        values = [sample[metric] for sample in samples]
+        results.append(_result(metric.removesuffix('_ms'), values))
+    results.append(_result('import_total', [summarize_imports(rows)['total_ms'] for rows in import_rows]))
+    results[-1]['modules'] = imports['modules']
+
+    return results, imports
+
+
+def _result(step, values):
+    return {
+        'step': step,
+        'requests': len(values),
+        'median_ms': round(statistics.median(values), 2),
+        'min_ms': round(min(values), 2),
+        'max_ms': round(max(values), 2),
+    }
@@ -0,0 +1,289 @@
+import logging
+import threading
+import time
+from collections import deque, namedtuple
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.mail import EmailMessage, get_connection
+from django.db.models import F
+from django.template import Context, Template
+from django.utils import timezone
+
+from custom_user.models import Campaign
+from custom_user.push import PushSender
+
+logger = logging.getLogger('custom_user.campaigns')
+
+User = get_user_model()
+
+RenderedMessage = namedtuple('RenderedMessage', 'subject body')
+
+
+def get_config():
+    config = {
+        # Bitta gateway chaqiruvidagi qabul qiluvchilar
+        'BATCH_SIZE': 500,
+        # .iterator(chunk_size) - bazadan bir martada o'qiladigan qatorlar
+        'CHUNK_SIZE': 2000,
+        # Parallel yuboruvchi threadlar (har birining o'z ulanishi)
+        'WORKERS': 4,
+        # Sekundiga xabarlar, 0 - cheklanmagan
+        'RATE': 200,
+        'RETRIES': 3,
+        'RETRY_DELAY': 1.0,
+    }
+    config.update(getattr(settings, 'CAMPAIGNS', {}))
+    return config
+
+
+def opted_in_users(after=0):
+    """
+    Reklama olishga rozilik bergan aktiv userlar id bo'yicha - user_promo_optin_idx partial index.
+    """
+    return (
+        User.objects.filter(promotional_notification=True, is_active=True, pk__gt=after)
+        .order_by('pk')
+        .values_list('pk', 'email', named=True)
+    )
+
+
+def render(campaign):
+    context = Context({'campaign': campaign})
+    return RenderedMessage(Template(campaign.subject).render(context).strip(), Template(campaign.body).render(context))
+
+
+class RateLimiter:
+    """
+    Token bucket: sekundiga `rate` ta xabar, qisqa portlashlar bitta batch hajmigacha.
+    """
+
+    def __init__(self, rate, burst):
+        self.rate = rate
+        self.burst = max(burst, 1)
+        self.tokens = self.burst
+        self.updated = time.monotonic()
+
+    def acquire(self, count):
+        if not self.rate:
+            return
+        while True:
+            now = time.monotonic()
+            self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            if self.tokens >= count:
+                self.tokens -= count
+                return
+            time.sleep((count - self.tokens) / self.rate)
+
+
+class EmailSender:
+    """
+    Django email backend orqali. Har bir worker thread o'z SMTP ulanishini ochiq ushlab turadi.
+    """
+
+    def __init__(self):
+        self._local = threading.local()
+        self._connections = []
+        self._lock = threading.Lock()
+
+    def _connection(self):
+        connection = getattr(self._local, 'connection', None)
+        if connection is None:
+            connection = get_connection(fail_silently=False)
+            connection.open()
+            self._local.connection = connection
+            with self._lock:
+                self._connections.append(connection)
+        return connection
+
+    def send(self, message, recipients):
+        connection = self._connection()
+        messages = [
+            EmailMessage(message.subject, message.body, settings.DEFAULT_FROM_EMAIL, [recipient.email],
+                         connection=connection)
+            for recipient in recipients
+        ]
+        return connection.send_messages(messages) or 0
+
+    def close(self):
+        with self._lock:
+            for connection in self._connections:
+                connection.close()
+            self._connections.clear()
+
+
+class LocalSink:
+    """
+    Gateway o'rnida (benchmark va lokal sinov): xabarlarni xotirada yig'adi.
+    `latency` - har bir batch uchun kechikish, `fail_after` - shuncha xabardan keyin xato beradi.
+    """
+
+    def __init__(self, latency=0.0, fail_after=None):
+        self.latency = latency
+        self.fail_after = fail_after
+        self.delivered = []
+        self.batches = 0
+        self._lock = threading.Lock()
+
+    def send(self, message, recipients):
+        if self.latency:
+            time.sleep(self.latency)
+        with self._lock:
+            if self.fail_after is not None and len(self.delivered) + len(recipients) > self.fail_after:
+                raise ConnectionError('Local sink is down')
+            self.delivered.extend(recipient.email for recipient in recipients)
+            self.batches += 1
+        return len(recipients)
+
+    def close(self):
+        pass
+
+
+SENDERS = {
+    'email': EmailSender,
+    'push': PushSender,
+}
+
+
+class CampaignDispatcher:
+    """
+    Kampaniyani rozilik bergan userlarga yuboradi. Userlar bazadan oqim bilan o'qiladi
+    (.iterator), shablon bir marta render qilinadi, batchlar thread pool orqali parallel va
+    RATE bilan cheklangan holda yuboriladi.
+
+    Har bir batch tugagach checkpoint (cursor + done_ranges) yoziladi, shuning uchun qayta
+    ishga tushirilganda yuborilganlar takrorlanmaydi. Jarayon o'lib qolsa faqat o'sha paytda
+    yuborilayotgan batchlar (WORKERS * 2 gacha) qayta yuborilishi mumkin. Gateway xatosi
+    RETRIES dan keyin ham davom etsa kampaniya `paused` holatiga o'tadi. Boshqa joydan
+    `paused` qilingan kampaniya keyingi checkpointda to'xtaydi.
+    """
+
+    def __init__(self, campaign, sender=None, **options):
+        self.campaign = campaign
+        self.sender = sender or SENDERS[campaign.channel]()
+        self.options = {**get_config(), **{name.upper(): value for name, value in options.items()}}
+        self.limiter = RateLimiter(self.options['RATE'], self.options['BATCH_SIZE'])
+        self.cursor = 0
+        # Yuborish tartibidagi [start, end, tugadimi] oraliqlar; tugagan boshi cursor'ga o'tadi
+        self.window = deque()
+        self.error = None
+        self.stopped = False
+
+    def batches(self):
+        """
+        ('send', qabul qiluvchilar) yoki ('skip', (start, end)) - oldingi ishga tushirishda
+        yuborilgan oraliq. Ikkalasi ham id bo'yicha tartibda keladi.
+        """
+        batch_size = self.options['BATCH_SIZE']
+        skip = sorted(tuple(item) for item in self.campaign.done_ranges)
+        skipping = None
+        batch = []
+        for recipient in opted_in_users(self.cursor).iterator(chunk_size=self.options['CHUNK_SIZE']):
+            if skip and recipient.pk > skip[0][0]:
+                if batch:
+                    yield 'send', batch
+                    batch = []
+                while skip and recipient.pk > skip[0][0]:
+                    skipping = skip.pop(0)
+                    yield 'skip', skipping
+            if skipping and recipient.pk <= skipping[1]:
+                continue
+            batch.append(recipient)
+            if len(batch) >= batch_size:
+                yield 'send', batch
+                batch = []
+        if batch:
+            yield 'send', batch
+        for item in skip:
+            yield 'skip', item
+
+    def send(self, message, batch):
+        retries = self.options['RETRIES']
+        for attempt in range(retries + 1):
+            try:
+                return self.sender.send(message, batch)
+            except Exception:
+                if attempt == retries:
+                    raise
+                logger.warning('Campaign %s batch failed, retrying', self.campaign.pk, exc_info=True)
+                time.sleep(self.options['RETRY_DELAY'] * 2 ** attempt)
+
+    def run(self):
+        if not self._start():
+            raise ValueError(f'Campaign {self.campaign.pk} is already {self.campaign.status}')
+
+        self.cursor = self.campaign.cursor
+        message = render(self.campaign)
+        pending = {}
+        workers = self.options['WORKERS']
+        try:
+            with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='campaign') as pool:
+                for kind, item in self.batches():
+                    if kind == 'skip':
+                        self.window.append([*item, True])
+                        continue
+                    while len(pending) >= workers * 2:
+                        done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                        self._collect(done, pending)
+                    if self.error or self.stopped:
+                        break
+                    self.limiter.acquire(len(item))
+                    entry = [item[0].pk - 1, item[-1].pk, False]
+                    self.window.append(entry)
+                    pending[pool.submit(self.send, message, item)] = (entry, len(item))
+                self._collect(wait(pending).done, pending)
+        finally:
+            self.sender.close()
+        return self._finish()
+
+    def _start(self):
+        started = Campaign.objects.filter(pk=self.campaign.pk, status__in=('draft', 'paused')).update(
+            status='running', started_at=timezone.now(), last_error=None,
+        )
+        self.campaign.refresh_from_db()
+        return bool(started)
+
+    def _collect(self, done, pending):
+        sent = failed = 0
+        for future in done:
+            entry, count = pending.pop(future)
+            error = future.exception()
+            if error is None:
+                sent += future.result()
+                failed += count - future.result()
+                entry[2] = True
+            elif self.error is None:
+                # Oraliq belgilanmaydi - qayta ishga tushirilganda shu batch yana yuboriladi
+                self.error = f'{type(error).__name__}: {error}'
+                logger.error('Campaign %s paused: %s', self.campaign.pk, self.error)
+        if done:
+            self._checkpoint(sent, failed)
+
+    def _checkpoint(self, sent, failed):
+        # Boshidan ketma-ket tugagan oraliqlar cursor'ga o'tadi - qolgani WORKERS * 2 tadan oshmaydi
+        while self.window and self.window[0][2]:
+            self.cursor = max(self.cursor, self.window.popleft()[1])
+        progress = {
+            'cursor': self.cursor,
+            'done_ranges': [[start, end] for start, end, done in self.window if done],
+            'sent_count': F('sent_count') + sent,
+            'failed_count': F('failed_count') + failed,
+        }
+        if not Campaign.objects.filter(pk=self.campaign.pk, status='running').update(**progress):
+            # Admin pauza qildi - progress saqlanadi, yangi batchlar yuborilmaydi
+            Campaign.objects.filter(pk=self.campaign.pk).update(**progress)
+            self.stopped = True
+
+    def _finish(self):
+        if self.error:
+            updates = {'status': 'paused', 'last_error': self.error}
+        elif self.stopped:
+            updates = {}
+        else:
+            updates = {'status': 'done', 'finished_at': timezone.now()}
+        if updates:
+            Campaign.objects.filter(pk=self.campaign.pk).update(**updates)
+        self.campaign.refresh_from_db()
+        return self.campaign
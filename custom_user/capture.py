@@ -0,0 +1,256 @@
+import json
+import logging
+import os
+import random
+import re
+import threading
+import time
+import uuid
+from logging.handlers import RotatingFileHandler
+from pathlib import Path
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.http import QueryDict
+
+SENSITIVE_KEYS = {
+    'password', 'new_password', 'old_password', 'code', 'card_number', 'card_expiry_date',
+    'access', 'refresh', 'reset_token', 'token', 'phone_number', 'door_phone',
+}
+HEADERS_OF_INTEREST = ('Content-Type', 'Accept', 'Accept-Encoding', 'Accept-Language')
+
+_EMAIL_RE = re.compile(r'^[^@\s]+@[^@\s]+\.[^@\s]+$')
+_UUID_RE = re.compile(r'^[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}$', re.IGNORECASE)
+_DECIMAL_RE = re.compile(r'^-?\d+\.\d+$')
+_PLACEHOLDER_RE = re.compile(r'^<(\w+)(?::(\d+))?>$')
+# path('cards/<uuid:uid>/') va re_path('^cards/(?P<pk>[^/.]+)/$') parametrlari
+_ROUTE_PARAM_RE = re.compile(r'<(?:\w+:)?(\w+)>|\(\?P<(\w+)>[^)]*\)')
+# Query'da o'zgarmay qoladigan qiymatlar: kichik raqam (page=2) yoki token (lang=uz, fields=id,name)
+_QUERY_TOKEN_RE = re.compile(r'^(?:\d{1,6}|[A-Za-z_][\w,.-]{0,31})$')
+
+
+def get_config():
+    config = {
+        'ENABLED': False,
+        'SAMPLE_RATE': 1.0,
+        'OUTPUT_DIR': os.path.join(settings.BASE_DIR, 'var', 'traffic'),
+        'MAX_FILE_MB': 50,
+        'BACKUP_COUNT': 10,
+        'MAX_BODY_BYTES': 64 * 1024,
+    }
+    config.update(getattr(settings, 'TRAFFIC_CAPTURE', {}))
+    return config
+
+
+def body_shape(value, key=None):
+    """
+    Payload strukturasini saqlab, qiymatlarni placeholder bilan almashtiradi:
+    `{"email": "a@b.uz", "code": "123456"}` -> `{"email": "<email>", "code": "<redacted:6>"}`.
+    """
+    if isinstance(value, dict):
+        return {name: body_shape(item, name) for name, item in value.items()}
+    if isinstance(value, list):
+        return [body_shape(item, key) for item in value[:20]]
+    if isinstance(value, bool) or value is None:
+        return value
+    if key in SENSITIVE_KEYS:
+        return f'<redacted:{len(str(value))}>'
+    if isinstance(value, int):
+        return '<int>'
+    if isinstance(value, float):
+        return '<float>'
+
+    value = str(value)
+    if _EMAIL_RE.match(value):
+        return '<email>'
+    if _UUID_RE.match(value):
+        return '<uuid>'
+    if value.isdigit():
+        return f'<digits:{len(value)}>'
+    if _DECIMAL_RE.match(value):
+        return '<decimal>'
+    return f'<str:{len(value)}>'
+
+
+def path_template(match):
+    """
+    Resolve bo'lgan route'dan id'larsiz shablon: `/api/user/api/cards/{uid}/`.
+    """
+    if match is None or not match.route:
+        return None
+    route = _ROUTE_PARAM_RE.sub(lambda param: '{%s}' % (param.group(1) or param.group(2)), match.route)
+    return '/' + route.translate(str.maketrans('', '', '^$?\\'))
+
+
+def query_shape(query):
+    """
+    Query qiymatlarining normallashgan shakli: `?page=2&email=a@b.uz` -> `{"email": ["<email>"], "page": ["2"]}`.
+    """
+    return {key: [_query_value(key, value) for value in query.getlist(key)] for key in sorted(query)}
+
+
+def _query_value(key, value):
+    if key not in SENSITIVE_KEYS and _QUERY_TOKEN_RE.match(value) and not _UUID_RE.match(value):
+        return value
+    return body_shape(value, key)
+
+
+def fill_shape(shape, credentials=None, key=None):
+    """
+    body_shape() teskarisi - replay uchun sintetik, lekin shakli bir xil payload.
+    """
+    credentials = credentials or {}
+    if isinstance(shape, dict):
+        return {name: fill_shape(item, credentials, name) for name, item in shape.items()}
+    if isinstance(shape, list):
+        return [fill_shape(item, credentials, key) for item in shape]
+    if not isinstance(shape, str):
+        return shape
+
+    match = _PLACEHOLDER_RE.match(shape)
+    if not match:
+        return shape
+    kind, length = match.group(1), int(match.group(2) or 8)
+
+    if key in credentials:
+        return credentials[key]
+    if kind == 'email':
+        return credentials.get('email') or f'replay-{uuid.uuid4().hex[:12]}@example.com'
+    if kind == 'uuid':
+        return str(uuid.uuid4())
+    if kind == 'int':
+        return 1
+    if kind == 'float':
+        return 41.311081
+    if kind == 'decimal':
+        return '41.311081'
+    if kind == 'digits' or (kind == 'redacted' and key in ('code', 'card_number')):
+        return ''.join(random.choices('0123456789', k=length))
+    return 'x' * length
+
+
+class TrafficWriter:
+    """
+    Har bir worker o'z faylini yozadi (`traffic-<pid>.jsonl`) - rotatsiya jarayonlar orasida to'qnashmaydi.
+    """
+
+    def __init__(self, config):
+        self.config = config
+        self._lock = threading.Lock()
+        self._handler = None
+        self._pid = None
+
+    def _get_handler(self):
+        if self._handler is None or self._pid != os.getpid():
+            output_dir = Path(self.config['OUTPUT_DIR'])
+            output_dir.mkdir(parents=True, exist_ok=True)
+            self._pid = os.getpid()
+            self._handler = RotatingFileHandler(
+                output_dir / f'traffic-{self._pid}.jsonl',
+                maxBytes=self.config['MAX_FILE_MB'] * 1024 * 1024,
+                backupCount=self.config['BACKUP_COUNT'],
+                delay=True,
+            )
+        return self._handler
+
+    def write(self, record):
+        line = json.dumps(record, separators=(',', ':'))
+        with self._lock:
+            # emit() yozish xatolarini o'zi ushlab handleError() orqali chiqaradi
+            self._get_handler().emit(logging.makeLogRecord({'msg': line}))
+
+
+def load_records(source):
+    """
+    Katalog yoki bitta fayldan yozuvlarni vaqt bo'yicha tartiblab qaytaradi.
+    """
+    source = Path(source)
+    paths = sorted(source.glob('traffic-*.jsonl*')) if source.is_dir() else [source]
+    records = []
+    for path in paths:
+        with open(path) as fh:
+            for line in fh:
+                line = line.strip()
+                if line:
+                    records.append(json.loads(line))
+    records.sort(key=lambda record: record['ts'])
+    return records
+
+
+class TrafficCaptureMiddleware:
+    """
+    So'rovlarning anonimlashtirilgan izini yozadi: method, URL shabloni, body va query shakli,
+    kerakli headerlar, status va davomiylik. IP, token, id va qiymatlar saqlanmaydi.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.config = get_config()
+        self.writer = TrafficWriter(self.config)
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        if not self.should_capture():
+            return self.get_response(request)
+
+        started_at = time.time()
+        start = time.perf_counter()
+        shape = self.request_shape(request)
+        response = self.get_response(request)
+        self.record(request, response, shape, started_at, time.perf_counter() - start)
+        return response
+
+    async def __acall__(self, request):
+        if not self.should_capture():
+            return await self.get_response(request)
+
+        started_at = time.time()
+        start = time.perf_counter()
+        shape = self.request_shape(request)
+        response = await self.get_response(request)
+        self.record(request, response, shape, started_at, time.perf_counter() - start)
+        return response
+
+    def should_capture(self):
+        return self.config['ENABLED'] and random.random() < self.config['SAMPLE_RATE']
+
+    def record(self, request, response, shape, started_at, duration):
+        match = request.resolver_match
+        self.writer.write({
+            'ts': started_at,
+            'method': request.method,
+            'path': path_template(match),
+            'path_params': body_shape(match.kwargs) if match else {},
+            'url_name': match.view_name if match else None,
+            'query': query_shape(request.GET),
+            'body': shape,
+            'headers': {name: request.headers[name] for name in HEADERS_OF_INTEREST if name in request.headers},
+            'authenticated': 'Authorization' in request.headers,
+            'status': response.status_code,
+            'duration_ms': round(duration * 1000, 3),
+            'response_bytes': len(response.content) if not response.streaming else None,
+        })
+
+    def request_shape(self, request):
+        content_type = request.content_type or ''
+        length = int(request.META.get('CONTENT_LENGTH') or 0)
+
+        if not length:
+            return None
+        if length > self.config['MAX_BODY_BYTES'] or content_type.startswith('multipart/'):
+            return f'<{content_type or "body"}:{length}>'
+
+        try:
+            if content_type == 'application/json':
+                return body_shape(json.loads(request.body))
+            if content_type == 'application/x-www-form-urlencoded':
+                return body_shape(QueryDict(request.body).dict())
+        except ValueError:
+            return f'<invalid:{length}>'
+        return f'<{content_type or "body"}:{length}>'
@@ -0,0 +1,246 @@
+import atexit
+import ipaddress
+import logging
+import threading
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils import timezone
+
+from custom_user.models import Device
+from custom_user.services import get_client_ip, lookup_city
+
+logger = logging.getLogger('custom_user.enrichment')
+
+CITY_CACHE_PREFIX = 'device_city_'
+
+DEVICE_NAME_LENGTH = Device._meta.get_field('device_name').max_length
+CITY_LENGTH = Device._meta.get_field('location_city').max_length
+USER_AGENT_LENGTH = Device._meta.get_field('user_agent').max_length
+
+
+def get_config():
+    config = {
+        # Navbatdagi qurilmalar shuncha sekundda bir qayta ishlanadi
+        'WINDOW': 1.0,
+        'BATCH_SIZE': 200,
+        # Parallel geolocation so'rovlari
+        'WORKERS': 4,
+        # IP -> shahar keshda shuncha turadi (barcha workerlar uchun umumiy)
+        'CACHE_TIMEOUT': 24 * 60 * 60,
+        # Shahri noma'lum IP qisqa muddat - provayder keyinroq aniqlashi mumkin
+        'EMPTY_CACHE_TIMEOUT': 10 * 60,
+    }
+    config.update(getattr(settings, 'DEVICE_ENRICHMENT', {}))
+    return config
+
+
+def raw_device_fields(request):
+    """
+    Login/verify paytida qurilmaga yoziladigan xom qiymatlar - tarmoq so'rovi va UA parse yo'q.
+    """
+    return {
+        'device_ip': get_client_ip(request),
+        'user_agent': request.META.get('HTTP_USER_AGENT', '')[:USER_AGENT_LENGTH],
+        'enriched_at': None,
+    }
+
+
+@lru_cache(maxsize=4096)
+def device_name(user_agent):
+    # user_agents'dagi device.model; bir xil UA'lar ko'p - parse bir marta
+    from user_agents import parse
+
+    return (parse(user_agent or '').device.model or '')[:DEVICE_NAME_LENGTH]
+
+
+def _is_public(ip_address):
+    try:
+        return ipaddress.ip_address(ip_address).is_global
+    except ValueError:
+        return False
+
+
+class DeviceEnricher:
+    """
+    Qurilmaning xom IP va User-Agent'idan location_city va device_name'ni to'ldiradi.
+    enqueue() faqat id'ni navbatga qo'yadi; fon thread har WINDOW da flush() qiladi.
+
+    Batch ichida har bir IP bir marta qidiriladi: avval umumiy keshdan (get_many), qolganlari
+    WORKERS ta parallel so'rov bilan. Lokal/xususiy IP'lar qidirilmaydi. Natija (ip, user_agent)
+    juftligi bo'yicha bitta UPDATE bilan yoziladi; shu orada qurilma yangi IP bilan qayta
+    kirgan bo'lsa (shart mos kelmaydi) u navbatda qoladi.
+
+    Navbat xotirada - jarayon o'lsa qolganlarini `manage.py enrich_devices` to'ldiradi.
+    """
+
+    def __init__(self, **options):
+        self.options = {**get_config(), **{name.upper(): value for name, value in options.items()}}
+        self._pool = ThreadPoolExecutor(max_workers=self.options['WORKERS'], thread_name_prefix='enrich')
+        self._pending = set()
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        self.stats = {'queued': 0, 'enriched': 0, 'lookups': 0, 'cache_hits': 0, 'errors': 0}
+
+    def enqueue(self, device_ids):
+        with self._lock:
+            self._pending.update(device_ids)
+            self.stats['queued'] += len(device_ids)
+        self._ensure_running()
+
+    def flush(self):
+        with self._flush_lock:
+            with self._lock:
+                pending, self._pending = self._pending, set()
+            return self.enrich(sorted(pending))
+
+    def enrich(self, device_ids):
+        size = self.options['BATCH_SIZE']
+        enriched = 0
+        for start in range(0, len(device_ids), size):
+            devices = Device.objects.filter(
+                pk__in=device_ids[start:start + size], enriched_at__isnull=True,
+            ).values_list('pk', 'device_ip', 'user_agent')
+            enriched += self.enrich_rows(list(devices))
+        return enriched
+
+    def enrich_rows(self, rows):
+        """
+        `rows` - (device_id, device_ip, user_agent). Yozilgan qurilmalar sonini qaytaradi.
+        """
+        if not rows:
+            return 0
+        cities = self.cities({ip for _, ip, _ in rows})
+        groups = defaultdict(list)
+        for pk, ip, user_agent in rows:
+            groups[(ip, user_agent)].append(pk)
+
+        now = timezone.now()
+        enriched = 0
+        for (ip, user_agent), pks in groups.items():
+            city = cities.get(ip)
+            if city is None:
+                # Geolocation xato berdi - keyingi flush yoki enrich_devices qayta urinadi
+                continue
+            enriched += Device.objects.filter(
+                pk__in=pks, device_ip=ip, user_agent=user_agent, enriched_at__isnull=True,
+            ).update(device_name=device_name(user_agent), location_city=city, enriched_at=now)
+        with self._lock:
+            self.stats['enriched'] += enriched
+        return enriched
+
+    def cities(self, ips):
+        """
+        IP -> shahar ('' - noma'lum). Qidiruv xato bergan IP natijada bo'lmaydi.
+        """
+        found = {ip: '' for ip in ips if not _is_public(ip)}
+        public = [ip for ip in ips if ip not in found]
+        cached = cache.get_many([CITY_CACHE_PREFIX + ip for ip in public])
+        missing = []
+        for ip in public:
+            city = cached.get(CITY_CACHE_PREFIX + ip)
+            if city is None:
+                missing.append(ip)
+            else:
+                found[ip] = city
+        with self._lock:
+            self.stats['cache_hits'] += len(public) - len(missing)
+            self.stats['lookups'] += len(missing)
+
+        looked_up = {}
+        for ip, city in zip(missing, self._pool.map(self._lookup, missing)):
+            if city is not None:
+                looked_up[ip] = city
+        for timeout, known in ((self.options['CACHE_TIMEOUT'], True), (self.options['EMPTY_CACHE_TIMEOUT'], False)):
+            batch = {CITY_CACHE_PREFIX + ip: city for ip, city in looked_up.items() if bool(city) == known}
+            if batch:
+                cache.set_many(batch, timeout)
+        found.update(looked_up)
+        return found
+
+    def _lookup(self, ip_address):
+        try:
+            city = lookup_city(ip_address)
+        except Exception:
+            logger.warning('Geolocation lookup failed for %s', ip_address, exc_info=True)
+            city = None
+        if city is None:
+            # Keshga yozilmaydi, qurilma navbatda qoladi - enrich_pending_devices qayta urinadi
+            with self._lock:
+                self.stats['errors'] += 1
+            return None
+        return city[:CITY_LENGTH]
+
+    def _ensure_running(self):
+        if self._thread is not None or self._stop.is_set():
+            return
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name='device-enricher', daemon=True)
+                self._thread.start()
+
+    def _run(self):
+        while not self._stop.wait(self.options['WINDOW']):
+            try:
+                self.flush()
+            except Exception:
+                logger.exception('Device enrichment flush failed')
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        try:
+            self.flush()
+        except Exception:
+            logger.exception('Device enrichment flush failed')
+        self._pool.shutdown()
+
+
+_enricher = None
+_enricher_lock = threading.Lock()
+
+
+def get_enricher():
+    global _enricher
+    if _enricher is None:
+        with _enricher_lock:
+            if _enricher is None:
+                _enricher = DeviceEnricher()
+                atexit.register(_enricher.stop)
+    return _enricher
+
+
+def enqueue(*device_ids):
+    get_enricher().enqueue(device_ids)
+
+
+def pending_devices(after=0):
+    """
+    Hali to'ldirilmagan qurilmalar id bo'yicha - device_enrich_pending_idx partial index.
+    """
+    return (
+        Device.objects.filter(enriched_at__isnull=True, pk__gt=after)
+        .order_by('pk')
+        .values_list('pk', 'device_ip', 'user_agent')
+    )
+
+
+def enrich_pending(enricher, batch_size=None):
+    """
+    Navbatdan tushib qolgan qurilmalarni id bo'yicha batchlab to'ldiradi. Qaytaradi: (ko'rilgan, to'ldirilgan).
+    """
+    batch_size = batch_size or enricher.options['BATCH_SIZE']
+    cursor = total = enriched = 0
+    while True:
+        rows = list(pending_devices(cursor)[:batch_size])
+        if not rows:
+            return total, enriched
+        cursor = rows[-1][0]
+        total += len(rows)
+        enriched += enricher.enrich_rows(rows)
@@ -0,0 +1,111 @@
+"""
+Sparse fieldsets: `?fields=uid,name` yoki `?exclude=instructions` bilan javobdagi maydonlarni
+qisqartirish. Tanlov serializer chiqishiga ham, querysetdagi ustunlarga ham (`only()` /
+`values()`) qo'llanadi - bazadan ham, tarmoqdan ham kamroq bayt o'tadi.
+"""
+from functools import lru_cache
+
+from drf_spectacular.utils import OpenApiParameter
+from rest_framework import status
+from rest_framework.exceptions import APIException
+
+FIELDS_PARAM = 'fields'
+EXCLUDE_PARAM = 'exclude'
+
+FIELDSET_PARAMETERS = [
+    OpenApiParameter(name=FIELDS_PARAM, required=False, type=str,
+                     description='Faqat shu maydonlar qaytariladi, vergul bilan (masalan: uid,name)'),
+    OpenApiParameter(name=EXCLUDE_PARAM, required=False, type=str,
+                     description='Bu maydonlar javobdan olib tashlanadi, vergul bilan'),
+]
+
+
+class InvalidFieldset(APIException):
+    status_code = status.HTTP_400_BAD_REQUEST
+
+    def __init__(self, unknown):
+        super().__init__()
+        # Loyihadagi boshqa xato javoblari bilan bir xil shakl
+        self.detail = {
+            'success': False,
+            'error': f"Unknown field(s): {', '.join(unknown)}",
+            'errorStatus': 'data_credential',
+        }
+
+
+def _split(value):
+    return [name for name in (part.strip() for part in value.split(',')) if name]
+
+
+def parse_fieldset(request, available):
+    """
+    So'rovdagi `fields` / `exclude` dan tanlangan maydonlar (`available` tartibida).
+    Parametr berilmagan bo'lsa None - barcha maydonlar. Noma'lum nom - 400.
+    """
+    fields = _split(request.query_params.get(FIELDS_PARAM, ''))
+    exclude = _split(request.query_params.get(EXCLUDE_PARAM, ''))
+    if not fields and not exclude:
+        return None
+
+    unknown = [name for name in fields + exclude if name not in available]
+    if unknown:
+        raise InvalidFieldset(unknown)
+
+    selected = set(fields or available) - set(exclude)
+    return tuple(name for name in available if name in selected)
+
+
+@lru_cache(maxsize=None)
+def serializer_columns(serializer_class):
+    """
+    O'qiladigan maydon -> kerakli model ustunlari. Ustuni aniqlab bo'lmaydigan maydon
+    (property, method field) uchun None, agar serializer `field_columns` da ko'rsatmagan bo'lsa.
+    """
+    model = serializer_class.Meta.model
+    concrete = {field.name for field in model._meta.concrete_fields}
+    declared = getattr(serializer_class, 'field_columns', {})
+    columns = {}
+    for name, field in serializer_class().fields.items():
+        if field.write_only:
+            continue
+        if name in declared:
+            columns[name] = tuple(declared[name])
+        elif field.source in concrete:
+            columns[name] = (field.source,)
+        else:
+            columns[name] = None
+    return columns
+
+
+def readable_fields(serializer_class):
+    return tuple(serializer_columns(serializer_class))
+
+
+def only_fieldset(queryset, serializer_class, fields, extra=()):
+    """
+    queryset.only() - faqat tanlangan maydonlarga kerakli ustunlar. Biror maydonning
+    ustunlari noma'lum bo'lsa queryset o'zgarmaydi (deferred ustun N+1 so'rovga olib keladi).
+    """
+    if fields is None:
+        return queryset
+    columns_by_field = serializer_columns(serializer_class)
+    columns = list(extra)
+    for name in fields:
+        field_columns = columns_by_field[name]
+        if field_columns is None:
+            return queryset
+        columns.extend(field_columns)
+    return queryset.only(*dict.fromkeys(columns))
+
+
+# Serializerga `fields` kwarg: `CardSerializer(card, fields=('uid', 'name'))`.
+# Docstring yozilmagan - spectacular uni har bir serializer komponentining tavsifiga qo'shadi.
+class DynamicFieldsMixin:
+    # Modelda bevosita ustuni yo'q maydonlar (property, method field) uchun kerakli ustunlar
+    field_columns = {}
+
+    def __init__(self, *args, fields=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        if fields is not None:
+            for name in set(self.fields) - set(fields):
+                self.fields.pop(name)
@@ -0,0 +1,81 @@
+import hashlib
+
+from django.core.cache import cache
+from rest_framework import status
+
+from custom_user.async_services import acache
+
+IDEMPOTENCY_HEADER = 'Idempotency-Key'
+# Saqlangan javob shuncha vaqt qayta beriladi
+RESULT_TIMEOUT = 24 * 60 * 60
+# Birinchi so'rov shu vaqt ichida tugamasa (jarayon o'lgan) kalit bo'shaydi
+PENDING_TIMEOUT = 30
+PENDING = 'pending'
+
+
+class IdempotentRequest:
+    """
+    `Idempotency-Key` sarlavhali so'rov: birinchisi bajariladi va javobi keshga yoziladi,
+    shu kalit bilan qayta kelgan so'rov (tarmoq uzilishi, retry) o'sha javobni oladi -
+    amal (user yozish, kod yuborish) takrorlanmaydi. Birinchisi hali tugamagan bo'lsa 409.
+
+    `fingerprint` - so'rovning asosiy qiymati (masalan email): kalit boshqa so'rov uchun
+    qayta ishlatilsa 422. Sarlavha bo'lmasa hech narsa qilmaydi.
+    """
+
+    def __init__(self, request, scope, fingerprint=''):
+        key = request.headers.get(IDEMPOTENCY_HEADER)
+        self.cache_key = None
+        if key:
+            digest = hashlib.sha256(key.encode()).hexdigest()
+            self.cache_key = f'idempotency_{scope}_{digest}'
+        self.fingerprint = hashlib.sha256(str(fingerprint or '').encode()).hexdigest()
+
+    def begin(self):
+        """
+        None - so'rovni bajarish kerak, aks holda (data, status) - shu javob qaytariladi.
+        """
+        if self.cache_key is None or cache.add(self.cache_key, PENDING, PENDING_TIMEOUT):
+            return None
+        return self._replay(cache.get(self.cache_key))
+
+    def finish(self, data, status_code):
+        if self.cache_key is not None:
+            cache.set(self.cache_key, self._stored(data, status_code), RESULT_TIMEOUT)
+
+    def abort(self):
+        # Xato bilan tugagan so'rov saqlanmaydi - mijoz shu kalit bilan qayta urinishi mumkin
+        if self.cache_key is not None:
+            cache.delete(self.cache_key)
+
+    async def abegin(self):
+        if self.cache_key is None or await acache.add(self.cache_key, PENDING, PENDING_TIMEOUT):
+            return None
+        return self._replay(await acache.get(self.cache_key))
+
+    async def afinish(self, data, status_code):
+        if self.cache_key is not None:
+            await acache.set(self.cache_key, self._stored(data, status_code), RESULT_TIMEOUT)
+
+    async def aabort(self):
+        if self.cache_key is not None:
+            await acache.delete(self.cache_key)
+
+    def _stored(self, data, status_code):
+        return {'fingerprint': self.fingerprint, 'status': status_code, 'data': data}
+
+    def _replay(self, stored):
+        if stored is None or stored == PENDING:
+            # add() va get() orasida kalit muddati tugagan bo'lsa ham birinchi so'rov hali ishlayapti deb hisoblaymiz
+            return (
+                {'success': False, 'error': 'A request with this Idempotency-Key is already in progress',
+                 'errorStatus': 'in_progress'},
+                status.HTTP_409_CONFLICT,
+            )
+        if stored['fingerprint'] != self.fingerprint:
+            return (
+                {'success': False, 'error': 'This Idempotency-Key was used with a different request',
+                 'errorStatus': 'idempotency_mismatch'},
+                status.HTTP_422_UNPROCESSABLE_ENTITY,
+            )
+        return stored['data'], stored['status']
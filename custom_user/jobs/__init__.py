@@ -0,0 +1,20 @@
+"""
+Fon vazifalari: Redis (default kesh) yoki users_job jadvali ustidagi navbat. Redis ishlamay qolsa
+vazifalar jadvalga yoziladi va worker ikkalasidan ham oladi.
+
+    from custom_user.jobs import job, periodic
+
+    @job(queue='email')
+    def send_email(subject: str, message: str, recipient_list: list[str]) -> None: ...
+
+    send_email.delay('Salom', 'Matn', ['a@b.uz'])
+
+Vazifalar app'larning `tasks` modulida e'lon qilinadi; `manage.py runworker` ularni bajaradi.
+"""
+from .backends import DatabaseBackend, FailoverBackend, RedisBackend, get_backend
+from .registry import JobType, autodiscover, get_config, get_job, job, periodic, registered_jobs
+
+__all__ = [
+    'DatabaseBackend', 'FailoverBackend', 'JobType', 'RedisBackend', 'autodiscover', 'get_backend', 'get_config',
+    'get_job', 'job', 'periodic', 'registered_jobs',
+]
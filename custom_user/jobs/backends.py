@@ -0,0 +1,360 @@
+import json
+import logging
+import time
+import uuid
+from datetime import datetime, timezone as dt_timezone
+
+from django.core.cache import caches
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Min, Q
+from django_redis.cache import RedisCache
+from redis.exceptions import WatchError
+
+from config.cache.resilient import is_outage
+
+from .registry import get_config
+
+logger = logging.getLogger('custom_user.jobs')
+
+# Bitta claim'da WATCH to'qnashuvi (boshqa worker shu navbatni o'zgartirdi) bo'lsa qayta urinish
+CLAIM_ATTEMPTS = 5
+
+
+def periodic_id(name):
+    return f'periodic:{name}'
+
+
+class RedisBackend:
+    """
+    Har bir navbat - sorted set (job id -> bajarilish vaqti, unix sekund), vazifaning o'zi -
+    alohida JSON kalit. Worker vazifani olganda balli `hozir + visibility timeout` ga o'tadi:
+    worker o'lsa vazifa shu vaqtdan keyin o'zi yana "tayyor" bo'ladi - alohida reaper kerak emas.
+    Kechiktirilgan va qayta urinishdagi vazifalar ham shu setda, faqat ballari kelajakda.
+
+    Olish (claim) WATCH/MULTI bilan: ikki worker bitta vazifani ololmaydi. Ack/retry faqat
+    vazifa hali shu workerda bo'lsa (token mos) yoziladi.
+    """
+
+    def __init__(self, backend, prefix):
+        self.backend = backend
+        # Kesh bilan bir xil KEY_PREFIX/versiya
+        self.prefix = backend.make_key(prefix)
+        self.queues_key = f'{self.prefix}:queues'
+        self.dead_key = f'{self.prefix}:dead'
+
+    def queue_key(self, queue):
+        return f'{self.prefix}:queue:{queue}'
+
+    def running_key(self, queue):
+        return f'{self.prefix}:running:{queue}'
+
+    def job_key(self, job_id):
+        return f'{self.prefix}:job:{job_id}'
+
+    def _call(self, operation):
+        client = self.backend.client
+        if hasattr(client, 'guarded'):
+            return client.guarded(operation, None, client.get_client(write=True))
+        return operation(client.get_client(write=True))
+
+    def push(self, queue, name, kwargs, run_at, job_id=None, only_new=False):
+        job_id = job_id or uuid.uuid4().hex
+        record = {'id': job_id, 'queue': queue, 'name': name, 'kwargs': kwargs, 'attempts': 0,
+                  'enqueued_at': time.time(), 'token': None}
+
+        def operation(redis):
+            pipe = redis.pipeline(transaction=True)
+            pipe.set(self.job_key(job_id), json.dumps(record), nx=only_new)
+            pipe.zadd(self.queue_key(queue), {job_id: run_at}, nx=only_new)
+            pipe.sadd(self.queues_key, queue)
+            pipe.execute()
+        self._call(operation)
+        return job_id
+
+    def ensure_periodic(self, job_type, run_at):
+        # Navbatda allaqachon bo'lsa (boshqa worker qo'ygan) tegmaydi
+        return self.push(job_type.queue, job_type.name, {}, run_at, periodic_id(job_type.name), only_new=True)
+
+    def claim(self, queue, visibility):
+        key = self.queue_key(queue)
+
+        def operation(redis):
+            for _ in range(CLAIM_ATTEMPTS):
+                now = time.time()
+                with redis.pipeline(transaction=True) as pipe:
+                    try:
+                        pipe.watch(key)
+                        found = pipe.zrangebyscore(key, '-inf', now, start=0, num=1, withscores=True)
+                        if not found:
+                            pipe.unwatch()
+                            return None
+                        job_id, due = found[0][0].decode(), found[0][1]
+                        raw = pipe.get(self.job_key(job_id))
+                        pipe.multi()
+                        if raw is None:
+                            # Vazifa kaliti yo'q (qo'lda o'chirilgan) - navbatdan ham olib tashlaymiz
+                            pipe.zrem(key, job_id)
+                            pipe.execute()
+                            continue
+                        record = json.loads(raw)
+                        record['attempts'] += 1
+                        record['token'] = uuid.uuid4().hex
+                        pipe.zadd(key, {job_id: now + visibility})
+                        pipe.set(self.job_key(job_id), json.dumps(record))
+                        pipe.sadd(self.running_key(queue), job_id)
+                        pipe.execute()
+                    except WatchError:
+                        continue
+                record['due'] = due
+                return record
+            return None
+        return self._call(operation)
+
+    def _finish(self, record, commands):
+        job_key = self.job_key(record['id'])
+
+        def operation(redis):
+            with redis.pipeline(transaction=True) as pipe:
+                try:
+                    pipe.watch(job_key)
+                    raw = pipe.get(job_key)
+                    if raw is None or json.loads(raw).get('token') != record['token']:
+                        # Ko'rinmaslik muddati o'tib vazifani boshqa worker olgan
+                        pipe.unwatch()
+                        return False
+                    pipe.multi()
+                    commands(pipe)
+                    pipe.srem(self.running_key(record['queue']), record['id'])
+                    pipe.execute()
+                    return True
+                except WatchError:
+                    return False
+        return self._call(operation)
+
+    def ack(self, record):
+        def commands(pipe):
+            pipe.zrem(self.queue_key(record['queue']), record['id'])
+            pipe.delete(self.job_key(record['id']))
+        return self._finish(record, commands)
+
+    def retry(self, record, run_at, error=None, reset=False):
+        stored = {**record, 'token': None, 'last_error': error}
+        stored.pop('due', None)
+        if reset:
+            stored['attempts'] = 0
+
+        def commands(pipe):
+            pipe.set(self.job_key(record['id']), json.dumps(stored))
+            pipe.zadd(self.queue_key(record['queue']), {record['id']: run_at})
+        return self._finish(record, commands)
+
+    def reschedule(self, record, run_at):
+        return self.retry(record, run_at, reset=True)
+
+    def bury(self, record, error):
+        stored = {**record, 'token': None, 'last_error': error, 'died_at': time.time()}
+        stored.pop('due', None)
+        limit = get_config()['DEAD_LIMIT']
+
+        def commands(pipe):
+            pipe.zrem(self.queue_key(record['queue']), record['id'])
+            pipe.delete(self.job_key(record['id']))
+            pipe.lpush(self.dead_key, json.dumps(stored))
+            pipe.ltrim(self.dead_key, 0, limit - 1)
+        return self._finish(record, commands)
+
+    def stats(self, queues=()):
+        now = time.time()
+
+        def operation(redis):
+            names = sorted({*queues, *(name.decode() for name in redis.smembers(self.queues_key))})
+            pipe = redis.pipeline(transaction=False)
+            for queue in names:
+                key = self.queue_key(queue)
+                pipe.zcount(key, '-inf', now)
+                pipe.zcard(key)
+                pipe.scard(self.running_key(queue))
+                pipe.zrangebyscore(key, '-inf', now, start=0, num=1, withscores=True)
+            pipe.llen(self.dead_key)
+            results = pipe.execute()
+            return names, results
+        names, results = self._call(operation)
+        stats = {}
+        for index, queue in enumerate(names):
+            ready, total, running, oldest = results[index * 4:index * 4 + 4]
+            stats[queue] = _queue_stats(ready, total - ready, running, oldest[0][1] if oldest else None, now)
+        return {'backend': 'redis', 'queues': stats, 'dead': results[-1]}
+
+
+class DatabaseBackend:
+    """
+    users_job jadvali - Redis yo'q muhit (lokal, SQLite) uchun. RedisBackend bilan bir xil semantika:
+    `run_at` navbatda bajarilish vaqti, olingandan keyin ko'rinmaslik muddati. Olish shartli UPDATE
+    (run_at va attempts o'zgarmagan bo'lsa) bilan - ikki worker bitta qatorni ololmaydi.
+    """
+
+    # Bitta so'rovda ko'rib chiqiladigan nomzodlar - boshqa worker olib qo'ygan bo'lsa keyingisi
+    CANDIDATES = 5
+
+    @property
+    def model(self):
+        from custom_user.models import Job
+
+        return Job
+
+    @staticmethod
+    def _datetime(timestamp):
+        return datetime.fromtimestamp(timestamp, tz=dt_timezone.utc)
+
+    def push(self, queue, name, kwargs, run_at):
+        job = self.model.objects.create(queue=queue, name=name, kwargs=kwargs, run_at=self._datetime(run_at))
+        return str(job.pk)
+
+    def ensure_periodic(self, job_type, run_at):
+        try:
+            with transaction.atomic():
+                self.model.objects.get_or_create(
+                    unique_key=periodic_id(job_type.name),
+                    defaults={'queue': job_type.queue, 'name': job_type.name, 'run_at': self._datetime(run_at)},
+                )
+        except IntegrityError:
+            # Parallel worker birinchi bo'lib qo'ydi
+            pass
+        return periodic_id(job_type.name)
+
+    def claim(self, queue, visibility):
+        now = time.time()
+        candidates = (
+            self.model.objects.filter(queue=queue, dead=False, run_at__lte=self._datetime(now))
+            .order_by('run_at').values_list('pk', 'run_at', 'attempts')[:self.CANDIDATES]
+        )
+        for pk, due, attempts in candidates:
+            token = uuid.uuid4().hex
+            claimed = self.model.objects.filter(pk=pk, run_at=due, attempts=attempts).update(
+                run_at=self._datetime(now + visibility), attempts=F('attempts') + 1, token=token,
+            )
+            if claimed:
+                job = self.model.objects.get(pk=pk)
+                return {
+                    'id': str(pk), 'queue': job.queue, 'name': job.name, 'kwargs': job.kwargs,
+                    'attempts': job.attempts, 'enqueued_at': job.enqueued_at.timestamp(), 'token': token,
+                    'due': due.timestamp(),
+                }
+        return None
+
+    def _owned(self, record):
+        return self.model.objects.filter(pk=record['id'], token=record['token'])
+
+    def ack(self, record):
+        deleted, _ = self._owned(record).delete()
+        return bool(deleted)
+
+    def retry(self, record, run_at, error=None, reset=False):
+        updates = {'run_at': self._datetime(run_at), 'token': None, 'last_error': error}
+        if reset:
+            updates['attempts'] = 0
+        return bool(self._owned(record).update(**updates))
+
+    def reschedule(self, record, run_at):
+        return self.retry(record, run_at, reset=True)
+
+    def bury(self, record, error):
+        return bool(self._owned(record).update(dead=True, token=None, last_error=error))
+
+    def stats(self, queues=()):
+        now = time.time()
+        current = self._datetime(now)
+        rows = (
+            self.model.objects.filter(dead=False).values('queue')
+            .annotate(
+                ready=_count(Q(run_at__lte=current)),
+                waiting=_count(Q(run_at__gt=current)),
+                running=_count(Q(run_at__gt=current, token__isnull=False)),
+                oldest=Min('run_at', filter=Q(run_at__lte=current)),
+            )
+        )
+        stats = {queue: _queue_stats(0, 0, 0, None, now) for queue in queues}
+        for row in rows:
+            oldest = row['oldest'].timestamp() if row['oldest'] else None
+            stats[row['queue']] = _queue_stats(row['ready'], row['waiting'], row['running'], oldest, now)
+        return {
+            'backend': 'database',
+            'queues': dict(sorted(stats.items())),
+            'dead': self.model.objects.filter(dead=True).count(),
+        }
+
+
+class FailoverBackend:
+    """
+    Redis asosiy navbat, users_job jadvali - zaxira. Redis ishlamayotganda (ulanish yo'q, breaker ochiq)
+    push() vazifani jadvalga yozadi - outage paytida enqueue yo'qolmaydi va chaqiruvchiga xato qaytmaydi.
+    Worker ikkala backenddan ham oladi (`members`). Davriy vazifalar faqat Redis'da: Redis qaytgach
+    worker ularni qayta qo'yadi.
+    """
+
+    def __init__(self, primary, fallback):
+        self.primary = primary
+        self.fallback = fallback
+        self.members = [primary, fallback]
+
+    def push(self, queue, name, kwargs, run_at):
+        try:
+            return self.primary.push(queue, name, kwargs, run_at)
+        except Exception as exc:
+            if not is_outage(exc):
+                raise
+            logger.warning('Redis unavailable, job %s queued in the database', name)
+            return self.fallback.push(queue, name, kwargs, run_at)
+
+    def ensure_periodic(self, job_type, run_at):
+        return self.primary.ensure_periodic(job_type, run_at)
+
+    def stats(self, queues=()):
+        try:
+            stats = self.primary.stats(queues)
+        except Exception as exc:
+            if not is_outage(exc):
+                raise
+            stats = {'backend': 'redis', 'queues': None, 'dead': None, 'error': 'unavailable'}
+        # Outage paytida jadvalga tushgan va hali bajarilmagan vazifalar
+        stats['fallback'] = self.fallback.stats(queues)
+        return stats
+
+
+def _count(condition):
+    return Count('pk', filter=condition)
+
+
+def _queue_stats(ready, waiting, running, oldest_due, now):
+    # `scheduled` - kelajakdagi (kechiktirilgan, qayta urinish) va hozir bajarilayotganlar
+    return {
+        'ready': ready,
+        'scheduled': max(waiting - running, 0),
+        'running': running,
+        # Eng eski tayyor vazifa qancha kutmoqda - navbat latency'si
+        'oldest_wait_seconds': round(max(now - oldest_due, 0.0), 3) if oldest_due is not None else 0.0,
+    }
+
+
+_backend = None
+
+
+def get_backend():
+    global _backend
+    if _backend is None:
+        config = get_config()
+        cache_backend = caches['default']
+        kind = config['BACKEND']
+        if kind == 'auto':
+            kind = 'redis' if isinstance(cache_backend, RedisCache) else 'database'
+        if kind == 'redis':
+            _backend = FailoverBackend(RedisBackend(cache_backend, config['PREFIX']), DatabaseBackend())
+        else:
+            _backend = DatabaseBackend()
+    return _backend
+
+
+def reset_backend():
+    global _backend
+    _backend = None
+
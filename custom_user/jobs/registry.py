@@ -0,0 +1,181 @@
+import inspect
+import json
+import time
+import types
+import typing
+from datetime import datetime, timedelta
+
+from django.conf import settings
+from django.utils.module_loading import autodiscover_modules
+
+_registry = {}
+
+
+def get_config():
+    config = {
+        # auto - default kesh Redis bo'lsa Redis, aks holda users_job jadvali
+        'BACKEND': 'auto',
+        'PREFIX': 'jobs',
+        # Worker olgan vazifa shuncha sekund boshqalarga ko'rinmaydi; tugamasa (worker o'lgan) qayta beriladi
+        'VISIBILITY_TIMEOUT': 300,
+        'RETRIES': 3,
+        # Qayta urinish: BACKOFF * 2^(urinish-1), MAX_BACKOFF dan oshmaydi
+        'BACKOFF': 5.0,
+        'MAX_BACKOFF': 3600,
+        # Navbat bo'sh bo'lganda so'rash oralig'i
+        'POLL_INTERVAL': 1.0,
+        # Redis ishlayotganda users_job zaxira jadvali shuncha sekundda bir so'raladi (outage'dan qolganlar)
+        'FALLBACK_POLL_INTERVAL': 30,
+        'PROCESSES': 1,
+        'THREADS': 4,
+        'STATS_INTERVAL': 60,
+        # Dead-letter ro'yxatida saqlanadigan oxirgi vazifalar (Redis)
+        'DEAD_LIMIT': 1000,
+    }
+    config.update(getattr(settings, 'JOBS', {}))
+    return config
+
+
+def _check_type(value, hint):
+    if hint is inspect.Parameter.empty or hint is typing.Any:
+        return True
+    origin = typing.get_origin(hint)
+    if origin in (typing.Union, types.UnionType):
+        return any(_check_type(value, arg) for arg in typing.get_args(hint))
+    if hint is type(None):
+        return value is None
+    expected = origin or hint
+    if not isinstance(expected, type):
+        return True
+    if expected is float and isinstance(value, int) and not isinstance(value, bool):
+        return True
+    if expected is int and isinstance(value, bool):
+        return False
+    return isinstance(value, expected)
+
+
+class JobType:
+    """
+    Ro'yxatdan o'tgan vazifa. Argumentlar enqueue paytida funksiya imzosi va type hint'lari
+    bo'yicha tekshiriladi (JSON'ga aylanadigan bo'lishi kerak) - xato worker'da emas,
+    chaqiruvchida chiqadi.
+    """
+
+    def __init__(self, func, name, queue, retries, backoff, timeout, every):
+        self.func = func
+        self.name = name
+        self.queue = queue
+        self.retries = retries
+        self.backoff = backoff
+        self.timeout = timeout
+        self.every = every.total_seconds() if isinstance(every, timedelta) else every
+        self.signature = inspect.signature(func)
+        self.hints = typing.get_type_hints(func)
+        if self.every and any(parameter.default is inspect.Parameter.empty
+                              for parameter in self.signature.parameters.values()):
+            raise TypeError(f'Periodic job {name} must not require arguments')
+
+    def __call__(self, *args, **kwargs):
+        # Navbatsiz, shu jarayonda bajarish
+        return self.func(*args, **kwargs)
+
+    def __repr__(self):
+        return f'<JobType {self.name} queue={self.queue}>'
+
+    def bind(self, *args, **kwargs):
+        try:
+            bound = self.signature.bind(*args, **kwargs)
+        except TypeError as exc:
+            raise TypeError(f'{self.name}: {exc}') from None
+        for name, value in bound.arguments.items():
+            hint = self.hints.get(name, inspect.Parameter.empty)
+            if not _check_type(value, hint):
+                raise TypeError(f'{self.name}: argument {name!r} must be {hint}, got {type(value).__name__}')
+        kwargs = dict(bound.arguments)
+        try:
+            json.dumps(kwargs)
+        except (TypeError, ValueError) as exc:
+            raise TypeError(f'{self.name}: arguments must be JSON serializable ({exc})') from None
+        return kwargs
+
+    def delay(self, *args, **kwargs):
+        return self.schedule(None, *args, **kwargs)
+
+    def schedule(self, when, *args, **kwargs):
+        """
+        `when` - datetime, sekund (float) yoki timedelta ichida; None - hozir. Job id qaytaradi.
+        """
+        from .backends import get_backend
+
+        if isinstance(when, datetime):
+            run_at = when.timestamp()
+        elif isinstance(when, timedelta):
+            run_at = time.time() + when.total_seconds()
+        else:
+            run_at = time.time() + (when or 0)
+        return get_backend().push(self.queue, self.name, self.bind(*args, **kwargs), run_at)
+
+    def backoff_delay(self, attempts):
+        options = get_config()
+        base = options['BACKOFF'] if self.backoff is None else self.backoff
+        return min(base * 2 ** max(attempts - 1, 0), options['MAX_BACKOFF'])
+
+    @property
+    def max_retries(self):
+        return get_config()['RETRIES'] if self.retries is None else self.retries
+
+    @property
+    def visibility_timeout(self):
+        # Vazifa shu vaqtdan uzoq ishlasa boshqa worker ham oladi (at-least-once)
+        return self.timeout or get_config()['VISIBILITY_TIMEOUT']
+
+
+def job(func=None, *, name=None, queue='default', retries=None, backoff=None, timeout=None):
+    """
+    Funksiyani vazifa sifatida ro'yxatdan o'tkazadi:
+
+        @job(queue='email', retries=5)
+        def send_email(subject: str, message: str, recipient_list: list[str]) -> None: ...
+
+        send_email.delay('Salom', 'Matn', ['a@b.uz'])
+        send_email.schedule(timedelta(minutes=5), ...)
+    """
+    def register(func):
+        job_type = JobType(func, name or f'{func.__module__}.{func.__qualname__}', queue, retries, backoff,
+                           timeout, None)
+        return _register(job_type)
+    return register(func) if func is not None else register
+
+
+def periodic(every, *, name=None, queue='default', retries=0, backoff=None, timeout=None):
+    """
+    Har `every` (sekund yoki timedelta) da bir bajariladigan vazifa. Navbatda bitta yozuv bo'ladi -
+    nechta worker ishlamasin bir vaqtda bir marta bajariladi.
+    """
+    def register(func):
+        job_type = JobType(func, name or f'{func.__module__}.{func.__qualname__}', queue, retries, backoff,
+                           timeout, every)
+        return _register(job_type)
+    return register
+
+
+def _register(job_type):
+    existing = _registry.get(job_type.name)
+    if existing is not None and existing.func is not job_type.func:
+        raise ValueError(f'Job {job_type.name} is already registered')
+    _registry[job_type.name] = job_type
+    return job_type
+
+
+def get_job(name):
+    return _registry.get(name)
+
+
+def registered_jobs():
+    return dict(_registry)
+
+
+def autodiscover():
+    # Har bir o'rnatilgan app'ning `tasks` moduli
+    autodiscover_modules('tasks')
+    return registered_jobs()
@@ -0,0 +1,259 @@
+import logging
+import math
+import multiprocessing
+import os
+import signal
+import threading
+import time
+
+from django.db import close_old_connections, connection, connections
+
+from config.cache.resilient import is_outage
+
+from .backends import get_backend
+from .registry import autodiscover, get_config
+
+logger = logging.getLogger('custom_user.jobs')
+
+
+def next_run(due, every, now):
+    # Jadval siljimaydi: worker uzoq to'xtab qolgan bo'lsa o'tib ketgan ishga tushirishlar bittaga qisqaradi
+    periods = max(math.ceil((now - due) / every), 1)
+    return due + periods * every
+
+
+class Worker:
+    """
+    Bitta jarayondagi THREADS ta thread: har biri navbatlarni navbatma-navbat so'raydi,
+    vazifani oladi (ko'rinmaslik muddati bilan), bajaradi va tasdiqlaydi.
+
+    At-least-once: worker vazifa o'rtasida o'lsa yoki u visibility timeout'dan uzoq ishlasa,
+    vazifa boshqa workerga qayta beriladi - vazifalar takror bajarilishga chidamli yozilishi kerak.
+    Xato bergan vazifa BACKOFF bilan qayta urinadi, RETRIES tugagach dead-letter'ga tushadi.
+    Davriy vazifa bajarilgach (xato bo'lsa ham) keyingi vaqtiga qayta qo'yiladi.
+    """
+
+    def __init__(self, queues=None, threads=None, backend=None, **options):
+        self.options = {**get_config(), **{name.upper(): value for name, value in options.items()}}
+        self.jobs = autodiscover()
+        self.queues = list(queues or sorted({job.queue for job in self.jobs.values()}) or ['default'])
+        self.threads = threads or self.options['THREADS']
+        self.backend = backend or get_backend()
+        # FailoverBackend: Redis va outage paytida to'ldirilgan users_job jadvali
+        self.backends = getattr(self.backend, 'members', [self.backend])
+        # Zaxira backend faqat asosiysi xato berayotganda yoki FALLBACK_POLL_INTERVAL da bir so'raladi
+        self._primary_failing = False
+        self._fallback_due = {}
+        # Navbatdagi eng uzun vazifaning timeout'i - olish paytida vazifa turi hali noma'lum
+        self.visibility = {
+            queue: max([job.visibility_timeout for job in self.jobs.values() if job.queue == queue],
+                       default=self.options['VISIBILITY_TIMEOUT'])
+            for queue in self.queues
+        }
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+        self.stats = {
+            'processed': 0, 'failed': 0, 'retried': 0, 'dead': 0, 'lost': 0,
+            'wait_total': 0.0, 'wait_max': 0.0, 'run_total': 0.0, 'run_max': 0.0,
+        }
+
+    def run(self):
+        self.schedule_periodic()
+        logger.info('Job worker %s started: queues=%s threads=%s', os.getpid(), ','.join(self.queues), self.threads)
+        threads = [
+            threading.Thread(target=self._loop, name=f'job-worker-{index}', daemon=True)
+            for index in range(self.threads)
+        ]
+        for thread in threads:
+            thread.start()
+        next_stats = time.monotonic() + self.options['STATS_INTERVAL']
+        while not self._stop.wait(1.0):
+            if time.monotonic() >= next_stats:
+                next_stats = time.monotonic() + self.options['STATS_INTERVAL']
+                # Davriy yozuv qo'lda o'chirilgan yoki startda qo'yilmay qolgan bo'lsa tiklanadi
+                self.schedule_periodic()
+                self.log_stats()
+        for thread in threads:
+            thread.join()
+        self.log_stats()
+
+    def stop(self, *args):
+        self._stop.set()
+
+    def schedule_periodic(self):
+        now = time.time()
+        for job_type in self.jobs.values():
+            if job_type.every and job_type.queue in self.queues:
+                try:
+                    self.backend.ensure_periodic(job_type, now)
+                except Exception:
+                    # Masalan SQLite'da bir vaqtda ishga tushgan workerlar - keyingi STATS_INTERVAL da qayta
+                    logger.warning('Could not schedule periodic job %s', job_type.name, exc_info=True)
+
+    def _loop(self):
+        index = 0
+        try:
+            while not self._stop.is_set():
+                backend, record, index = self._claim(index)
+                if record is None:
+                    self._stop.wait(self.options['POLL_INTERVAL'])
+                    continue
+                self.execute(record, backend)
+        finally:
+            connection.close()
+
+    def _claim(self, index):
+        for offset in range(len(self.queues)):
+            queue = self.queues[(index + offset) % len(self.queues)]
+            for position, backend in enumerate(self.backends):
+                fallback = position > 0
+                if fallback and not self._primary_failing and time.monotonic() < self._fallback_due.get(queue, 0):
+                    continue
+                try:
+                    record = backend.claim(queue, self.visibility[queue])
+                except Exception as exc:
+                    # Redis outage'ini breaker o'zi log qiladi - har bir so'rovda takrorlamaymiz
+                    if not is_outage(exc):
+                        logger.exception('Job claim from %s failed', queue)
+                    if not fallback:
+                        self._primary_failing = True
+                    continue
+                if not fallback:
+                    self._primary_failing = False
+                elif record is None:
+                    # Zaxira navbat bo'sh - Redis ishlayotgan bo'lsa keyingi safar interval o'tgach
+                    self._fallback_due[queue] = time.monotonic() + self.options['FALLBACK_POLL_INTERVAL']
+                if record is not None:
+                    # Keyingi safar boshqa navbatdan boshlaymiz - bitta navbat qolganlarini bosib ketmaydi
+                    return backend, record, (index + offset + 1) % len(self.queues)
+        return None, None, index
+
+    def execute(self, record, backend=None):
+        """
+        Bitta olingan vazifani bajaradi va natijasini u olingan backendga yozadi.
+        """
+        backend = backend or self.backends[0]
+        job_type = self.jobs.get(record['name'])
+        started = time.time()
+        wait = max(started - record['due'], 0.0)
+        outcome = 'processed'
+        try:
+            if job_type is None:
+                outcome = 'dead'
+                self._finish(backend.bury, record, f"Unknown job {record['name']}")
+                return
+            try:
+                job_type.func(**record['kwargs'])
+            except Exception as exc:
+                error = f'{type(exc).__name__}: {exc}'
+                if record['attempts'] <= job_type.max_retries:
+                    outcome = 'retried'
+                    delay = job_type.backoff_delay(record['attempts'])
+                    logger.warning('Job %s %s failed (attempt %s), retrying in %.0fs',
+                                   record['name'], record['id'], record['attempts'], delay, exc_info=True)
+                    self._finish(backend.retry, record, time.time() + delay, error)
+                elif job_type.every:
+                    outcome = 'failed'
+                    logger.exception('Periodic job %s failed', record['name'])
+                    self._finish(backend.reschedule, record, next_run(record['due'], job_type.every, time.time()))
+                else:
+                    outcome = 'dead'
+                    logger.exception('Job %s %s failed after %s attempts', record['name'], record['id'],
+                                     record['attempts'])
+                    self._finish(backend.bury, record, error)
+            else:
+                if job_type.every:
+                    self._finish(backend.reschedule, record, next_run(record['due'], job_type.every, time.time()))
+                else:
+                    self._finish(backend.ack, record)
+        finally:
+            close_old_connections()
+            elapsed = time.time() - started
+            with self._lock:
+                self.stats[outcome] += 1
+                self.stats['wait_total'] += wait
+                self.stats['wait_max'] = max(self.stats['wait_max'], wait)
+                self.stats['run_total'] += elapsed
+                self.stats['run_max'] = max(self.stats['run_max'], elapsed)
+
+    def _finish(self, method, record, *args):
+        try:
+            if not method(record, *args):
+                # Ko'rinmaslik muddati o'tgan - vazifa boshqa workerda, natija yozilmadi
+                with self._lock:
+                    self.stats['lost'] += 1
+                logger.warning('Job %s %s outlived its visibility timeout', record['name'], record['id'])
+        except Exception:
+            # Backend ishlamayapti - vazifa muddati o'tgach qayta beriladi
+            logger.exception('Could not record result of job %s %s', record['name'], record['id'])
+
+    def snapshot(self):
+        with self._lock:
+            stats = dict(self.stats)
+        handled = sum(stats[name] for name in ('processed', 'failed', 'retried', 'dead')) or 1
+        return {
+            'processed': stats['processed'],
+            'failed': stats['failed'],
+            'retried': stats['retried'],
+            'dead': stats['dead'],
+            'lost': stats['lost'],
+            'wait_avg_ms': round(stats['wait_total'] / handled * 1000, 1),
+            'wait_max_ms': round(stats['wait_max'] * 1000, 1),
+            'run_avg_ms': round(stats['run_total'] / handled * 1000, 1),
+            'run_max_ms': round(stats['run_max'] * 1000, 1),
+        }
+
+    def log_stats(self):
+        depth = []
+        for backend in self.backends:
+            try:
+                queues = backend.stats(self.queues)['queues']
+            except Exception:
+                logger.warning('Job queue stats failed', exc_info=True)
+                continue
+            depth.extend(f"{name}={item['ready']}/{item['oldest_wait_seconds']}s" for name, item in queues.items())
+        depth = ' '.join(depth)
+        logger.info('Job worker %s: %s queues(ready/oldest) %s', os.getpid(), self.snapshot(), depth)
+
+
+def _run_worker(queues, threads, options):
+    worker = Worker(queues, threads, **options)
+    signal.signal(signal.SIGTERM, worker.stop)
+    signal.signal(signal.SIGINT, worker.stop)
+    worker.run()
+
+
+def run_pool(processes, queues=None, threads=None, **options):
+    """
+    `processes` ta worker jarayoni (fork) - GIL'ni band qiladigan vazifalar uchun. O'lgan jarayon
+    qayta ishga tushiriladi; SIGTERM/SIGINT hammasini joriy vazifasini tugatib to'xtatadi.
+    """
+    if processes <= 1:
+        return _run_worker(queues, threads, options)
+
+    context = multiprocessing.get_context('fork')
+    stopping = threading.Event()
+
+    def spawn(index):
+        process = context.Process(target=_run_worker, args=(queues, threads, options), name=f'job-worker-{index}')
+        process.start()
+        return process
+
+    def stop(*args):
+        stopping.set()
+
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+    # Ochiq DB ulanishi bolalarga meros qolmasin
+    connections.close_all()
+    pool = [spawn(index) for index in range(processes)]
+    while not stopping.wait(1.0):
+        for index, process in enumerate(pool):
+            if not process.is_alive():
+                logger.warning('Job worker %s exited with %s, restarting', process.pid, process.exitcode)
+                pool[index] = spawn(index)
+    for process in pool:
+        if process.is_alive():
+            os.kill(process.pid, signal.SIGTERM)
+    for process in pool:
+        process.join()
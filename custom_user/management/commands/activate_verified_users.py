@@ -0,0 +1,49 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db.models import Count, Exists, OuterRef
+
+from custom_user.models import Address, Card, Device
+
+User = get_user_model()
+
+
+def verified_inactive_users():
+    """
+    Verify akkauntni aktivlashtirmagan davrda kodni tasdiqlagan userlar: nofaol, hech kirmagan
+    (last_login bo'sh - admin bloklagan, oldin ishlagan akkauntlar tushmaydi), lekin qurilmasi,
+    kartasi yoki manzili bor - bular faqat verify bergan token bilan paydo bo'ladi.
+    """
+    return User.objects.filter(
+        Exists(Device.objects.filter(user=OuterRef('pk')))
+        | Exists(Card.objects.filter(user=OuterRef('pk')))
+        | Exists(Address.objects.filter(user=OuterRef('pk'))),
+        is_active=False, is_staff=False, last_login__isnull=True,
+    )
+
+
+class Command(BaseCommand):
+    help = (
+        "Emailini tasdiqlagan, lekin nofaol qolgan userlarni ko'rsatadi; --apply bilan ularni aktivlashtiradi. "
+        "Bir martalik: ro'yxatni ko'rib chiqib, ataylab bloklanganlarini --exclude bilan chiqarib tashlang"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--apply', action='store_true', help="Ro'yxatdagilarni aktivlashtirish")
+        parser.add_argument('--exclude', type=int, nargs='*', default=[], metavar='ID',
+                            help="Aktivlashtirilmaydigan user id'lari")
+
+    def handle(self, *args, **options):
+        users = verified_inactive_users().exclude(pk__in=options['exclude']).annotate(
+            device_count=Count('devices', distinct=True), card_count=Count('cards', distinct=True),
+        ).order_by('pk')
+
+        self.stdout.write(f"{'id':>8}  {'email':<40} {'date_joined':<20} {'devices':>7} {'cards':>5}")
+        for user in users:
+            self.stdout.write(f"{user.pk:>8}  {user.email:<40} {user.date_joined:%Y-%m-%d %H:%M}    "
+                              f"{user.device_count:>7} {user.card_count:>5}")
+
+        if not options['apply']:
+            self.stdout.write(f'{len(users)} users would be activated (dry run, pass --apply)')
+            return
+        activated = verified_inactive_users().filter(pk__in=[user.pk for user in users]).update(is_active=True)
+        self.stdout.write(self.style.SUCCESS(f'Activated {activated} users'))
@@ -0,0 +1,82 @@
+import os
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from custom_user.benchmarks import (
+    benchmark_database,
+    compare_results,
+    format_table,
+    load_results,
+    local_standins,
+    save_results,
+)
+from custom_user.benchmarks.async_auth import run
+from custom_user.benchmarks.auth_flow import seed_users
+
+DEFAULT_BASELINE = os.path.join(settings.BASE_DIR, 'var', 'benchmarks', 'async_auth.json')
+
+
+class Command(BaseCommand):
+    help = (
+        "register, activation, verify, login va forgot-password endpointlarining sync va native async "
+        "variantlarini ASGI ostida parallel yuklama bilan solishtiradi"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=200, help='Har bir endpointga so\'rovlar soni')
+        parser.add_argument('--concurrency', type=int, default=20, help='Bir vaqtdagi so\'rovlar soni')
+        parser.add_argument('--users', type=int, default=200, help='Seed qilinadigan aktiv userlar soni')
+        parser.add_argument('--mode', choices=['sync', 'async', 'both'], default='both')
+        parser.add_argument('--geo-latency-ms', type=float, default=50,
+                            help="Geolocation HTTP chaqiruvining taqlid qilingan kechikishi (fon enricher'ida)")
+        parser.add_argument('--fast-hasher', action='store_true',
+                            help='PBKDF2 o\'rniga MD5 hasher (parol hashing vaqtini chiqarib tashlash)')
+        parser.add_argument('--save', nargs='?', const=DEFAULT_BASELINE, metavar='PATH',
+                            help='Natijani JSON baseline sifatida saqlash')
+        parser.add_argument('--compare', nargs='?', const=DEFAULT_BASELINE, metavar='PATH',
+                            help='Baseline bilan solishtirish, regressiya bo\'lsa xato bilan chiqadi')
+        parser.add_argument('--tolerance', type=float, default=0.2,
+                            help='Latency/rps uchun ruxsat etilgan yomonlashish (0.2 = 20%%)')
+
+    def handle(self, *args, **options):
+        modes = ['sync', 'async'] if options['mode'] == 'both' else [options['mode']]
+        # forgot-password bitta userga daqiqasiga bir marta - har so'rovga alohida user kerak
+        users = max(options['users'], options['requests'])
+        results = []
+
+        with benchmark_database(), local_standins(
+            fast_hasher=options['fast_hasher'], geo_latency=options['geo_latency_ms'] / 1000,
+        ):
+            seed_users(users)
+            for mode in modes:
+                results += run(mode, options['requests'], options['concurrency'], users)
+
+        self.stdout.write(format_table(results))
+
+        if options['save']:
+            meta = {key: options[key] for key in (
+                'requests', 'concurrency', 'users', 'mode', 'geo_latency_ms', 'fast_hasher',
+            )}
+            save_results(options['save'], 'async_auth', results, meta)
+            self.stdout.write(self.style.SUCCESS(f"Baseline saved to {options['save']}"))
+
+        if options['compare']:
+            self.compare(results, options['compare'], options['tolerance'])
+
+    def compare(self, results, path, tolerance):
+        try:
+            baseline = load_results(path)
+        except FileNotFoundError:
+            raise CommandError(f'Baseline not found: {path}')
+
+        regressions = compare_results(results, baseline, tolerance)
+        if not regressions:
+            self.stdout.write(self.style.SUCCESS(f'No regressions against {path}'))
+            return
+
+        for item, metric, old, new in regressions:
+            self.stdout.write(self.style.ERROR(
+                f"REGRESSION {item.get('mode', '')} {item['step']}: {metric} {old} -> {new}"
+            ))
+        raise CommandError(f'{len(regressions)} regression(s) against {path}')
@@ -0,0 +1,73 @@
+import os
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from custom_user.benchmarks import (
+    benchmark_database,
+    compare_results,
+    format_table,
+    load_results,
+    local_standins,
+    save_results,
+)
+from custom_user.benchmarks.auth_flow import run_asgi, run_wsgi, seed_users
+
+DEFAULT_BASELINE = os.path.join(settings.BASE_DIR, 'var', 'benchmarks', 'auth_flow.json')
+
+
+class Command(BaseCommand):
+    help = (
+        "register -> activation -> verify -> login -> devices -> cards -> addresses oqimini "
+        "test client va ASGI orqali o'lchaydi"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--iterations', type=int, default=50, help='Har bir rejimda oqim necha marta')
+        parser.add_argument('--users', type=int, default=200, help='Seed qilinadigan aktiv userlar soni')
+        parser.add_argument('--mode', choices=['wsgi', 'asgi', 'both'], default='both')
+        parser.add_argument('--fast-hasher', action='store_true',
+                            help='PBKDF2 o\'rniga MD5 hasher (parol hashing vaqtini chiqarib tashlash)')
+        parser.add_argument('--save', nargs='?', const=DEFAULT_BASELINE, metavar='PATH',
+                            help='Natijani JSON baseline sifatida saqlash')
+        parser.add_argument('--compare', nargs='?', const=DEFAULT_BASELINE, metavar='PATH',
+                            help='Baseline bilan solishtirish, regressiya bo\'lsa xato bilan chiqadi')
+        parser.add_argument('--tolerance', type=float, default=0.2,
+                            help='Latency/rps uchun ruxsat etilgan yomonlashish (0.2 = 20%%)')
+
+    def handle(self, *args, **options):
+        results = []
+
+        with benchmark_database(), local_standins(fast_hasher=options['fast_hasher']):
+            seed_users(options['users'])
+            if options['mode'] in ('wsgi', 'both'):
+                results += run_wsgi(options['iterations'], options['users'])
+            if options['mode'] in ('asgi', 'both'):
+                results += run_asgi(options['iterations'], options['users'])
+
+        self.stdout.write(format_table(results))
+
+        if options['save']:
+            meta = {key: options[key] for key in ('iterations', 'users', 'mode', 'fast_hasher')}
+            save_results(options['save'], 'auth_flow', results, meta)
+            self.stdout.write(self.style.SUCCESS(f"Baseline saved to {options['save']}"))
+
+        if options['compare']:
+            self.compare(results, options['compare'], options['tolerance'])
+
+    def compare(self, results, path, tolerance):
+        try:
+            baseline = load_results(path)
+        except FileNotFoundError:
+            raise CommandError(f'Baseline not found: {path}')
+
+        regressions = compare_results(results, baseline, tolerance)
+        if not regressions:
+            self.stdout.write(self.style.SUCCESS(f'No regressions against {path}'))
+            return
+
+        for item, metric, old, new in regressions:
+            self.stdout.write(self.style.ERROR(
+                f"REGRESSION {item.get('mode', '')} {item['step']}: {metric} {old} -> {new}"
+            ))
+        raise CommandError(f'{len(regressions)} regression(s) against {path}')
@@ -0,0 +1,65 @@
+import os
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from custom_user.benchmarks import compare_results, load_results, save_results
+
+DEFAULT_BASELINE = os.path.join(settings.BASE_DIR, 'var', 'benchmarks', 'cache_codec.json')
+
+
+class Command(BaseCommand):
+    help = (
+        "Kesh kalitlari aralashmasida oldingi pickle+zlib va CODEC sozlamasini solishtiradi: "
+        "saqlanadigan bayt, encode va decode vaqti"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--alias', default='default', help='CODEC sozlamasi olinadigan kesh')
+        parser.add_argument('--samples', type=int, default=200, help='Har bir kalit turi uchun qiymatlar soni')
+        parser.add_argument('--iterations', type=int, default=20, help='Har bir qiymat necha marta kodlanadi')
+        parser.add_argument('--repeat', type=int, default=5, help='Nechta urinishdan eng yaxshisi olinadi')
+        parser.add_argument('--save', nargs='?', const=DEFAULT_BASELINE, metavar='PATH',
+                            help='Natijani JSON baseline sifatida saqlash')
+        parser.add_argument('--compare', nargs='?', const=DEFAULT_BASELINE, metavar='PATH',
+                            help='Baseline bilan solishtirish, regressiya bo\'lsa xato bilan chiqadi')
+        parser.add_argument('--tolerance', type=float, default=0.3,
+                            help='Bayt va vaqt uchun ruxsat etilgan yomonlashish (0.3 = 30%%)')
+
+    def handle(self, *args, **options):
+        from custom_user.benchmarks.cache_codec import codec_options, format_table, run
+
+        if options['alias'] not in settings.CACHES:
+            raise CommandError(f"Unknown cache alias: {options['alias']}")
+        codec = codec_options(options['alias'])
+        if codec is None:
+            self.stderr.write(self.style.WARNING(
+                f"CACHES[{options['alias']!r}] has no CODEC options, measuring the codec defaults"
+            ))
+
+        results = run(options['samples'], options['iterations'], options['repeat'], codec)
+        self.stdout.write(format_table(results))
+
+        if options['save']:
+            meta = {'samples': options['samples'], 'iterations': options['iterations'],
+                    'repeat': options['repeat'], 'codec': codec}
+            save_results(options['save'], 'cache_codec', results, meta)
+            self.stdout.write(self.style.SUCCESS(f"Baseline saved to {options['save']}"))
+
+        if options['compare']:
+            self.compare(results, options['compare'], options['tolerance'])
+
+    def compare(self, results, path, tolerance):
+        try:
+            baseline = load_results(path)
+        except FileNotFoundError:
+            raise CommandError(f'Baseline not found: {path}')
+
+        regressions = compare_results(results, baseline, tolerance, metrics=('bytes', 'encode_us', 'decode_us'))
+        if not regressions:
+            self.stdout.write(self.style.SUCCESS(f'No regressions against {path}'))
+            return
+
+        for item, metric, old, new in regressions:
+            self.stdout.write(self.style.ERROR(f"REGRESSION {item['mode']} {item['step']}: {metric} {old} -> {new}"))
+        raise CommandError(f'{len(regressions)} regression(s) against {path}')
@@ -0,0 +1,60 @@
+import os
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from custom_user.benchmarks import benchmark_database, compare_results, load_results, save_results
+
+DEFAULT_BASELINE = os.path.join(settings.BASE_DIR, 'var', 'benchmarks', 'campaign.json')
+
+
+class Command(BaseCommand):
+    help = (
+        "Reklama kampaniyasini LocalSink'ga yuboradi: o'tkazuvchanlik, SQL soni va gateway "
+        "ishdan chiqqandan keyin davom ettirishda takroriy xabarlar yo'qligi"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=100_000, help='Jami userlar (30%% reklamaga rozi)')
+        parser.add_argument('--batch-size', type=int, default=500)
+        parser.add_argument('--workers', type=int, default=4)
+        parser.add_argument('--latency', type=float, default=0.005, help='Gateway javob vaqti (sekund/batch)')
+        parser.add_argument('--save', nargs='?', const=DEFAULT_BASELINE, metavar='PATH',
+                            help='Natijani JSON baseline sifatida saqlash')
+        parser.add_argument('--compare', nargs='?', const=DEFAULT_BASELINE, metavar='PATH',
+                            help='Baseline bilan solishtirish, regressiya bo\'lsa xato bilan chiqadi')
+        parser.add_argument('--tolerance', type=float, default=0.3,
+                            help='Vaqt uchun ruxsat etilgan yomonlashish (0.3 = 30%%)')
+
+    def handle(self, *args, **options):
+        from custom_user.benchmarks.campaign import format_table, query_plan, run
+
+        with benchmark_database(verbosity=options['verbosity'] - 1):
+            results = run(options['users'], options['batch_size'], options['workers'], options['latency'])
+            plan = query_plan()
+
+        self.stdout.write(format_table(results))
+        self.stdout.write(f'Recipient query plan: {plan}')
+
+        if options['save']:
+            meta = {key: options[key] for key in ('users', 'batch_size', 'workers', 'latency')}
+            save_results(options['save'], 'campaign', results, meta)
+            self.stdout.write(self.style.SUCCESS(f"Baseline saved to {options['save']}"))
+
+        if options['compare']:
+            self.compare(results, options['compare'], options['tolerance'])
+
+    def compare(self, results, path, tolerance):
+        try:
+            baseline = load_results(path)
+        except FileNotFoundError:
+            raise CommandError(f'Baseline not found: {path}')
+
+        regressions = compare_results(results, baseline, tolerance, metrics=('seconds', 'queries_per_1k'))
+        if not regressions:
+            self.stdout.write(self.style.SUCCESS(f'No regressions against {path}'))
+            return
+
+        for item, metric, old, new in regressions:
+            self.stdout.write(self.style.ERROR(f"REGRESSION {item['mode']} {item['step']}: {metric} {old} -> {new}"))
+        raise CommandError(f'{len(regressions)} regression(s) against {path}')
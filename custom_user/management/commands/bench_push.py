@@ -0,0 +1,61 @@
+import os
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from custom_user.benchmarks import benchmark_database, compare_results, load_results, save_results
+
+DEFAULT_BASELINE = os.path.join(settings.BASE_DIR, 'var', 'benchmarks', 'push.json')
+
+
+class Command(BaseCommand):
+    help = (
+        "Push dispatcher'ni lokal gateway'ga qarshi o'lchaydi: o'tkazuvchanlik (msg/s), "
+        "birlashtirish, o'lik tokenlarni tozalash va SQL soni"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--devices', type=int, default=20_000)
+        parser.add_argument('--notifications', type=int, default=3,
+                            help='Har bir qurilmaga oyna ichida yuboriladigan bildirishnomalar')
+        parser.add_argument('--batch-size', type=int, default=500)
+        parser.add_argument('--workers', type=int, default=4)
+        parser.add_argument('--latency', type=float, default=0.0, help='Gateway javob vaqti (sekund/so\'rov)')
+        parser.add_argument('--dead-ratio', type=float, default=0.05, help='O\'lik tokenlar ulushi')
+        parser.add_argument('--save', nargs='?', const=DEFAULT_BASELINE, metavar='PATH',
+                            help='Natijani JSON baseline sifatida saqlash')
+        parser.add_argument('--compare', nargs='?', const=DEFAULT_BASELINE, metavar='PATH',
+                            help='Baseline bilan solishtirish, regressiya bo\'lsa xato bilan chiqadi')
+        parser.add_argument('--tolerance', type=float, default=0.3,
+                            help='Vaqt uchun ruxsat etilgan yomonlashish (0.3 = 30%%)')
+
+    def handle(self, *args, **options):
+        from custom_user.benchmarks.push import format_table, run
+
+        keys = ('devices', 'notifications', 'batch_size', 'workers', 'latency', 'dead_ratio')
+        with benchmark_database(verbosity=options['verbosity'] - 1):
+            results = run(*(options[key] for key in keys))
+
+        self.stdout.write(format_table(results))
+
+        if options['save']:
+            save_results(options['save'], 'push', results, {key: options[key] for key in keys})
+            self.stdout.write(self.style.SUCCESS(f"Baseline saved to {options['save']}"))
+
+        if options['compare']:
+            self.compare(results, options['compare'], options['tolerance'])
+
+    def compare(self, results, path, tolerance):
+        try:
+            baseline = load_results(path)
+        except FileNotFoundError:
+            raise CommandError(f'Baseline not found: {path}')
+
+        regressions = compare_results(results, baseline, tolerance, metrics=('seconds', 'queries'))
+        if not regressions:
+            self.stdout.write(self.style.SUCCESS(f'No regressions against {path}'))
+            return
+
+        for item, metric, old, new in regressions:
+            self.stdout.write(self.style.ERROR(f"REGRESSION {item['mode']} {item['step']}: {metric} {old} -> {new}"))
+        raise CommandError(f'{len(regressions)} regression(s) against {path}')
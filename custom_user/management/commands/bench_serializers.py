@@ -0,0 +1,56 @@
+import os
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from custom_user.benchmarks import benchmark_database, compare_results, load_results, save_results
+
+DEFAULT_BASELINE = os.path.join(settings.BASE_DIR, 'var', 'benchmarks', 'serializers.json')
+
+
+class Command(BaseCommand):
+    help = (
+        "Karta, manzil va bildirishnoma sozlamalari uchun DRF serializer va "
+        "CompiledSerializer (values() + row -> dict) tezligini solishtiradi"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=100, help='Har bir ro\'yxatdagi qatorlar soni')
+        parser.add_argument('--iterations', type=int, default=200, help='Har bir holat necha marta bajariladi')
+        parser.add_argument('--save', nargs='?', const=DEFAULT_BASELINE, metavar='PATH',
+                            help='Natijani JSON baseline sifatida saqlash')
+        parser.add_argument('--compare', nargs='?', const=DEFAULT_BASELINE, metavar='PATH',
+                            help='Baseline bilan solishtirish, regressiya bo\'lsa xato bilan chiqadi')
+        parser.add_argument('--tolerance', type=float, default=0.3,
+                            help='Qator boshiga vaqt uchun ruxsat etilgan yomonlashish (0.3 = 30%%)')
+
+    def handle(self, *args, **options):
+        from custom_user.benchmarks.serializers import format_table, run
+
+        with benchmark_database(verbosity=options['verbosity'] - 1):
+            results = run(options['rows'], options['iterations'])
+
+        self.stdout.write(format_table(results))
+
+        if options['save']:
+            meta = {'rows': options['rows'], 'iterations': options['iterations']}
+            save_results(options['save'], 'serializers', results, meta)
+            self.stdout.write(self.style.SUCCESS(f"Baseline saved to {options['save']}"))
+
+        if options['compare']:
+            self.compare(results, options['compare'], options['tolerance'])
+
+    def compare(self, results, path, tolerance):
+        try:
+            baseline = load_results(path)
+        except FileNotFoundError:
+            raise CommandError(f'Baseline not found: {path}')
+
+        regressions = compare_results(results, baseline, tolerance, metrics=('row_us', 'queries_per_request'))
+        if not regressions:
+            self.stdout.write(self.style.SUCCESS(f'No regressions against {path}'))
+            return
+
+        for item, metric, old, new in regressions:
+            self.stdout.write(self.style.ERROR(f"REGRESSION {item['mode']} {item['step']}: {metric} {old} -> {new}"))
+        raise CommandError(f'{len(regressions)} regression(s) against {path}')
@@ -0,0 +1,63 @@
+import os
+from contextlib import nullcontext
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.test.utils import override_settings
+
+from custom_user.benchmarks import LOCAL_CACHES, benchmark_database, compare_results, load_results, save_results
+
+DEFAULT_BASELINE = os.path.join(settings.BASE_DIR, 'var', 'benchmarks', 'stampede.json')
+
+
+class Command(BaseCommand):
+    help = (
+        "Kesh muddati tugaganda DB so'rovlari sonini o'lchaydi: oddiy get/set va "
+        "get_or_compute (single-flight lock + erta yangilash)"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--threads', type=int, default=16, help='Bir vaqtda so\'rov yuboruvchi threadlar')
+        parser.add_argument('--duration', type=float, default=5.0, help='Har bir rejim necha sekund ishlaydi')
+        parser.add_argument('--ttl', type=float, default=0.5, help='Kesh muddati (sekund)')
+        parser.add_argument('--rows', type=int, default=2000, help='Ro\'yxatdagi filiallar soni')
+        parser.add_argument('--redis', action='store_true',
+                            help='locmem o\'rniga sozlamalardagi keshni (Redis) ishlatish')
+        parser.add_argument('--save', nargs='?', const=DEFAULT_BASELINE, metavar='PATH',
+                            help='Natijani JSON baseline sifatida saqlash')
+        parser.add_argument('--compare', nargs='?', const=DEFAULT_BASELINE, metavar='PATH',
+                            help='Baseline bilan solishtirish, regressiya bo\'lsa xato bilan chiqadi')
+        parser.add_argument('--tolerance', type=float, default=0.3,
+                            help='p95 uchun ruxsat etilgan yomonlashish (0.3 = 30%%)')
+
+    def handle(self, *args, **options):
+        from custom_user.benchmarks.stampede import format_table, run
+
+        caches = nullcontext() if options['redis'] else override_settings(CACHES=LOCAL_CACHES)
+        with caches, benchmark_database(verbosity=options['verbosity'] - 1):
+            results = run(options['threads'], options['duration'], options['ttl'], options['rows'])
+
+        self.stdout.write(format_table(results))
+
+        if options['save']:
+            meta = {key: options[key] for key in ('threads', 'duration', 'ttl', 'rows', 'redis')}
+            save_results(options['save'], 'stampede', results, meta)
+            self.stdout.write(self.style.SUCCESS(f"Baseline saved to {options['save']}"))
+
+        if options['compare']:
+            self.compare(results, options['compare'], options['tolerance'])
+
+    def compare(self, results, path, tolerance):
+        try:
+            baseline = load_results(path)
+        except FileNotFoundError:
+            raise CommandError(f'Baseline not found: {path}')
+
+        regressions = compare_results(results, baseline, tolerance, metrics=('p95_ms', 'max_hits_per_window'))
+        if not regressions:
+            self.stdout.write(self.style.SUCCESS(f'No regressions against {path}'))
+            return
+
+        for item, metric, old, new in regressions:
+            self.stdout.write(self.style.ERROR(f"REGRESSION {item['mode']} {item['step']}: {metric} {old} -> {new}"))
+        raise CommandError(f'{len(regressions)} regression(s) against {path}')
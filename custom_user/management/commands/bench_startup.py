@@ -0,0 +1,65 @@
+import os
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from custom_user.benchmarks import compare_results, load_results, save_results
+from custom_user.benchmarks.startup import run
+
+DEFAULT_BASELINE = os.path.join(settings.BASE_DIR, 'var', 'benchmarks', 'startup.json')
+
+
+class Command(BaseCommand):
+    help = (
+        "Yangi jarayonda django.setup(), URLconf importi va birinchi javobgacha vaqtni o'lchaydi; "
+        "-X importtime bo'yicha eng qimmat modullarni ko'rsatadi"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--repeat', type=int, default=5, help='Nechta yangi jarayonda o\'lchash')
+        parser.add_argument('--path', default='/api/user/login/', help='Birinchi so\'rov yuboriladigan URL')
+        parser.add_argument('-n', '--top', type=int, default=15, help='Nechta eng qimmat modul chiqarilsin')
+        parser.add_argument('--save', nargs='?', const=DEFAULT_BASELINE, metavar='PATH',
+                            help='Natijani JSON baseline sifatida saqlash')
+        parser.add_argument('--compare', nargs='?', const=DEFAULT_BASELINE, metavar='PATH',
+                            help='Baseline bilan solishtirish, regressiya bo\'lsa xato bilan chiqadi')
+        parser.add_argument('--tolerance', type=float, default=0.3,
+                            help='Median vaqt uchun ruxsat etilgan yomonlashish (0.3 = 30%%)')
+
+    def handle(self, *args, **options):
+        results, imports = run(options['repeat'], options['path'], options['top'])
+
+        self.stdout.write(f"{'step':<18} {'median ms':>10} {'min ms':>10} {'max ms':>10}")
+        for item in results:
+            self.stdout.write(
+                f"{item['step']:<18} {item['median_ms']:>10.1f} {item['min_ms']:>10.1f} {item['max_ms']:>10.1f}"
+            )
+        self.stdout.write(f"\n{imports['modules']} modules imported. Top by cumulative import time:")
+        for name, value in imports['top_cumulative']:
+            self.stdout.write(f'  {value:>8.1f} ms  {name}')
+        self.stdout.write('Top by self import time:')
+        for name, value in imports['top_self']:
+            self.stdout.write(f'  {value:>8.1f} ms  {name}')
+
+        if options['save']:
+            meta = {'repeat': options['repeat'], 'path': options['path'], 'imports': imports}
+            save_results(options['save'], 'startup', results, meta)
+            self.stdout.write(self.style.SUCCESS(f"Baseline saved to {options['save']}"))
+
+        if options['compare']:
+            self.compare(results, options['compare'], options['tolerance'])
+
+    def compare(self, results, path, tolerance):
+        try:
+            baseline = load_results(path)
+        except FileNotFoundError:
+            raise CommandError(f'Baseline not found: {path}')
+
+        regressions = compare_results(results, baseline, tolerance, metrics=('median_ms',))
+        if not regressions:
+            self.stdout.write(self.style.SUCCESS(f'No regressions against {path}'))
+            return
+
+        for item, metric, old, new in regressions:
+            self.stdout.write(self.style.ERROR(f"REGRESSION {item['step']}: {metric} {old} -> {new}"))
+        raise CommandError(f'{len(regressions)} regression(s) against {path}')
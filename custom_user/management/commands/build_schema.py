@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand
+
+from custom_user.schema_cache import build_schema, get_config, prune, schema_path, urlconf_hash, write_schema
+
+
+class Command(BaseCommand):
+    help = "OpenAPI sxemasini oldindan quradi va diskka yozadi (deploy vaqtida bir marta)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--force', action='store_true', help='Shu hash uchun fayl bo\'lsa ham qayta qurish')
+        parser.add_argument('--prune', action='store_true', help='Boshqa hashlarning eski fayllarini o\'chirish')
+
+    def handle(self, *args, **options):
+        config = get_config()
+        schema_hash = urlconf_hash(config=config)
+        path = schema_path(schema_hash, config)
+
+        if path.exists() and not options['force']:
+            self.stdout.write(f'Schema {schema_hash} is up to date: {path}')
+        else:
+            write_schema(schema_hash, build_schema(), config)
+            self.stdout.write(self.style.SUCCESS(f'Schema {schema_hash} written to {path}'))
+
+        if options['prune']:
+            for removed in prune(schema_hash, config):
+                self.stdout.write(f'Removed {removed}')
@@ -0,0 +1,32 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from custom_user.enrichment import DeviceEnricher, enrich_pending, get_config
+
+
+class Command(BaseCommand):
+    help = (
+        "Fon workeri to'ldirmay qolgan qurilmalarning (jarayon o'lgan, geolocation xatosi) "
+        "location_city va device_name maydonlarini to'ldiradi"
+    )
+
+    def add_arguments(self, parser):
+        config = get_config()
+        parser.add_argument('--batch-size', type=int, default=config['BATCH_SIZE'])
+        parser.add_argument('--workers', type=int, default=config['WORKERS'])
+
+    def handle(self, *args, **options):
+        enricher = DeviceEnricher(batch_size=options['batch_size'], workers=options['workers'])
+        started = time.perf_counter()
+        try:
+            total, enriched = enrich_pending(enricher)
+        finally:
+            enricher.stop()
+        elapsed = time.perf_counter() - started
+
+        stats = enricher.stats
+        self.stdout.write(self.style.SUCCESS(
+            f"Enriched {enriched} of {total} pending devices in {elapsed:.1f}s "
+            f"(lookups={stats['lookups']} cache_hits={stats['cache_hits']} errors={stats['errors']})"
+        ))
@@ -0,0 +1,42 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from custom_user.benchmarks.dataset import DEFAULT_PASSWORD, DatasetGenerator
+
+
+class Command(BaseCommand):
+    help = (
+        "Lokal yuklama testlari uchun sintetik ma'lumotlar: userlar, qurilmalar, kartalar, "
+        "manzillar, restoranlar va filiallar"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=100_000)
+        parser.add_argument('--restaurants', type=int, default=2_000)
+        parser.add_argument('--branches-mean', type=int, default=6, help="Restoran boshiga o'rtacha filial")
+        parser.add_argument('--inactive-ratio', type=float, default=0.05,
+                            help="Aktivlashtirilmagan userlar ulushi")
+        parser.add_argument('--batch-size', type=int, default=5_000, help='Bitta tranzaksiyadagi userlar')
+        parser.add_argument('--seed', type=int, default=None, help='Takrorlanuvchi natija uchun')
+        parser.add_argument('--password', default=DEFAULT_PASSWORD, help='Barcha userlar uchun parol')
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        generator = DatasetGenerator(
+            seed=options['seed'],
+            batch_size=options['batch_size'],
+            password=options['password'],
+            stdout=self.stdout,
+        )
+
+        totals = {}
+        if options['users']:
+            totals.update(generator.generate_users(options['users'], options['inactive_ratio']))
+        if options['restaurants']:
+            totals.update(generator.generate_restaurants(options['restaurants'], options['branches_mean']))
+
+        summary = ', '.join(f'{name}={count}' for name, count in totals.items())
+        self.stdout.write(self.style.SUCCESS(
+            f'Generated {summary} in {time.perf_counter() - started:.1f}s'
+        ))
@@ -0,0 +1,58 @@
+from django.core.management.base import BaseCommand
+
+from custom_user.memory import build_report, load_reports
+
+
+def _mb(value):
+    return f'{value / (1024 * 1024):.1f}MB'
+
+
+class Command(BaseCommand):
+    help = "Workerlar xotira snapshotlarini (RSS, GC, tracemalloc o'sishi) chiqaradi"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--local', action='store_true',
+                            help='Workerlar emas, shu jarayonning o\'zini hisoblash')
+        parser.add_argument('--models', action='store_true',
+                            help='Model obyektlari sonini hisoblash (faqat --local bilan)')
+        parser.add_argument('--dead', action='store_true', help="To'xtagan workerlarni ham ko'rsatish")
+
+    def handle(self, *args, **options):
+        if options['local']:
+            reports = [build_report(include_models=options['models'])]
+        else:
+            reports = [report for report in load_reports() if options['dead'] or report['alive']]
+
+        if not reports:
+            self.stdout.write('No memory reports found. Is MEMORY_PROFILING["ENABLED"] on?')
+            return
+
+        for report in reports:
+            self.write_report(report)
+
+    def write_report(self, report):
+        self.stdout.write(self.style.MIGRATE_HEADING(
+            f"pid={report['pid']} rss={_mb(report['rss_bytes'])} "
+            f"gc_counts={tuple(report['gc']['counts'])}" + ('' if report.get('alive', True) else ' (dead)')
+        ))
+
+        if 'traced_bytes' in report:
+            self.stdout.write(
+                f"  traced={_mb(report['traced_bytes'])} peak={_mb(report['traced_peak_bytes'])}"
+            )
+            self.stdout.write('  growth since baseline by package:')
+            for package, size_diff in report['growth_by_package'].items():
+                self.stdout.write(f'    {package:<30} {size_diff / 1024:+.1f}KB')
+
+            for prefix, sites in report['top_sites'].items():
+                if not sites:
+                    continue
+                self.stdout.write(f'  top allocation sites in {prefix}.*:')
+                for site in sites:
+                    self.stdout.write(
+                        f"    {site['site']:<60} {site['size_diff'] / 1024:+.1f}KB "
+                        f"({site['count_diff']:+d} blocks)"
+                    )
+
+        for model, count in report.get('model_instances', {}).items():
+            self.stdout.write(f'  {model}: {count} instances')
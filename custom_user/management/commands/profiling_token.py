@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand
+
+from custom_user.profiling import get_config, make_profile_token
+
+
+class Command(BaseCommand):
+    help = "So'rovni profil qilish uchun imzolangan header qiymatini yaratadi"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'url_name', nargs='?', default='*',
+            help="URL nomi (masalan: user-login). '*' - barcha endpointlar",
+        )
+
+    def handle(self, *args, **options):
+        config = get_config()
+        token = make_profile_token(options['url_name'])
+
+        self.stdout.write(f"{config['HEADER']}: {token}")
+        self.stdout.write(f"Valid for {config['TOKEN_MAX_AGE']} seconds.")
@@ -0,0 +1,37 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from custom_user.retention import RetentionPurge, get_config
+
+
+class Command(BaseCommand):
+    help = (
+        "Emailini tasdiqlamagan eski userlarni va uzoq kirmagan qurilmalarni id oralig'i bo'yicha "
+        "kichik tranzaksiyalarda o'chiradi"
+    )
+
+    def add_arguments(self, parser):
+        config = get_config()
+        parser.add_argument('--inactive-hours', type=float, default=config['INACTIVE_USER_HOURS'],
+                            help="0 - userlarni o'chirmaslik")
+        parser.add_argument('--device-days', type=float, default=config['DEVICE_IDLE_DAYS'],
+                            help="0 - qurilmalarni o'chirmaslik")
+        parser.add_argument('--chunk-size', type=int, default=config['CHUNK_SIZE'])
+        parser.add_argument('--pause', type=float, default=config['PAUSE'], help="Bo'laklar orasidagi pauza, sekund")
+        parser.add_argument('--dry-run', action='store_true', help="O'chirmasdan faqat sanash")
+
+    def handle(self, *args, **options):
+        purge = RetentionPurge(
+            inactive_user_hours=options['inactive_hours'], device_idle_days=options['device_days'],
+            chunk_size=options['chunk_size'], pause=options['pause'],
+        )
+        started = time.perf_counter()
+        stats = purge.run(dry_run=options['dry_run'])
+        elapsed = time.perf_counter() - started
+
+        action = 'Would delete' if options['dry_run'] else 'Deleted'
+        self.stdout.write(self.style.SUCCESS(
+            f"{action} {stats['users']} inactive users and {stats['devices']} idle devices "
+            f"in {stats['chunks']} chunks, {elapsed:.1f}s (revoked={stats['revoked']})"
+        ))
@@ -0,0 +1,34 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from custom_user.push import LocalGateway
+
+
+class Command(BaseCommand):
+    help = (
+        "Lokal push gateway (yuklama sinovi uchun): PUSH['GATEWAY_URL'] shu manzilga qaratiladi. "
+        "'dead-' bilan boshlanadigan tokenlarga 'invalid' javob qaytaradi"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--host', default='127.0.0.1')
+        parser.add_argument('--port', type=int, default=8099)
+        parser.add_argument('--latency', type=float, default=0.0, help='Har bir so\'rovga kechikish (sekund)')
+
+    def handle(self, *args, **options):
+        gateway = LocalGateway(options['host'], options['port'], options['latency']).start()
+        self.stdout.write(self.style.SUCCESS(f'Local push gateway on {gateway.url}'))
+
+        previous = 0
+        try:
+            while True:
+                time.sleep(1)
+                if gateway.messages != previous:
+                    self.stdout.write(f'{gateway.messages - previous} msg/s, total {gateway.messages} '
+                                      f'in {gateway.requests} requests')
+                    previous = gateway.messages
+        except KeyboardInterrupt:
+            pass
+        finally:
+            gateway.stop()
@@ -0,0 +1,53 @@
+from pathlib import Path
+
+from django.core.management.base import BaseCommand
+
+from custom_user.querylog import get_config, load_stats
+
+
+class Command(BaseCommand):
+    help = "Eng ko'p vaqt olgan SQL fingerprintlarini chiqaradi (barcha workerlar bo'yicha)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('-n', '--top', type=int, default=20, help='Nechta fingerprint chiqarilsin')
+        parser.add_argument(
+            '--sort', choices=['total', 'count', 'max', 'avg'], default='total',
+            help='Saralash mezoni',
+        )
+        parser.add_argument('--by-view', action='store_true', help="Har bir fingerprint uchun view'lar kesimi")
+        parser.add_argument('--reset', action='store_true', help="Yig'ilgan statistikani o'chirish")
+
+    def handle(self, *args, **options):
+        if options['reset']:
+            for path in Path(get_config()['STATS_DIR']).glob('*.json'):
+                path.unlink(missing_ok=True)
+            self.stdout.write(self.style.SUCCESS('Query stats cleared.'))
+            return
+
+        stats = load_stats()
+        if not stats:
+            self.stdout.write('No query stats collected yet. Is QUERY_LOG["ENABLED"] on?')
+            return
+
+        sort_keys = {
+            'total': lambda item: item[1]['total_ms'],
+            'count': lambda item: item[1]['count'],
+            'max': lambda item: item[1]['max_ms'],
+            'avg': lambda item: item[1]['total_ms'] / item[1]['count'],
+        }
+        rows = sorted(stats.items(), key=sort_keys[options['sort']], reverse=True)[:options['top']]
+
+        for position, (key, entry) in enumerate(rows, start=1):
+            avg_ms = entry['total_ms'] / entry['count']
+            self.stdout.write(
+                f"{position:>3}. count={entry['count']} total={entry['total_ms']:.1f}ms "
+                f"avg={avg_ms:.2f}ms max={entry['max_ms']:.1f}ms"
+            )
+            self.stdout.write(f'     {key}')
+
+            if options['by_view']:
+                views = sorted(entry['views'].items(), key=lambda item: item[1][1], reverse=True)
+                for view, (count, total_ms, max_ms) in views:
+                    self.stdout.write(
+                        f'       - {view}: count={count} total={total_ms:.1f}ms max={max_ms:.1f}ms'
+                    )
@@ -0,0 +1,172 @@
+import asyncio
+import json
+import time
+from collections import Counter, defaultdict
+
+import aiohttp
+from django.core.management.base import BaseCommand, CommandError
+
+from custom_user.benchmarks import percentile
+from custom_user.capture import fill_shape, get_config, load_records
+
+
+class Command(BaseCommand):
+    help = "Yozib olingan trafikni lokal instansga qayta yuboradi va latency/xatolar farqini chiqaradi"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--source', default=None, help='traffic-*.jsonl katalogi yoki fayl')
+        parser.add_argument('--target', default='http://127.0.0.1:8000', help='Instans manzili')
+        parser.add_argument('--speed', type=float, default=1.0,
+                            help="Tezlik koeffitsienti: 1 - asl tezlik, 2 - ikki barobar tez, 0 - kutmasdan")
+        parser.add_argument('--concurrency', type=int, default=32, help='Bir vaqtdagi ulanishlar soni')
+        parser.add_argument('--limit', type=int, default=None, help='Faqat birinchi N ta yozuv')
+        parser.add_argument('--email', help="Auth talab qiladigan so'rovlar uchun user")
+        parser.add_argument('--password', help='Shu userning paroli')
+        parser.add_argument('--param', action='append', default=[], metavar='NAME=VALUE',
+                            help="URL parametri uchun haqiqiy qiymat (masalan uid=<karta uuid>), aks holda sintetik")
+        parser.add_argument('--json', dest='json_path', help='Natijani JSON faylga yozish')
+
+    def handle(self, *args, **options):
+        records = load_records(options['source'] or get_config()['OUTPUT_DIR'])[:options['limit']]
+        if not records:
+            raise CommandError('No traffic records found.')
+
+        credentials = {}
+        if options['email'] and options['password']:
+            credentials = {'email': options['email'], 'password': options['password']}
+
+        params = {}
+        for item in options['param']:
+            name, sep, value = item.partition('=')
+            if not sep:
+                raise CommandError(f'--param expects NAME=VALUE, got {item!r}')
+            params[name] = value
+        options['params'] = params
+
+        self.stdout.write(f"Replaying {len(records)} requests against {options['target']} "
+                          f"at {options['speed']}x ...")
+        results, elapsed = asyncio.run(self.replay(records, options, credentials))
+        report = self.build_report(results, elapsed)
+        self.write_report(report)
+
+        if options['json_path']:
+            with open(options['json_path'], 'w') as fh:
+                json.dump(report, fh, indent=2)
+
+    async def replay(self, records, options, credentials):
+        target = options['target'].rstrip('/')
+        speed = options['speed']
+        semaphore = asyncio.Semaphore(options['concurrency'])
+        connector = aiohttp.TCPConnector(limit=options['concurrency'])
+        timeout = aiohttp.ClientTimeout(total=30)
+
+        async with aiohttp.ClientSession(connector=connector, timeout=timeout) as session:
+            token = await self.login(session, target, credentials) if credentials else None
+            first_ts = records[0]['ts']
+            started = time.perf_counter()
+
+            async def fire(record):
+                if speed > 0:
+                    delay = (record['ts'] - first_ts) / speed - (time.perf_counter() - started)
+                    if delay > 0:
+                        await asyncio.sleep(delay)
+                async with semaphore:
+                    return await self.send(session, target, record, token, credentials, options['params'])
+
+            results = await asyncio.gather(*(fire(record) for record in records))
+            return results, time.perf_counter() - started
+
+    async def login(self, session, target, credentials):
+        async with session.post(f'{target}/api/user/login/', json={
+            **credentials, 'device_hardware': 'traffic-replay',
+        }) as response:
+            data = await response.json(content_type=None)
+        token = (data.get('login_response') or {}).get('access')
+        if not token:
+            raise CommandError(f'Login failed for {credentials["email"]}: {data}')
+        return token
+
+    async def send(self, session, target, record, token, credentials, params):
+        body = record.get('body')
+        result = {
+            'url_name': record.get('url_name') or record['path'] or '<unresolved>', 'captured': record['status'],
+        }
+
+        if isinstance(body, str) or not record['path']:
+            # multipart/katta body yoki resolve bo'lmagan URL - shaklidan qayta tiklab bo'lmaydi
+            return dict(result, status=None, skipped=True)
+
+        path = record['path'].format_map({
+            name: str(value) for name, value in fill_shape(record.get('path_params') or {}, params).items()
+        })
+        # Eski yozuvlarda query faqat kalitlar ro'yxati edi
+        query = record.get('query') if isinstance(record.get('query'), dict) else {}
+        query = [(name, str(fill_shape(value, key=name))) for name, values in query.items() for value in values]
+
+        # Haqiqiy parol faqat login so'rovlariga qo'yiladi, qolganlari sintetik qiymat oladi
+        login_credentials = credentials if record.get('url_name') == 'user-login' else None
+        headers = {
+            name: value for name, value in record.get('headers', {}).items()
+            if name in ('Accept', 'Accept-Language')
+        }
+        if record.get('authenticated') and token:
+            headers['Authorization'] = f'Bearer {token}'
+
+        start = time.perf_counter()
+        try:
+            async with session.request(
+                record['method'], target + path, params=query, headers=headers,
+                json=fill_shape(body, login_credentials) if body is not None else None,
+            ) as response:
+                await response.read()
+                status = response.status
+        except (aiohttp.ClientError, asyncio.TimeoutError) as exc:
+            status = type(exc).__name__
+        return dict(result, status=status, latency=time.perf_counter() - start, skipped=False)
+
+    def build_report(self, results, elapsed):
+        by_url = defaultdict(list)
+        for result in results:
+            by_url[result['url_name']].append(result)
+
+        endpoints = []
+        for url_name, items in sorted(by_url.items()):
+            sent = [item for item in items if not item['skipped']]
+            latencies = sorted(item['latency'] for item in sent)
+            diffs = Counter(
+                f"{item['captured']}->{item['status']}" for item in sent
+                if _status_class(item['status']) != _status_class(item['captured'])
+            )
+            endpoints.append({
+                'url_name': url_name,
+                'requests': len(sent),
+                'skipped': len(items) - len(sent),
+                'p50_ms': round(percentile(latencies, 50) * 1000, 2),
+                'p95_ms': round(percentile(latencies, 95) * 1000, 2),
+                'p99_ms': round(percentile(latencies, 99) * 1000, 2),
+                'statuses': dict(Counter(str(item['status']) for item in sent)),
+                'status_diffs': dict(diffs),
+            })
+
+        sent_total = sum(item['requests'] for item in endpoints)
+        return {
+            'requests': sent_total,
+            'elapsed_s': round(elapsed, 2),
+            'rps': round(sent_total / elapsed, 2) if elapsed else 0.0,
+            'endpoints': endpoints,
+        }
+
+    def write_report(self, report):
+        self.stdout.write(
+            f"{'endpoint':<32} {'n':>6} {'skip':>5} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}  status diffs"
+        )
+        for item in report['endpoints']:
+            diffs = ', '.join(f'{key} x{count}' for key, count in item['status_diffs'].items()) or '-'
+            line = (f"{item['url_name']:<32} {item['requests']:>6} {item['skipped']:>5} "
+                    f"{item['p50_ms']:>9.2f} {item['p95_ms']:>9.2f} {item['p99_ms']:>9.2f}  {diffs}")
+            self.stdout.write(self.style.ERROR(line) if item['status_diffs'] else line)
+        self.stdout.write(f"{report['requests']} requests in {report['elapsed_s']}s ({report['rps']} req/s)")
+
+
+def _status_class(status):
+    return status // 100 if isinstance(status, int) else status
@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand
+
+from custom_user.jobs import get_config
+from custom_user.jobs.worker import run_pool
+
+
+class Command(BaseCommand):
+    help = (
+        "Fon vazifalarini bajaradi (custom_user/jobs). Har bir jarayonda --threads ta thread; "
+        "SIGTERM joriy vazifalar tugagach to'xtatadi"
+    )
+
+    def add_arguments(self, parser):
+        config = get_config()
+        parser.add_argument('--queues', default='',
+                            help="Vergul bilan ajratilgan navbatlar; bo'sh - ro'yxatdan o'tgan barcha navbatlar")
+        parser.add_argument('--processes', type=int, default=config['PROCESSES'])
+        parser.add_argument('--threads', type=int, default=config['THREADS'])
+        parser.add_argument('--poll-interval', type=float, default=config['POLL_INTERVAL'])
+
+    def handle(self, *args, **options):
+        queues = [queue.strip() for queue in options['queues'].split(',') if queue.strip()] or None
+        run_pool(options['processes'], queues, options['threads'], poll_interval=options['poll_interval'])
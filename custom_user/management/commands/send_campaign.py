@@ -0,0 +1,56 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from custom_user.campaigns import CampaignDispatcher, LocalSink, get_config
+from custom_user.models import Campaign
+
+
+class Command(BaseCommand):
+    help = (
+        "Reklama kampaniyasini rozilik bergan userlarga yuboradi. To'xtab qolgan kampaniya "
+        "checkpointdan davom ettiriladi"
+    )
+
+    def add_arguments(self, parser):
+        config = get_config()
+        parser.add_argument('campaign_id', type=int)
+        parser.add_argument('--batch-size', type=int, default=config['BATCH_SIZE'])
+        parser.add_argument('--workers', type=int, default=config['WORKERS'])
+        parser.add_argument('--rate', type=float, default=config['RATE'], help='Sekundiga xabarlar, 0 - cheklanmagan')
+        parser.add_argument('--sink', choices=('gateway', 'local'), default='gateway',
+                            help="local - xabarlar hech qayerga yuborilmaydi (lokal sinov)")
+        parser.add_argument('--force', action='store_true',
+                            help="'running' holatida qolib ketgan kampaniyani (jarayon o'lgan) davom ettirish")
+
+    def handle(self, *args, **options):
+        try:
+            campaign = Campaign.objects.get(pk=options['campaign_id'])
+        except Campaign.DoesNotExist:
+            raise CommandError(f"Campaign {options['campaign_id']} not found")
+
+        if campaign.status == 'done':
+            raise CommandError(f'Campaign {campaign.pk} is already done')
+        if campaign.status == 'running':
+            if not options['force']:
+                raise CommandError(f'Campaign {campaign.pk} is running; use --force if its process died')
+            Campaign.objects.filter(pk=campaign.pk).update(status='paused')
+
+        sender = LocalSink() if options['sink'] == 'local' else None
+        dispatcher = CampaignDispatcher(
+            campaign, sender,
+            batch_size=options['batch_size'], workers=options['workers'], rate=options['rate'],
+        )
+        if campaign.cursor or campaign.done_ranges:
+            self.stdout.write(f'Resuming campaign {campaign.pk} after user id {campaign.cursor}')
+
+        started = time.perf_counter()
+        campaign = dispatcher.run()
+        elapsed = time.perf_counter() - started
+
+        summary = (f'Campaign {campaign.pk} {campaign.status}: sent={campaign.sent_count} '
+                   f'failed={campaign.failed_count} in {elapsed:.1f}s')
+        if campaign.status == 'paused':
+            self.stdout.write(self.style.WARNING(f'{summary} ({campaign.last_error})'))
+        else:
+            self.stdout.write(self.style.SUCCESS(summary))
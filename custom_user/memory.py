@@ -0,0 +1,197 @@
+import gc
+import json
+import linecache
+import logging
+import os
+import resource
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from pathlib import Path
+
+from django.apps import apps
+from django.conf import settings
+
+logger = logging.getLogger('custom_user.memory')
+
+_lock = threading.Lock()
+_baseline = None
+_thread = None
+
+
+def get_config():
+    config = {
+        'ENABLED': False,
+        'SNAPSHOT_INTERVAL': 300,
+        'TRACEBACK_FRAMES': 1,
+        'TOP': 20,
+        'MODULES': ['custom_user', 'restaurants', 'rest_framework', 'django', 'user_agents'],
+        'STATS_DIR': os.path.join(settings.BASE_DIR, 'var', 'memory'),
+    }
+    config.update(getattr(settings, 'MEMORY_PROFILING', {}))
+    return config
+
+
+def get_rss_bytes():
+    try:
+        with open('/proc/self/statm') as fh:
+            return int(fh.read().split()[1]) * resource.getpagesize()
+    except (OSError, ValueError, IndexError):
+        # /proc yo'q (macOS) - eng yuqori RSS bilan kifoyalanamiz
+        usage = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return usage if sys.platform == 'darwin' else usage * 1024
+
+
+def _module_for(filename, _cache={}):
+    module = _cache.get(filename)
+    if module is None:
+        module = filename
+        for path in sorted(sys.path, key=len, reverse=True):
+            if path and filename.startswith(path.rstrip(os.sep) + os.sep):
+                relative = os.path.splitext(filename[len(path.rstrip(os.sep)) + 1:])[0]
+                module = relative.replace(os.sep, '.').removesuffix('.__init__')
+                break
+        _cache[filename] = module
+    return module
+
+
+def gc_stats():
+    return {
+        'counts': gc.get_count(),
+        'thresholds': gc.get_threshold(),
+        'generations': gc.get_stats(),
+    }
+
+
+def model_instance_counts():
+    """
+    Xotiradagi model obyektlari soni. gc.get_objects() butun heapni aylanadi -
+    faqat talab bo'yicha chaqiriladi.
+    """
+    model_classes = set(apps.get_models())
+    counts = Counter(
+        type(obj).__name__ for obj in gc.get_objects() if type(obj) in model_classes
+    )
+    return dict(counts.most_common())
+
+
+def start(config=None):
+    global _baseline, _thread
+    config = config or get_config()
+
+    with _lock:
+        if _thread is not None:
+            return
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(config['TRACEBACK_FRAMES'])
+        _baseline = tracemalloc.take_snapshot()
+        _thread = threading.Thread(
+            target=_snapshot_loop, args=(config,), name='memory-snapshots', daemon=True,
+        )
+        _thread.start()
+
+
+def reset_baseline():
+    global _baseline
+    if tracemalloc.is_tracing():
+        _baseline = tracemalloc.take_snapshot()
+
+
+def _snapshot_loop(config):
+    while True:
+        time.sleep(config['SNAPSHOT_INTERVAL'])
+        try:
+            write_report(build_report(config), config)
+        except Exception:
+            logger.exception('Memory snapshot failed')
+
+
+def build_report(config=None, include_models=False):
+    config = config or get_config()
+
+    report = {
+        'pid': os.getpid(),
+        'timestamp': time.time(),
+        'rss_bytes': get_rss_bytes(),
+        'gc': gc_stats(),
+        'tracing': tracemalloc.is_tracing(),
+    }
+
+    if tracemalloc.is_tracing() and _baseline is not None:
+        snapshot = tracemalloc.take_snapshot().filter_traces((
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, linecache.__file__),
+        ))
+        current, peak = tracemalloc.get_traced_memory()
+        report['traced_bytes'] = current
+        report['traced_peak_bytes'] = peak
+        report.update(_diff_by_module(snapshot, config))
+
+    if include_models:
+        report['model_instances'] = model_instance_counts()
+
+    return report
+
+
+def _diff_by_module(snapshot, config):
+    diff = snapshot.compare_to(_baseline, 'lineno')
+    prefixes = config['MODULES']
+    by_module = Counter()
+    top_sites = {prefix: [] for prefix in prefixes}
+
+    for stat in diff:
+        frame = stat.traceback[0]
+        module = _module_for(frame.filename)
+        by_module[module if module.startswith('<') else module.split('.')[0]] += stat.size_diff
+
+        for prefix in prefixes:
+            if module == prefix or module.startswith(prefix + '.'):
+                if len(top_sites[prefix]) < config['TOP'] and stat.size_diff > 0:
+                    top_sites[prefix].append({
+                        'site': f'{module}:{frame.lineno}',
+                        'size_diff': stat.size_diff,
+                        'count_diff': stat.count_diff,
+                        'size': stat.size,
+                    })
+                break
+
+    return {
+        'growth_by_package': dict(by_module.most_common(config['TOP'])),
+        'top_sites': top_sites,
+    }
+
+
+def write_report(report, config=None):
+    config = config or get_config()
+    stats_dir = Path(config['STATS_DIR'])
+    stats_dir.mkdir(parents=True, exist_ok=True)
+    path = stats_dir / f"{report['pid']}.json"
+    tmp_path = path.with_suffix('.tmp')
+    tmp_path.write_text(json.dumps(report, default=str))
+    os.replace(tmp_path, path)
+
+
+def load_reports(config=None):
+    config = config or get_config()
+    reports = []
+    for path in sorted(Path(config['STATS_DIR']).glob('*.json')):
+        try:
+            report = json.loads(path.read_text())
+        except (OSError, ValueError):
+            logger.warning('Skipping unreadable memory report %s', path)
+            continue
+        report['alive'] = _is_alive(report['pid'])
+        reports.append(report)
+    return reports
+
+
+def _is_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
@@ -0,0 +1,43 @@
+# Generated by Django 5.2.8 on 2026-10-19 14:45
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auth', '0012_alter_user_first_name_max_length'),
+        ('custom_user', '0013_alter_card_card_name_alter_card_card_number_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Campaign',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100)),
+                ('channel', models.CharField(choices=[('email', 'email')], default='email', max_length=20)),
+                ('subject', models.CharField(help_text='Django shablon', max_length=255)),
+                ('body', models.TextField(help_text='Django shablon; kampaniya boshida bir marta render qilinadi')),
+                ('status', models.CharField(choices=[('draft', 'draft'), ('running', 'running'), ('paused', 'paused'), ('done', 'done')], default='draft', max_length=20)),
+                ('cursor', models.BigIntegerField(default=0)),
+                ('done_ranges', models.JSONField(blank=True, default=list)),
+                ('sent_count', models.PositiveIntegerField(default=0)),
+                ('failed_count', models.PositiveIntegerField(default=0)),
+                ('last_error', models.TextField(blank=True, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('started_at', models.DateTimeField(blank=True, null=True)),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                'verbose_name': 'Campaign',
+                'verbose_name_plural': 'Campaigns',
+                'db_table': 'users_campaign',
+                'ordering': ['-created_at'],
+            },
+        ),
+        migrations.AddIndex(
+            model_name='customuser',
+            index=models.Index(condition=models.Q(('promotional_notification', True)), fields=['id'], name='user_promo_optin_idx'),
+        ),
+    ]
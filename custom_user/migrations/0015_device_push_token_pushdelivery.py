@@ -0,0 +1,39 @@
+# Generated by Django 5.2.8 on 2026-10-19 14:49
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('custom_user', '0014_campaign_promo_optin_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='device',
+            name='push_token',
+            field=models.CharField(blank=True, max_length=255, null=True, unique=True),
+        ),
+        migrations.AlterField(
+            model_name='campaign',
+            name='channel',
+            field=models.CharField(choices=[('email', 'email'), ('push', 'push')], default='email', max_length=20),
+        ),
+        migrations.CreateModel(
+            name='PushDelivery',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('status', models.PositiveSmallIntegerField(choices=[(1, 'sent'), (2, 'failed'), (3, 'invalid token')])),
+                ('coalesced', models.PositiveSmallIntegerField(default=1)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('device', models.ForeignKey(db_constraint=False, on_delete=django.db.models.deletion.CASCADE, related_name='push_deliveries', to='custom_user.device')),
+            ],
+            options={
+                'verbose_name': 'Push delivery',
+                'verbose_name_plural': 'Push deliveries',
+                'db_table': 'users_push_delivery',
+            },
+        ),
+    ]
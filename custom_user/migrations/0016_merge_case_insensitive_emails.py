@@ -0,0 +1,82 @@
+from django.db import migrations, transaction
+from django.db.models import Count, F
+from django.db.models.functions import Lower
+
+# Bitta tranzaksiyada birlashtiriladigan email guruhlari - qulflar qisqa turadi
+BATCH_SIZE = 100
+
+
+def merge_group(User, email_lower):
+    # Qoladigan akkaunt: aktiv, oxirgi kirgan, eng eski
+    users = list(
+        User.objects.alias(email_lower=Lower('email')).filter(email_lower=email_lower)
+        .order_by('-is_active', F('last_login').desc(nulls_last=True), 'id')
+    )
+    keeper, merged = users[0], [user.pk for user in users[1:]]
+    if not merged:
+        return 0
+
+    # Bog'liq qatorlar (qurilmalar, kartalar, manzillar, admin log ...) qoladigan userga o'tadi
+    for relation in User._meta.related_objects:
+        if relation.one_to_many:
+            relation.related_model._base_manager.filter(**{f'{relation.field.name}__in': merged}).update(
+                **{relation.field.name: keeper.pk}
+            )
+    # Ikkala akkaunt bitta telefondan kirgan bo'lsa: (user, device_hardware) bo'yicha eng oxirgi faol
+    # qurilma qoladi, aks holda login/verify dagi update_or_create MultipleObjectsReturned beradi
+    Device = User._meta.apps.get_model('custom_user', 'Device')
+    PushDelivery = User._meta.apps.get_model('custom_user', 'PushDelivery')
+    seen, duplicates = set(), []
+    devices = (
+        Device._base_manager.filter(user_id=keeper.pk, device_hardware__isnull=False)
+        .order_by('device_hardware', '-last_online', '-id').values_list('pk', 'device_hardware')
+    )
+    for pk, hardware in devices:
+        if hardware in seen:
+            duplicates.append(pk)
+        seen.add(hardware)
+    if duplicates:
+        PushDelivery._base_manager.filter(device_id__in=duplicates).delete()
+        Device._base_manager.filter(pk__in=duplicates).delete()
+
+    for model in ('Card', 'Address'):
+        # Birlashgandan keyin ham asosiy karta/manzil bitta bo'lishi kerak
+        related = User._meta.apps.get_model('custom_user', model)._base_manager.filter(user_id=keeper.pk, default=True)
+        first = related.order_by('-created_at').values_list('pk', flat=True).first()
+        if first is not None:
+            related.exclude(pk=first).update(default=False)
+
+    for field in User._meta.many_to_many:
+        through = field.remote_field.through
+        source, target = f'{field.m2m_field_name()}_id', f'{field.m2m_reverse_field_name()}_id'
+        existing = set(through.objects.filter(**{source: keeper.pk}).values_list(target, flat=True))
+        targets = set(through.objects.filter(**{f'{source}__in': merged}).values_list(target, flat=True)) - existing
+        through.objects.bulk_create([through(**{source: keeper.pk, target: pk}) for pk in targets])
+
+    User.objects.filter(pk__in=merged).delete()
+    return len(merged)
+
+
+def merge_case_duplicates(apps, schema_editor):
+    User = apps.get_model('custom_user', 'CustomUser')
+    emails = list(
+        User.objects.annotate(email_lower=Lower('email')).values('email_lower')
+        .annotate(count=Count('id')).filter(count__gt=1).values_list('email_lower', flat=True)
+    )
+    for start in range(0, len(emails), BATCH_SIZE):
+        with transaction.atomic(using=schema_editor.connection.alias):
+            for email_lower in emails[start:start + BATCH_SIZE]:
+                merge_group(User, email_lower)
+
+
+class Migration(migrations.Migration):
+    # Har bir batch o'z tranzaksiyasida
+    atomic = False
+
+    dependencies = [
+        ('custom_user', '0015_device_push_token_pushdelivery'),
+    ]
+
+    operations = [
+        migrations.RunPython(merge_case_duplicates, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 5.2.8 on 2026-10-19 15:03
+
+from django.db import migrations, models
+from django.db.models import F
+
+
+def mark_existing_enriched(apps, schema_editor):
+    # Mavjud qurilmalar login paytida to'ldirilgan - ular navbatga tushmasin
+    Device = apps.get_model('custom_user', 'Device')
+    Device.objects.filter(enriched_at__isnull=True).update(enriched_at=F('last_online'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('custom_user', '0017_customuser_email_lower_uniq'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='device',
+            name='enriched_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='device',
+            name='user_agent',
+            field=models.CharField(blank=True, max_length=512, null=True),
+        ),
+        migrations.RunPython(mark_existing_enriched, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='device',
+            index=models.Index(condition=models.Q(('enriched_at__isnull', True)), fields=['id'], name='device_enrich_pending_idx'),
+        ),
+    ]
@@ -0,0 +1,12 @@
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+    # Avval bu yerda qurilmasi/kartasi/manzili bor barcha nofaol userlar aktivlashtirilardi - admin ataylab
+    # o'chirgan akkauntlar ham. Endi bu operator ko'rib chiqadigan buyruq: `manage.py activate_verified_users`
+
+    dependencies = [
+        ('custom_user', '0019_job'),
+    ]
+
+    operations = []
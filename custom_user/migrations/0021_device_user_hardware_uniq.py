@@ -0,0 +1,41 @@
+# Generated by Django 5.2.8 on 2026-10-19 15:24
+
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def remove_duplicate_devices(apps, schema_editor):
+    # 0016 birlashtirgan akkauntlar (yoki parallel login) qoldirgan takror qurilmalar:
+    # har bir (user, device_hardware) uchun eng oxirgi faol qator qoladi
+    Device = apps.get_model('custom_user', 'Device')
+    PushDelivery = apps.get_model('custom_user', 'PushDelivery')
+    groups = (
+        Device._base_manager.filter(device_hardware__isnull=False).values('user_id', 'device_hardware')
+        .annotate(count=Count('id')).filter(count__gt=1).values_list('user_id', 'device_hardware')
+    )
+    duplicates = []
+    for user_id, hardware in groups:
+        pks = list(
+            Device._base_manager.filter(user_id=user_id, device_hardware=hardware)
+            .order_by('-last_online', '-id').values_list('pk', flat=True)
+        )
+        duplicates.extend(pks[1:])
+    for start in range(0, len(duplicates), 500):
+        chunk = duplicates[start:start + 500]
+        PushDelivery._base_manager.filter(device_id__in=chunk).delete()
+        Device._base_manager.filter(pk__in=chunk).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('custom_user', '0020_activate_verified_users'),
+    ]
+
+    operations = [
+        migrations.RunPython(remove_duplicate_devices, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='device',
+            constraint=models.UniqueConstraint(fields=('user', 'device_hardware'), name='device_user_hardware_uniq'),
+        ),
+    ]
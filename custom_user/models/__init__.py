@@ -1,5 +1,9 @@
+from .tracking import *
 from .device import *
 from .user import *
 from .misc import *
 from .delivery_locations import *
-from .card import *
\ No newline at end of file
+from .card import *
+from .campaign import *
+from .push import *
+from .job import *
\ No newline at end of file
@@ -0,0 +1,40 @@
+from django.db import models
+
+
+class Campaign(models.Model):
+    STATUS_CHOICES = [
+        ('draft', 'draft'),
+        ('running', 'running'),
+        ('paused', 'paused'),
+        ('done', 'done'),
+    ]
+
+    CHANNEL_CHOICES = [
+        ('email', 'email'),
+        ('push', 'push'),
+    ]
+
+    name = models.CharField(max_length=100)
+    channel = models.CharField(max_length=20, choices=CHANNEL_CHOICES, default='email')
+    subject = models.CharField(max_length=255, help_text="Django shablon")
+    body = models.TextField(help_text="Django shablon; kampaniya boshida bir marta render qilinadi")
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='draft')
+    # Checkpoint: id <= cursor bo'lgan userlar ko'rib chiqilgan, done_ranges - undan keyingi
+    # yuborib bo'lingan (start, end] oraliqlar. Qayta ishga tushirilganda shular o'tkazib yuboriladi
+    cursor = models.BigIntegerField(default=0)
+    done_ranges = models.JSONField(default=list, blank=True)
+    sent_count = models.PositiveIntegerField(default=0)
+    failed_count = models.PositiveIntegerField(default=0)
+    last_error = models.TextField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        db_table = 'users_campaign'
+        verbose_name = 'Campaign'
+        verbose_name_plural = 'Campaigns'
+        ordering = ['-created_at']
+
+    def __str__(self):
+        return f"{self.name} ({self.status})"
@@ -2,9 +2,11 @@ import uuid
 from django.db import models
 from django.contrib.auth import get_user_model
 
+from .tracking import DirtyFieldsMixin
+
 User = get_user_model()
 
-class Card(models.Model):
+class Card(DirtyFieldsMixin, models.Model):
     uid = models.UUIDField(default=uuid.uuid4, unique=True, editable=False)
     user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='cards')
     name = models.CharField(max_length=100, null=True, blank=True,
@@ -28,10 +30,11 @@ class Card(models.Model):
         return f"{self.user.email} - {masked_number}"
 
     def save(self, *args, **kwargs):
-        if self.default:
-            Card.objects.filter(user=self.user, default=True).exclude(pk=self.pk).update(default=False)
+        # Boshqa default'ni faqat default haqiqatan o'zgarganda tushiramiz
+        if self.default and self.is_dirty('default'):
+            Card.objects.filter(user_id=self.user_id, default=True).exclude(pk=self.pk).update(default=False)
 
-        if not self.pk and not Card.objects.filter(user=self.user).exists():
+        if not self.pk and not Card.objects.filter(user_id=self.user_id).exists():
             self.default = True
 
         super().save(*args, **kwargs)
@@ -1,10 +1,12 @@
 from django.db import models
 from django.contrib.auth import get_user_model
 
+from .tracking import DirtyFieldsMixin
+
 User = get_user_model()
 
 
-class Address(models.Model):
+class Address(DirtyFieldsMixin, models.Model):
     user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='addresses')
     lat = models.DecimalField(max_digits=9, decimal_places=6, null=True, blank=True, help_text="Latitude")
     long = models.DecimalField(max_digits=9, decimal_places=6, null=True, blank=True, help_text="Longitude")
@@ -29,10 +31,11 @@ class Address(models.Model):
         return f"{self.user.email} - {self.name or self.address}"
 
     def save(self, *args, **kwargs):
-        if self.default:
-            Address.objects.filter(user=self.user, default=True).exclude(pk=self.pk).update(default=False)
+        # Boshqa default'ni faqat default haqiqatan o'zgarganda tushiramiz
+        if self.default and self.is_dirty('default'):
+            Address.objects.filter(user_id=self.user_id, default=True).exclude(pk=self.pk).update(default=False)
 
-        if not self.pk and not Address.objects.filter(user=self.user).exists():
+        if not self.pk and not Address.objects.filter(user_id=self.user_id).exists():
             self.default = True
 
         super().save(*args, **kwargs)
\ No newline at end of file
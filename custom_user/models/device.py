@@ -1,8 +1,28 @@
 import uuid
-from django.db import models
+from django.db import models, router, transaction
+from .tracking import DirtyFieldsMixin
 from .user import CustomUser
 
-class Device(models.Model):
+class DeviceManager(models.Manager):
+    def delete_others(self, user_id, keep_hardware):
+        """
+        Userning `keep_hardware` dan boshqa barcha qurilmalarini bitta tranzaksiyada o'chiradi
+        (qatorlar select_for_update bilan qulflanadi, push_deliveries CASCADE bilan ketadi).
+        Qaytaradi: o'chirilganlarning device_hardware ro'yxati.
+        """
+        db = router.db_for_write(self.model)
+        with transaction.atomic(using=db):
+            # exclude() device_hardware IS NULL qatorlarni ham oladi
+            rows = list(
+                self.using(db).filter(user_id=user_id).exclude(device_hardware=keep_hardware)
+                .select_for_update().values_list('id', 'device_hardware')
+            )
+            if rows:
+                self.using(db).filter(pk__in=[pk for pk, _ in rows]).delete()
+        return [hardware for _, hardware in rows]
+
+
+class Device(DirtyFieldsMixin, models.Model):
     uid = models.UUIDField(default=uuid.uuid4, unique=True, editable=False)
     user = models.ForeignKey(CustomUser, on_delete=models.CASCADE, related_name='devices')
     device_ip = models.CharField(max_length=45, null=True, blank=True)
@@ -14,12 +34,29 @@ class Device(models.Model):
     refresh_token = models.CharField(max_length=300, null=True, blank=True)
     last_online = models.DateTimeField(auto_now=True)
     is_active = models.BooleanField(default=True)
+    # Mobil ilova bergan push token (FCM/APNs); gateway 'invalid' desa o'chiriladi
+    push_token = models.CharField(max_length=255, null=True, blank=True, unique=True)
+    # Login/verify paytidagi xom User-Agent; device_name va location_city fon workerida to'ldiriladi
+    user_agent = models.CharField(max_length=512, null=True, blank=True)
+    # NULL - device_ip/user_agent hali qayta ishlanmagan
+    enriched_at = models.DateTimeField(null=True, blank=True)
+
+    objects = DeviceManager()
 
     class Meta:
         db_table = 'users_device'
         verbose_name = 'Device'
         verbose_name_plural = 'Devices'
         ordering = ['-last_online']
+        constraints = [
+            # login/verify update_or_create(user, device_hardware) - bitta qurilmaga bitta qator
+            models.UniqueConstraint(fields=['user', 'device_hardware'], name='device_user_hardware_uniq'),
+        ]
+        indexes = [
+            # Fon worker va enrich_devices faqat kutayotgan qurilmalarni o'qiydi
+            models.Index(fields=['id'], condition=models.Q(enriched_at__isnull=True),
+                         name='device_enrich_pending_idx'),
+        ]
 
 
 
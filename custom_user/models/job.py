@@ -0,0 +1,35 @@
+from django.db import models
+from django.utils import timezone
+
+
+class Job(models.Model):
+    """
+    Fon vazifalari navbati - Redis bo'lmaganda (custom_user/jobs/backends.py DatabaseBackend).
+
+    `run_at` - navbatda: qachon bajarilishi kerak; worker olgan bo'lsa: ko'rinmaslik muddati
+    (visibility timeout) - worker o'lsa shu vaqtdan keyin boshqa worker qayta oladi.
+    """
+
+    queue = models.CharField(max_length=50)
+    name = models.CharField(max_length=200)
+    kwargs = models.JSONField(default=dict)
+    run_at = models.DateTimeField(default=timezone.now)
+    enqueued_at = models.DateTimeField(default=timezone.now)
+    attempts = models.PositiveIntegerField(default=0)
+    # Joriy egasi; ack/retry faqat token mos kelsa yoziladi
+    token = models.CharField(max_length=32, null=True, blank=True)
+    # Davriy vazifalar uchun `periodic:<name>` - har biri navbatda bitta qator
+    unique_key = models.CharField(max_length=200, null=True, blank=True, unique=True)
+    dead = models.BooleanField(default=False)
+    last_error = models.TextField(null=True, blank=True)
+
+    class Meta:
+        db_table = 'users_job'
+        verbose_name = 'Job'
+        verbose_name_plural = 'Jobs'
+        indexes = [
+            models.Index(fields=['queue', 'run_at'], condition=models.Q(dead=False), name='job_ready_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.name} ({self.queue})"
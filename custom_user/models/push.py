@@ -0,0 +1,31 @@
+from django.db import models
+
+from .device import Device
+
+
+class PushDelivery(models.Model):
+    STATUS_SENT = 1
+    STATUS_FAILED = 2
+    STATUS_INVALID = 3
+
+    STATUS_CHOICES = [
+        (STATUS_SENT, 'sent'),
+        (STATUS_FAILED, 'failed'),
+        (STATUS_INVALID, 'invalid token'),
+    ]
+
+    # Har bir yuborilgan push uchun bitta qator - faqat raqamlar, matn saqlanmaydi.
+    # db_constraint=False: navbatdagi push yozilguncha device o'chirilgan bo'lsa ham insert yiqilmaydi
+    device = models.ForeignKey(Device, on_delete=models.CASCADE, db_constraint=False, related_name='push_deliveries')
+    status = models.PositiveSmallIntegerField(choices=STATUS_CHOICES)
+    # Oynada bitta xabarga birlashtirilgan bildirishnomalar soni
+    coalesced = models.PositiveSmallIntegerField(default=1)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        db_table = 'users_push_delivery'
+        verbose_name = 'Push delivery'
+        verbose_name_plural = 'Push deliveries'
+
+    def __str__(self):
+        return f"{self.device_id} - {self.get_status_display()}"
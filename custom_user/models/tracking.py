@@ -0,0 +1,84 @@
+from django.db import models
+from django.db.models import DEFERRED
+
+
+class DirtyFieldsMixin(models.Model):
+    """
+    Bazadan o'qilgan qiymatlarni eslab qoladi. save() faqat o'zgargan ustunlarni yozadi
+    (update_fields), hech narsa o'zgarmagan bo'lsa so'rov ham, pre_save/post_save ham bo'lmaydi.
+    auto_now maydonlar (updated_at, last_online) faqat haqiqiy o'zgarish bilan birga yangilanadi.
+
+    Yangi obyekt, update_fields berilgan yoki force_insert/force_update chaqiruvlar odatdagidek ishlaydi.
+    """
+
+    class Meta:
+        abstract = True
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Qiymatlar from_db_value'dan o'tgan, snapshot uchun nusxa shart emas (ro'yxat/dict maydonlar yo'q)
+        instance._loaded_values = dict(zip(field_names, values))
+        return instance
+
+    def get_dirty_fields(self):
+        loaded = getattr(self, '_loaded_values', None)
+        if loaded is None:
+            return None
+        current = self.__dict__
+        dirty = []
+        for field in self._meta.concrete_fields:
+            if field.primary_key:
+                continue
+            value = current.get(field.attname, DEFERRED)
+            if value is DEFERRED:
+                # only()/defer() bilan o'qilmagan va qiymat berilmagan
+                continue
+            if field.attname not in loaded or self._changed(field, value, loaded[field.attname]):
+                dirty.append(field.name)
+        return dirty
+
+    @staticmethod
+    def _changed(field, value, old):
+        if value == old:
+            return False
+        # '41.300000' va Decimal('41.3') kabi - Python turiga keltirib solishtiramiz
+        try:
+            return field.to_python(value) != field.to_python(old)
+        except Exception:
+            return True
+
+    def is_dirty(self, field_name):
+        dirty = self.get_dirty_fields()
+        return dirty is None or field_name in dirty
+
+    def save(self, *args, **kwargs):
+        tracked = not (args or self._state.adding or kwargs.get('update_fields') is not None
+                       or kwargs.get('force_insert') or kwargs.get('force_update'))
+        if tracked:
+            dirty = self.get_dirty_fields()
+            if dirty is not None:
+                if not dirty:
+                    return
+                auto_now = [field.name for field in self._meta.concrete_fields
+                            if getattr(field, 'auto_now', False) and field.name not in dirty]
+                kwargs['update_fields'] = dirty + auto_now
+        super().save(*args, **kwargs)
+        self._snapshot(kwargs.get('update_fields'))
+
+    def refresh_from_db(self, using=None, fields=None, from_queryset=None):
+        super().refresh_from_db(using=using, fields=fields, from_queryset=from_queryset)
+        self._snapshot(fields)
+
+    def _snapshot(self, field_names=None):
+        if field_names is None:
+            fields = self._meta.concrete_fields
+        else:
+            fields = [field for field in map(self._meta.get_field, field_names) if field.concrete]
+        loaded = getattr(self, '_loaded_values', None)
+        if loaded is None or field_names is None:
+            loaded = self._loaded_values = {}
+        for field in fields:
+            value = self.__dict__.get(field.attname, DEFERRED)
+            if value is not DEFERRED:
+                loaded[field.attname] = value
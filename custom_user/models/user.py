@@ -1,17 +1,64 @@
-from django.db import models
+from django.db import IntegrityError, models, transaction
+from django.contrib.auth.hashers import make_password
 from django.contrib.auth.models import AbstractBaseUser, BaseUserManager, PermissionsMixin
+from django.db.models.functions import Lower
 from django.utils import timezone
 
+from .tracking import DirtyFieldsMixin
+
 
 class CustomUserManager(BaseUserManager):
+    def by_email(self, email):
+        """
+        Email bo'yicha katta-kichik harfni farqlamasdan qidirish. Shart `LOWER(email) = %s` ko'rinishida -
+        user_email_lower_uniq indeksidan foydalanadi (iexact LIKE/UPPER bilan to'liq skanerlaydi).
+        """
+        return self.get_queryset().alias(email_lower=Lower('email')).filter(email_lower=(email or '').lower())
+
+    def get_by_natural_key(self, username):
+        # ModelBackend (admin, djoser jwt/create) ham shu qidiruvdan o'tadi
+        return self.by_email(username).get()
+
     def create_user(self, email, password=None, **extra_fields):
         if not email:
             raise ValueError('The email must be set')
-        user = self.model(email=email, **extra_fields)
+        user = self.model(email=self.normalize_email(email), **extra_fields)
         user.set_password(password)
         user.save(using=self._db)
         return user
 
+    def register(self, email, password, **fields):
+        """
+        Ro'yxatdan o'tish: shu emailli aktivlashtirilmagan user bo'lsa o'sha qator qayta ishlatiladi
+        (id, bog'liq qatorlar saqlanadi), parol hashi va profil maydonlari yangilanadi.
+        Qaytaradi: (user, created). Email aktiv userga tegishli bo'lsa user o'zgartirilmasdan qaytariladi.
+        """
+        # Hashing (~0.3s) tranzaksiyadan tashqarida - qator shuncha vaqt qulflanib turmaydi
+        password_hash = make_password(password)
+        email = self.normalize_email(email)
+        for attempt in range(2):
+            try:
+                with transaction.atomic(using=self._db):
+                    user = self.by_email(email).select_for_update().first()
+                    if user is not None and user.is_active:
+                        return user, False
+                    created = user is None
+                    if created:
+                        user = self.model(is_active=False)
+                    # Qayta ro'yxatdan o'tishda oxirgi yozilgan ko'rinish saqlanadi (Foo@x.uz -> foo@x.uz)
+                    user.email = email
+                    for name, value in fields.items():
+                        setattr(user, name, value)
+                    user.password = password_hash
+                    # Retention tasdiqlanmagan qatorni shu vaqtdan hisoblaydi - qayta urinish o'chib ketmasin
+                    user.date_joined = timezone.now()
+                    user.save(using=self._db)
+                    return user, created
+            except IntegrityError:
+                # Parallel so'rov shu emailni birinchi bo'lib yaratdi - endi uning qatori yangilanadi
+                if attempt:
+                    raise
+
     def create_superuser(self, email, password=None, **extra_fields):
         extra_fields.setdefault('is_staff', True)
         extra_fields.setdefault('is_superuser', True)
@@ -21,7 +68,7 @@ class CustomUserManager(BaseUserManager):
             raise ValueError('Superuser must have is_superuser=True.')
         return self.create_user(email, password, **extra_fields)
 
-class CustomUser(AbstractBaseUser, PermissionsMixin):
+class CustomUser(DirtyFieldsMixin, AbstractBaseUser, PermissionsMixin):
     email = models.EmailField(unique=True, null=False)
     phone_number = models.CharField(max_length=15, null=True)
     full_name = models.CharField(max_length=30, null=True, blank=True)
@@ -42,6 +89,17 @@ class CustomUser(AbstractBaseUser, PermissionsMixin):
     USERNAME_FIELD = 'email'
     REQUIRED_FIELDS = []
 
+    class Meta:
+        constraints = [
+            # Foo@x.uz va foo@x.uz - bitta akkaunt; by_email() shu indeks bo'yicha qidiradi
+            models.UniqueConstraint(Lower('email'), name='user_email_lower_uniq'),
+        ]
+        indexes = [
+            # Reklama kampaniyalari faqat rozilik bergan userlarni id bo'yicha tartibda o'qiydi
+            models.Index(fields=['id'], condition=models.Q(promotional_notification=True),
+                         name='user_promo_optin_idx'),
+        ]
+
     def __str__(self):
         return self.email
 
@@ -0,0 +1,310 @@
+import cProfile
+import logging
+import os
+import pstats
+import random
+import re
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+from pathlib import Path
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core import signing
+from django.urls import Resolver404, resolve
+
+logger = logging.getLogger('custom_user.profiling')
+
+TOKEN_SALT = 'custom_user.profiling'
+
+_REQUEST_ID_RE = re.compile(r'^[A-Za-z0-9_-]{1,64}$')
+
+
+def get_config():
+    config = {
+        'ENABLED': False,
+        'SAMPLE_RATE': 0.0,
+        'HEADER': 'X-Profile-Token',
+        'MODE': 'cprofile',
+        'SAMPLE_INTERVAL': 0.005,
+        'OUTPUT_DIR': os.path.join(settings.BASE_DIR, 'var', 'profiles'),
+        'MAX_DISK_MB': 200,
+        'CPU_BUDGET_SECONDS': 10,
+        'CPU_BUDGET_WINDOW': 60,
+        'TOKEN_MAX_AGE': 3600,
+    }
+    config.update(getattr(settings, 'PROFILING', {}))
+    return config
+
+
+def make_profile_token(url_name='*'):
+    """
+    Header uchun imzolangan token. `url_name='*'` har qanday endpointga ruxsat beradi.
+    """
+    return signing.TimestampSigner(salt=TOKEN_SALT).sign(url_name)
+
+
+def check_profile_token(token, url_name, max_age):
+    try:
+        allowed = signing.TimestampSigner(salt=TOKEN_SALT).unsign(token, max_age=max_age)
+    except signing.BadSignature:
+        return False
+    return allowed in ('*', url_name)
+
+
+def _frame_label(code):
+    module = os.path.splitext(os.path.basename(code.co_filename))[0]
+    return f'{module}:{code.co_name}:{code.co_firstlineno}'
+
+
+def collapse_pstats(profile, max_depth=64, min_weight=1e-6):
+    """
+    cProfile natijasidan flamegraph uchun collapsed-stack qatorlarini yasaydi.
+    cProfile faqat caller->callee juftliklarini saqlaydi, shuning uchun har bir
+    funksiyaning o'z vaqti callerlar orasida ularning ulushiga qarab taqsimlanadi.
+    """
+    stats = pstats.Stats(profile).stats
+    labels = {func: f'{os.path.splitext(os.path.basename(func[0]))[0]}:{func[2]}:{func[1]}' for func in stats}
+    stacks = Counter()
+
+    def walk(func, path, weight, depth):
+        callers = stats[func][4]
+        if not callers or depth >= max_depth or weight < min_weight:
+            stacks[';'.join(reversed(path))] += weight
+            return
+        total = sum(caller_stats[3] for caller_stats in callers.values()) or len(callers)
+        for caller, caller_stats in callers.items():
+            share = (caller_stats[3] or 1) / total
+            if caller in stats and labels[caller] not in path:
+                walk(caller, path + [labels[caller]], weight * share, depth + 1)
+            else:
+                stacks[';'.join(reversed(path))] += weight * share
+
+    for func, (_, _, tottime, _, _) in stats.items():
+        if tottime > 0:
+            walk(func, [labels[func]], tottime, 0)
+
+    # collapsed format butun sonlarni kutadi - mikrosekundlarda yozamiz
+    return {stack: int(value * 1_000_000) for stack, value in stacks.items() if value >= min_weight}
+
+
+class StackSampler(threading.Thread):
+    """
+    Berilgan threadning stackini har `interval` sekundda oladi.
+    cProfile'ga qaraganda overhead ancha past, natija faqat collapsed-stack.
+    """
+
+    def __init__(self, thread_id, interval, max_duration):
+        super().__init__(daemon=True)
+        self.thread_id = thread_id
+        self.interval = interval
+        self.max_duration = max_duration
+        self.stacks = Counter()
+        # Samplerning o'z CPU vaqti - profil budjetiga qo'shiladi
+        self.cpu_seconds = 0.0
+        self._stop_event = threading.Event()
+
+    def run(self):
+        cpu_start = time.thread_time()
+        deadline = time.monotonic() + self.max_duration
+        try:
+            while not self._stop_event.wait(self.interval) and time.monotonic() < deadline:
+                frame = sys._current_frames().get(self.thread_id)
+                path = []
+                while frame is not None:
+                    path.append(_frame_label(frame.f_code))
+                    frame = frame.f_back
+                if path:
+                    self.stacks[';'.join(reversed(path))] += 1
+        finally:
+            self.cpu_seconds = time.thread_time() - cpu_start
+
+    def stop(self):
+        self._stop_event.set()
+        self.join()
+
+
+class ProfilingBudget:
+    """
+    Profil qilingan so'rovlar sarflaydigan CPU vaqtiga oynali limit.
+    Bir vaqtda faqat bitta so'rov profil qilinadi.
+    """
+
+    def __init__(self, seconds, window):
+        self.seconds = seconds
+        self.window = window
+        self._lock = threading.Lock()
+        self._active = threading.Lock()
+        self._window_start = time.monotonic()
+        self._spent = 0.0
+
+    def acquire(self):
+        with self._lock:
+            now = time.monotonic()
+            if now - self._window_start >= self.window:
+                self._window_start = now
+                self._spent = 0.0
+            if self._spent >= self.seconds:
+                return False
+        return self._active.acquire(blocking=False)
+
+    def release(self, cpu_seconds):
+        with self._lock:
+            self._spent += cpu_seconds
+        self._active.release()
+
+    @property
+    def remaining(self):
+        with self._lock:
+            return max(self.seconds - self._spent, 0.0)
+
+
+def enforce_disk_cap(output_dir, max_bytes):
+    files = [path for path in Path(output_dir).rglob('*') if path.is_file()]
+    files.sort(key=lambda path: path.stat().st_mtime)
+    total = sum(path.stat().st_size for path in files)
+
+    while files and total > max_bytes:
+        oldest = files.pop(0)
+        total -= oldest.stat().st_size
+        oldest.unlink(missing_ok=True)
+
+
+def write_collapsed(path, stacks):
+    with open(path, 'w') as fh:
+        for stack, value in sorted(stacks.items()):
+            fh.write(f'{stack} {value}\n')
+
+
+class ProfilingMiddleware:
+    """
+    Imzolangan header kelganda yoki SAMPLE_RATE bo'yicha so'rovni profil qiladi
+    va natijani `<OUTPUT_DIR>/<url_name>/<request_id>.prof|.collapsed` ga yozadi.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.config = get_config()
+        self.budget = ProfilingBudget(self.config['CPU_BUDGET_SECONDS'], self.config['CPU_BUDGET_WINDOW'])
+        self.header = 'HTTP_' + self.config['HEADER'].upper().replace('-', '_')
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        if not self.config['ENABLED'] or not self.should_profile(request):
+            return self.get_response(request)
+
+        if not self.budget.acquire():
+            logger.info('Profiling budget exhausted, skipping %s', request.path_info)
+            return self.get_response(request)
+
+        request_id = self.request_id(request)
+        cpu_start = time.thread_time()
+        profiler = sampler = response = None
+        try:
+            if self.config['MODE'] == 'sample':
+                sampler = StackSampler(
+                    threading.get_ident(), self.config['SAMPLE_INTERVAL'], self.budget.remaining or 1,
+                )
+                sampler.start()
+                response = self.get_response(request)
+            else:
+                profiler = cProfile.Profile()
+                response = profiler.runcall(self.get_response, request)
+        finally:
+            if sampler is not None:
+                sampler.stop()
+            self.finish(request, request_id, profiler, sampler, cpu_start, response is not None)
+
+        response['X-Profile-Id'] = request_id
+        return response
+
+    async def __acall__(self, request):
+        """
+        Async rejimda profil event loop threadini kuzatadi - shu vaqtda parallel ishlagan
+        boshqa so'rovlar ham profilga tushadi. Budjet bir vaqtda bittadan profilga ruxsat beradi.
+        """
+        if not self.config['ENABLED'] or not self.should_profile(request):
+            return await self.get_response(request)
+
+        if not self.budget.acquire():
+            logger.info('Profiling budget exhausted, skipping %s', request.path_info)
+            return await self.get_response(request)
+
+        request_id = self.request_id(request)
+        cpu_start = time.thread_time()
+        profiler = sampler = response = None
+        try:
+            if self.config['MODE'] == 'sample':
+                sampler = StackSampler(
+                    threading.get_ident(), self.config['SAMPLE_INTERVAL'], self.budget.remaining or 1,
+                )
+                sampler.start()
+            else:
+                profiler = cProfile.Profile()
+                profiler.enable()
+            response = await self.get_response(request)
+        finally:
+            if sampler is not None:
+                sampler.stop()
+            if profiler is not None:
+                profiler.disable()
+            self.finish(request, request_id, profiler, sampler, cpu_start, response is not None)
+
+        response['X-Profile-Id'] = request_id
+        return response
+
+    @staticmethod
+    def request_id(request):
+        request_id = request.META.get('HTTP_X_REQUEST_ID', '')
+        if not _REQUEST_ID_RE.match(request_id):
+            request_id = uuid.uuid4().hex
+        return request_id
+
+    def should_profile(self, request):
+        token = request.META.get(self.header)
+        if token:
+            try:
+                url_name = resolve(request.path_info).url_name
+            except Resolver404:
+                return False
+            return check_profile_token(token, url_name, self.config['TOKEN_MAX_AGE'])
+
+        return self.config['SAMPLE_RATE'] > 0 and random.random() < self.config['SAMPLE_RATE']
+
+    def finish(self, request, request_id, profiler, sampler, cpu_start, completed):
+        # Budjetga profilni yozish (collapse_pstats butun chaqiruv grafini aylanadi, disk) va
+        # sampler threadining CPU vaqti ham kiradi - release() eng oxirida
+        try:
+            if completed:
+                self.dump(request, request_id, profiler, sampler)
+        finally:
+            spent = time.thread_time() - cpu_start
+            if sampler is not None:
+                spent += sampler.cpu_seconds
+            self.budget.release(spent)
+
+    def dump(self, request, request_id, profiler, sampler):
+        match = request.resolver_match
+        url_name = (match.url_name if match else None) or 'unresolved'
+        output_dir = Path(self.config['OUTPUT_DIR'])
+        target = output_dir / url_name / request_id
+
+        try:
+            target.parent.mkdir(parents=True, exist_ok=True)
+            if profiler is not None:
+                profiler.dump_stats(f'{target}.prof')
+                write_collapsed(f'{target}.collapsed', collapse_pstats(profiler))
+            else:
+                write_collapsed(f'{target}.collapsed', sampler.stacks)
+            enforce_disk_cap(output_dir, self.config['MAX_DISK_MB'] * 1024 * 1024)
+        except OSError:
+            logger.exception('Could not write profile for %s', request.path_info)
@@ -0,0 +1,347 @@
+import atexit
+import json
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import requests
+from django.conf import settings
+from django.db import connection, transaction
+from django.utils import timezone
+from requests.adapters import HTTPAdapter
+
+from custom_user.models import Device, PushDelivery
+
+logger = logging.getLogger('custom_user.push')
+
+# Gateway javobidagi status -> PushDelivery.status
+GATEWAY_STATUSES = {
+    'ok': PushDelivery.STATUS_SENT,
+    'invalid': PushDelivery.STATUS_INVALID,
+}
+
+STATUS_NAMES = {
+    PushDelivery.STATUS_SENT: 'sent',
+    PushDelivery.STATUS_FAILED: 'failed',
+    PushDelivery.STATUS_INVALID: 'invalid',
+}
+
+# PositiveSmallIntegerField chegarasi
+MAX_COALESCED = 32767
+
+
+def get_config():
+    config = {
+        'GATEWAY_URL': '',
+        # Shu oyna ichida bitta qurilmaga kelgan bildirishnomalar bitta push bo'lib ketadi
+        'WINDOW': 1.0,
+        # Bitta gateway so'rovidagi xabarlar
+        'BATCH_SIZE': 500,
+        # Parallel gateway so'rovlari = HTTP pool hajmi
+        'WORKERS': 4,
+        'TIMEOUT': 5.0,
+        'RETRIES': 2,
+        'RETRY_DELAY': 0.5,
+    }
+    config.update(getattr(settings, 'PUSH', {}))
+    return config
+
+
+class PushGateway:
+    """
+    Push gateway HTTP klienti, ulanishlar pool'da ochiq turadi (keep-alive).
+
+    Protokol: POST GATEWAY_URL {"messages": [{"token", "title", "body", "data", "badge"}]}
+    -> {"results": [{"status": "ok" | "invalid" | "error"}]} - xabarlar tartibida.
+    """
+
+    def __init__(self, url, timeout=5.0, pool_size=4):
+        if not url:
+            raise ValueError('PUSH["GATEWAY_URL"] is not configured')
+        self.url = url
+        self.timeout = timeout
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+
+    def send(self, messages):
+        response = self.session.post(self.url, json={'messages': messages}, timeout=self.timeout)
+        response.raise_for_status()
+        return [item.get('status', 'error') for item in response.json()['results']]
+
+    def close(self):
+        self.session.close()
+
+
+class _Pending:
+    __slots__ = ('token', 'title', 'body', 'data', 'count')
+
+    def __init__(self, token, title, body, data):
+        self.token = token
+        self.title = title
+        self.body = body
+        self.data = dict(data or {})
+        self.count = 1
+
+    def merge(self, token, title, body, data):
+        # Oxirgi sarlavha/matn qoladi, data birlashadi, badge - nechta bildirishnoma kelgani
+        self.token = token
+        self.title = title
+        self.body = body
+        self.data.update(data or {})
+        self.count += 1
+
+    def message(self):
+        return {'token': self.token, 'title': self.title, 'body': self.body, 'data': self.data, 'badge': self.count}
+
+
+class PushDispatcher:
+    """
+    Qurilmalarga push yuboradi. notify() faqat navbatga qo'yadi: bir qurilmaga WINDOW ichida
+    kelgan bildirishnomalar bitta xabarga birlashadi. Fon thread har WINDOW da flush() qiladi:
+    xabarlar BATCH_SIZE dan bo'lib WORKERS ta parallel so'rov bilan gateway'ga ketadi, natija
+    bitta bulk_create bilan PushDelivery'ga yoziladi, o'lik tokenlar bitta UPDATE bilan o'chiriladi.
+
+    Navbat xotirada - jarayon o'lsa oynadagi (WINDOW sekundlik) bildirishnomalar yo'qoladi.
+    """
+
+    def __init__(self, gateway=None, **options):
+        self.options = {**get_config(), **{name.upper(): value for name, value in options.items()}}
+        self.gateway = gateway or PushGateway(
+            self.options['GATEWAY_URL'], self.options['TIMEOUT'], self.options['WORKERS'],
+        )
+        self._pool = ThreadPoolExecutor(max_workers=self.options['WORKERS'], thread_name_prefix='push')
+        self._pending = {}
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        self.stats = {'queued': 0, 'sent': 0, 'failed': 0, 'invalid': 0, 'requests': 0}
+
+    def notify(self, users, title, body, data=None):
+        """
+        `users` - user id lar yoki queryset. Push tokeni bor aktiv qurilmalar bitta so'rov bilan olinadi.
+        """
+        devices = Device.objects.filter(
+            user_id__in=users, is_active=True, push_token__isnull=False,
+        ).values_list('pk', 'push_token')
+        return self.enqueue(devices, title, body, data)
+
+    def enqueue(self, devices, title, body, data=None):
+        """
+        `devices` - (device_id, push_token) juftliklari.
+        """
+        count = 0
+        with self._lock:
+            for device_id, token in devices:
+                item = self._pending.get(device_id)
+                if item is None:
+                    self._pending[device_id] = _Pending(token, title, body, data)
+                else:
+                    item.merge(token, title, body, data)
+                count += 1
+            self.stats['queued'] += count
+        self._ensure_running()
+        return count
+
+    def flush(self):
+        """
+        Navbatdagi hamma xabarni hozir yuboradi. Qaytaradi: {'sent', 'failed', 'invalid'}.
+        """
+        with self._flush_lock:
+            with self._lock:
+                pending, self._pending = self._pending, {}
+            statuses = self.deliver(list(pending.items()))
+        return {name: statuses.count(status) for status, name in STATUS_NAMES.items()}
+
+    def deliver(self, items):
+        """
+        `items` - (device_id, _Pending) ro'yxati; navbatni chetlab darhol yuboradi.
+        Har bir xabar uchun PushDelivery.status qaytaradi.
+        """
+        if not items:
+            return []
+
+        size = self.options['BATCH_SIZE']
+        batches = [items[start:start + size] for start in range(0, len(items), size)]
+        statuses = []
+        for batch in self._pool.map(self._send, batches):
+            statuses.extend(GATEWAY_STATUSES.get(status, PushDelivery.STATUS_FAILED) for status in batch)
+
+        self.record([(device_id, status, min(item.count, MAX_COALESCED))
+                     for (device_id, item), status in zip(items, statuses)])
+        self.prune([item.token for (_, item), status in zip(items, statuses)
+                    if status == PushDelivery.STATUS_INVALID])
+        with self._lock:
+            for status, name in STATUS_NAMES.items():
+                self.stats[name] += statuses.count(status)
+            self.stats['requests'] += len(batches)
+        return statuses
+
+    def record(self, rows):
+        # bulk_create 20k obyekt uchun model instance + har bir maydonni tayyorlashga flush vaqtining
+        # ko'pini sarflaydi; qatorlar tayyor tuple bo'lgani uchun to'g'ridan-to'g'ri executemany
+        if not rows:
+            return
+        now = connection.ops.adapt_datetimefield_value(timezone.now())
+        sql = (f'INSERT INTO {connection.ops.quote_name(PushDelivery._meta.db_table)} '
+               f'(device_id, status, coalesced, created_at) VALUES (%s, %s, %s, %s)')
+        with transaction.atomic(), connection.cursor() as cursor:
+            cursor.executemany(sql, [(*row, now) for row in rows])
+
+    def prune(self, tokens):
+        # Token boshqa qurilmaga o'tgan bo'lsa ham faqat shu token o'chadi
+        for start in range(0, len(tokens), 500):
+            Device.objects.filter(push_token__in=tokens[start:start + 500]).update(push_token=None)
+
+    def _send(self, batch):
+        messages = [item.message() for _, item in batch]
+        retries = self.options['RETRIES']
+        for attempt in range(retries + 1):
+            try:
+                statuses = self.gateway.send(messages)
+                if len(statuses) != len(messages):
+                    raise ValueError(f'Gateway returned {len(statuses)} results for {len(messages)} messages')
+                return statuses
+            except Exception:
+                if attempt == retries:
+                    logger.exception('Push batch of %s messages failed', len(messages))
+                    return ['error'] * len(messages)
+                time.sleep(self.options['RETRY_DELAY'] * 2 ** attempt)
+
+    def _ensure_running(self):
+        if self._thread is not None or self._stop.is_set():
+            return
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name='push-flusher', daemon=True)
+                self._thread.start()
+
+    def _run(self):
+        while not self._stop.wait(self.options['WINDOW']):
+            try:
+                self.flush()
+            except Exception:
+                logger.exception('Push flush failed')
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        self.flush()
+        self._pool.shutdown()
+        self.gateway.close()
+
+
+_dispatcher = None
+_dispatcher_lock = threading.Lock()
+
+
+def get_dispatcher():
+    global _dispatcher
+    if _dispatcher is None:
+        with _dispatcher_lock:
+            if _dispatcher is None:
+                _dispatcher = PushDispatcher()
+                atexit.register(_dispatcher.stop)
+    return _dispatcher
+
+
+def notify(users, title, body, data=None):
+    return get_dispatcher().notify(users, title, body, data)
+
+
+class PushSender:
+    """
+    Kampaniya uchun (SENDERS['push']): batchdagi userlarning qurilmalariga darhol yuboradi.
+    Kamida bitta qurilmasiga yetib borgan user yuborilgan hisoblanadi. Batchdagi hamma xabar
+    yetmasa (gateway xatosi) exception - CampaignDispatcher uni qayta urinadi va pauza qiladi.
+    """
+
+    def __init__(self, dispatcher=None):
+        self.dispatcher = dispatcher or PushDispatcher()
+
+    def send(self, message, recipients):
+        devices = Device.objects.filter(
+            user_id__in=[recipient.pk for recipient in recipients], is_active=True, push_token__isnull=False,
+        ).values_list('pk', 'user_id', 'push_token')
+        owners = {}
+        items = []
+        for device_id, user_id, token in devices:
+            owners[device_id] = user_id
+            items.append((device_id, _Pending(token, message.subject, message.body, None)))
+        statuses = self.dispatcher.deliver(items)
+        if items and all(status == PushDelivery.STATUS_FAILED for status in statuses):
+            # Gateway ishlamayapti - kampaniya batchni qayta urinadi, keyin `paused` bo'ladi
+            raise ConnectionError(f'Push gateway failed for all {len(items)} messages')
+        return len({owners[device_id] for (device_id, _), status in zip(items, statuses)
+                    if status == PushDelivery.STATUS_SENT})
+
+    def close(self):
+        self.dispatcher.stop()
+
+
+DEAD_TOKEN_PREFIX = 'dead-'
+
+
+class _GatewayHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def do_POST(self):
+        payload = json.loads(self.rfile.read(int(self.headers.get('Content-Length', 0))))
+        if self.server.latency:
+            time.sleep(self.server.latency)
+        results = [
+            {'status': 'invalid' if message['token'].startswith(DEAD_TOKEN_PREFIX) else 'ok'}
+            for message in payload['messages']
+        ]
+        self.server.record(len(results))
+        body = json.dumps({'results': results}).encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class LocalGateway(ThreadingHTTPServer):
+    """
+    Haqiqiy push gateway o'rnida (benchmark va yuklama sinovi): PushGateway protokoli bo'yicha
+    javob beradi, `dead-` bilan boshlanadigan tokenlarga 'invalid' qaytaradi.
+    `latency` - har bir so'rovga kechikish (sekund).
+    """
+
+    daemon_threads = True
+
+    def __init__(self, host='127.0.0.1', port=0, latency=0.0):
+        super().__init__((host, port), _GatewayHandler)
+        self.latency = latency
+        self.messages = 0
+        self.requests = 0
+        self._stats_lock = threading.Lock()
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self.server_address[:2]
+        return f'http://{host}:{port}/send'
+
+    def record(self, count):
+        with self._stats_lock:
+            self.messages += count
+            self.requests += 1
+
+    def start(self):
+        self._thread = threading.Thread(target=self.serve_forever, name='local-push-gateway', daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
@@ -0,0 +1,235 @@
+import atexit
+import json
+import logging
+import os
+import re
+import threading
+import time
+from contextvars import ContextVar
+from pathlib import Path
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+
+logger = logging.getLogger('custom_user.querylog')
+
+_current_view = ContextVar('querylog_view', default='-')
+_explaining = threading.local()
+
+_STRING_RE = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_RE = re.compile(r"\b\d+(?:\.\d+)?\b")
+_PLACEHOLDER_RE = re.compile(r"%s|\?")
+_IN_LIST_RE = re.compile(r"\bIN\s*\(\s*\?(?:\s*,\s*\?)*\s*\)", re.IGNORECASE)
+_VALUES_RE = re.compile(r"\bVALUES\s*\(.*\)", re.IGNORECASE | re.DOTALL)
+_SPACE_RE = re.compile(r"\s+")
+
+
+def get_config():
+    config = {
+        'ENABLED': False,
+        'SLOW_THRESHOLD_MS': 100,
+        'EXPLAIN': True,
+        'STATS_DIR': os.path.join(settings.BASE_DIR, 'var', 'querylog'),
+        'FLUSH_INTERVAL': 30,
+    }
+    config.update(getattr(settings, 'QUERY_LOG', {}))
+    return config
+
+
+def fingerprint(sql):
+    """
+    SQL'ni literallarsiz normal ko'rinishga keltiradi:
+    `WHERE id = 5` va `WHERE id = 7` bitta fingerprint beradi.
+    """
+    sql = _STRING_RE.sub('?', sql)
+    sql = _NUMBER_RE.sub('?', sql)
+    sql = _PLACEHOLDER_RE.sub('?', sql)
+    sql = _IN_LIST_RE.sub('IN (...)', sql)
+    sql = _VALUES_RE.sub('VALUES (...)', sql)
+    return _SPACE_RE.sub(' ', sql).strip()
+
+
+class QueryStats:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._data = {}
+        self._last_flush = time.monotonic()
+
+    def record(self, sql, duration_ms, view):
+        key = fingerprint(sql)
+
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                entry = self._data[key] = {
+                    'count': 0, 'total_ms': 0.0, 'max_ms': 0.0,
+                    'sample': sql[:1000], 'views': {},
+                }
+            entry['count'] += 1
+            entry['total_ms'] += duration_ms
+            entry['max_ms'] = max(entry['max_ms'], duration_ms)
+
+            per_view = entry['views'].setdefault(view, [0, 0.0, 0.0])
+            per_view[0] += 1
+            per_view[1] += duration_ms
+            per_view[2] = max(per_view[2], duration_ms)
+
+    def snapshot(self):
+        with self._lock:
+            return json.loads(json.dumps(self._data))
+
+    def reset(self):
+        with self._lock:
+            self._data.clear()
+
+    def maybe_flush(self, interval):
+        if time.monotonic() - self._last_flush >= interval:
+            self.flush()
+
+    def flush(self):
+        self._last_flush = time.monotonic()
+        stats_dir = Path(get_config()['STATS_DIR'])
+        try:
+            stats_dir.mkdir(parents=True, exist_ok=True)
+            path = stats_dir / f'{os.getpid()}.json'
+            tmp_path = path.with_suffix('.tmp')
+            tmp_path.write_text(json.dumps(self.snapshot()))
+            os.replace(tmp_path, path)
+        except OSError:
+            logger.exception('Query stats could not be flushed to %s', stats_dir)
+
+
+stats = QueryStats()
+atexit.register(lambda: stats.flush() if get_config()['ENABLED'] else None)
+
+
+def merge_stats(snapshots):
+    merged = {}
+    for snapshot in snapshots:
+        for key, entry in snapshot.items():
+            target = merged.setdefault(key, {
+                'count': 0, 'total_ms': 0.0, 'max_ms': 0.0,
+                'sample': entry['sample'], 'views': {},
+            })
+            target['count'] += entry['count']
+            target['total_ms'] += entry['total_ms']
+            target['max_ms'] = max(target['max_ms'], entry['max_ms'])
+
+            for view, (count, total_ms, max_ms) in entry['views'].items():
+                per_view = target['views'].setdefault(view, [0, 0.0, 0.0])
+                per_view[0] += count
+                per_view[1] += total_ms
+                per_view[2] = max(per_view[2], max_ms)
+    return merged
+
+
+def load_stats():
+    stats_dir = Path(get_config()['STATS_DIR'])
+    snapshots = []
+    for path in sorted(stats_dir.glob('*.json')):
+        try:
+            snapshots.append(json.loads(path.read_text()))
+        except (OSError, ValueError):
+            logger.warning('Skipping unreadable query stats file %s', path)
+    return merge_stats(snapshots)
+
+
+def explain(connection, sql, params):
+    if not sql.lstrip().upper().startswith('SELECT'):
+        return None
+
+    _explaining.active = True
+    try:
+        prefix = connection.ops.explain_query_prefix()
+        # create_cursor() backend cursorini beradi - execute_wrappers qayta ishga tushmaydi
+        cursor = connection.create_cursor()
+        try:
+            cursor.execute(f'{prefix} {sql}', params)
+            return '\n'.join(' '.join(str(col) for col in row) for row in cursor.fetchall())
+        finally:
+            cursor.close()
+    except Exception:
+        logger.debug('EXPLAIN failed for %s', sql, exc_info=True)
+        return None
+    finally:
+        _explaining.active = False
+
+
+class QueryLogger:
+    """
+    `connection.execute_wrapper` sifatida ishlaydi: har bir so'rov vaqtini o'lchaydi,
+    fingerprint va view bo'yicha yig'adi, sekin so'rovlarni EXPLAIN bilan log qiladi.
+    """
+
+    def __init__(self, config=None):
+        self.config = config or get_config()
+
+    def __call__(self, execute, sql, params, many, context):
+        if getattr(_explaining, 'active', False):
+            return execute(sql, params, many, context)
+
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            duration_ms = (time.perf_counter() - start) * 1000
+            view = _current_view.get()
+            stats.record(sql, duration_ms, view)
+
+            if duration_ms >= self.config['SLOW_THRESHOLD_MS']:
+                plan = None
+                if self.config['EXPLAIN'] and not many:
+                    plan = explain(context['connection'], sql, params)
+                logger.warning(
+                    'Slow query %.1fms view=%s fingerprint=%s\nplan:\n%s',
+                    duration_ms, view, fingerprint(sql), plan or '-',
+                )
+
+            stats.maybe_flush(self.config['FLUSH_INTERVAL'])
+
+
+def install_query_logger(sender, connection, **kwargs):
+    if not any(isinstance(wrapper, QueryLogger) for wrapper in connection.execute_wrappers):
+        connection.execute_wrappers.append(QueryLogger())
+
+
+class QueryLogMiddleware:
+    """
+    So'rovlarni chaqirgan view nomini QueryLogger uchun belgilab qo'yadi.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+            # ASGI'da sync process_view har so'rovda threadga o'tkaziladi
+            self.process_view = self.aprocess_view
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        token = _current_view.set(request.path_info)
+        try:
+            return self.get_response(request)
+        finally:
+            _current_view.reset(token)
+
+    async def __acall__(self, request):
+        token = _current_view.set(request.path_info)
+        try:
+            return await self.get_response(request)
+        finally:
+            _current_view.reset(token)
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        _set_view(request, view_func)
+
+    async def aprocess_view(self, request, view_func, view_args, view_kwargs):
+        _set_view(request, view_func)
+
+
+def _set_view(request, view_func):
+    match = request.resolver_match
+    _current_view.set(match.view_name if match and match.view_name else view_func.__name__)
@@ -0,0 +1,130 @@
+import logging
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import router, transaction
+from django.db.models import Exists, Max, OuterRef
+from django.utils import timezone
+from rest_framework_simplejwt.settings import api_settings
+
+from custom_user.models import Address, Card, Device
+from custom_user.revocation import device_member, revoke_durably
+
+logger = logging.getLogger('custom_user.retention')
+
+User = get_user_model()
+
+
+def get_config():
+    config = {
+        # Emailini tasdiqlamagan (hech kirmagan) user shuncha soatdan keyin o'chiriladi; 0 yoki None - o'chirmaslik
+        'INACTIVE_USER_HOURS': 48,
+        # Shuncha kun kirmagan qurilma o'chiriladi; 0 yoki None - o'chirmaslik
+        'DEVICE_IDLE_DAYS': 90,
+        # Bitta tranzaksiya ko'rib chiqadigan id oralig'idagi qatorlar
+        'CHUNK_SIZE': 500,
+        # O'chirgan har bir chunk'dan keyin pauza (sekund) - replikatsiya va boshqa yozuvlarga navbat
+        'PAUSE': 0.05,
+    }
+    config.update(getattr(settings, 'RETENTION', {}))
+    return config
+
+
+def abandoned_users(cutoff):
+    # is_active=False va last_login bo'sh - ro'yxatdan o'tib tasdiqlamagan; bloklangan akkauntlarga tegmaydi.
+    # Qurilma, karta yoki manzil faqat verify bergan token bilan paydo bo'ladi - bunday user tasdiqlagan
+    # (verify akkauntni aktivlashtirmagan davrdan qolgan qatorlar)
+    return User.objects.filter(
+        is_active=False, is_staff=False, last_login__isnull=True, date_joined__lt=cutoff,
+    ).exclude(
+        Exists(Device.objects.filter(user=OuterRef('pk')))
+        | Exists(Card.objects.filter(user=OuterRef('pk')))
+        | Exists(Address.objects.filter(user=OuterRef('pk')))
+    )
+
+
+def idle_devices(cutoff):
+    return Device.objects.filter(last_online__lt=cutoff)
+
+
+class RetentionPurge:
+    """
+    Eskirgan qatorlarni id oralig'i bo'yicha bo'laklab o'chiradi. Har bir bo'lak - (cursor, upper]
+    oralig'idagi CHUNK_SIZE ta qator (chegara PK indeksidan olinadi, jadval skanerlanmaydi) va alohida
+    qisqa tranzaksiya: nomzodlar select_for_update bilan olinadi va shu tranzaksiyada id bo'yicha o'chiriladi,
+    ya'ni orada kirgan/tasdiqlangan qator o'chmaydi. Bo'laklar orasida PAUSE - uzoq qulf va yuklama yo'q,
+    eng ko'p ishlaydigan soatlarda ham ishga tushirsa bo'ladi.
+
+    Ishga tushgandagi eng katta id'dan keyingi qatorlar ko'rilmaydi - ular baribir yangi.
+    """
+
+    def __init__(self, **options):
+        self.options = {**get_config(), **{name.upper(): value for name, value in options.items()}}
+        self.stats = {'users': 0, 'devices': 0, 'chunks': 0, 'revoked': 0}
+
+    def run(self, dry_run=False):
+        now = timezone.now()
+        hours, days = self.options['INACTIVE_USER_HOURS'], self.options['DEVICE_IDLE_DAYS']
+        if days:
+            # Qurilmalar avval: user o'chganda ularni CASCADE baribir o'chiradi
+            self.stats['devices'] += self.purge(
+                idle_devices(now - timedelta(days=days)), self._delete_devices, dry_run,
+            )
+        if hours:
+            self.stats['users'] += self.purge(
+                abandoned_users(now - timedelta(hours=hours)), self._delete_users, dry_run,
+            )
+        return self.stats
+
+    def purge(self, queryset, delete, dry_run=False):
+        model = queryset.model
+        db = router.db_for_write(model)
+        last_pk = model.objects.using(db).aggregate(last=Max('pk'))['last']
+        if last_pk is None:
+            return 0
+        size = self.options['CHUNK_SIZE']
+        cursor = removed = 0
+        while cursor < last_pk:
+            # Bo'lakning yuqori chegarasi - PK indeksidagi CHUNK_SIZE-chi id
+            bound = list(model.objects.using(db).filter(pk__gt=cursor).order_by('pk')
+                         .values_list('pk', flat=True)[size - 1:size])
+            upper = min(bound[0], last_pk) if bound else last_pk
+            chunk = queryset.using(db).filter(pk__gt=cursor, pk__lte=upper)
+            if dry_run:
+                count = chunk.count()
+            else:
+                with transaction.atomic(using=db):
+                    count = delete(db, list(chunk.select_for_update().order_by('pk')))
+            self.stats['chunks'] += 1
+            removed += count
+            cursor = upper
+            if count and not dry_run and self.options['PAUSE']:
+                time.sleep(self.options['PAUSE'])
+        logger.info('Retention purged %s %s rows', removed, model._meta.model_name)
+        return removed
+
+    def _delete_users(self, db, users):
+        if not users:
+            return 0
+        # Collector: kartalar, manzillar, qurilmalar, guruh/ruxsat bog'lanishlari ham shu tranzaksiyada
+        User.objects.using(db).filter(pk__in=[user.pk for user in users]).delete()
+        return len(users)
+
+    def _delete_devices(self, db, devices):
+        if not devices:
+            return 0
+        Device.objects.using(db).filter(pk__in=[device.pk for device in devices]).delete()
+        # Qurilma tokenlari hali amal qilishi mumkin bo'lsa (IDLE_DAYS token muddatidan qisqa) bekor qilamiz
+        lifetime = max(api_settings.ACCESS_TOKEN_LIFETIME, api_settings.REFRESH_TOKEN_LIFETIME)
+        if timedelta(days=self.options['DEVICE_IDLE_DAYS']) < lifetime:
+            # Butun bo'lak bitta revoke() - bitta Redis pipeline
+            entries = [(device_member(device.user_id, device.device_hardware), lifetime.total_seconds())
+                       for device in devices if device.device_hardware]
+            transaction.on_commit(lambda: self._revoke(entries), using=db)
+        return len(devices)
+
+    def _revoke(self, entries):
+        # Bo'lak commit bo'lgan - Redis ishlamasa bekor qilish navbatga yoziladi, purge to'xtamaydi
+        self.stats['revoked'] += revoke_durably(entries)
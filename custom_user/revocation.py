@@ -0,0 +1,394 @@
+import hashlib
+import logging
+import math
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django_redis.cache import RedisCache
+from redis.exceptions import WatchError
+from rest_framework_simplejwt.settings import api_settings
+
+logger = logging.getLogger('custom_user.revocation')
+
+# Qurilma tokenining aniq (sekund ulushlari bilan) berilgan vaqti: `iat` butun sekund, shu sekundda
+# o'chirilib qayta login qilingan qurilmaning yangi tokeni eski tokenlar bilan birga bekor bo'lmasin
+DEVICE_ISSUED_CLAIM = 'device_iat'
+
+
+def get_config():
+    config = {
+        'KEY': 'revoked_tokens',
+        # Har bir worker Redis'dagi versiyani shuncha sekundda bir tekshiradi: bekor qilingan token
+        # boshqa workerlarda ko'pi bilan shuncha vaqt o'tadi
+        'SYNC_INTERVAL': 1.0,
+        # Bloom filter hajmi va false positive ulushi; positive javob Redis'da aniq tekshiriladi
+        'CAPACITY': 100_000,
+        'ERROR_RATE': 0.001,
+        # Muddati o'tgan a'zolar setdan shuncha sekundda bir tozalanadi
+        'PURGE_INTERVAL': 300,
+        'CONFIRM_CACHE': 10_000,
+    }
+    config.update(getattr(settings, 'TOKEN_REVOCATION', {}))
+    return config
+
+
+def token_member(jti):
+    return f'j:{jti}'
+
+
+def device_member(user_id, device_hardware):
+    return f'd:{user_id}:{device_hardware}'
+
+
+def stamp_device(token, device_hardware):
+    """
+    Tokenni qurilmaga bog'laydi. Access token refresh'dan yaratilganda ikkala claim ham ko'chadi.
+    """
+    token['device_hardware'] = device_hardware
+    token[DEVICE_ISSUED_CLAIM] = time.time()
+    return token
+
+
+def device_entries(user_id, device_hardwares):
+    # Refresh token ham qurilmaga bog'langan - a'zo eng uzun token muddati davomida saqlanadi
+    ttl = max(api_settings.ACCESS_TOKEN_LIFETIME, api_settings.REFRESH_TOKEN_LIFETIME).total_seconds()
+    return [(device_member(user_id, hardware), ttl) for hardware in device_hardwares if hardware]
+
+
+class BloomFilter:
+    """
+    `capacity` ta element uchun `error_rate` false positive. k ta pozitsiya bitta blake2b
+    hashidan (double hashing) olinadi.
+    """
+
+    def __init__(self, capacity, error_rate):
+        capacity = max(capacity, 1)
+        self.size = max(math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2), 8)
+        self.hashes = max(round(self.size / capacity * math.log(2)), 1)
+        self.bits = bytearray((self.size + 7) // 8)
+
+    def _positions(self, item):
+        digest = hashlib.blake2b(item.encode(), digest_size=16).digest()
+        first = int.from_bytes(digest[:8], 'little')
+        second = int.from_bytes(digest[8:], 'little') | 1
+        size = self.size
+        for index in range(self.hashes):
+            yield (first + index * second) % size
+
+    def add(self, item):
+        for position in self._positions(item):
+            self.bits[position >> 3] |= 1 << (position & 7)
+
+    def __contains__(self, item):
+        # Yo'q element odatda birinchi bir-ikki bitdayoq aniqlanadi
+        bits = self.bits
+        for position in self._positions(item):
+            if not bits[position >> 3] & (1 << (position & 7)):
+                return False
+        return True
+
+
+class RedisStore:
+    """
+    Redis set (a'zolar ro'yxati) + har bir a'zo uchun TTL'li kalit (qiymati - bekor qilingan vaqt).
+    Set va jurnal faqat Bloom filterni qurish uchun; a'zo kalitining muddati o'tsa u bekor qilinmagan hisoblanadi.
+    Jurnal - sorted set (a'zo -> u qo'shilgan versiya): workerlar faqat o'zidan keyingi a'zolarni o'qiydi.
+    Amallar ResilientClient breakeri orqali: Redis o'chganda socket timeout kutilmaydi.
+    """
+
+    def __init__(self, backend, key):
+        self.backend = backend
+        self.set_key = backend.make_key(key)
+        self.version_key = backend.make_key(f'{key}:version')
+        self.journal_key = backend.make_key(f'{key}:journal')
+        self.member_prefix = backend.make_key(f'{key}:')
+
+    def _call(self, operation):
+        client = self.backend.client
+        if hasattr(client, 'guarded'):
+            return client.guarded(operation, None, client.get_client(write=True))
+        return operation(client.get_client(write=True))
+
+    def version(self):
+        return int(self._call(lambda redis: redis.get(self.version_key)) or 0)
+
+    def members(self):
+        return self._call(lambda redis: [member.decode() for member in redis.smembers(self.set_key)])
+
+    def changes(self, since):
+        return self._call(lambda redis: [
+            member.decode() for member in redis.zrangebyscore(self.journal_key, f'({since}', '+inf')
+        ])
+
+    def get(self, member):
+        value = self._call(lambda redis: redis.get(self.member_prefix + member))
+        return None if value is None else float(value)
+
+    def add(self, entries):
+        # Bitta tranzaksiya: versiya ko'ringan paytda uning jurnal yozuvlari ham bor
+        def operation(redis):
+            with redis.pipeline(transaction=True) as pipe:
+                while True:
+                    try:
+                        pipe.watch(self.version_key)
+                        version = int(pipe.get(self.version_key) or 0) + 1
+                        pipe.multi()
+                        for member, revoked_at, ttl in entries:
+                            pipe.set(self.member_prefix + member, repr(revoked_at), ex=max(math.ceil(ttl), 1))
+                        pipe.sadd(self.set_key, *[member for member, _, _ in entries])
+                        pipe.zadd(self.journal_key, {member: version for member, _, _ in entries})
+                        pipe.set(self.version_key, version)
+                        pipe.execute()
+                        return
+                    except WatchError:
+                        continue
+        self._call(operation)
+
+    def purge(self):
+        def operation(redis):
+            members = [member.decode() for member in redis.smembers(self.set_key)]
+            dead = []
+            for start in range(0, len(members), 1000):
+                chunk = members[start:start + 1000]
+                values = redis.mget([self.member_prefix + member for member in chunk])
+                dead.extend(member for member, value in zip(chunk, values) if value is None)
+            if dead:
+                redis.srem(self.set_key, *dead)
+                redis.zrem(self.journal_key, *dead)
+            return len(dead)
+        return self._call(operation)
+
+
+class CacheStore:
+    """
+    Redis bo'lmagan kesh backendlari uchun (locmem - lokal ishlash va benchmarklar).
+    Amallar atomar emas - production'da RedisStore ishlatiladi.
+    """
+
+    def __init__(self, backend, key):
+        self.backend = backend
+        self.journal_key = f'{key}:journal'
+        self.version_key = f'{key}:version'
+        self.member_prefix = f'{key}:'
+
+    def version(self):
+        return self.backend.get(self.version_key) or 0
+
+    def _journal(self):
+        return self.backend.get(self.journal_key) or {}
+
+    def members(self):
+        return list(self._journal())
+
+    def changes(self, since):
+        return [member for member, version in self._journal().items() if version > since]
+
+    def get(self, member):
+        return self.backend.get(self.member_prefix + member)
+
+    def add(self, entries):
+        version = self.version() + 1
+        for member, revoked_at, ttl in entries:
+            self.backend.set(self.member_prefix + member, revoked_at, max(math.ceil(ttl), 1))
+        self.backend.set(self.journal_key, {**self._journal(), **{member: version for member, _, _ in entries}},
+                         None)
+        self.backend.set(self.version_key, version, None)
+
+    def purge(self):
+        journal = self._journal()
+        alive = set(self.backend.get_many([self.member_prefix + member for member in journal]))
+        dead = {member for member in journal if self.member_prefix + member not in alive}
+        if dead:
+            self.backend.set(self.journal_key, {
+                member: version for member, version in journal.items() if member not in dead
+            }, None)
+        return len(dead)
+
+
+class RevocationList:
+    """
+    Bekor qilingan access/refresh tokenlar: `j:<jti>` - bitta token, `d:<user_id>:<device_hardware>` -
+    qurilmaning shu vaqtgacha berilgan barcha tokenlari (iat <= bekor qilingan vaqt).
+
+    Qurilma qoidasi tokenning DEVICE_ISSUED_CLAIM vaqti (eski tokenlarda - `iat`) bilan solishtiriladi.
+
+    Har bir so'rovdagi tekshiruv - xotiradagi Bloom filter (bir necha mikrosekund). Filter startda Redis'dagi
+    set'dan quriladi, keyin versiya o'zgarganda faqat jurnaldagi yangi a'zolar qo'shiladi. Muddati o'tgan
+    a'zolar filterdan chiqmaydi - qo'shilganlar filter sig'imidan oshsa u qaytadan quriladi. Filter "bor" desa
+    (bekor qilingan token yoki false positive) Redis'dagi a'zo kaliti o'qiladi, natija eslab qolinadi.
+    """
+
+    def __init__(self, store, **options):
+        self.store = store
+        self.options = {**get_config(), **{name.upper(): value for name, value in options.items()}}
+        self.bloom = BloomFilter(self.options['CAPACITY'], self.options['ERROR_RATE'])
+        self.capacity = self.options['CAPACITY']
+        # Filterga qurilgandan beri qo'shilgan a'zolar - sig'imdan oshsa to'liq qayta quriladi
+        self.added = 0
+        self.version = None
+        self.synced_at = 0.0
+        self.purged_at = time.monotonic()
+        self._confirmed = {}
+        self._lock = threading.Lock()
+        self.stats = {'checks': 0, 'bloom_hits': 0, 'confirmations': 0, 'revoked': 0, 'syncs': 0, 'errors': 0}
+
+    def is_revoked(self, payload):
+        """
+        `payload` - tekshirilgan token (AccessToken/RefreshToken) yoki uning claim'lari.
+        """
+        self.stats['checks'] += 1
+        self.sync()
+
+        candidates = []
+        jti = payload.get(api_settings.JTI_CLAIM)
+        if jti:
+            candidates.append((token_member(jti), None))
+        device_hardware = payload.get('device_hardware')
+        user_id = payload.get(api_settings.USER_ID_CLAIM)
+        if device_hardware and user_id is not None:
+            issued_at = payload.get(DEVICE_ISSUED_CLAIM, payload.get('iat', 0))
+            candidates.append((device_member(user_id, device_hardware), issued_at))
+
+        for member, issued_at in candidates:
+            if member not in self.bloom:
+                continue
+            self.stats['bloom_hits'] += 1
+            revoked_at = self._confirm(member)
+            if revoked_at is not None and (issued_at is None or issued_at <= revoked_at):
+                self.stats['revoked'] += 1
+                return True
+        return False
+
+    def revoke(self, entries, revoked_at=None):
+        """
+        `entries` - (a'zo, ttl) juftliklari; hammasi bitta Redis pipeline bilan yoziladi.
+        `revoked_at` - kechiktirilgan bekor qilish (revoke_tokens vazifasi) uchun asl vaqt: undan keyin
+        berilgan tokenlar (qayta login) bekor bo'lmaydi, ttl shu vaqtdan hisoblanadi.
+        """
+        now = time.time()
+        revoked_at = now if revoked_at is None else revoked_at
+        entries = [(member, revoked_at, ttl - (now - revoked_at)) for member, ttl in entries]
+        entries = [entry for entry in entries if entry[2] > 0]
+        if not entries:
+            return 0
+        # Shu worker sinxronizatsiyani kutmasdan darhol rad etadi
+        with self._lock:
+            for member, revoked_at, _ in entries:
+                self.bloom.add(member)
+                self._confirmed[member] = revoked_at
+            self.added += len(entries)
+        self.store.add(entries)
+        self._maybe_purge()
+        return len(entries)
+
+    def revoke_token(self, token):
+        ttl = token.get('exp', 0) - time.time()
+        return self.revoke([(token_member(token[api_settings.JTI_CLAIM]), ttl)])
+
+    def revoke_devices(self, user_id, device_hardwares):
+        return self.revoke(device_entries(user_id, device_hardwares))
+
+    def sync(self, force=False):
+        now = time.monotonic()
+        if not force and now - self.synced_at < self.options['SYNC_INTERVAL']:
+            return
+        if not self._lock.acquire(blocking=False):
+            return
+        try:
+            self.synced_at = now
+            version = self.store.version()
+            if version == self.version and not force:
+                return
+            if force or self.version is None or self.added > self.capacity:
+                self._rebuild(version)
+            else:
+                # Faqat oxirgi sinxronizatsiyadan keyin qo'shilganlar - O(yangi a'zolar)
+                members = self.store.changes(self.version)
+                for member in members:
+                    self.bloom.add(member)
+                    # Oldin "bekor qilinmagan" deb eslab qolingan bo'lishi mumkin
+                    self._confirmed.pop(member, None)
+                self.added += len(members)
+                self.version = version
+            self.stats['syncs'] += 1
+        except Exception:
+            # Oxirgi filter bilan davom etamiz; keyingi urinish SYNC_INTERVAL dan keyin
+            self.stats['errors'] += 1
+            logger.warning('Token revocation list sync failed', exc_info=True)
+        finally:
+            self._lock.release()
+
+    def _rebuild(self, version):
+        members = self.store.members()
+        capacity = max(self.options['CAPACITY'], len(members) * 2)
+        bloom = BloomFilter(capacity, self.options['ERROR_RATE'])
+        for member in members:
+            bloom.add(member)
+        self.bloom, self.capacity, self.version, self._confirmed = bloom, capacity, version, {}
+        self.added = len(members)
+
+    def _confirm(self, member):
+        if member in self._confirmed:
+            return self._confirmed[member]
+        self.stats['confirmations'] += 1
+        try:
+            revoked_at = self.store.get(member)
+        except Exception:
+            # Redis ishlamayapti: filter "bor" degan tokenni o'tkazib yubormaymiz
+            self.stats['errors'] += 1
+            logger.warning('Token revocation check failed for %s', member, exc_info=True)
+            return math.inf
+        if len(self._confirmed) >= self.options['CONFIRM_CACHE']:
+            self._confirmed = {}
+        self._confirmed[member] = revoked_at
+        return revoked_at
+
+    def _maybe_purge(self):
+        if time.monotonic() - self.purged_at < self.options['PURGE_INTERVAL']:
+            return
+        self.purged_at = time.monotonic()
+        try:
+            self.store.purge()
+        except Exception:
+            logger.warning('Token revocation purge failed', exc_info=True)
+
+
+_revocation_list = None
+_revocation_lock = threading.Lock()
+
+
+def get_revocation_list():
+    global _revocation_list
+    if _revocation_list is None:
+        with _revocation_lock:
+            if _revocation_list is None:
+                backend, key = caches['default'], get_config()['KEY']
+                store = RedisStore(backend, key) if isinstance(backend, RedisCache) else CacheStore(backend, key)
+                _revocation_list = RevocationList(store)
+    return _revocation_list
+
+
+def revoke_durably(entries):
+    """
+    revoke() ning qator o'chirilgandan keyin chaqiriladigan varianti - hech qachon xato ko'tarmaydi.
+    Redis ishlamasa (breaker ochiq) bekor qilish revoke_tokens vazifasiga yoziladi (outage paytida -
+    users_job jadvaliga), worker Redis qaytguncha qayta urinadi. Shu worker filtri baribir darhol yangilanadi.
+    """
+    revoked_at = time.time()
+    try:
+        return get_revocation_list().revoke(entries, revoked_at=revoked_at)
+    except Exception:
+        logger.warning('Token revocation failed, deferring %s entries to a job', len(entries), exc_info=True)
+    try:
+        from custom_user.tasks import revoke_tokens
+
+        revoke_tokens.delay([[member, ttl] for member, ttl in entries], revoked_at)
+    except Exception:
+        logger.exception('Could not defer revocation of %s', [member for member, _ in entries])
+    return 0
+
+
+def revoke_devices(user_id, device_hardwares):
+    return revoke_durably(device_entries(user_id, device_hardwares))
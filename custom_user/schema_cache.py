@@ -0,0 +1,169 @@
+import gzip
+import hashlib
+import json
+import logging
+import os
+import threading
+import weakref
+from pathlib import Path
+
+import drf_spectacular
+from django.conf import settings
+from django.urls import URLPattern, URLResolver, get_resolver
+from drf_spectacular.renderers import OpenApiJsonRenderer, OpenApiYamlRenderer
+from drf_spectacular.settings import spectacular_settings
+
+from config.cache import get_or_compute
+
+logger = logging.getLogger('custom_user.schema_cache')
+
+FORMATS = ('yaml', 'json')
+
+_lock = threading.Lock()
+_entries = {}
+# URLconf o'zgarmaguncha (jarayon ichida) hash bir marta hisoblanadi
+_hash_by_resolver = weakref.WeakKeyDictionary()
+
+
+def get_config():
+    config = {
+        'DIR': os.path.join(settings.BASE_DIR, 'var', 'schema'),
+        # Deploy identifikatori (masalan git SHA): serializer o'zgarsa ham URLconf bir xil qolishi mumkin
+        'VERSION': '',
+        'GZIP_LEVEL': 9,
+        # Diskda fayl yo'q bo'lsa (yangi deploy) sxemani workerlardan faqat bittasi quradi,
+        # qolganlar natijani kesh orqali oladi
+        'BUILD_LOCK_TIMEOUT': 120,
+        'CACHE_TIMEOUT': 24 * 60 * 60,
+    }
+    config.update(getattr(settings, 'SCHEMA_CACHE', {}))
+    return config
+
+
+def _walk(patterns, prefix=''):
+    for pattern in patterns:
+        route = prefix + str(pattern.pattern)
+        if isinstance(pattern, URLResolver):
+            yield from _walk(pattern.url_patterns, route)
+        elif isinstance(pattern, URLPattern):
+            callback = pattern.callback
+            view = getattr(callback, 'cls', None) or getattr(callback, 'view_class', None) or callback
+            actions = getattr(callback, 'actions', None) or {}
+            yield '{} {} {}.{} {}'.format(
+                route, pattern.name, view.__module__, view.__qualname__, sorted(actions.items()),
+            )
+
+
+def urlconf_hash(resolver=None, config=None):
+    """
+    URL patternlari, ularning view klasslari, spectacular sozlamalari va deploy versiyasidan hash.
+    Shulardan biri o'zgarsa sxema qayta quriladi.
+    """
+    resolver = resolver or get_resolver()
+    cached = _hash_by_resolver.get(resolver)
+    if cached is not None:
+        return cached
+
+    config = config or get_config()
+    digest = hashlib.sha256()
+    for line in _walk(resolver.url_patterns):
+        digest.update(line.encode())
+        digest.update(b'\n')
+    digest.update(repr(sorted(getattr(settings, 'SPECTACULAR_SETTINGS', {}).items())).encode())
+    digest.update(f'{drf_spectacular.__version__}:{config["VERSION"]}'.encode())
+
+    value = digest.hexdigest()[:16]
+    _hash_by_resolver[resolver] = value
+    return value
+
+
+class SchemaEntry:
+    """
+    Bitta hash uchun tayyor javoblar: har bir format uchun xom va gzip baytlar hamda ETag.
+    """
+
+    def __init__(self, schema_hash, schema, gzip_level=9):
+        self.hash = schema_hash
+        self.body = {
+            'yaml': OpenApiYamlRenderer().render(schema, renderer_context={}),
+            'json': OpenApiJsonRenderer().render(schema, renderer_context={}),
+        }
+        self.gzipped = {fmt: gzip.compress(body, gzip_level, mtime=0) for fmt, body in self.body.items()}
+
+    def etag(self, fmt, encoding=None):
+        suffix = '-gzip' if encoding == 'gzip' else ''
+        return f'"{self.hash}-{fmt}{suffix}"'
+
+
+def build_schema():
+    generator = spectacular_settings.DEFAULT_GENERATOR_CLASS(
+        urlconf=spectacular_settings.SERVE_URLCONF, api_version=None,
+    )
+    return generator.get_schema(request=None, public=spectacular_settings.SERVE_PUBLIC)
+
+
+def schema_path(schema_hash, config=None):
+    config = config or get_config()
+    return Path(config['DIR']) / f'openapi-{schema_hash}.json'
+
+
+def write_schema(schema_hash, schema, config=None):
+    path = schema_path(schema_hash, config)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_suffix(f'.{os.getpid()}.tmp')
+    tmp_path.write_text(json.dumps(schema))
+    os.replace(tmp_path, path)
+    return path
+
+
+def _load_from_disk(schema_hash, config):
+    path = schema_path(schema_hash, config)
+    try:
+        return json.loads(path.read_text())
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError):
+        logger.warning('Ignoring unreadable schema file %s', path)
+        return None
+
+
+def _build(schema_hash):
+    logger.info('Building OpenAPI schema %s', schema_hash)
+    return build_schema()
+
+
+def get_entry(config=None):
+    """
+    Xotira -> disk -> generatsiya. Generatsiya jarayon boshiga bir marta (lock ostida) va
+    barcha workerlar uchun bir marta (get_or_compute), natija diskka yoziladi.
+    """
+    config = config or get_config()
+    schema_hash = urlconf_hash(config=config)
+    entry = _entries.get(schema_hash)
+    if entry is not None:
+        return entry
+
+    with _lock:
+        entry = _entries.get(schema_hash)
+        if entry is None:
+            schema = _load_from_disk(schema_hash, config)
+            if schema is None:
+                schema = get_or_compute(
+                    f'openapi_schema:{schema_hash}', lambda: _build(schema_hash), config['CACHE_TIMEOUT'],
+                    lock_timeout=config['BUILD_LOCK_TIMEOUT'], wait=config['BUILD_LOCK_TIMEOUT'],
+                )
+                write_schema(schema_hash, schema, config)
+            entry = SchemaEntry(schema_hash, schema, config['GZIP_LEVEL'])
+            # Eski hashlar xotirada qolmasin
+            _entries.clear()
+            _entries[schema_hash] = entry
+    return entry
+
+
+def prune(keep_hash, config=None):
+    removed = []
+    for path in Path((config or get_config())['DIR']).glob('openapi-*.json'):
+        if path != schema_path(keep_hash, config):
+            path.unlink(missing_ok=True)
+            removed.append(path)
+    return removed
@@ -1,3 +1,4 @@
+from .compiled import *
 from .device import *
 from .login import *
 from .misc import *
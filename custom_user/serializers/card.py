@@ -1,21 +1,39 @@
+from django.db.models import Case, CharField, F, Value, When
+from django.db.models.functions import Concat, Left, Length, Right
+from django.db.models.lookups import LessThan
 from drf_spectacular.types import OpenApiTypes
 from drf_spectacular.utils import extend_schema_field
 from rest_framework import serializers
+from custom_user.fieldsets import DynamicFieldsMixin
 from custom_user.models import Card
+from .compiled import CompiledSerializer
 
-class CardSerializer(serializers.ModelSerializer):
+class CardSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     masked_number = serializers.CharField(read_only=True)
+    field_columns = {'masked_number': ('card_number',)}
 
     class Meta:
         model = Card
         fields = ('uid', 'name', 'card_number', 'masked_number', 'card_name',
                   'card_expiry_date', 'phone_number', 'default', 'created_at', 'updated_at')
         read_only_fields = ('uid', 'masked_number', 'created_at', 'updated_at')
+        # To'liq raqam javobda hech qachon qaytarilmaydi
+        extra_kwargs = {'card_number': {'write_only': True}}
 
-    def to_representation(self, instance):
-        data = super().to_representation(instance)
-        data.pop('card_number', None)
-        return data
+
+def masked_card_number():
+    """
+    Card.masked_number ning SQL varianti: to'liq karta raqami bazadan umuman chiqmaydi.
+    """
+    return Case(
+        When(LessThan(Length('card_number'), 4), then=F('card_number')),
+        default=Concat(Left('card_number', 4), Value(' **** **** '), Right('card_number', 4)),
+        output_field=CharField(),
+    )
+
+
+# Ro'yxat endpointi uchun: card_number olinmaydi, masked_number DB'da hisoblanadi
+card_rows = CompiledSerializer(CardSerializer, expressions={'masked_number': masked_card_number()})
 
 
 def validate_card_number(value):
@@ -0,0 +1,157 @@
+from functools import cached_property
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.utils import timezone
+from rest_framework import ISO_8601, serializers
+from rest_framework.settings import api_settings
+
+__all__ = ['CompiledSerializer']
+
+# to_representation() qiymatni o'zgartirmaydigan maydonlar: DB qiymati to'g'ridan-to'g'ri ishlatiladi
+PASSTHROUGH_FIELDS = (serializers.CharField, serializers.BooleanField, serializers.IntegerField)
+
+
+def _is_iso_datetime(field):
+    output_format = getattr(field, 'format', api_settings.DATETIME_FORMAT)
+    return (
+        type(field) is serializers.DateTimeField and settings.USE_TZ and not hasattr(field, 'timezone')
+        and output_format is not None and output_format.lower() == ISO_8601
+    )
+
+
+def datetime_iso(value, tz, field):
+    """
+    DateTimeField.to_representation() bilan bir xil natija, lekin joriy timezone har qator
+    uchun emas, butun ro'yxat uchun bir marta olinadi.
+    """
+    if value.tzinfo is None:
+        return field.to_representation(value)
+    value = value.astimezone(tz).isoformat()
+    return value[:-6] + 'Z' if value.endswith('+00:00') else value
+
+
+class CompiledSerializer:
+    """
+    DRF serializerning maydonlar ro'yxatidan bir marta `row -> dict` funksiyasini quradi.
+    `values()` queryset faqat kerakli ustunlarni oladi, natija esa serializer.data bilan bir xil.
+
+        rows = CompiledSerializer(CardSerializer, exclude=['card_number'],
+                                  expressions={'masked_number': masked_card_number()})
+        data = rows.many(rows.values(Card.objects.filter(user=user)))
+
+    `expressions` - DB'da hisoblanadigan maydonlar (property o'rniga). Ichma-ich source
+    (`user.email`) va SerializerMethodField qo'llab-quvvatlanmaydi - bunday maydonlar uchun
+    oddiy serializerdan foydalaning.
+    """
+
+    def __init__(self, serializer_class, fields=None, exclude=(), expressions=None):
+        self.serializer_class = serializer_class
+        self.field_names = fields
+        self.exclude = set(exclude)
+        self.expressions = expressions or {}
+        self._subsets = {}
+
+    @cached_property
+    def plan(self):
+        """
+        (chiqish nomi, values() kaliti, converter yoki None) ro'yxati - birinchi murojaatda,
+        app registry tayyor bo'lgandan keyin quriladi.
+        """
+        declared = self.serializer_class().fields
+        names = self.field_names
+        if names is None:
+            names = [name for name, field in declared.items() if not field.write_only]
+        plan = []
+        for name in names:
+            if name in self.exclude:
+                continue
+            field = declared[name]
+            if name in self.expressions:
+                key = name
+            elif field.source == '*' or '.' in field.source or isinstance(field, serializers.SerializerMethodField):
+                raise ImproperlyConfigured(
+                    f'{self.serializer_class.__name__}.{name}: nested sources cannot be compiled, '
+                    f'use `expressions` or the regular serializer.'
+                )
+            else:
+                key = field.source
+            if type(field) in PASSTHROUGH_FIELDS:
+                converter = None
+            elif _is_iso_datetime(field):
+                converter = field
+            else:
+                converter = field.to_representation
+            plan.append((name, key, converter))
+        return plan
+
+    @cached_property
+    def names(self):
+        return tuple(name for name, _, _ in self.plan)
+
+    @cached_property
+    def columns(self):
+        return [key for _, key, _ in self.plan if key not in self.expressions]
+
+    @cached_property
+    def selected_expressions(self):
+        return {name: expression for name, expression in self.expressions.items() if name in self.names}
+
+    def select(self, fields):
+        """
+        Faqat `fields` maydonlari uchun kompilyatsiya qilingan variant (sparse fieldsets).
+        Har bir kombinatsiya bir marta quriladi; `fields` parse_fieldset() dan keladi,
+        shuning uchun kombinatsiyalar soni serializer maydonlari bilan chegaralangan.
+        """
+        if fields is None:
+            return self
+        subset = self._subsets.get(fields)
+        if subset is None:
+            subset = CompiledSerializer(self.serializer_class, fields, self.exclude, self.expressions)
+            self._subsets[fields] = subset
+        return subset
+
+    def _compile(self, accessor):
+        namespace = {'datetime_iso': datetime_iso}
+        items = []
+        for index, (name, key, converter) in enumerate(self.plan):
+            value = accessor.format(key=key)
+            if converter is None:
+                items.append(f'{name!r}: {value}')
+            elif isinstance(converter, serializers.DateTimeField):
+                namespace[f'c{index}'] = converter
+                items.append(f'{name!r}: None if (v{index} := {value}) is None else datetime_iso(v{index}, tz, c{index})')
+            else:
+                namespace[f'c{index}'] = converter
+                # DRF ham None qiymatlarni to_representation'ga bermaydi
+                items.append(f'{name!r}: None if (v{index} := {value}) is None else c{index}(v{index})')
+        source = 'def to_dict(row, tz):\n    return {\n' + ''.join(f'        {item},\n' for item in items) + '    }\n'
+        exec(compile(source, f'<compiled {self.serializer_class.__name__}>', 'exec'), namespace)
+        return namespace['to_dict']
+
+    @cached_property
+    def row_to_dict(self):
+        return self._compile('row[{key!r}]')
+
+    @cached_property
+    def instance_to_dict(self):
+        return self._compile('row.{key}')
+
+    def values(self, queryset):
+        # Bo'sh values() barcha ustunlarni oladi - hech narsa tanlanmagan bo'lsa faqat pk
+        return queryset.values(*(self.columns or ['pk']), **self.selected_expressions)
+
+    @cached_property
+    def has_datetimes(self):
+        return any(isinstance(converter, serializers.DateTimeField) for _, _, converter in self.plan)
+
+    def _timezone(self):
+        # get_current_timezone() asgiref Local orqali o'qiladi - arzon emas
+        return timezone.get_current_timezone() if self.has_datetimes else None
+
+    def many(self, rows):
+        to_dict, tz = self.row_to_dict, self._timezone()
+        return [to_dict(row, tz) for row in rows]
+
+    def one(self, instance):
+        return self.instance_to_dict(instance, self._timezone())
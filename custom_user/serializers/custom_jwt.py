@@ -1,7 +1,13 @@
+from drf_spectacular.contrib.rest_framework_simplejwt import (
+    TokenRefreshSerializerExtension,
+    TokenVerifySerializerExtension,
+)
 from rest_framework import serializers
-from rest_framework_simplejwt.serializers import TokenObtainPairSerializer, TokenRefreshSerializer
-from rest_framework_simplejwt.tokens import RefreshToken
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.serializers import TokenObtainPairSerializer, TokenRefreshSerializer, TokenVerifySerializer
+from rest_framework_simplejwt.tokens import RefreshToken, UntypedToken
 from custom_user.models import Device
+from custom_user.revocation import get_revocation_list, stamp_device
 
 
 class CustomTokenObtainPairSerializer(TokenObtainPairSerializer):
@@ -17,7 +23,7 @@ class CustomTokenObtainPairSerializer(TokenObtainPairSerializer):
         refresh = self.get_token(self.user)
 
         if device.device_hardware:
-            refresh['device_hardware'] = device.device_hardware
+            stamp_device(refresh, device.device_hardware)
 
         data['refresh'] = str(refresh)
         data['access'] = str(refresh.access_token)
@@ -37,6 +43,10 @@ class CustomTokenObtainPairSerializer(TokenObtainPairSerializer):
 class CustomTokenRefreshSerializer(TokenRefreshSerializer):
 
     def validate(self, attrs):
+        # O'chirilgan qurilmaning refresh tokeni yangi access token olmasligi kerak
+        if get_revocation_list().is_revoked(self.token_class(attrs['refresh'])):
+            raise TokenError('Token has been revoked')
+
         data = super().validate(attrs)
 
         refresh_token_str = attrs['refresh']
@@ -56,4 +66,27 @@ class CustomTokenRefreshSerializer(TokenRefreshSerializer):
         except Exception as e:
             pass
 
-        return data
\ No newline at end of file
+        return data
+
+
+class CustomTokenVerifySerializer(TokenVerifySerializer):
+
+    def validate(self, attrs):
+        if get_revocation_list().is_revoked(UntypedToken(attrs['token'])):
+            raise TokenError('Token has been revoked')
+        return super().validate(attrs)
+
+
+# drf-spectacular: sxemada simplejwt'ning asl komponentlari (TokenRefresh, TokenVerify) qoladi
+class CustomTokenRefreshSerializerExtension(TokenRefreshSerializerExtension):
+    target_class = CustomTokenRefreshSerializer
+
+    def get_name(self, auto_schema, direction):
+        return 'TokenRefresh'
+
+
+class CustomTokenVerifySerializerExtension(TokenVerifySerializerExtension):
+    target_class = CustomTokenVerifySerializer
+
+    def get_name(self, auto_schema, direction):
+        return 'TokenVerify'
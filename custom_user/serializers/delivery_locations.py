@@ -1,8 +1,10 @@
+from custom_user.fieldsets import DynamicFieldsMixin
 from custom_user.models import Address
 from rest_framework import serializers
+from .compiled import CompiledSerializer
 
 
-class AddressSerializer(serializers.ModelSerializer):
+class AddressSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
 
     class Meta:
         model = Address
@@ -11,6 +13,9 @@ class AddressSerializer(serializers.ModelSerializer):
         read_only_fields = ('id', 'created_at', 'updated_at')
 
 
+address_rows = CompiledSerializer(AddressSerializer)
+
+
 class AddressCreateSerializer(serializers.ModelSerializer):
 
     class Meta:
@@ -1,13 +1,19 @@
+from functools import cached_property
+
 from rest_framework import serializers
 from django.contrib.auth import get_user_model
+from custom_user.fieldsets import DynamicFieldsMixin
 from custom_user.models import Device
 from custom_user.utils import get_device_from_token
 
 User = get_user_model()
 
-class DeviceSerializer(serializers.ModelSerializer):
+_NO_CURRENT_DEVICE = object()
+
+class DeviceSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     me = serializers.SerializerMethodField()
     login_data = serializers.DateTimeField(source='created_at', read_only=True)
+    field_columns = {'me': ('device_hardware',)}
 
     class Meta:
         model = Device
@@ -15,6 +21,12 @@ class DeviceSerializer(serializers.ModelSerializer):
         read_only_fields = ('uid', 'last_used')
 
     def get_me(self, obj):
+        current = self.current_device
+        return current is not _NO_CURRENT_DEVICE and obj.device_hardware == current
+
+    @cached_property
+    def current_device(self):
+        # Token har bir qurilma uchun emas, serializer uchun bir marta dekodlanadi
         request = self.context.get('request')
 
         if request:
@@ -22,16 +34,24 @@ class DeviceSerializer(serializers.ModelSerializer):
             if auth_header.startswith('Bearer '):
                 token_string = auth_header.split(' ')[1]
             else:
-                return False
+                return _NO_CURRENT_DEVICE
 
             token_data = get_device_from_token(token_string)
-            device_hardware = token_data.get("device_hardware")
-
-            return obj.device_hardware == device_hardware
+            return token_data.get("device_hardware")
 
-        return False
+        return _NO_CURRENT_DEVICE
 
 
 class DeviceDeleteResponseSerializer(serializers.Serializer):
     success = serializers.BooleanField()
-    message = serializers.CharField()
\ No newline at end of file
+    message = serializers.CharField()
+
+class PushTokenSerializer(serializers.Serializer):
+    push_token = serializers.CharField(max_length=255, allow_null=True,
+                                       help_text="FCM/APNs token; null - push o'chiriladi")
+
+
+class DeviceLogoutOthersResponseSerializer(serializers.Serializer):
+    success = serializers.BooleanField()
+    message = serializers.CharField()
+    count = serializers.IntegerField(help_text="O'chirilgan qurilmalar soni")
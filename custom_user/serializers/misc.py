@@ -1,10 +1,12 @@
 from rest_framework import serializers
 from djoser.serializers import UserSerializer
 from django.contrib.auth import get_user_model
+from custom_user.fieldsets import DynamicFieldsMixin
+from .compiled import CompiledSerializer
 
 User = get_user_model()
 
-class CustomUserSerializer(UserSerializer):
+class CustomUserSerializer(DynamicFieldsMixin, UserSerializer):
     class Meta(UserSerializer.Meta):
         model = User
         fields = ("id", "email", "phone_number", "full_name", "profile_photo", 'notification', 'promotional_notification')
@@ -21,6 +23,9 @@ class NotificationSettingsSerializer(serializers.Serializer):
         return data
 
 
+notification_settings_rows = CompiledSerializer(NotificationSettingsSerializer)
+
+
 class NotificationSettingsResponseSerializer(serializers.Serializer):
     success = serializers.BooleanField()
     message = serializers.CharField()
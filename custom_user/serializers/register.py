@@ -4,6 +4,8 @@ from django.contrib.auth import get_user_model
 User = get_user_model()
 
 class UserRegistrationSerializer(serializers.ModelSerializer):
+    # ModelSerializer'ning UniqueValidator'i aktivlashtirilmagan emailni ham rad etardi - upsert o'zi tekshiradi
+    email = serializers.EmailField(max_length=254)
     password = serializers.CharField(write_only=True, min_length=8)
     phone_number = serializers.CharField(max_length=15, required=False, allow_blank=True, allow_null=True)
     full_name = serializers.CharField(max_length=30, required=False, allow_blank=True, allow_null=True)
@@ -12,22 +14,22 @@ class UserRegistrationSerializer(serializers.ModelSerializer):
         model = User
         fields = ('email', 'phone_number', 'full_name', 'password')
 
-    def validate_email(self, value):
-        if User.objects.filter(email=value).exists():
-            raise serializers.ValidationError("Bu email allaqachon ro'yxatdan o'tgan")
-        return value
-
     def create(self, validated_data):
-        user = User.objects.create_user(
-            email=validated_data['email'],
-            password=validated_data['password'],
-            phone_number=validated_data.get('phone_number'),
-            full_name=validated_data.get('full_name', ''),
-            is_active=False
-        )
+        user, created = User.objects.register(**registration_fields(validated_data))
+        if not created and user.is_active:
+            raise serializers.ValidationError({'email': "Bu email allaqachon ro'yxatdan o'tgan"})
         return user
 
 
+def registration_fields(validated_data):
+    return {
+        'email': validated_data['email'],
+        'password': validated_data['password'],
+        'phone_number': validated_data.get('phone_number'),
+        'full_name': validated_data.get('full_name', ''),
+    }
+
+
 class UserRegistrationResponseSerializer(serializers.Serializer):
     success = serializers.BooleanField()
     message = serializers.CharField()
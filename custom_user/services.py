@@ -1,5 +1,6 @@
-import geocoder
-from user_agents import parse
+# geocoder (requests, ratelim, ...) importi sekin -
+# worker va manage.py startini sekinlashtirmaslik uchun birinchi chaqiruvda yuklanadi.
+
 
 def get_client_ip(request):
     x_forwarded_for = request.META.get("HTTP_X_FORWARDED_FOR")
@@ -10,27 +11,14 @@ def get_client_ip(request):
     return ip
 
 
-def get_location_by_ip(ip_address: str):
-    g = geocoder.ip(ip_address)
-    return g.city
-
-
-
-def get_device_info(request):
-    ua_string = request.META.get('HTTP_USER_AGENT', '')
-    user_agent = parse(ua_string)
+def lookup_city(ip_address: str):
+    """
+    IP bo'yicha shahar: '' - javob keldi, shahar noma'lum;
+    None - qidiruv muvaffaqiyatsiz (geocoder tarmoq/HTTP xatosini ko'tarmaydi, g.error ga yozadi).
+    """
+    import geocoder
 
-    return {
-        "is_mobile": user_agent.is_mobile,
-        "is_tablet": user_agent.is_tablet,
-        "is_pc": user_agent.is_pc,
-
-        "browser": user_agent.browser.family,
-        "browser_version": user_agent.browser.version_string,
-
-        "os": user_agent.os.family,
-        "os_version": user_agent.os.version_string,
-
-        "device_brand": user_agent.device.brand,
-        "device_model": user_agent.device.model
-    }
\ No newline at end of file
+    g = geocoder.ip(ip_address)
+    if g.error:
+        return None
+    return g.city or ''
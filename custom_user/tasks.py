@@ -0,0 +1,47 @@
+"""
+custom_user fon vazifalari - `manage.py runworker` bajaradi (custom_user/jobs).
+"""
+from django.conf import settings
+from django.core.mail import send_mail
+
+from custom_user.jobs import job, periodic
+
+
+@job(queue='email', retries=5, backoff=10.0, timeout=60)
+def send_email(subject: str, message: str, recipient_list: list[str], from_email: str | None = None) -> None:
+    # Xato ko'tariladi - worker BACKOFF bilan qayta urinadi
+    send_mail(
+        subject=subject,
+        message=message,
+        from_email=from_email or settings.DEFAULT_FROM_EMAIL,
+        recipient_list=recipient_list,
+        fail_silently=False,
+    )
+
+
+@job(retries=20, backoff=5.0, timeout=60)
+def revoke_tokens(entries: list[list], revoked_at: float) -> None:
+    # revocation.revoke_durably(): Redis outage paytida o'chirilgan qurilma/tokenlar, [a'zo, ttl] juftliklari
+    from custom_user.revocation import get_revocation_list
+
+    get_revocation_list().revoke([(member, ttl) for member, ttl in entries], revoked_at=revoked_at)
+
+
+@periodic(every=300, queue='maintenance', timeout=600)
+def enrich_pending_devices() -> None:
+    # Jarayon o'lishi yoki geolocation xatosi tufayli to'ldirilmay qolgan qurilmalar
+    from custom_user.enrichment import DeviceEnricher, enrich_pending
+
+    enricher = DeviceEnricher()
+    try:
+        enrich_pending(enricher)
+    finally:
+        enricher.stop()
+
+
+@periodic(every=3600, queue='maintenance', timeout=1800)
+def purge_retention() -> None:
+    # Tasdiqlanmagan userlar va uzoq kirmagan qurilmalar - RETENTION sozlamalari
+    from custom_user.retention import RetentionPurge
+
+    RetentionPurge().run()
@@ -1,3 +1,630 @@
-from django.test import TestCase
+import threading
+import time
+from io import StringIO
+from datetime import timedelta
+from unittest import mock
 
-# Create your tests here.
+from django.core import mail
+from django.core.cache import cache, caches
+from django.core.management import call_command
+from django.db import connection
+from django.db.migrations.executor import MigrationExecutor
+from django.test import RequestFactory, TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from django_redis.cache import RedisCache
+from django_redis.exceptions import ConnectionInterrupted
+from redis.exceptions import ConnectionError as RedisConnectionError
+from redis.exceptions import TimeoutError as RedisTimeoutError
+
+from config.cache import get_or_compute, stampede
+from config.cache.breaker import CLOSED, HALF_OPEN, OPEN, CircuitBreaker
+from custom_user.campaigns import CampaignDispatcher, LocalSink
+from custom_user.idempotency import IDEMPOTENCY_HEADER, IdempotentRequest
+from custom_user.jobs.backends import DatabaseBackend, FailoverBackend
+from custom_user.jobs.worker import Worker
+from custom_user.models import Address, Campaign, Card, CustomUser, Device, Job, PushDelivery
+from custom_user.push import PushDispatcher, PushSender
+from custom_user.retention import RetentionPurge
+from custom_user.revocation import (
+    DEVICE_ISSUED_CLAIM,
+    CacheStore,
+    RevocationList,
+    device_entries,
+    device_member,
+    revoke_durably,
+)
+from custom_user.tasks import revoke_tokens
+
+
+# Parol hashi testlarning asosiy vaqtini olmasin
+FAST_HASHER = override_settings(PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher'])
+
+
+def _age(queryset, **fields):
+    # update() - auto_now (last_online) qayta yozilmasin
+    queryset.update(**fields)
+
+
+@FAST_HASHER
+class RetentionPurgeTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.old = timezone.now() - timedelta(hours=49)
+
+    def purge(self, **options):
+        return RetentionPurge(**{'chunk_size': 2, 'pause': 0, **options}).run()
+
+    def test_verified_user_survives(self):
+        password = 'Secret123!x'
+        response = self.client.post('/api/user/register/', {
+            'email': 'verified@x.uz', 'password': password, 'password2': password,
+            'full_name': 'Test', 'phone_number': '+998901234567',
+        }, content_type='application/json')
+        self.assertEqual(response.status_code, 201)
+        user = CustomUser.objects.by_email('verified@x.uz').get()
+        code = cache.get(f'activation_code_{user.pk}')['code']
+        response = self.client.post('/api/user/verify/', {
+            'email': 'verified@x.uz', 'code': code, 'request_type': 'register', 'device_hardware': 'hw-1',
+        }, content_type='application/json')
+        self.assertEqual(response.status_code, 200)
+        _age(CustomUser.objects.filter(pk=user.pk), date_joined=self.old)
+
+        stats = self.purge()
+
+        self.assertEqual(stats['users'], 0)
+        self.assertTrue(CustomUser.objects.filter(pk=user.pk, is_active=True).exists())
+        self.assertTrue(Device.objects.filter(user=user, device_hardware='hw-1').exists())
+
+    def test_deletes_only_old_abandoned_users(self):
+        abandoned = [CustomUser.objects.create_user(f'gone{index}@x.uz', 'x', is_active=False) for index in range(5)]
+        fresh = CustomUser.objects.create_user('fresh@x.uz', 'x', is_active=False)
+        blocked = CustomUser.objects.create_user('blocked@x.uz', 'x', is_active=False, last_login=self.old)
+        legacy = CustomUser.objects.create_user('legacy@x.uz', 'x', is_active=False)
+        Device.objects.create(user=legacy, device_hardware='hw-legacy')
+        active = CustomUser.objects.create_user('active@x.uz', 'x')
+        _age(CustomUser.objects.exclude(pk=fresh.pk), date_joined=self.old)
+
+        counted = RetentionPurge(chunk_size=2, pause=0, device_idle_days=0).run(dry_run=True)
+        self.assertEqual(counted['users'], len(abandoned))
+        self.assertEqual(CustomUser.objects.count(), 9)
+
+        stats = self.purge(device_idle_days=0)
+
+        self.assertEqual(stats['users'], len(abandoned))
+        self.assertGreater(stats['chunks'], 1)
+        self.assertEqual(
+            set(CustomUser.objects.values_list('pk', flat=True)),
+            {fresh.pk, blocked.pk, legacy.pk, active.pk},
+        )
+
+    def test_deletes_idle_devices_with_push_deliveries(self):
+        user = CustomUser.objects.create_user('devices@x.uz', 'x')
+        idle = [Device.objects.create(user=user, device_hardware=f'idle-{index}') for index in range(3)]
+        recent = Device.objects.create(user=user, device_hardware='recent')
+        PushDelivery.objects.create(device=idle[0], status=PushDelivery.STATUS_SENT)
+        _age(Device.objects.filter(pk__in=[device.pk for device in idle]),
+             last_online=timezone.now() - timedelta(days=91))
+
+        stats = self.purge(inactive_user_hours=0)
+
+        self.assertEqual(stats['devices'], 3)
+        self.assertEqual(list(Device.objects.values_list('pk', flat=True)), [recent.pk])
+        self.assertFalse(PushDelivery.objects.exists())
+
+
+class MergeCaseInsensitiveEmailsMigrationTests(TransactionTestCase):
+    before = [('custom_user', '0015_device_push_token_pushdelivery')]
+    after = [('custom_user', '0021_device_user_hardware_uniq')]
+
+    def migrate(self, targets):
+        executor = MigrationExecutor(connection)
+        executor.loader.build_graph()
+        executor.migrate(targets)
+        return executor.loader.project_state(targets).apps
+
+    def tearDown(self):
+        # Keyingi testlar oxirgi sxemada ishlaydi
+        self.migrate(MigrationExecutor(connection).loader.graph.leaf_nodes())
+
+    def test_merges_accounts_and_their_devices(self):
+        apps = self.migrate(self.before)
+        User = apps.get_model('custom_user', 'CustomUser')
+        Device = apps.get_model('custom_user', 'Device')
+        PushDelivery = apps.get_model('custom_user', 'PushDelivery')
+        now = timezone.now()
+        keeper = User.objects.create(email='Foo@x.uz', password='x', is_active=True, last_login=now)
+        other = User.objects.create(email='foo@x.uz', password='x', is_active=False)
+        kept = Device.objects.create(user=keeper, device_hardware='phone')
+        stale = Device.objects.create(user=other, device_hardware='phone')
+        moved = Device.objects.create(user=other, device_hardware='tablet')
+        Device.objects.filter(pk=kept.pk).update(last_online=now)
+        Device.objects.filter(pk=stale.pk).update(last_online=now - timedelta(days=1))
+        PushDelivery.objects.create(device=stale, status=1)
+
+        self.migrate(self.after)
+
+        self.assertEqual(list(CustomUser.objects.values_list('pk', flat=True)), [keeper.pk])
+        self.assertEqual(
+            set(Device.objects.filter(user_id=keeper.pk).values_list('pk', flat=True)), {kept.pk, moved.pk},
+        )
+        self.assertFalse(PushDelivery.objects.exists())
+        self.assertEqual(CustomUser.objects.by_email('FOO@X.UZ').get().pk, keeper.pk)
+
+
+@FAST_HASHER
+class CampaignDispatcherTests(TestCase):
+    def setUp(self):
+        self.recipients = [
+            CustomUser.objects.create_user(f'promo{index}@x.uz', 'x', promotional_notification=True).email
+            for index in range(23)
+        ]
+        CustomUser.objects.create_user('no-promo@x.uz', 'x')
+        CustomUser.objects.create_user('inactive@x.uz', 'x', promotional_notification=True, is_active=False)
+        self.campaign = Campaign.objects.create(name='Test', subject='Salom', body='{{ campaign.name }}')
+
+    def dispatch(self, sink):
+        dispatcher = CampaignDispatcher(self.campaign, sink, batch_size=4, workers=2, rate=0, retries=0)
+        return dispatcher.run()
+
+    def test_full_dispatch(self):
+        sink = LocalSink()
+
+        campaign = self.dispatch(sink)
+
+        self.assertEqual(campaign.status, 'done')
+        self.assertEqual(campaign.sent_count, len(self.recipients))
+        self.assertEqual(sorted(sink.delivered), sorted(self.recipients))
+
+    def test_resume_after_outage_sends_no_duplicates(self):
+        failing = LocalSink(fail_after=10)
+
+        campaign = self.dispatch(failing)
+
+        self.assertEqual(campaign.status, 'paused')
+        self.assertIn('Local sink is down', campaign.last_error)
+        self.assertLess(len(failing.delivered), len(self.recipients))
+
+        resumed = LocalSink()
+        campaign = self.dispatch(resumed)
+
+        delivered = failing.delivered + resumed.delivered
+        self.assertEqual(campaign.status, 'done')
+        self.assertEqual(len(delivered), len(set(delivered)))
+        self.assertEqual(sorted(delivered), sorted(self.recipients))
+        self.assertEqual(campaign.sent_count, len(self.recipients))
+
+
+class FlakyGateway:
+    # PushGateway o'rnida: `fail_after` ta xabardan keyin ulanish xatosi
+    def __init__(self, fail_after=None):
+        self.fail_after = fail_after
+        self.tokens = []
+        self._lock = threading.Lock()
+
+    def send(self, messages):
+        with self._lock:
+            if self.fail_after is not None and len(self.tokens) + len(messages) > self.fail_after:
+                raise ConnectionError('Push gateway is down')
+            self.tokens.extend(message['token'] for message in messages)
+        return ['ok'] * len(messages)
+
+    def close(self):
+        pass
+
+
+@FAST_HASHER
+class PushCampaignTests(TransactionTestCase):
+    # Sender campaign threadida qurilmalarni o'qiydi va PushDelivery yozadi - setUp qatorlari commit bo'lsin
+    def setUp(self):
+        self.tokens = []
+        for index in range(12):
+            user = CustomUser.objects.create_user(f'push{index}@x.uz', 'x', promotional_notification=True)
+            Device.objects.create(user=user, device_hardware='phone', push_token=f'token-{index}')
+            self.tokens.append(f'token-{index}')
+        self.campaign = Campaign.objects.create(name='Push', channel='push', subject='Salom', body='Aksiya')
+
+    def dispatch(self, gateway):
+        sender = PushSender(PushDispatcher(gateway=gateway, retries=0, retry_delay=0))
+        dispatcher = CampaignDispatcher(self.campaign, sender, batch_size=4, workers=1, rate=0, retries=1,
+                                        retry_delay=0)
+        return dispatcher.run()
+
+    def test_gateway_outage_pauses_and_resume_sends_the_rest(self):
+        failing = FlakyGateway(fail_after=4)
+
+        campaign = self.dispatch(failing)
+
+        self.assertEqual(campaign.status, 'paused')
+        self.assertIn('Push gateway failed', campaign.last_error)
+        self.assertEqual(campaign.sent_count, 4)
+        self.assertEqual(campaign.failed_count, 0)
+
+        resumed = FlakyGateway()
+        campaign = self.dispatch(resumed)
+
+        delivered = failing.tokens + resumed.tokens
+        self.assertEqual(campaign.status, 'done')
+        self.assertEqual(sorted(delivered), sorted(self.tokens))
+        self.assertEqual(campaign.sent_count, len(self.tokens))
+
+
+class FailingStore(CacheStore):
+    # Redis o'chgan holat: yozish ham, a'zoni o'qish ham ulanish xatosi
+    def add(self, entries):
+        raise ConnectionError('Redis is down')
+
+    def get(self, member):
+        raise ConnectionError('Redis is down')
+
+
+class TokenRevocationTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.store = CacheStore(caches['default'], 'test_revoked')
+        self.now = time.time()
+
+    def revocations(self, store=None):
+        revocations = RevocationList(store or self.store, sync_interval=0)
+        revocations.sync()
+        return revocations
+
+    def payload(self, issued_at, hardware='phone'):
+        return {'user_id': 1, 'device_hardware': hardware, 'iat': int(issued_at), DEVICE_ISSUED_CLAIM: issued_at}
+
+    def test_relogin_in_the_same_second_is_not_revoked(self):
+        revocations = self.revocations()
+
+        revocations.revoke(device_entries(1, ['phone']), revoked_at=self.now)
+
+        self.assertTrue(revocations.is_revoked(self.payload(self.now - 0.001)))
+        self.assertFalse(revocations.is_revoked(self.payload(self.now + 0.001)))
+        # Claim'siz eski tokenlar butun sekundli `iat` bo'yicha
+        self.assertTrue(revocations.is_revoked({'user_id': 1, 'device_hardware': 'phone', 'iat': int(self.now)}))
+
+    def test_bloom_miss_does_not_touch_the_store(self):
+        revocations = self.revocations()
+        revocations.revoke(device_entries(1, ['phone']))
+
+        with mock.patch.object(self.store, 'get') as get:
+            self.assertFalse(revocations.is_revoked(self.payload(self.now - 1, hardware='tablet')))
+
+        get.assert_not_called()
+        self.assertEqual(revocations.stats['bloom_hits'], 0)
+
+    def test_other_worker_syncs_only_new_members(self):
+        worker, other = self.revocations(), self.revocations()
+        other.revoke(device_entries(1, ['phone']))
+
+        with mock.patch.object(self.store, 'members', side_effect=AssertionError('full rebuild')):
+            worker.sync()
+
+        self.assertEqual(worker.stats['errors'], 0)
+        self.assertEqual(worker.version, self.store.version())
+        self.assertTrue(worker.is_revoked(self.payload(self.now - 1)))
+        self.assertFalse(worker.is_revoked(self.payload(self.now - 1, hardware='tablet')))
+
+    def test_confirmation_fails_closed_when_the_store_is_down(self):
+        self.revocations().revoke(device_entries(1, ['phone']))
+        revocations = self.revocations()
+
+        with mock.patch.object(self.store, 'get', side_effect=ConnectionError('Redis is down')):
+            # Filter "bor" dedi, Redis javob bermadi - yangi token ham rad etiladi
+            self.assertTrue(revocations.is_revoked(self.payload(time.time() + 1)))
+
+        self.assertEqual(revocations.stats['errors'], 1)
+
+    def test_revoke_durably_defers_to_a_job_when_the_store_is_down(self):
+        entries = device_entries(1, ['phone'])
+
+        with mock.patch('custom_user.revocation.get_revocation_list',
+                        return_value=RevocationList(FailingStore(caches['default'], 'test_revoked'))):
+            self.assertEqual(revoke_durably(entries), 0)
+
+        job = Job.objects.get(name=revoke_tokens.name)
+        self.assertEqual(job.kwargs['entries'], [list(entry) for entry in entries])
+
+        with mock.patch('custom_user.revocation.get_revocation_list', return_value=self.revocations()):
+            revoke_tokens(**job.kwargs)
+
+        self.assertEqual(self.store.get(device_member(1, 'phone')), job.kwargs['revoked_at'])
+        self.assertTrue(self.revocations().is_revoked(self.payload(job.kwargs['revoked_at'] - 1)))
+
+
+@FAST_HASHER
+class DirtyFieldsTests(TestCase):
+    def setUp(self):
+        self.user = CustomUser.objects.create_user('dirty@x.uz', 'x')
+        self.card = Card.objects.create(user=self.user, card_number='8600123412341234', card_expiry_date='12/30')
+
+    def test_noop_save_issues_no_query(self):
+        card = Card.objects.get(pk=self.card.pk)
+        address = Address.objects.create(user=self.user, address='Chilonzor', lat='41.3')
+        address = Address.objects.get(pk=address.pk)
+        address.lat = '41.300000'
+
+        with self.assertNumQueries(0):
+            card.save()
+            address.save()
+
+    def test_save_writes_only_changed_columns(self):
+        card = Card.objects.get(pk=self.card.pk)
+        card.name = 'Ish kartasi'
+
+        with CaptureQueriesContext(connection) as queries:
+            card.save()
+
+        self.assertEqual(len(queries), 1)
+        sql = queries[0]['sql']
+        self.assertTrue(sql.startswith('UPDATE'))
+        self.assertIn('"name"', sql)
+        self.assertIn('"updated_at"', sql)
+        self.assertNotIn('"card_number"', sql)
+        self.assertNotIn('"default"', sql)
+        card.refresh_from_db()
+        self.assertEqual(card.name, 'Ish kartasi')
+
+    def test_default_card_switch_unsets_the_others(self):
+        other = Card.objects.create(user=self.user, card_number='8600999999999999', card_expiry_date='01/29')
+        self.assertTrue(Card.objects.get(pk=self.card.pk).default)
+
+        other = Card.objects.get(pk=other.pk)
+        other.default = True
+        other.save()
+
+        self.assertEqual(list(Card.objects.filter(user=self.user, default=True).values_list('pk', flat=True)),
+                         [other.pk])
+
+    def test_default_address_switch_unsets_the_others(self):
+        home = Address.objects.create(user=self.user, address='Chilonzor')
+        work = Address.objects.create(user=self.user, address='Yunusobod')
+        self.assertTrue(Address.objects.get(pk=home.pk).default)
+
+        work = Address.objects.get(pk=work.pk)
+        work.default = True
+        work.save()
+
+        self.assertEqual(list(Address.objects.filter(user=self.user, default=True).values_list('pk', flat=True)),
+                         [work.pk])
+
+
+@FAST_HASHER
+class RegisterIdempotencyTests(TestCase):
+    password = 'Secret123!x'
+
+    def setUp(self):
+        cache.clear()
+
+    def register(self, email, key='key-1'):
+        return self.client.post('/api/user/register/', {
+            'email': email, 'password': self.password, 'password2': self.password,
+            'full_name': 'Test', 'phone_number': '+998901234567',
+        }, content_type='application/json', headers={IDEMPOTENCY_HEADER: key})
+
+    def test_retry_with_the_same_key_replays_the_first_response(self):
+        first = self.register('idem@x.uz')
+        code = cache.get(f"activation_code_{CustomUser.objects.by_email('idem@x.uz').get().pk}")['code']
+
+        retry = self.register('idem@x.uz')
+
+        self.assertEqual(first.status_code, 201)
+        self.assertEqual((retry.status_code, retry.json()), (first.status_code, first.json()))
+        self.assertEqual(len(mail.outbox), 1)
+        # Kod qayta yaratilmagan
+        self.assertEqual(cache.get(f"activation_code_{CustomUser.objects.by_email('idem@x.uz').get().pk}")['code'],
+                         code)
+
+    def test_key_reused_for_another_email_is_rejected(self):
+        self.register('idem@x.uz')
+
+        response = self.register('other@x.uz')
+
+        self.assertEqual(response.status_code, 422)
+        self.assertEqual(response.json()['errorStatus'], 'idempotency_mismatch')
+        self.assertFalse(CustomUser.objects.by_email('other@x.uz').exists())
+
+    def test_key_in_progress_returns_conflict(self):
+        request = RequestFactory().post('/api/user/register/', headers={IDEMPOTENCY_HEADER: 'key-1'})
+        self.assertIsNone(IdempotentRequest(request, 'register', 'idem@x.uz').begin())
+
+        response = self.register('idem@x.uz')
+
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(response.json()['errorStatus'], 'in_progress')
+        self.assertEqual(len(mail.outbox), 0)
+
+    def test_register_retries_after_a_concurrent_insert(self):
+        existing = CustomUser.objects.create_user('race@x.uz', 'x', is_active=False)
+        manager = type(CustomUser.objects)
+        by_email = manager.by_email
+        calls = []
+
+        def racing(self, email):
+            # Birinchi urinish parallel so'rov yozgan qatorni ko'rmaydi - INSERT IntegrityError beradi
+            calls.append(email)
+            queryset = by_email(self, email)
+            return queryset.none() if len(calls) == 1 else queryset
+
+        with mock.patch.object(manager, 'by_email', racing):
+            user, created = CustomUser.objects.register('Race@x.uz', self.password, full_name='Racer')
+
+        self.assertEqual(len(calls), 2)
+        self.assertFalse(created)
+        self.assertEqual(user.pk, existing.pk)
+        self.assertEqual(CustomUser.objects.get().full_name, 'Racer')
+
+
+class ActivateVerifiedUsersCommandTests(TestCase):
+    def test_activates_only_never_logged_in_users_with_data(self):
+        verified = CustomUser.objects.create_user('verified@x.uz', 'x', is_active=False)
+        Device.objects.create(user=verified, device_hardware='phone')
+        blocked = CustomUser.objects.create_user('blocked@x.uz', 'x', is_active=False, last_login=timezone.now())
+        Device.objects.create(user=blocked, device_hardware='phone')
+        excluded = CustomUser.objects.create_user('excluded@x.uz', 'x', is_active=False)
+        Address.objects.create(user=excluded, address='Chilonzor')
+        pending = CustomUser.objects.create_user('pending@x.uz', 'x', is_active=False)
+
+        call_command('activate_verified_users', stdout=StringIO())
+        self.assertFalse(CustomUser.objects.filter(is_active=True).exists())
+
+        call_command('activate_verified_users', '--apply', '--exclude', str(excluded.pk), stdout=StringIO())
+
+        self.assertEqual(list(CustomUser.objects.filter(is_active=True).values_list('pk', flat=True)), [verified.pk])
+        self.assertFalse(CustomUser.objects.get(pk=pending.pk).is_active)
+
+
+class CircuitBreakerTests(TestCase):
+    def setUp(self):
+        self.now = 1000.0
+        clock = mock.patch('config.cache.breaker.time.monotonic', lambda: self.now)
+        clock.start()
+        self.addCleanup(clock.stop)
+        self.probes = []
+        self.probe_error = None
+        self.breaker = CircuitBreaker(self.probe, {'MIN_CALLS': 4, 'FAILURE_RATE': 0.5, 'OPEN_SECONDS': 5})
+
+    def probe(self):
+        self.probes.append(self.breaker.state)
+        if self.probe_error:
+            raise self.probe_error
+
+    def test_opens_fails_fast_and_half_opens(self):
+        for _ in range(3):
+            self.breaker.record_failure(ConnectionError('refused'))
+        self.assertEqual(self.breaker.state, CLOSED)
+        self.breaker.record_failure(ConnectionError('refused'))
+        self.assertEqual(self.breaker.state, OPEN)
+
+        # Ochiq: probe ham, Redis ham yo'q
+        self.assertFalse(self.breaker.allow())
+        self.assertEqual(self.probes, [])
+        self.assertEqual(self.breaker.stats()['short_circuited'], 1)
+
+        self.now += 5
+        self.probe_error = ConnectionError('Redis is down')
+        self.assertFalse(self.breaker.allow())
+        self.assertEqual(self.probes, [HALF_OPEN])
+        self.assertEqual(self.breaker.state, OPEN)
+
+        self.now += 5
+        self.probe_error = None
+        self.assertTrue(self.breaker.allow())
+        self.assertEqual(self.breaker.state, CLOSED)
+        self.assertEqual(self.breaker.stats()['window_calls'], 0)
+
+    def test_socket_timeout_trips_immediately(self):
+        try:
+            raise ConnectionInterrupted(connection=None) from RedisTimeoutError('Timeout reading from socket')
+        except ConnectionInterrupted as exc:
+            self.breaker.record_failure(exc)
+
+        self.assertEqual(self.breaker.state, OPEN)
+        self.assertFalse(self.breaker.allow())
+
+
+class DownRedis:
+    """
+    RedisBackend o'rniga - `down` bo'lganda django-redis outage xatosini beradi.
+    """
+
+    def __init__(self):
+        self.down = False
+        self.pushed = []
+        self.claims = 0
+
+    def _check(self):
+        if self.down:
+            raise ConnectionInterrupted(connection=None) from RedisConnectionError('Connection refused')
+
+    def push(self, queue, name, kwargs, run_at):
+        self._check()
+        self.pushed.append(name)
+        return 'redis-1'
+
+    def claim(self, queue, visibility):
+        self.claims += 1
+        self._check()
+        return None
+
+
+class JobFailoverTests(TestCase):
+    def setUp(self):
+        self.redis = DownRedis()
+        self.database = DatabaseBackend()
+        self.backend = FailoverBackend(self.redis, self.database)
+        self.worker = Worker(queues=['default'], threads=1, backend=self.backend, fallback_poll_interval=30)
+
+    def test_outage_push_lands_in_database_and_worker_drains_it(self):
+        self.redis.down = True
+        self.backend.push('default', revoke_tokens.name, {'entries': [], 'revoked_at': 1.0}, time.time())
+        self.assertEqual(Job.objects.count(), 1)
+
+        backend, record, _ = self.worker._claim(0)
+        self.assertIs(backend, self.database)
+        with mock.patch.object(self.worker.jobs[revoke_tokens.name], 'func') as func:
+            self.worker.execute(record, backend)
+
+        func.assert_called_once_with(entries=[], revoked_at=1.0)
+        self.assertFalse(Job.objects.exists())
+
+    def test_healthy_primary_polls_database_once_per_interval(self):
+        now = [1000.0]
+        with mock.patch('custom_user.jobs.worker.time.monotonic', lambda: now[0]), \
+                mock.patch.object(self.database, 'claim', return_value=None) as fallback_claim:
+            for _ in range(5):
+                self.assertEqual(self.worker._claim(0)[1], None)
+            self.assertEqual(self.redis.claims, 5)
+            self.assertEqual(fallback_claim.call_count, 1)
+
+            now[0] += 30
+            self.worker._claim(0)
+            self.assertEqual(fallback_claim.call_count, 2)
+
+            # Redis tushdi - jadval har safar so'raladi, qaytgach yana interval bilan
+            self.redis.down = True
+            self.worker._claim(0)
+            self.worker._claim(0)
+            self.assertEqual(fallback_claim.call_count, 4)
+            self.redis.down = False
+            self.worker._claim(0)
+            self.assertEqual(fallback_claim.call_count, 4)
+
+    def test_ack_deletes_only_owned_row(self):
+        self.database.push('default', revoke_tokens.name, {}, time.time())
+        record = self.database.claim('default', 60)
+
+        self.assertFalse(self.database.ack({**record, 'token': 'stale'}))
+        self.assertTrue(self.database.ack(record))
+        self.assertFalse(Job.objects.exists())
+
+
+class StampedeLockTests(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_releases_own_lock(self):
+        self.assertEqual(get_or_compute('stampede:own', lambda: 1, 60), 1)
+        self.assertIsNone(cache.get('stampede:own:lock'))
+
+    def test_lock_past_its_timeout_is_not_deleted(self):
+        now = [1000.0]
+
+        def slow():
+            # Hisoblash LOCK_TIMEOUT dan uzoq davom etdi - lock endi boshqa workerniki bo'lishi mumkin
+            now[0] += 11
+            return 1
+
+        with mock.patch('config.cache.stampede.time.monotonic', lambda: now[0]):
+            get_or_compute('stampede:slow', slow, 60, lock_timeout=10)
+        self.assertIsNotNone(cache.get('stampede:slow:lock'))
+
+    def test_redis_release_is_compare_and_delete(self):
+        redis_cache = RedisCache('redis://127.0.0.1:6390/1',
+                                 {'OPTIONS': {'CLIENT_CLASS': 'config.cache.ResilientClient'}})
+        raw = mock.Mock()
+        with mock.patch.object(redis_cache.client, 'get_client', return_value=raw):
+            stampede._release(redis_cache, 'report', None, (42, time.monotonic() + 10))
+
+        raw.eval.assert_called_once_with(stampede.RELEASE_SCRIPT, 1, redis_cache.make_key('report:lock'), 42)
+        raw.get.assert_not_called()
+        raw.delete.assert_not_called()
@@ -1,6 +1,39 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
-from custom_user.views import *
+
+from custom_user.views.async_auth import (
+    AsyncForgotPasswordView,
+    AsyncSendActivationCodeView,
+    AsyncUserLoginView,
+    AsyncUserRegistrationView,
+    AsyncVerifyCodeUniversalView,
+)
+from custom_user.views.cache import CacheStatsView
+from custom_user.views.card import CardCreateView, CardDetailView, CardListView, CardSetDefaultView
+from custom_user.views.custom_user import CustomUserViewSet
+from custom_user.views.delivery_locations import (
+    AddressCreateView,
+    AddressDetailView,
+    AddressListView,
+    AddressSetDefaultView,
+)
+from custom_user.views.device import (
+    DeviceDeleteView,
+    DeviceDeleteWithUidView,
+    DeviceListView,
+    DeviceLogoutOthersView,
+    DevicePushTokenView,
+)
+from custom_user.views.forgot_password import ForgotPasswordCompleteView, ForgotPasswordView
+from custom_user.views.jobs import JobStatsView
+from custom_user.views.login import UserLoginView
+from custom_user.views.memory import MemoryStatsView
+from custom_user.views.notification import NotificationSettingsView
+from custom_user.views.profile_photo import ProfilePhotoUpdateView
+from custom_user.views.register import UserRegistrationView
+from custom_user.views.reset_password import ResetPasswordView
+from custom_user.views.send_activation import SendActivationCodeView
+from custom_user.views.verify import VerifyCodeUniversalView
 
 router = DefaultRouter()
 router.register(r'users', CustomUserViewSet, basename='users')
@@ -17,11 +50,20 @@ urlpatterns = [
     path('password/forgot/complete/', ForgotPasswordCompleteView.as_view(), name='forgot-password-complete'),
     path('password/reset/', ResetPasswordView.as_view(), name='reset-password'),
 
+    # Native async variantlar (ASGI uchun), request/response formati yuqoridagilar bilan bir xil
+    path('async/register/', AsyncUserRegistrationView.as_view(), name='async-user-register'),
+    path('async/activation/send/', AsyncSendActivationCodeView.as_view(), name='async-send-activation-code'),
+    path('async/verify/', AsyncVerifyCodeUniversalView.as_view(), name='async-verify-activation-code'),
+    path('async/login/', AsyncUserLoginView.as_view(), name='async-user-login'),
+    path('async/password/forgot/', AsyncForgotPasswordView.as_view(), name='async-forgot-password'),
+
     path('', include(router.urls)),
 
     path('devices/', DeviceListView.as_view(), name='device-list'),
     path('devices/<uuid:uid>/delete/', DeviceDeleteWithUidView.as_view(), name='device-delete-with-uid'),
     path('devices/delete/', DeviceDeleteView.as_view(), name='device-delete'),
+    path('devices/logout-others/', DeviceLogoutOthersView.as_view(), name='device-logout-others'),
+    path('devices/push-token/', DevicePushTokenView.as_view(), name='device-push-token'),
 
     path('api/cards/', CardListView.as_view(), name='card-list'),
     path('api/cards/create/', CardCreateView.as_view(), name='card-create'),
@@ -31,5 +73,9 @@ urlpatterns = [
     path('addresses/', AddressListView.as_view(), name='addresses-list'),
     path('addresses/create', AddressCreateView.as_view(), name='address-create'),
     path('addresses/<int:address_id>/', AddressDetailView.as_view(), name='address-detail'),
-    path('addresses/<int:address_id>/set-default', AddressSetDefaultView.as_view(), name='address-set-default')
+    path('addresses/<int:address_id>/set-default', AddressSetDefaultView.as_view(), name='address-set-default'),
+
+    path('debug/memory/', MemoryStatsView.as_view(), name='memory-stats'),
+    path('debug/cache/', CacheStatsView.as_view(), name='cache-stats'),
+    path('debug/jobs/', JobStatsView.as_view(), name='job-stats'),
 ]
\ No newline at end of file
@@ -1,5 +1,7 @@
 from rest_framework_simplejwt.tokens import RefreshToken
 
+from custom_user.revocation import stamp_device
+
 def custom_preprocessing_hook(endpoints):
     excluded_paths = [
         '/api/user/users/',
@@ -26,7 +28,7 @@ def get_tokens_for_user(user, device_hardware=None):
     refresh = RefreshToken.for_user(user)
 
     if device_hardware:
-        refresh['device_hardware'] = device_hardware
+        stamp_device(refresh, device_hardware)
 
     return {
         'refresh': str(refresh),
@@ -1,12 +1,4 @@
-from .custom_user import *
-from .device import *
-from .login import *
-from .profile_photo import *
-from .register import *
-from .send_activation import *
-from .verify import *
-from .forgot_password import *
-from .reset_password import *
-from .notification import *
-from .delivery_locations import *
-from .card import *
\ No newline at end of file
+"""
+View klasslari o'z modulidan import qilinadi (`custom_user.views.<modul>`) - paket barcha
+modullarni va ularning bog'liqliklarini bir yo'la tortib kelmaydi.
+"""
@@ -0,0 +1,475 @@
+import asyncio
+import json
+import random
+import string
+import uuid
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.http import JsonResponse
+from django.utils import timezone
+from django.views import View
+from django.views.decorators.csrf import csrf_exempt
+from rest_framework import status
+
+from custom_user.async_services import (
+    acache,
+    acheck_password,
+    asend_mail,
+)
+from custom_user.models import Device
+from custom_user.serializers import (
+    DeviceSerializer,
+    ForgotPasswordSerializer,
+    SendActivationCodeSerializer,
+    UserLoginSerializer,
+    UserRegistrationSerializer,
+    VerifyCodeUniversalSerializer,
+    registration_fields,
+)
+from custom_user.idempotency import IdempotentRequest
+from custom_user import enrichment
+from custom_user.services import get_client_ip
+from custom_user.utils import get_tokens_for_user
+
+User = get_user_model()
+
+__all__ = [
+    'AsyncUserLoginView',
+    'AsyncUserRegistrationView',
+    'AsyncSendActivationCodeView',
+    'AsyncVerifyCodeUniversalView',
+    'AsyncForgotPasswordView',
+]
+
+
+class AsyncAuthView(View):
+    """
+    Auth endpointlarning native async varianti. Request/response formati sync APIView'lar
+    bilan bir xil, lekin ORM, Redis, SMTP va parol hashing event loopni
+    to'sib qo'ymaydi. Faqat ASGI ostida foyda beradi - WSGI'da sync viewlarni ishlating.
+
+    Geolocation so'rov yo'lida yo'q: qurilmaga xom IP/User-Agent yoziladi, shahar va qurilma nomini
+    fon enricher'i to'ldiradi (enrichment.py). Shu sababli login/verify'da user qidiruvi bilan
+    parallel bajariladigan tarmoq chaqiruvi qolmagan.
+    """
+
+    @classmethod
+    def as_view(cls, **initkwargs):
+        return csrf_exempt(super().as_view(**initkwargs))
+
+    @staticmethod
+    def respond(data, status_code):
+        # DRF JSONRenderer bilan bir xil: ixcham, UTF-8
+        return JsonResponse(
+            data, status=status_code, json_dumps_params={'ensure_ascii': False, 'separators': (',', ':')},
+        )
+
+    def parse_data(self, request):
+        if request.content_type == 'application/json':
+            try:
+                return json.loads(request.body or b'{}')
+            except ValueError as exc:
+                raise _ParseError(f'JSON parse error - {exc}')
+        return request.POST
+
+    async def dispatch(self, request, *args, **kwargs):
+        try:
+            return await super().dispatch(request, *args, **kwargs)
+        except _ParseError as exc:
+            return self.respond({'detail': str(exc)}, status.HTTP_400_BAD_REQUEST)
+
+    def invalid(self, serializer):
+        errors = serializer.errors
+        first_field = next(iter(errors))
+        return self.respond(
+            {'success': False, 'error': errors[first_field][0], 'errorStatus': 'data_credential'},
+            status.HTTP_400_BAD_REQUEST,
+        )
+
+
+class _ParseError(Exception):
+    pass
+
+
+def _generate_code():
+    return ''.join(random.choices(string.digits, k=6))
+
+
+class AsyncUserLoginView(AsyncAuthView):
+    async def post(self, request):
+        data = self.parse_data(request)
+        serializer = UserLoginSerializer(data=data)
+        if not serializer.is_valid():
+            return self.invalid(serializer)
+
+        email = serializer.validated_data['email']
+        password = serializer.validated_data['password']
+        device_hardware = data.get('device_hardware')
+
+        try:
+            user = await User.objects.by_email(email).aget()
+        except User.DoesNotExist:
+            return self.respond(
+                {'success': False, 'error': 'Incorrect email or password.', 'errorStatus': 'data_credential'},
+                status.HTTP_400_BAD_REQUEST,
+            )
+
+        if not await acheck_password(user, password):
+            return self.respond(
+                {'success': False, 'error': 'Incorrect email or password.', 'errorStatus': 'data_credential'},
+                status.HTTP_400_BAD_REQUEST,
+            )
+
+        if not user.is_active:
+            return self.respond(
+                {'success': False, 'error': 'Account not activated. Please enter the code sent to your email.',
+                 'errorStatus': 'not_activated'},
+                status.HTTP_401_UNAUTHORIZED,
+            )
+
+        tokens = get_tokens_for_user(user, device_hardware=device_hardware)
+
+        if device_hardware:
+            # Shahar va qurilma nomi fon workerida - login geolocation'ni kutmaydi
+            device, created = await Device.objects.aupdate_or_create(
+                user=user,
+                device_hardware=device_hardware,
+                defaults={
+                    **enrichment.raw_device_fields(request),
+                    'access_token': tokens['access'],
+                    'refresh_token': tokens['refresh'],
+                }
+            )
+
+            device.last_online = timezone.now()
+            await device.asave()
+            enrichment.enqueue(device.pk)
+
+        return self.respond({
+            'success': True,
+            'message': 'Login muvaffaqiyatli',
+            'login_response': {
+                'access': tokens['access'],
+                'refresh': tokens['refresh'],
+            }
+        }, status.HTTP_200_OK)
+
+
+class AsyncUserRegistrationView(AsyncAuthView):
+    async def post(self, request):
+        data = self.parse_data(request)
+        idempotency = IdempotentRequest(request, 'register', data.get('email'))
+        replay = await idempotency.abegin()
+        if replay is not None:
+            return self.respond(*replay)
+
+        try:
+            result, status_code = await self.register(request, data)
+        except Exception:
+            await idempotency.aabort()
+            raise
+        await idempotency.afinish(result, status_code)
+        return self.respond(result, status_code)
+
+    async def register(self, request, data):
+        ip_address = get_client_ip(request)
+        serializer = UserRegistrationSerializer(data=data)
+        if not serializer.is_valid():
+            errors = serializer.errors
+            first_field = next(iter(errors))
+            return (
+                {'success': False, 'error': errors[first_field][0], 'errorStatus': 'data_credential'},
+                status.HTTP_400_BAD_REQUEST,
+            )
+
+        # Parol hashing va tranzaksiya threadda - event loop to'silmaydi
+        user, created = await sync_to_async(User.objects.register)(**registration_fields(serializer.validated_data))
+        if not created and user.is_active:
+            return (
+                {'success': False, 'error': 'This email already exists', 'errorStatus': 'exists'},
+                status.HTTP_400_BAD_REQUEST,
+            )
+
+        code = _generate_code()
+        await acache.set(f'activation_code_{user.id}', {
+            'email': user.email,
+            'code': code,
+            'ip_address': ip_address,
+            'user_id': user.id
+        }, timeout=60)
+
+        try:
+            await asend_mail(
+                subject='Aktivatsiya kodi',
+                message=f'Assalomu alaykum!\n\nSizning aktivatsiya kodingiz: {code}\n\nKod 5 daqiqa amal qiladi.',
+                from_email=settings.DEFAULT_FROM_EMAIL,
+                recipient_list=[user.email],
+                fail_silently=False,
+            )
+        except Exception:
+            pass
+
+        return {
+            'success': True,
+            'message': 'We can send code to your email',
+        }, status.HTTP_201_CREATED
+
+
+class AsyncSendActivationCodeView(AsyncAuthView):
+    async def post(self, request):
+        serializer = SendActivationCodeSerializer(data=self.parse_data(request))
+        if not serializer.is_valid():
+            return self.invalid(serializer)
+
+        email = serializer.validated_data['email']
+        ip_address = get_client_ip(request)
+
+        try:
+            user = await User.objects.by_email(email).aget()
+        except User.DoesNotExist:
+            return self.respond(
+                {'success': False, 'error': 'No user found with this email.', 'errorStatus': 'data_credential'},
+                status.HTTP_404_NOT_FOUND,
+            )
+
+        if user.is_active:
+            return self.respond(
+                {'status': False, 'error': 'This account is already activated.', 'errorStatus': 'already_have'},
+                status.HTTP_400_BAD_REQUEST,
+            )
+
+        cache_key = f'activation_code_{user.id}'
+        last_sent_key = f'last_code_sent_{user.id}_{ip_address}'
+        cached_data, last_sent = await asyncio.gather(acache.get(cache_key), acache.get(last_sent_key))
+
+        if cached_data:
+            if cached_data.get('ip_address') == ip_address:
+                if last_sent:
+                    return self.respond(
+                        {'status': False, 'error': 'Please wait 1 minute to request a new code.',
+                         'errorStatus': 'time_out'},
+                        status.HTTP_429_TOO_MANY_REQUESTS,
+                    )
+            else:
+                await acache.delete(cache_key)
+
+        code = _generate_code()
+        await asyncio.gather(
+            acache.set(cache_key, {
+                'email': email,
+                'code': code,
+                'ip_address': ip_address,
+                'user_id': user.id
+            }, timeout=60),
+            acache.set(last_sent_key, True, timeout=60),
+        )
+
+        try:
+            await asend_mail(
+                subject='Aktivatsiya kodi',
+                message=f'Assalomu alaykum!\n\nSizning aktivatsiya kodingiz: {code}\n\nKod 5 daqiqa amal qiladi.',
+                from_email=settings.DEFAULT_FROM_EMAIL,
+                recipient_list=[email],
+                fail_silently=False,
+            )
+        except Exception:
+            return self.respond(
+                {'success': False, 'error': 'An error occurred while sending the email.',
+                 'errorStatus': 'data_credential'},
+                status.HTTP_500_INTERNAL_SERVER_ERROR,
+            )
+
+        return self.respond({
+            'success': True,
+            'message': 'The activation code has been sent to your email.',
+        }, status.HTTP_200_OK)
+
+
+class AsyncVerifyCodeUniversalView(AsyncAuthView):
+    async def post(self, request):
+        serializer = VerifyCodeUniversalSerializer(data=self.parse_data(request))
+        if not serializer.is_valid():
+            return self.invalid(serializer)
+
+        email = serializer.validated_data['email']
+        code = serializer.validated_data['code']
+        request_type = serializer.validated_data['request_type']
+        device_hardware = serializer.validated_data.get('device_hardware')
+        ip_address = get_client_ip(request)
+
+        try:
+            user = await User.objects.by_email(email).aget()
+        except User.DoesNotExist:
+            return self.respond(
+                {'success': False, 'error': 'No user found with this email.', 'errorStatus': 'exists'},
+                status.HTTP_404_NOT_FOUND,
+            )
+
+        if request_type == 'register':
+            cache_key = f'activation_code_{user.id}'
+        else:
+            cache_key = f'reset_password_code_{user.id}'
+
+        cached_data = await acache.get(cache_key)
+        error = self.check_code(cached_data, ip_address, code)
+        if error is not None:
+            return error
+
+        if request_type == 'register':
+            return await self.verify_register(user, device_hardware, ip_address, cache_key, request)
+        return await self.verify_forgot(user, email, ip_address, cache_key)
+
+    def check_code(self, cached_data, ip_address, code):
+        if not cached_data:
+            return self.respond(
+                {'success': False, 'error': 'Code has expired. Request a new code.', 'errorStatus': 'time_out'},
+                status.HTTP_400_BAD_REQUEST,
+            )
+
+        if cached_data.get('ip_address') != ip_address:
+            return self.respond(
+                {'success': False,
+                 'error': 'The code has been sent to another device. Please confirm on the device where the code '
+                          'was sent or request a new code.',
+                 'errorStatus': 'another_device'},
+                status.HTTP_403_FORBIDDEN,
+            )
+
+        if cached_data.get('code') != code:
+            return self.respond(
+                {'success': False, 'error': 'Invalid code', 'errorStatus': 'data_credential'},
+                status.HTTP_400_BAD_REQUEST,
+            )
+        return None
+
+    async def verify_register(self, user, device_hardware, ip_address, cache_key, request):
+        # VerifyCodeUniversalView bilan bir xil: akkaunt tasdiqlash paytida aktivlashadi
+        user.is_active = True
+        user.last_login = timezone.now()
+        await user.asave()
+
+        tokens = get_tokens_for_user(user, device_hardware=device_hardware)
+
+        device = None
+        if device_hardware:
+            # Shahar va qurilma nomi fon workerida - noto'g'ri kod geolocation'ga tushmaydi
+            device, created = await Device.objects.aupdate_or_create(
+                user=user,
+                device_hardware=device_hardware,
+                defaults={
+                    **enrichment.raw_device_fields(request),
+                    'access_token': tokens['access'],
+                    'refresh_token': tokens['refresh'],
+                }
+            )
+            enrichment.enqueue(device.pk)
+
+        await acache.delete(cache_key, f'last_code_sent_{user.id}_{ip_address}')
+
+        response_data = {
+            'success': True,
+            'message': 'Akkount muvaffaqiyatli aktivlashtirildi',
+            'response': {
+                'access': tokens['access'],
+                'refresh': tokens['refresh'],
+            }
+        }
+        if device:
+            response_data['device'] = DeviceSerializer(device).data
+
+        return self.respond(response_data, status.HTTP_200_OK)
+
+    async def verify_forgot(self, user, email, ip_address, cache_key):
+        if not user.is_active:
+            return self.respond(
+                {'success': False, 'error': 'This account has not been activated.', 'errorStatus': 'unauthorized'},
+                status.HTTP_400_BAD_REQUEST,
+            )
+
+        reset_token = uuid.uuid4()
+        await asyncio.gather(
+            acache.set(f'password_reset_token_{reset_token}', {
+                'user_id': user.id,
+                'email': email,
+                'ip_address': ip_address,
+            }, timeout=900),
+            acache.delete(cache_key, f'last_reset_sent_{user.id}_{ip_address}'),
+        )
+
+        return self.respond({
+            'success': True,
+            'message': 'The code has been verified. Now set your new password.',
+            'reset_token': str(reset_token)
+        }, status.HTTP_200_OK)
+
+
+class AsyncForgotPasswordView(AsyncAuthView):
+    async def post(self, request):
+        serializer = ForgotPasswordSerializer(data=self.parse_data(request))
+        if not serializer.is_valid():
+            return self.invalid(serializer)
+
+        email = serializer.validated_data['email']
+        ip_address = get_client_ip(request)
+
+        try:
+            user = await User.objects.by_email(email).aget()
+        except User.DoesNotExist:
+            return self.respond(
+                {'success': False, 'error': 'No user found with this email.', 'errorStatus': 'exists'},
+                status.HTTP_404_NOT_FOUND,
+            )
+
+        if not user.is_active:
+            return self.respond(
+                {'success': False, 'error': 'This account has not been activated.', 'errorStatus': 'not_activated'},
+                status.HTTP_400_BAD_REQUEST,
+            )
+
+        cache_key = f'reset_password_code_{user.id}'
+        last_sent_key = f'last_reset_sent_{user.id}_{ip_address}'
+        cached_data, last_sent = await asyncio.gather(acache.get(cache_key), acache.get(last_sent_key))
+
+        if cached_data:
+            if cached_data.get('ip_address') == ip_address:
+                if last_sent:
+                    return self.respond(
+                        {'success': False, 'error': 'Please wait 1 minute to request a new code.',
+                         'errorStatus': 'time_out'},
+                        status.HTTP_429_TOO_MANY_REQUESTS,
+                    )
+            else:
+                await acache.delete(cache_key)
+
+        code = _generate_code()
+        await asyncio.gather(
+            acache.set(cache_key, {
+                'email': email,
+                'code': code,
+                'ip_address': ip_address,
+                'user_id': user.id
+            }, timeout=60),
+            acache.set(last_sent_key, True, timeout=60),
+        )
+
+        try:
+            await asend_mail(
+                subject='Parolni tiklash kodi',
+                message=f'Assalomu alaykum!\n\nParolni tiklash kodingiz: {code}\n\nKod 10 daqiqa amal qiladi.\n\n'
+                        f'Agar siz bu so\'rovni yuborgan bo\'lmasangiz, bu xabarni e\'tiborsiz qoldiring.',
+                from_email=settings.DEFAULT_FROM_EMAIL,
+                recipient_list=[email],
+                fail_silently=False,
+            )
+        except Exception:
+            return self.respond(
+                {'success': False, 'error': 'An error occurred while sending the email.', 'errorStatus': 'send_mail'},
+                status.HTTP_500_INTERNAL_SERVER_ERROR,
+            )
+
+        return self.respond({
+            'success': True,
+            'message': 'A password recovery code has been sent to your email.',
+        }, status.HTTP_200_OK)
@@ -0,0 +1,29 @@
+from django.core.cache import caches
+from drf_spectacular.types import OpenApiTypes
+from drf_spectacular.utils import OpenApiResponse, extend_schema
+from rest_framework import status
+from rest_framework.permissions import IsAdminUser
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+
+class CacheStatsView(APIView):
+    permission_classes = [IsAdminUser]
+
+    @extend_schema(
+        request=None,
+        responses={200: OpenApiResponse(response=OpenApiTypes.OBJECT, description='Kesh statistikasi')},
+        tags=['Monitoring'],
+        summary='Worker kesh statistikasi',
+        description="Joriy worker uchun Redis circuit breaker holati, lokal LRU va fallback kesh statistikasi"
+    )
+    def get(self, request):
+        stats = {}
+        for alias in caches:
+            client = getattr(caches[alias], 'client', None)
+            stats[alias] = client.stats() if hasattr(client, 'stats') else None
+
+        return Response({
+            'success': True,
+            'caches': stats,
+        }, status=status.HTTP_200_OK)
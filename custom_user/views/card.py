@@ -4,9 +4,10 @@ from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from rest_framework import status
 from drf_spectacular.utils import OpenApiParameter, OpenApiResponse, extend_schema
+from custom_user.fieldsets import FIELDSET_PARAMETERS, only_fieldset, parse_fieldset, readable_fields
 from custom_user.models import Card
 from custom_user.pagination import CustomPageNumberPagination
-from custom_user.serializers import CardSerializer, CardCreateSerializer, CardUpdateSerializer, ErrorResponseSerializer
+from custom_user.serializers import CardSerializer, CardCreateSerializer, CardUpdateSerializer, ErrorResponseSerializer, card_rows
 
 
 
@@ -27,10 +28,20 @@ class CardListView(ListAPIView):
         summary='Kartalar ro\'yxati',
         description='User\'ning barcha kartalari (default birinchi, pagination bilan)',
         operation_id='cards_list',
+        parameters=FIELDSET_PARAMETERS,
     )
     def get(self, request, *args, **kwargs):
         return super().get(request, *args, **kwargs)
 
+    def get_queryset(self):
+        return Card.objects.filter(user=self.request.user)
+
+    def list(self, request, *args, **kwargs):
+        # ModelSerializer o'rniga values() + oldindan kompilyatsiya qilingan row -> dict
+        rows = card_rows.select(parse_fieldset(request, card_rows.names))
+        page = self.paginate_queryset(rows.values(self.get_queryset()))
+        return self.get_paginated_response(rows.many(page))
+
 
 class CardCreateView(APIView):
     permission_classes = [IsAuthenticated]
@@ -80,13 +91,14 @@ class CardCreateView(APIView):
 class CardDetailView(APIView):
     permission_classes = [IsAuthenticated]
 
-    def get_object(self, uid):
+    def get_object(self, uid, queryset=None):
         try:
-            return Card.objects.get(uid=uid, user=self.request.user)
+            return (Card.objects if queryset is None else queryset).get(uid=uid, user=self.request.user)
         except Card.DoesNotExist:
             return None
 
     @extend_schema(
+        parameters=FIELDSET_PARAMETERS,
         responses={
             200: CardSerializer,
             404: ErrorResponseSerializer,
@@ -96,7 +108,8 @@ class CardDetailView(APIView):
         operation_id='card_retrieve_details',
     )
     def get(self, request, uid):
-        card = self.get_object(uid)
+        fields = parse_fieldset(request, readable_fields(CardSerializer))
+        card = self.get_object(uid, only_fieldset(Card.objects.all(), CardSerializer, fields))
 
         if not card:
             return Response(
@@ -106,7 +119,7 @@ class CardDetailView(APIView):
 
         return Response({
             'success': True,
-            'data': CardSerializer(card).data
+            'data': CardSerializer(card, fields=fields).data
         }, status=status.HTTP_200_OK)
 
     @extend_schema(
@@ -1,11 +1,37 @@
+from functools import cached_property
+
 from rest_framework import status
 from rest_framework.response import Response
-from drf_yasg.utils import swagger_auto_schema
+from drf_spectacular.utils import extend_schema, extend_schema_view
 from djoser.views import UserViewSet
 
+from custom_user.fieldsets import FIELDSET_PARAMETERS, only_fieldset, parse_fieldset, readable_fields
+
+READ_ACTIONS = ('me', 'retrieve')
 
+
+@extend_schema_view(me=extend_schema(methods=['GET'], parameters=FIELDSET_PARAMETERS))
 class CustomUserViewSet(UserViewSet):
 
+    @cached_property
+    def fieldset(self):
+        return parse_fieldset(self.request, readable_fields(self.get_serializer_class()))
+
+    def is_read(self):
+        return self.request.method == 'GET' and self.action in READ_ACTIONS
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if self.is_read():
+            # `me` request.user'ni qaytaradi - only() faqat retrieve'ga ta'sir qiladi
+            queryset = only_fieldset(queryset, self.get_serializer_class(), self.fieldset)
+        return queryset
+
+    def get_serializer(self, *args, **kwargs):
+        if self.is_read():
+            kwargs['fields'] = self.fieldset
+        return super().get_serializer(*args, **kwargs)
+
     def update(self, request, *args, **kwargs):
         return super().update(request, *args, **kwargs)
 
@@ -15,7 +41,7 @@ class CustomUserViewSet(UserViewSet):
     def destroy(self, request, *args, **kwargs):
         return super().destroy(request, *args, **kwargs)
 
-    @swagger_auto_schema(auto_schema=None)
+    @extend_schema(exclude=True)
     def list(self, request, *args, **kwargs):
         return Response(
             {"detail": "List endpoint disabled."},
@@ -23,18 +49,18 @@ class CustomUserViewSet(UserViewSet):
         )
 
 
-    @swagger_auto_schema(auto_schema=None)
+    @extend_schema(exclude=True)
     def create(self, request, *args, **kwargs):
         return Response(
             {"detail": "Registration disabled."},
             status=status.HTTP_405_METHOD_NOT_ALLOWED
         )
 
-    @swagger_auto_schema(auto_schema=None)
+    @extend_schema(exclude=True)
     def reset_password(self, request, *args, **kwargs):
         return super().reset_password(request, *args, **kwargs)
 
-    @swagger_auto_schema(auto_schema=None)
+    @extend_schema(exclude=True)
     def activation(self, request, *args, **kwargs):
         return Response({"detail": "Disabled."}, status=status.HTTP_404_NOT_FOUND)
 
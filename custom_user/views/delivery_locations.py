@@ -5,12 +5,14 @@ from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from rest_framework import status
 
+from custom_user.fieldsets import FIELDSET_PARAMETERS, only_fieldset, parse_fieldset, readable_fields
 from custom_user.pagination import CustomPageNumberPagination
 from custom_user.serializers import (
     AddressSerializer,
     AddressCreateSerializer,
     AddressUpdateSerializer,
-    ErrorResponseSerializer
+    ErrorResponseSerializer,
+    address_rows,
 )
 from custom_user.models import Address
 
@@ -31,11 +33,21 @@ class AddressListView(ListAPIView):
         },
         tags=['Addresses'],
         summary='Manzillar ro\'yxati',
-        description='User\'ning barcha manzillari (default birinchi)'
+        description='User\'ning barcha manzillari (default birinchi)',
+        parameters=FIELDSET_PARAMETERS,
     )
     def get(self, request, *args, **kwargs):
         return super().get(request, *args, **kwargs)
 
+    def get_queryset(self):
+        return Address.objects.filter(user=self.request.user)
+
+    def list(self, request, *args, **kwargs):
+        # ModelSerializer o'rniga values() + oldindan kompilyatsiya qilingan row -> dict
+        rows = address_rows.select(parse_fieldset(request, address_rows.names))
+        page = self.paginate_queryset(rows.values(self.get_queryset()))
+        return self.get_paginated_response(rows.many(page))
+
 class AddressCreateView(APIView):
     permission_classes = [IsAuthenticated]
 
@@ -75,14 +87,15 @@ class AddressCreateView(APIView):
 class AddressDetailView(APIView):
     permission_classes = [IsAuthenticated]
 
-    def get_object(self, address_id):
+    def get_object(self, address_id, queryset=None):
         try:
-            return Address.objects.get(id=address_id, user=self.request.user)
+            return (Address.objects if queryset is None else queryset).get(id=address_id, user=self.request.user)
         except Address.DoesNotExist:
             return None
 
     @extend_schema(
         operation_id="address_detail",
+        parameters=FIELDSET_PARAMETERS,
         responses={
             200: AddressSerializer,
             404: ErrorResponseSerializer,
@@ -91,7 +104,8 @@ class AddressDetailView(APIView):
         summary='Manzilni ko\'rish',
     )
     def get(self, request, address_id):
-        address = self.get_object(address_id)
+        fields = parse_fieldset(request, readable_fields(AddressSerializer))
+        address = self.get_object(address_id, only_fieldset(Address.objects.all(), AddressSerializer, fields))
 
         if not address:
             return Response(
@@ -101,7 +115,7 @@ class AddressDetailView(APIView):
 
         return Response({
             'success': True,
-            'address': AddressSerializer(address).data
+            'address': AddressSerializer(address, fields=fields).data
         }, status=status.HTTP_200_OK)
 
     @extend_schema(
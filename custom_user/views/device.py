@@ -1,3 +1,4 @@
+from django.db import transaction
 from rest_framework import status
 from rest_framework.response import Response
 from rest_framework.views import APIView
@@ -9,8 +10,12 @@ from custom_user.serializers import (
     ErrorResponseSerializer,
     DeviceSerializer,
     DeviceDeleteResponseSerializer,
+    DeviceLogoutOthersResponseSerializer,
+    PushTokenSerializer,
 )
+from custom_user.fieldsets import FIELDSET_PARAMETERS, only_fieldset, parse_fieldset, readable_fields
 from custom_user.models import Device
+from custom_user.revocation import revoke_devices
 from custom_user.utils import get_device_from_token
 from custom_user.pagination import CustomPageNumberPagination
 
@@ -78,6 +83,8 @@ class DeviceDeleteView(APIView):
             )
 
             device.delete()
+            # Redis ishlamasa bekor qilish navbatga yoziladi - o'chirilgandan keyin 500 qaytmaydi
+            revoke_devices(request.user.id, [device_hardware])
 
             return Response(
                 {
@@ -125,6 +132,7 @@ class DeviceDeleteWithUidView(APIView):
             )
 
         device.delete()
+        revoke_devices(request.user.id, [device.device_hardware])
 
         return Response(
             {
@@ -134,6 +142,90 @@ class DeviceDeleteWithUidView(APIView):
         )
 
 
+class DeviceLogoutOthersView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    @extend_schema(
+        request=None,
+        responses={
+            200: DeviceLogoutOthersResponseSerializer,
+            400: ErrorResponseSerializer,
+        },
+        tags=['Devices'],
+        summary='Boshqa barcha qurilmalardan chiqish',
+        description='Joriy qurilmadan (JWT dagi device_hardware) boshqa barcha qurilmalar o\'chiriladi va tokenlari bekor qilinadi'
+    )
+    def post(self, request):
+        device_hardware = request.auth.get('device_hardware')
+        if not device_hardware:
+            return Response(
+                {'success': False, 'error': 'The token does not contain device information.', 'errorStatus': 'invalid_token'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        removed = Device.objects.delete_others(request.user.id, device_hardware)
+        # O'chirish commit bo'ldi - Redis ishlamasa ham 500 emas, bekor qilish navbatga yoziladi
+        revoke_devices(request.user.id, removed)
+
+        return Response(
+            {
+                'success': True,
+                'message': 'Logged out of all other devices.',
+                'count': len(removed),
+            },
+            status=status.HTTP_200_OK
+        )
+
+
+class DevicePushTokenView(APIView):
+    permission_classes = [IsAuthenticated]
+    serializer_class = PushTokenSerializer
+
+    @extend_schema(
+        request=PushTokenSerializer,
+        responses={
+            200: OpenApiResponse(response=DeviceDeleteResponseSerializer, description='Push token saqlandi'),
+            400: ErrorResponseSerializer,
+            404: ErrorResponseSerializer,
+        },
+        tags=['Devices'],
+        summary='Joriy qurilmaning push tokeni',
+        description='Token JWT dagi device_hardware bo\'yicha joriy qurilmaga yoziladi'
+    )
+    def put(self, request):
+        serializer = PushTokenSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(
+                {'success': False, 'error': serializer.errors, 'errorStatus': 'data_credential'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        # JWTAuthentication tokenni allaqachon tekshirgan - qayta dekodlanmaydi
+        device_hardware = request.auth.get('device_hardware')
+        if not device_hardware:
+            return Response(
+                {'success': False, 'error': 'The token does not contain device information.', 'errorStatus': 'invalid_token'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        push_token = serializer.validated_data['push_token']
+        with transaction.atomic():
+            if push_token:
+                # Ilova qayta o'rnatilganda token eski qurilma yozuvida qolib ketgan bo'lishi mumkin
+                Device.objects.filter(push_token=push_token).update(push_token=None)
+            updated = Device.objects.filter(user=request.user, device_hardware=device_hardware).update(
+                push_token=push_token
+            )
+
+        if not updated:
+            return Response(
+                {'success': False, 'error': 'Device not found', 'errorStatus': 'exists'},
+                status=status.HTTP_404_NOT_FOUND
+            )
+
+        return Response({'success': True, 'message': 'Push token saved.'}, status=status.HTTP_200_OK)
+
+
 class DeviceListView(ListAPIView):
     permission_classes = [IsAuthenticated]
     pagination_class = CustomPageNumberPagination
@@ -146,28 +238,26 @@ class DeviceListView(ListAPIView):
         return {'request': self.request}
 
     def list(self, request, *args, **kwargs):
-        queryset = self.get_queryset()
-        serializer = self.get_serializer(queryset, many=True)
-
-        # me bo'yicha tartiblash: True'lar birinchi
-        sorted_data = sorted(
-            serializer.data,
-            key=lambda x: x.get('me', False),
-            reverse=True
-        )
+        fields = parse_fieldset(request, readable_fields(DeviceSerializer))
+        # device_hardware 'me' tartiblash uchun har doim kerak
+        queryset = only_fieldset(self.get_queryset(), DeviceSerializer, fields, extra=('device_hardware',))
+
+        # me bo'yicha tartiblash: True'lar birinchi (me maydoni so'ralmagan bo'lsa ham)
+        sorted_devices = sorted(queryset, key=self.get_serializer().get_me, reverse=True)
 
-        # Pagination
-        page = self.paginate_queryset(sorted_data)
+        # Pagination - faqat sahifadagi qurilmalar serializatsiya qilinadi
+        page = self.paginate_queryset(sorted_devices)
         if page is not None:
-            return self.get_paginated_response(page)
+            return self.get_paginated_response(self.get_serializer(page, many=True, fields=fields).data)
 
-        return Response(sorted_data)
+        return Response(self.get_serializer(sorted_devices, many=True, fields=fields).data)
 
     @extend_schema(
         parameters=[
             OpenApiParameter(name='page', description='Sahifa raqami', required=False, type=int),
             OpenApiParameter(name='page_size', description='Sahifadagi elementlar soni (max: 100)', required=False,
                              type=int, default=5),
+            *FIELDSET_PARAMETERS,
         ],
         responses={200: DeviceSerializer(many=True)},
         tags=['Devices'],
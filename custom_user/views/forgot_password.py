@@ -66,7 +66,7 @@ class ForgotPasswordView(APIView):
         ip_address = get_client_ip(request)
 
         try:
-            user = User.objects.get(email=email)
+            user = User.objects.by_email(email).get()
 
             if not user.is_active:
                 return Response(
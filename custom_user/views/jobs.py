@@ -0,0 +1,28 @@
+from drf_spectacular.types import OpenApiTypes
+from drf_spectacular.utils import OpenApiResponse, extend_schema
+from rest_framework import status
+from rest_framework.permissions import IsAdminUser
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from custom_user.jobs import autodiscover, get_backend
+
+
+class JobStatsView(APIView):
+    permission_classes = [IsAdminUser]
+
+    @extend_schema(
+        request=None,
+        responses={200: OpenApiResponse(response=OpenApiTypes.OBJECT, description='Navbatlar statistikasi')},
+        tags=['Monitoring'],
+        summary='Fon vazifalari navbatlari',
+        description="Har bir navbat uchun tayyor, rejalashtirilgan va bajarilayotgan vazifalar soni, "
+                    "eng eski tayyor vazifaning kutish vaqti va dead-letter hajmi. Redis ishlatilsa `fallback` - "
+                    "outage paytida jadvalga yozilgan vazifalar"
+    )
+    def get(self, request):
+        queues = {job.queue for job in autodiscover().values()}
+        return Response({
+            'success': True,
+            'jobs': get_backend().stats(queues),
+        }, status=status.HTTP_200_OK)
@@ -12,7 +12,7 @@ from custom_user.serializers import (
     UserLoginSerializer,
     UserLoginResponseSerializer,
 )
-from custom_user.services import get_device_info, get_location_by_ip, get_client_ip
+from custom_user import enrichment
 from custom_user.utils import get_tokens_for_user
 
 User = get_user_model()
@@ -59,7 +59,7 @@ class UserLoginView(APIView):
         device_hardware = request.data.get('device_hardware')
 
         try:
-            user = User.objects.get(email=email)
+            user = User.objects.by_email(email).get()
 
             if not user.check_password(password):
                 return Response(
@@ -76,18 +76,11 @@ class UserLoginView(APIView):
             tokens = get_tokens_for_user(user, device_hardware=device_hardware)
 
             if device_hardware:
-                ip_address = get_client_ip(request)
-                location_city = get_location_by_ip(ip_address)
-                device_info = get_device_info(request)
-                device_model = device_info.get('device_model', '')
-
                 device, created = Device.objects.update_or_create(
                     user=user,
                     device_hardware=device_hardware,
                     defaults={
-                        'device_ip': ip_address,
-                        'device_name': device_model,
-                        'location_city': location_city if location_city else '',
+                        **enrichment.raw_device_fields(request),
                         'access_token': tokens['access'],
                         'refresh_token': tokens['refresh'],
                     }
@@ -95,6 +88,7 @@ class UserLoginView(APIView):
 
                 device.last_online = timezone.now()
                 device.save()
+                enrichment.enqueue(device.pk)
 
             response_data = {
                 'success': True,
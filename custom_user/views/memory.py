@@ -0,0 +1,45 @@
+from drf_spectacular.types import OpenApiTypes
+from drf_spectacular.utils import OpenApiParameter, OpenApiResponse, extend_schema
+from rest_framework import status
+from rest_framework.permissions import IsAdminUser
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from custom_user.memory import build_report, load_reports, reset_baseline
+
+
+class MemoryStatsView(APIView):
+    permission_classes = [IsAdminUser]
+
+    @extend_schema(
+        parameters=[
+            OpenApiParameter(name='models', description="Model obyektlari sonini ham hisoblash (sekin)",
+                             required=False, type=bool),
+        ],
+        responses={200: OpenApiResponse(response=OpenApiTypes.OBJECT, description='Xotira statistikasi')},
+        tags=['Monitoring'],
+        summary='Worker xotira statistikasi',
+        description="Joriy worker uchun RSS, GC va tracemalloc diff, hamda boshqa workerlarning oxirgi snapshotlari"
+    )
+    def get(self, request):
+        include_models = request.query_params.get('models') in ('1', 'true', 'True')
+
+        return Response({
+            'success': True,
+            'worker': build_report(include_models=include_models),
+            'workers': load_reports(),
+        }, status=status.HTTP_200_OK)
+
+    @extend_schema(
+        request=None,
+        responses={200: OpenApiResponse(response=OpenApiTypes.OBJECT, description='Baseline yangilandi')},
+        tags=['Monitoring'],
+        summary='Baseline snapshotni yangilash',
+    )
+    def post(self, request):
+        reset_baseline()
+
+        return Response({
+            'success': True,
+            'message': 'Memory baseline reset.',
+        }, status=status.HTTP_200_OK)
@@ -4,7 +4,12 @@ from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.views import APIView
 
-from custom_user.serializers import NotificationSettingsSerializer, ErrorResponseSerializer, NotificationSettingsResponseSerializer
+from custom_user.serializers import (
+    NotificationSettingsSerializer,
+    ErrorResponseSerializer,
+    NotificationSettingsResponseSerializer,
+    notification_settings_rows,
+)
 
 class NotificationSettingsView(APIView):
     permission_classes = [IsAuthenticated]
@@ -65,14 +70,8 @@ class NotificationSettingsView(APIView):
         description='User notification sozlamalarini ko\'rish'
     )
     def get(self, request):
-        user = request.user
-
         return Response(
-            {
-                'success': True,
-                'notification': user.notification,
-                'promotional_notification': user.promotional_notification
-            },
+            {'success': True, **notification_settings_rows.one(request.user)},
             status=status.HTTP_200_OK
         )
 
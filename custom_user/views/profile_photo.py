@@ -3,8 +3,7 @@ from rest_framework.views import APIView
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.parsers import MultiPartParser, FormParser
 from django.contrib.auth import get_user_model
-from drf_yasg.utils import swagger_auto_schema
-from drf_yasg import openapi
+from drf_spectacular.utils import extend_schema
 
 from custom_user.serializers import (
     ProfilePhotoSerializer,
@@ -17,15 +16,8 @@ class ProfilePhotoUpdateView(APIView):
     parser_classes = [MultiPartParser, FormParser]
     serializer_class = ProfilePhotoSerializer
 
-    @swagger_auto_schema(
-        manual_parameters=[
-            openapi.Parameter(
-                name='profile_photo',
-                in_=openapi.IN_FORM,
-                type=openapi.TYPE_FILE,
-                required=True
-            )
-        ]
+    @extend_schema(
+        request={'multipart/form-data': ProfilePhotoSerializer},
     )
     def patch(self, request):
         user = request.user
@@ -6,7 +6,7 @@ from django.contrib.auth import get_user_model
 from django.core.mail import send_mail
 from django.conf import settings
 from django.core.cache import cache
-from drf_spectacular.utils import extend_schema, OpenApiResponse
+from drf_spectacular.utils import extend_schema, OpenApiParameter, OpenApiResponse
 import random
 import string
 
@@ -14,7 +14,9 @@ from custom_user.serializers import (
     UserRegistrationSerializer,
     UserRegistrationResponseSerializer,
     ErrorResponseSerializer,
+    registration_fields,
 )
+from custom_user.idempotency import IDEMPOTENCY_HEADER, IdempotentRequest
 from custom_user.services import get_client_ip
 
 User = get_user_model()
@@ -34,28 +36,42 @@ class UserRegistrationView(APIView):
                 response=ErrorResponseSerializer,
                 description='"This email already exists" or "Validation error"'
             ),
+            409: OpenApiResponse(
+                response=ErrorResponseSerializer,
+                description='Shu Idempotency-Key bilan so\'rov hali bajarilmoqda'
+            ),
+            422: OpenApiResponse(
+                response=ErrorResponseSerializer,
+                description='Idempotency-Key boshqa email bilan ishlatilgan'
+            ),
         },
+        parameters=[
+            OpenApiParameter(
+                IDEMPOTENCY_HEADER, str, OpenApiParameter.HEADER, required=False,
+                description="Qayta yuborilgan so'rov birinchi javobni oladi, kod qayta yuborilmaydi"
+            ),
+        ],
         tags=['Authentication'],
         summary="Ro'yxatdan o'tish",
         description='Yangi user yaratish va email ga aktivatsiya kodi yuborish'
     )
     def post(self, request):
-        email = request.data.get('email')
-        ip_address = get_client_ip(request)
-
-        if email:
-            if User.objects.filter(email=email, is_active=True).exists():
-                return Response(
-                    {"success": False, 'error': 'This email already exists', "errorStatus": "exists"},
-                    status=status.HTTP_400_BAD_REQUEST
-                )
-
-            old_user = User.objects.filter(email=email, is_active=False).first()
-            if old_user:
-                old_cache_key = f'activation_code_{old_user.id}'
-                cache.delete(old_cache_key)
-                old_user.delete()
+        idempotency = IdempotentRequest(request, 'register', request.data.get('email'))
+        replay = idempotency.begin()
+        if replay is not None:
+            data, status_code = replay
+            return Response(data, status=status_code)
 
+        try:
+            data, status_code = self.register(request)
+        except Exception:
+            idempotency.abort()
+            raise
+        idempotency.finish(data, status_code)
+        return Response(data, status=status_code)
+
+    def register(self, request):
+        ip_address = get_client_ip(request)
         serializer = UserRegistrationSerializer(data=request.data)
 
         if not serializer.is_valid():
@@ -63,17 +79,24 @@ class UserRegistrationView(APIView):
             first_field = next(iter(errors))
             error_msg = errors[first_field][0]
 
-            return Response(
+            return (
                 {"success": False, 'error': error_msg, "errorStatus": "data_credential"},
-                status=status.HTTP_400_BAD_REQUEST
+                status.HTTP_400_BAD_REQUEST,
             )
 
-        user = serializer.save()
+        # Aktivlashtirilmagan user qatori qayta ishlatiladi - id, kaskad o'chirish va qayta INSERT yo'q
+        user, created = User.objects.register(**registration_fields(serializer.validated_data))
+        if not created and user.is_active:
+            return (
+                {"success": False, 'error': 'This email already exists', "errorStatus": "exists"},
+                status.HTTP_400_BAD_REQUEST,
+            )
 
         email = user.email
 
         code = ''.join(random.choices(string.digits, k=6))
 
+        # Qayta ro'yxatdan o'tishda kalit o'sha (user.id) - eski kod shu bilan almashadi
         cache_key = f'activation_code_{user.id}'
         cache_data = {
             'email': email,
@@ -99,5 +122,4 @@ class UserRegistrationView(APIView):
             'message': 'We can send code to your email',
         }
 
-        return Response(response_data, status=status.HTTP_201_CREATED)
-
+        return response_data, status.HTTP_201_CREATED
@@ -0,0 +1,38 @@
+from django.http import HttpResponse, HttpResponseNotModified
+from django.utils.cache import patch_vary_headers
+from drf_spectacular.utils import extend_schema
+from drf_spectacular.views import SCHEMA_KWARGS, SpectacularAPIView
+
+from custom_user.schema_cache import get_entry
+
+
+class CachedSpectacularAPIView(SpectacularAPIView):
+    """
+    SpectacularAPIView bilan bir xil URL va content negotiation, lekin sxema har so'rovda
+    qayta qurilmaydi: tayyor YAML/JSON baytlar ETag va oldindan siqilgan gzip bilan beriladi.
+    `lang` va `version` parametrlari bilan kelgan so'rovlar odatdagidek generatsiya qilinadi.
+    """
+
+    @extend_schema(**SCHEMA_KWARGS)
+    def get(self, request, *args, **kwargs):
+        if request.GET.get('lang') or request.GET.get('version') or self.custom_settings or self.patterns:
+            return super().get(request, *args, **kwargs)
+
+        entry = get_entry()
+        fmt = 'json' if 'json' in request.accepted_renderer.format else 'yaml'
+        encoding = 'gzip' if 'gzip' in request.META.get('HTTP_ACCEPT_ENCODING', '') else None
+        etag = entry.etag(fmt, encoding)
+
+        if etag in request.META.get('HTTP_IF_NONE_MATCH', ''):
+            response = HttpResponseNotModified()
+        else:
+            body = entry.gzipped[fmt] if encoding else entry.body[fmt]
+            response = HttpResponse(body, content_type=request.accepted_media_type)
+            response['Content-Disposition'] = f'inline; filename="{self._get_filename(request, None)}"'
+            if encoding:
+                response['Content-Encoding'] = 'gzip'
+
+        response['ETag'] = etag
+        response['Cache-Control'] = 'no-cache'
+        patch_vary_headers(response, ('Accept', 'Accept-Encoding'))
+        return response
@@ -73,7 +73,7 @@ class SendActivationCodeView(APIView):
         ip_address = get_client_ip(request)
 
         try:
-            user = User.objects.get(email=email)
+            user = User.objects.by_email(email).get()
 
             if user.is_active:
                 return Response(
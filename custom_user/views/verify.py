@@ -4,6 +4,7 @@ from rest_framework.views import APIView
 from rest_framework.permissions import AllowAny
 from django.contrib.auth import get_user_model
 from django.core.cache import cache
+from django.utils import timezone
 from drf_spectacular.utils import extend_schema, OpenApiResponse
 
 from custom_user.serializers import (
@@ -12,7 +13,8 @@ from custom_user.serializers import (
     ErrorResponseSerializer,
     VerifyCodeUniversalResponseSerializer,
 )
-from custom_user.services import get_client_ip, get_location_by_ip, get_device_info
+from custom_user import enrichment
+from custom_user.services import get_client_ip
 from custom_user.models import Device
 from custom_user.utils import get_tokens_for_user
 
@@ -63,12 +65,9 @@ class VerifyCodeUniversalView(APIView):
         code = serializer.validated_data['code']
         request_type = serializer.validated_data['request_type']
         ip_address = get_client_ip(request)
-        location_city = get_location_by_ip(ip_address)
-        device = get_device_info(request)
-        device_model = device.get('device_model')
 
         try:
-            user = User.objects.get(email=email)
+            user = User.objects.by_email(email).get()
 
             if request_type == 'register':
                 cache_key = f'activation_code_{user.id}'
@@ -104,22 +103,28 @@ class VerifyCodeUniversalView(APIView):
 
             # ========== REGISTER TYPE ==========
             if request_type == 'register':
+                # Akkaunt shu yerda aktivlashadi: register() faqat aktiv bo'lmagan qatorni qayta yozadi,
+                # retention esa aktivlashmagan va hech kirmagan userlarni o'chiradi
+                user.is_active = True
+                user.last_login = timezone.now()
+                user.save()
+
                 device_hardware_from_request = serializer.validated_data.get('device_hardware')
                 tokens = get_tokens_for_user(user, device_hardware=device_hardware_from_request)
 
                 device = None
                 if device_hardware_from_request:
+                    # Shahar va qurilma nomi fon workerida - noto'g'ri kod geolocation'ga tushmaydi
                     device, created = Device.objects.update_or_create(
                         user=user,
                         device_hardware=device_hardware_from_request,
                         defaults={
-                            'device_ip': ip_address,
-                            'device_name': device_model,
-                            'location_city': location_city if location_city else '',
+                            **enrichment.raw_device_fields(request),
                             'access_token': tokens['access'],
                             'refresh_token': tokens['refresh'],
                         }
                     )
+                    enrichment.enqueue(device.pk)
 
                 cache.delete(cache_key)
                 cache.delete(f'last_code_sent_{user.id}_{ip_address}')